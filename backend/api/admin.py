@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import JingleSchedule, JinglePlayHistory, VenueConfiguration, KaraokeSession, KaraokeQueue
+from .models import JingleSchedule, JinglePlayHistory, JinglePlayRollup, VenueConfiguration, KaraokeSession, KaraokeQueue
 
 # Register your models here.
 
@@ -12,10 +12,16 @@ class JingleScheduleAdmin(admin.ModelAdmin):
 
 @admin.register(JinglePlayHistory)
 class JinglePlayHistoryAdmin(admin.ModelAdmin):
-    list_display = ('jingle_filename', 'played_at', 'round_number')
+    list_display = ('jingle_filename', 'venue_name', 'played_at', 'round_number')
     list_filter = ('played_at',)
     ordering = ('-played_at',)
 
+@admin.register(JinglePlayRollup)
+class JinglePlayRollupAdmin(admin.ModelAdmin):
+    list_display = ('jingle_filename', 'venue_name', 'hour', 'play_count', 'last_played_at')
+    list_filter = ('venue_name',)
+    ordering = ('-hour',)
+
 @admin.register(VenueConfiguration)
 class VenueConfigurationAdmin(admin.ModelAdmin):
     list_display = ('venue_name', 'num_players', 'voice_id', 'include_qr', 'created_at')
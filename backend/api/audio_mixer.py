@@ -1,83 +1,388 @@
 """
 Audio Mixer Module for Jingle Generation
 Combines TTS audio with AI-generated music background
+
+Mixing runs on NumPy PCM arrays: each MP3 is decoded once through ffmpeg
+into float32 samples, gain/fades/looping/overlay are vectorised array
+operations, and the result is encoded to MP3 once. Durations are derived
+from array lengths, so callers never re-decode the output to measure it.
+
+The music bed is ducked under the voice with a sidechain-style envelope
+follower (block RMS of the TTS, attack/release smoothing) computed on the
+same arrays, so it adds no extra decode or encode step.
 """
 
 import io
 import logging
+import shutil
+import subprocess
+
+import numpy as np
 from pydub import AudioSegment
-from pydub.effects import normalize
 
 logger = logging.getLogger(__name__)
 
+# Working format for all mixing: 44.1kHz stereo float32 in [-1.0, 1.0]
+SAMPLE_RATE = 44100
+CHANNELS = 2
+DEFAULT_BITRATE = '128k'
+DEFAULT_FADE_MS = 500
+
+# Voice-over ducking: music drops by DUCK_DEPTH_DB wherever the TTS RMS
+# (measured in DUCK_BLOCK_MS blocks) is above DUCK_THRESHOLD_DB
+DUCK_DEPTH_DB = 8
+DUCK_THRESHOLD_DB = -40
+DUCK_ATTACK_MS = 20
+DUCK_RELEASE_MS = 250
+DUCK_BLOCK_MS = 10
+
+
+def _ffmpeg_binary():
+    """Locate the ffmpeg executable (installed in the Docker image)"""
+    return shutil.which('ffmpeg') or 'ffmpeg'
+
+
+def decode_mp3(audio_bytes, sample_rate=SAMPLE_RATE, channels=CHANNELS):
+    """
+    Decode MP3 bytes into a PCM array
+
+    Args:
+        audio_bytes: MP3 (or any ffmpeg-readable) audio bytes
+        sample_rate: Output sample rate in Hz
+        channels: Output channel count
+
+    Returns:
+        np.ndarray: float32 array of shape (samples, channels)
 
-def mix_tts_with_music(tts_bytes, music_bytes, tts_volume=3, music_volume=-4):
+    Raises:
+        ValueError: If ffmpeg cannot decode the input
+    """
+    cmd = [
+        _ffmpeg_binary(), '-v', 'error',
+        '-i', 'pipe:0',
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', str(channels), '-ar', str(sample_rate),
+        'pipe:1'
+    ]
+    proc = subprocess.run(cmd, input=audio_bytes, capture_output=True)
+    if proc.returncode != 0:
+        raise ValueError(f"ffmpeg decode failed: {proc.stderr.decode(errors='ignore').strip()}")
+
+    samples = np.frombuffer(proc.stdout, dtype='<i2').astype(np.float32) / 32768.0
+    return samples.reshape(-1, channels)
+
+
+def encode_mp3(pcm, sample_rate=SAMPLE_RATE, bitrate=DEFAULT_BITRATE):
+    """
+    Encode a PCM array to MP3 bytes
+
+    Args:
+        pcm: float32 array of shape (samples, channels)
+        sample_rate: Sample rate of the array in Hz
+        bitrate: MP3 bitrate (e.g. '128k')
+
+    Returns:
+        bytes: MP3 audio
+    """
+    channels = pcm.shape[1] if pcm.ndim == 2 else 1
+    int_samples = (np.clip(pcm, -1.0, 32767 / 32768) * 32768).astype('<i2')
+    cmd = [
+        _ffmpeg_binary(), '-v', 'error',
+        '-f', 's16le', '-ar', str(sample_rate), '-ac', str(channels),
+        '-i', 'pipe:0',
+        '-f', 'mp3', '-b:a', bitrate,
+        'pipe:1'
+    ]
+    proc = subprocess.run(cmd, input=int_samples.tobytes(), capture_output=True)
+    if proc.returncode != 0:
+        raise ValueError(f"ffmpeg encode failed: {proc.stderr.decode(errors='ignore').strip()}")
+    return proc.stdout
+
+
+def duration_ms(pcm, sample_rate=SAMPLE_RATE):
+    """Duration of a PCM array in milliseconds"""
+    return int(round(len(pcm) * 1000 / sample_rate))
+
+
+def ms_to_samples(ms, sample_rate=SAMPLE_RATE):
+    """Convert milliseconds to a sample count"""
+    return int(round(ms * sample_rate / 1000))
+
+
+def db_to_gain(db):
+    """Convert a dB adjustment to a linear amplitude factor"""
+    return 10 ** (db / 20)
+
+
+def apply_gain(pcm, gain_db):
+    """Return a copy of pcm with gain_db applied"""
+    return pcm * np.float32(db_to_gain(gain_db))
+
+
+def apply_fades(pcm, fade_in_ms=0, fade_out_ms=0, sample_rate=SAMPLE_RATE):
+    """
+    Apply linear fade in/out ramps (same curve as pydub's fade_in/fade_out)
+
+    Args:
+        pcm: PCM array (samples, channels)
+        fade_in_ms: Fade-in length in milliseconds
+        fade_out_ms: Fade-out length in milliseconds
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        np.ndarray: New array with fades applied
+    """
+    out = pcm.copy()
+    total = len(out)
+
+    fade_in = min(ms_to_samples(fade_in_ms, sample_rate), total)
+    if fade_in > 0:
+        out[:fade_in] *= np.linspace(0.0, 1.0, fade_in, endpoint=False, dtype=np.float32)[:, None]
+
+    fade_out = min(ms_to_samples(fade_out_ms, sample_rate), total)
+    if fade_out > 0:
+        out[total - fade_out:] *= np.linspace(1.0, 0.0, fade_out, endpoint=False, dtype=np.float32)[:, None]
+
+    return out
+
+
+def loop_to_length(pcm, num_samples):
+    """
+    Loop (or trim) pcm so that it is exactly num_samples long
+
+    Args:
+        pcm: PCM array (samples, channels)
+        num_samples: Target length in samples
+
+    Returns:
+        np.ndarray: Array of length num_samples
+    """
+    if len(pcm) == 0:
+        return np.zeros((num_samples, pcm.shape[1]), dtype=np.float32)
+    if len(pcm) >= num_samples:
+        return pcm[:num_samples]
+    repetitions = -(-num_samples // len(pcm))  # ceil division
+    return np.tile(pcm, (repetitions, 1))[:num_samples]
+
+
+def overlay(base, top, position=0):
+    """
+    Mix top into base starting at sample offset position
+
+    Like pydub's AudioSegment.overlay, the result keeps base's length and
+    any part of top that runs past the end of base is dropped.
+
+    Args:
+        base: PCM array (samples, channels)
+        top: PCM array (samples, channels)
+        position: Start offset in samples
+
+    Returns:
+        np.ndarray: New mixed array, clipped to [-1.0, 1.0]
+    """
+    out = base.copy()
+    end = min(len(out), position + len(top))
+    if end > position:
+        out[position:end] += top[:end - position]
+    np.clip(out, -1.0, 1.0, out=out)
+    return out
+
+
+def rms_envelope(pcm, block_ms=DUCK_BLOCK_MS, sample_rate=SAMPLE_RATE):
+    """
+    RMS level of pcm per block, in dBFS
+
+    Args:
+        pcm: PCM array (samples, channels)
+        block_ms: Block length in milliseconds
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        np.ndarray: One dBFS value per block (last partial block zero-padded)
+    """
+    block = max(1, ms_to_samples(block_ms, sample_rate))
+    num_blocks = -(-len(pcm) // block)
+    padded = np.zeros(num_blocks * block, dtype=np.float32)
+    if pcm.ndim == 2:
+        # Column sums are much faster than a strided mean(axis=1)
+        for channel in range(pcm.shape[1]):
+            padded[:len(pcm)] += pcm[:, channel]
+        padded /= pcm.shape[1]
+    else:
+        padded[:len(pcm)] = pcm
+    blocks = padded.reshape(num_blocks, block)
+    rms = np.sqrt(np.einsum('ij,ij->i', blocks, blocks) / block)
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def ducking_gain(envelope_db, depth_db=DUCK_DEPTH_DB, threshold_db=DUCK_THRESHOLD_DB,
+                 attack_ms=DUCK_ATTACK_MS, release_ms=DUCK_RELEASE_MS, block_ms=DUCK_BLOCK_MS):
+    """
+    Smoothed per-block gain (dB) for the music bed
+
+    Blocks where the voice is above threshold target -depth_db; a one-pole
+    smoother with separate attack (ducking down) and release (recovering)
+    time constants avoids audible pumping.
+
+    Args:
+        envelope_db: Voice level per block from rms_envelope()
+        depth_db: Attenuation applied under speech
+        threshold_db: Voice level that counts as speech
+        attack_ms: Time constant when ducking down
+        release_ms: Time constant when recovering
+        block_ms: Block length used for the envelope
+
+    Returns:
+        np.ndarray: Gain in dB per block (0 = untouched, -depth_db = fully ducked)
+    """
+    target = np.where(envelope_db > threshold_db, -float(depth_db), 0.0)
+    attack = np.exp(-block_ms / max(attack_ms, 1e-3))
+    release = np.exp(-block_ms / max(release_ms, 1e-3))
+
+    gain = np.empty_like(target)
+    current = 0.0
+    for i, goal in enumerate(target):
+        coeff = attack if goal < current else release
+        current = goal + (current - goal) * coeff
+        gain[i] = current
+    return gain
+
+
+def duck_music(music_pcm, voice_pcm, position=0, depth_db=DUCK_DEPTH_DB,
+               threshold_db=DUCK_THRESHOLD_DB, attack_ms=DUCK_ATTACK_MS,
+               release_ms=DUCK_RELEASE_MS, sample_rate=SAMPLE_RATE):
+    """
+    Attenuate music only where the voice is speaking
+
+    Args:
+        music_pcm: Music PCM array (samples, channels)
+        voice_pcm: Voice PCM array that will be overlaid on the music
+        position: Sample offset where the voice starts in the music
+        depth_db: Attenuation applied under speech
+        threshold_db: Voice level that counts as speech
+        attack_ms: Time constant when ducking down
+        release_ms: Time constant when recovering
+        sample_rate: Sample rate of both arrays
+
+    Returns:
+        np.ndarray: New music array with the ducking envelope applied
+    """
+    if depth_db <= 0 or len(voice_pcm) == 0 or len(music_pcm) == 0:
+        return music_pcm
+
+    block = max(1, ms_to_samples(DUCK_BLOCK_MS, sample_rate))
+    envelope = rms_envelope(voice_pcm, DUCK_BLOCK_MS, sample_rate)
+    block_gain_db = ducking_gain(envelope, depth_db, threshold_db, attack_ms, release_ms, DUCK_BLOCK_MS)
+
+    # Let the release tail run past the last spoken block
+    tail_blocks = int(np.ceil(5 * release_ms / DUCK_BLOCK_MS))
+    tail = block_gain_db[-1] * np.exp(-np.arange(1, tail_blocks + 1) * DUCK_BLOCK_MS / max(release_ms, 1e-3))
+    block_gain = 10 ** (np.concatenate([block_gain_db, tail]) / 20)
+    centres = np.arange(len(block_gain)) * block + block / 2 + position
+
+    # Only the region covered by the voice (plus tail) needs a gain curve
+    start = max(0, int(centres[0]))
+    end = min(len(music_pcm), int(np.ceil(centres[-1])) + 1)
+    out = music_pcm.copy()
+    if end > start:
+        gain = np.interp(np.arange(start, end), centres, block_gain, left=1.0, right=1.0).astype(np.float32)
+        out[start:end] *= gain[:, None]
+    return out
+
+
+def mix_pcm(tts_pcm, music_pcm, tts_volume=3, music_volume=-4,
+            fade_ms=DEFAULT_FADE_MS, duck_db=DUCK_DEPTH_DB, sample_rate=SAMPLE_RATE):
+    """
+    Mix decoded TTS over decoded background music
+
+    Args:
+        tts_pcm: TTS PCM array
+        music_pcm: Music PCM array
+        tts_volume: Volume adjustment for TTS in dB
+        music_volume: Volume adjustment for music in dB
+        fade_ms: Fade in/out applied to the music bed
+        duck_db: Extra music attenuation under speech (0 disables ducking)
+        sample_rate: Sample rate of both arrays
+
+    Returns:
+        np.ndarray: Mixed PCM array (at least as long as the TTS)
+    """
+    tts = apply_gain(tts_pcm, tts_volume)
+    music = apply_gain(music_pcm, music_volume)
+    music = apply_fades(music, fade_ms, fade_ms, sample_rate)
+
+    # Music should be at least as long as TTS
+    if len(music) < len(tts):
+        logger.warning("Background music shorter than TTS, extending...")
+        music = loop_to_length(music, len(tts))
+
+    # Duck the music under the voice so it doesn't fight speech
+    music = duck_music(music, tts, position=0, depth_db=duck_db, sample_rate=sample_rate)
+
+    # Always start TTS at position 0 (beginning of music)
+    return overlay(music, tts, position=0)
+
+
+def render_jingle(tts_bytes, music_bytes, tts_volume=3, music_volume=-4,
+                  bitrate=DEFAULT_BITRATE, tts_pcm=None, duck_db=DUCK_DEPTH_DB):
+    """
+    Decode, mix and encode a jingle in one pass
+
+    Args:
+        tts_bytes: MP3 bytes of TTS audio (ignored if tts_pcm is given)
+        music_bytes: MP3 bytes of background music
+        tts_volume: Volume adjustment for TTS in dB
+        music_volume: Volume adjustment for music in dB
+        bitrate: Output MP3 bitrate
+        tts_pcm: Already-decoded TTS array, to skip a second decode
+        duck_db: Extra music attenuation under speech (0 disables ducking)
+
+    Returns:
+        dict: audio_bytes, duration_ms, tts_duration_ms, music_duration_ms
+    """
+    if tts_pcm is None:
+        tts_pcm = decode_mp3(tts_bytes)
+    music_pcm = decode_mp3(music_bytes)
+    logger.info(
+        f"Mixing TTS ({duration_ms(tts_pcm)}ms, {tts_volume}dB) with "
+        f"music ({duration_ms(music_pcm)}ms, {music_volume}dB)"
+    )
+
+    mixed = mix_pcm(tts_pcm, music_pcm, tts_volume=tts_volume, music_volume=music_volume, duck_db=duck_db)
+    audio_bytes = encode_mp3(mixed, bitrate=bitrate)
+
+    result = {
+        'audio_bytes': audio_bytes,
+        'duration_ms': duration_ms(mixed),
+        'tts_duration_ms': duration_ms(tts_pcm),
+        'music_duration_ms': duration_ms(music_pcm),
+    }
+    logger.info(f"Successfully mixed audio: {len(audio_bytes)} bytes, {result['duration_ms']}ms")
+    return result
+
+
+def mix_tts_with_music(tts_bytes, music_bytes, tts_volume=3, music_volume=-4, duck_db=DUCK_DEPTH_DB):
     """
     Mix TTS audio with background music
-    
+
     Args:
         tts_bytes: MP3 bytes of TTS audio
         music_bytes: MP3 bytes of background music
         tts_volume: Volume adjustment for TTS in dB (3 = boosted for clarity)
         music_volume: Volume adjustment for music in dB (-4 = prominent background music)
-    
+        duck_db: Extra music attenuation while the voice is speaking
+
     Returns:
         bytes: Mixed audio as MP3
     """
     try:
-        # Load audio segments
-        logger.info("Loading TTS audio...")
-        tts_audio = AudioSegment.from_mp3(io.BytesIO(tts_bytes))
-        logger.info(f"TTS duration: {len(tts_audio)}ms ({len(tts_audio)/1000:.1f}s)")
-        
-        logger.info("Loading background music...")
-        bg_audio = AudioSegment.from_mp3(io.BytesIO(music_bytes))
-        logger.info(f"Music duration BEFORE adjustments: {len(bg_audio)}ms")
-        logger.info(f"Music volume adjustment: {music_volume}dB")
-        
-        # Apply volume adjustments
-        tts_audio = tts_audio + tts_volume
-        bg_audio = bg_audio + music_volume
-        logger.info(f"Volume adjustments applied - TTS: {tts_volume}dB, Music: {music_volume}dB")
-        
-        # Apply fade in/out to background music
-        logger.info("Applying fade effects...")
-        bg_audio = bg_audio.fade_in(500).fade_out(500)
-        logger.info(f"Fade effects applied - Music duration: {len(bg_audio)}ms ({len(bg_audio)/1000:.1f}s)")
-        
-        # Music should be at least as long as TTS
-        if len(bg_audio) < len(tts_audio):
-            logger.warning(f"Background music shorter than TTS, extending...")
-            # Loop the background music if needed
-            repetitions = (len(tts_audio) // len(bg_audio)) + 1
-            bg_audio = bg_audio * repetitions
-            bg_audio = bg_audio[:len(tts_audio)]
-        
-        logger.info(f"Final music duration: {len(bg_audio)}ms ({len(bg_audio)/1000:.1f}s)")
-        
-        # Overlay TTS on top of background music (both start at position 0)
-        logger.info("Mixing audio tracks...")
-        logger.info(f"Final pre-mix - TTS: {len(tts_audio)}ms, Music: {len(bg_audio)}ms")
-        
-        # Always start TTS at position 0 (beginning of music)
-        mixed = bg_audio.overlay(tts_audio, position=0)
-        
-        logger.info(f"Mixed audio duration: {len(mixed)}ms")
-        
-        # No normalization - preserve volume balance between voice and music
-        logger.info(f"Final jingle duration: {len(mixed)}ms ({len(mixed)/1000:.1f}s)")
-        
-        # Export to MP3
-        logger.info("Exporting final mix...")
-        output = io.BytesIO()
-        mixed.export(output, format="mp3", bitrate="128k")
-        
-        output.seek(0)
-        result = output.getvalue()
-        
-        logger.info(f"Successfully mixed audio: {len(result)} bytes")
-        return result
-        
+        return render_jingle(
+            tts_bytes,
+            music_bytes,
+            tts_volume=tts_volume,
+            music_volume=music_volume,
+            duck_db=duck_db
+        )['audio_bytes']
     except Exception as e:
         logger.error(f"Error mixing audio: {e}", exc_info=True)
         raise
@@ -86,32 +391,32 @@ def mix_tts_with_music(tts_bytes, music_bytes, tts_volume=3, music_volume=-4):
 def validate_audio(audio_bytes, max_duration_ms=15000):
     """
     Validate audio file
-    
+
     Args:
         audio_bytes: Audio data in bytes
         max_duration_ms: Maximum duration in milliseconds
-    
+
     Returns:
         dict: Audio info (duration, channels, sample_rate)
-    
+
     Raises:
         ValueError: If audio is invalid
     """
     try:
         audio = AudioSegment.from_mp3(io.BytesIO(audio_bytes))
-        
-        duration_ms = len(audio)
-        if duration_ms > max_duration_ms:
-            raise ValueError(f"Audio too long: {duration_ms}ms (max: {max_duration_ms}ms)")
-        
+
+        audio_ms = len(audio)
+        if audio_ms > max_duration_ms:
+            raise ValueError(f"Audio too long: {audio_ms}ms (max: {max_duration_ms}ms)")
+
         return {
-            'duration_ms': duration_ms,
-            'duration_seconds': duration_ms / 1000,
+            'duration_ms': audio_ms,
+            'duration_seconds': audio_ms / 1000,
             'channels': audio.channels,
             'sample_rate': audio.frame_rate,
             'sample_width': audio.sample_width
         }
-        
+
     except Exception as e:
         logger.error(f"Error validating audio: {e}")
         raise ValueError(f"Invalid audio file: {e}")
@@ -3,18 +3,28 @@ Karaoke System Views
 Handles karaoke sessions, queue management, and song selection
 """
 
+import json
 import logging
-from datetime import datetime
-from django.http import JsonResponse
-from django.db import models as django_models
+import queue
+import time
+from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from django.utils import timezone
 
 from .models import KaraokeSession, KaraokeQueue
+from .services.karaoke_queue_service import KaraokeQueueService
+from .services.karaoke_events import karaoke_events
+from .services.song_index import song_index
 
 logger = logging.getLogger(__name__)
 
+# Live queue stream
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_MAX_CONNECTION_TIME = 300  # Close after 5 minutes; clients reconnect
+
 
 # ============================================================
 # SESSION MANAGEMENT
@@ -43,15 +53,20 @@ def create_session(request):
                 'venue_name': existing.venue_name,
                 'status': existing.status,
                 'created_at': existing.created_at,
+                'scheduling_mode': existing.scheduling_mode,
                 'queue_count': existing.get_queue_count(),
                 'message': 'Using existing active session'
             })
         
         # Create new session
         avg_duration = request.data.get('avg_song_duration', 240)
+        scheduling_mode = request.data.get('scheduling_mode', 'fifo')
+        if scheduling_mode not in dict(KaraokeSession.SCHEDULING_MODES):
+            return Response({'error': f'Invalid scheduling_mode: {scheduling_mode}'}, status=status.HTTP_400_BAD_REQUEST)
         session = KaraokeSession.objects.create(
             venue_name=venue_name,
-            avg_song_duration=avg_duration
+            avg_song_duration=avg_duration,
+            scheduling_mode=scheduling_mode
         )
         
         logger.info(f"✅ Created karaoke session for {venue_name}: {session.id}")
@@ -61,6 +76,7 @@ def create_session(request):
             'venue_name': session.venue_name,
             'status': session.status,
             'created_at': session.created_at,
+            'scheduling_mode': session.scheduling_mode,
             'queue_count': 0
         }, status=status.HTTP_201_CREATED)
         
@@ -72,9 +88,7 @@ def create_session(request):
 @api_view(['GET'])
 def get_session(request, venue_name):
     """GET /api/karaoke/session/<venue_name>"""
-    logger.info(f"🎤 KARAOKE: get_session called with venue_name='{venue_name}'")
-    logger.info(f"   Request method: {request.method}")
-    logger.info(f"   Request path: {request.path}")
+    logger.debug("KARAOKE: get_session venue_name=%r", venue_name)
     try:
         session = KaraokeSession.objects.filter(
             venue_name=venue_name,
@@ -84,35 +98,19 @@ def get_session(request, venue_name):
         if not session:
             return Response({'error': 'No active session found'}, status=status.HTTP_404_NOT_FOUND)
         
-        current_singer = session.get_current_singer()
-        current_data = None
-        if current_singer:
-            current_data = {
-                'id': current_singer.id,
-                'name': current_singer.name,
-                'song_title': current_singer.song_title,
-                'artist': current_singer.artist
-            }
-        
-        queue = session.get_active_queue()
-        queue_data = [{
-            'id': e.id,
-            'name': e.name,
-            'song_title': e.song_title,
-            'artist': e.artist,
-            'position': e.position,
-            'estimated_wait': e.estimated_wait_time()
-        } for e in queue]
+        # Current singer + pending queue with wait times, one query
+        view = KaraokeQueueService().build_queue_view(session)
         
         return Response({
             'session': {
                 'id': session.id,
                 'venue_name': session.venue_name,
                 'status': session.status,
-                'queue_count': session.get_queue_count()
+                'scheduling_mode': session.scheduling_mode,
+                'queue_count': view['count']
             },
-            'current_singer': current_data,
-            'queue': queue_data
+            'current_singer': view['current_singer'],
+            'queue': view['queue']
         })
         
     except Exception as e:
@@ -120,6 +118,90 @@ def get_session(request, venue_name):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['PATCH'])
+def update_session_settings(request, session_id):
+    """
+    PATCH /api/karaoke/session/<session_id>/settings
+    Update queue settings
+    
+    Body:
+    {
+        "scheduling_mode": "fair",   // 'fifo' or 'fair' (reorders the pending queue)
+        "auto_advance": true
+    }
+    """
+    try:
+        session = KaraokeSession.objects.get(id=session_id)
+        service = KaraokeQueueService()
+        
+        if 'auto_advance' in request.data:
+            session.auto_advance = bool(request.data['auto_advance'])
+            session.save(update_fields=['auto_advance'])
+        
+        reordered = 0
+        mode = request.data.get('scheduling_mode')
+        if mode and mode != session.scheduling_mode:
+            reordered = service.set_scheduling_mode(session, mode)
+            logger.info(f"Karaoke session {session.id} scheduling mode -> {mode} ({reordered} reordered)")
+            if reordered:
+                karaoke_events.publish(session.id, 'reorder')
+        
+        return Response({
+            'id': session.id,
+            'scheduling_mode': session.scheduling_mode,
+            'auto_advance': session.auto_advance,
+            'reordered': reordered
+        })
+        
+    except KaraokeSession.DoesNotExist:
+        return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"Error updating session settings: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def queue_stream(request, session_id):
+    """
+    GET /api/karaoke/session/<session_id>/stream
+    Server-Sent Events stream of queue changes for singer and host screens
+    
+    Every event carries the full queue view (same shape as get_session)
+    with a type of snapshot, add, cancel, complete, advance, move or sync.
+    Screens share the hub's fan-out and never query the database here.
+    """
+    if not KaraokeSession.objects.filter(id=session_id).exists():
+        return JsonResponse({'error': 'Session not found'}, status=404)
+    
+    def event_generator():
+        subscriber = karaoke_events.subscribe(session_id)
+        # The hub does the queries; don't hold a DB connection for the whole stream
+        connection.close()
+        connection_start = time.monotonic()
+        try:
+            yield f"data: {json.dumps({'type': 'connected', 'session_id': session_id})}\n\n"
+            while time.monotonic() - connection_start < STREAM_MAX_CONNECTION_TIME:
+                try:
+                    event = subscriber.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+            # EventSource reconnects automatically
+            yield f"data: {json.dumps({'type': 'timeout'})}\n\n"
+        finally:
+            karaoke_events.unsubscribe(session_id, subscriber)
+    
+    response = StreamingHttpResponse(
+        event_generator(),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
+    return response
+
+
 @api_view(['POST'])
 def add_to_queue(request):
     """POST /api/karaoke/queue - Add singer to queue"""
@@ -130,15 +212,9 @@ def add_to_queue(request):
         
         session = KaraokeSession.objects.get(id=session_id)
         
-        # Get next position
-        max_position = session.queue_entries.filter(status='pending').aggregate(
-            max_pos=django_models.Max('position')
-        )['max_pos']
-        next_position = (max_position or 0) + 1
-        
-        # Create entry
-        entry = KaraokeQueue.objects.create(
-            session=session,
+        # Appended at MAX(position) + gap inside the INSERT - race-free
+        entry = KaraokeQueueService().add_entry(
+            session,
             name=request.data.get('name'),
             song_id=request.data.get('song_id'),
             song_title=request.data.get('song_title'),
@@ -146,18 +222,21 @@ def add_to_queue(request):
             message=request.data.get('message', ''),
             duration=request.data.get('duration', 240),
             audio_url=request.data.get('audio_url', ''),
-            lyrics_url=request.data.get('lyrics_url', ''),
-            position=next_position
+            lyrics_url=request.data.get('lyrics_url', '')
         )
         
         logger.info(f"✅ Added to queue: {entry.name} - {entry.song_title}")
+        song_index.add(entry.song_title, entry.artist, entry.duration)
+        karaoke_events.publish(session.id, 'add', entry)
+        
+        queued = KaraokeQueueService().get_entry_wait(entry) or {}
         
         return Response({
             'id': entry.id,
             'name': entry.name,
             'song_title': entry.song_title,
-            'position': entry.position,
-            'estimated_wait': entry.estimated_wait_time()
+            'position': queued.get('position'),
+            'estimated_wait': queued.get('estimated_wait', 0)
         }, status=status.HTTP_201_CREATED)
         
     except KaraokeSession.DoesNotExist:
@@ -172,20 +251,14 @@ def get_queue(request, session_id):
     """GET /api/karaoke/queue/<session_id>"""
     try:
         session = KaraokeSession.objects.get(id=session_id)
-        queue = session.get_active_queue()
-        
-        queue_data = [{
-            'id': e.id,
-            'name': e.name,
-            'song_title': e.song_title,
-            'artist': e.artist,
-            'position': e.position,
-            'estimated_wait': e.estimated_wait_time(),
-            'audio_url': e.audio_url,
-            'lyrics_url': e.lyrics_url
-        } for e in queue]
+        view = KaraokeQueueService().build_queue_view(session)
         
-        return Response({'session_id': session.id, 'queue': queue_data, 'count': len(queue_data)})
+        return Response({
+            'session_id': session.id,
+            'queue': view['queue'],
+            'count': view['count'],
+            'current_singer': view['current_singer']
+        })
         
     except KaraokeSession.DoesNotExist:
         return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -203,16 +276,12 @@ def cancel_entry(request, entry_id):
         if entry.status == 'singing':
             return Response({'error': 'Cannot cancel currently singing'}, status=status.HTTP_400_BAD_REQUEST)
         
-        session = entry.session
-        entry.status = 'cancelled'
-        entry.save()
-        
-        # Reorder remaining
-        for idx, e in enumerate(session.get_active_queue(), start=1):
-            e.position = idx
-            e.save()
+        # Single UPDATE - sparse positions mean nothing needs renumbering
+        if not KaraokeQueueService().cancel_entry(entry.id):
+            return Response({'error': f'Cannot cancel entry with status {entry.status}'}, status=status.HTTP_400_BAD_REQUEST)
         
         logger.info(f"Cancelled: {entry.name} - {entry.song_title}")
+        karaoke_events.publish(entry.session_id, 'cancel', entry)
         return Response({'message': 'Entry cancelled'})
         
     except KaraokeQueue.DoesNotExist:
@@ -222,6 +291,56 @@ def cancel_entry(request, entry_id):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET', 'DELETE'])
+def queue_detail(request, pk):
+    """
+    GET /api/karaoke/queue/<session_id> - Get queue
+    DELETE /api/karaoke/queue/<entry_id> - Cancel entry
+    Both share one URL pattern, so dispatch on method here
+    """
+    if request.method == 'DELETE':
+        return cancel_entry(request._request, pk)
+    return get_queue(request._request, pk)
+
+
+@api_view(['PATCH'])
+def move_entry(request, entry_id):
+    """
+    PATCH /api/karaoke/queue/<entry_id>/move - Reorder a pending entry
+    
+    Body (one of):
+    {"direction": "up"} / {"direction": "down"}
+    {"after_id": 42}     // drag-to-reorder: place after entry 42
+    {"after_id": null}   // move to the front
+    """
+    try:
+        entry = KaraokeQueue.objects.get(id=entry_id)
+        if entry.status != 'pending':
+            return Response({'error': 'Only pending entries can be moved'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        service = KaraokeQueueService()
+        if 'direction' in request.data:
+            moved = service.move_entry(entry, request.data['direction'])
+        elif 'after_id' in request.data:
+            moved = service.reorder_entry(entry, request.data['after_id'])
+        else:
+            return Response({'error': 'direction or after_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if moved:
+            karaoke_events.publish(entry.session_id, 'move', entry)
+        
+        view = service.build_queue_view(entry.session)
+        return Response({'moved': moved, 'queue': view['queue']})
+        
+    except KaraokeQueue.DoesNotExist:
+        return Response({'error': 'Entry not found'}, status=status.HTTP_404_NOT_FOUND)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"Error moving entry: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['PATCH'])
 def complete_entry(request, entry_id):
     """PATCH /api/karaoke/queue/<entry_id>/complete"""
@@ -230,21 +349,22 @@ def complete_entry(request, entry_id):
         
         if entry.status != 'singing':
             entry.status = 'singing'
-            entry.started_at = datetime.now()
+            entry.started_at = timezone.now()
             entry.save()
         
         entry.status = 'completed'
-        entry.completed_at = datetime.now()
+        entry.completed_at = timezone.now()
         entry.save()
         
         # Auto-advance to next
         session = entry.session
-        next_entry = session.get_active_queue().first()
+        # Queue is kept in scheduling order, so the next singer is the first position
+        next_entry = KaraokeQueueService().next_entry(session)
         next_singer = None
         
         if next_entry and session.auto_advance:
             next_entry.status = 'singing'
-            next_entry.started_at = datetime.now()
+            next_entry.started_at = timezone.now()
             next_entry.save()
             next_singer = {
                 'id': next_entry.id,
@@ -255,6 +375,9 @@ def complete_entry(request, entry_id):
             }
         
         logger.info(f"✅ Completed: {entry.name} - {entry.song_title}")
+        karaoke_events.publish(session.id, 'complete', entry)
+        if next_singer:
+            karaoke_events.publish(session.id, 'advance', next_entry)
         
         return Response({
             'message': 'Entry completed',
@@ -269,6 +392,24 @@ def complete_entry(request, entry_id):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+def search_songs(request):
+    """
+    GET /api/karaoke/songs/search?q=<text>&limit=10
+    Autocomplete songs from everything requested so far (local index)
+    """
+    try:
+        query = request.GET.get('q', '')
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+        return Response({'songs': song_index.search(query, limit=limit)})
+        
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"Error searching songs: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # ============================================================
 # KARAFUN API INTEGRATION
 # ============================================================
@@ -276,11 +417,12 @@ def complete_entry(request, entry_id):
 @api_view(['GET'])
 def list_karafun_devices(request):
     """
-    GET /api/karaoke/karafun/devices
-    List all Karafun devices available in the account
+    GET /api/karaoke/karafun/devices[?refresh=1]
+    List all Karafun devices available in the account (cached)
     """
     try:
         from .karafun_client import get_karafun_client
+        from .services.karafun_cache import KarafunCache
         
         client = get_karafun_client()
         if not client:
@@ -289,7 +431,7 @@ def list_karafun_devices(request):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
         
-        devices = client.list_devices()
+        devices = KarafunCache(client).list_devices(refresh=request.GET.get('refresh') == '1')
         return Response({'devices': devices})
         
     except Exception as e:
@@ -297,6 +439,35 @@ def list_karafun_devices(request):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+def list_karafun_sessions(request):
+    """
+    GET /api/karaoke/karafun/sessions?start_at_timestamp=...&end_at_timestamp=...[&refresh=1]
+    List Karafun Business sessions between two dates (cached)
+    """
+    try:
+        from .karafun_client import get_karafun_client
+        from .services.karafun_cache import KarafunCache
+        
+        client = get_karafun_client()
+        if not client:
+            return Response(
+                {'error': 'Karafun API not configured'}, 
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        sessions = KarafunCache(client).get_sessions(
+            request.GET.get('start_at_timestamp'),
+            request.GET.get('end_at_timestamp'),
+            refresh=request.GET.get('refresh') == '1'
+        )
+        return Response({'sessions': sessions})
+        
+    except Exception as e:
+        logger.error(f"Error fetching Karafun sessions: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['POST'])
 def create_karafun_session(request):
     """
@@ -314,6 +485,7 @@ def create_karafun_session(request):
     """
     try:
         from .karafun_client import get_karafun_client
+        from .services.karafun_cache import KarafunCache
         
         client = get_karafun_client()
         if not client:
@@ -332,7 +504,8 @@ def create_karafun_session(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        karafun_session = client.create_session(
+        # Invalidates cached session lists
+        karafun_session = KarafunCache(client).create_session(
             device_id=device_id,
             start_at_timestamp=start_at,
             end_at_timestamp=end_at,
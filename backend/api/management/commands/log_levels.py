@@ -0,0 +1,52 @@
+"""
+Change log levels of running processes
+Levels are saved to LOG_LEVELS_FILE and applied without a restart: web
+processes check the file on requests and debug category use, job workers
+between jobs (at least every JOB_POLL_SECONDS), each at most once per
+LOG_LEVELS_CHECK_SECONDS
+
+Usage:
+    python manage.py log_levels                               # show current overrides
+    python manage.py log_levels debug.quiz_stream=DEBUG       # enable one debug category
+    python manage.py log_levels debug=DEBUG api.karaoke_views=WARNING
+    python manage.py log_levels --unset debug.quiz_stream
+    python manage.py log_levels --reset                       # back to LOG_LEVELS only
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils import log_control
+from api.utils.config import AppConfig
+
+
+class Command(BaseCommand):
+    help = 'Show or change per-subsystem log levels at runtime'
+
+    def add_arguments(self, parser):
+        parser.add_argument('levels', nargs='*', help='logger=LEVEL entries to set')
+        parser.add_argument('--unset', nargs='+', default=[], metavar='LOGGER', help='Remove overrides')
+        parser.add_argument('--reset', action='store_true', help='Remove every override')
+
+    def handle(self, *args, **options):
+        overrides = {} if options['reset'] else log_control.read_overrides()
+        try:
+            updates = log_control.parse_levels(','.join(options['levels']))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for name in options['unset']:
+            overrides.pop(name, None)
+        for name, level in updates.items():
+            overrides[name] = logging.getLevelName(level)
+
+        if options['levels'] or options['unset'] or options['reset']:
+            log_control.write_overrides(overrides)
+
+        self.stdout.write(f"LOG_LEVELS: {AppConfig.LOG_LEVELS or '(none)'}")
+        self.stdout.write(f'Overrides ({AppConfig.LOG_LEVELS_FILE}):')
+        for name, level in sorted(overrides.items()):
+            self.stdout.write(f'  {name}={level}')
+        if not overrides:
+            self.stdout.write('  (none)')
@@ -0,0 +1,31 @@
+"""
+Generated file retention
+Deletes local card PDFs, session files and temp logos past the retention
+period (card generation also queues this as a background job)
+
+Usage:
+    python manage.py prune_cards                 # CARD_RETENTION_DAYS
+    python manage.py prune_cards --days 2 --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.services.card_generation_service import CardGenerationService
+
+
+class Command(BaseCommand):
+    help = 'Delete generated card files older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, help='Retention period in days (default: CARD_RETENTION_DAYS)')
+        parser.add_argument('--dry-run', action='store_true', help='Only list what would be deleted')
+
+    def handle(self, *args, **options):
+        pruned = CardGenerationService().prune_outputs(max_age_days=options['days'], dry_run=options['dry_run'])
+        for name in pruned['deleted']:
+            self.stdout.write(f'  {name}')
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(
+            f"{verb} {len(pruned['deleted'])} file(s), {pruned['freed_bytes'] / 1024 / 1024:.1f} MB; "
+            f"kept {pruned['kept']}"
+        )
@@ -0,0 +1,81 @@
+"""
+Job worker process
+Runs queued card and jingle generation jobs outside the web workers
+
+Usage:
+    python manage.py run_jobs                          # all job types, until stopped
+    python manage.py run_jobs --types card_generation --threads 1
+    python manage.py run_jobs --drain                  # run what is queued, then exit
+    python manage.py run_jobs --metrics-port 9108      # serve this worker's /metrics
+
+Set JOB_WORKER_MODE=external on the web processes so only these workers run jobs.
+The stage histograms of the jobs (card render/upload, jingle tts/mix...) are
+recorded in this process, so scrape them from --metrics-port (needs METRICS_TOKEN).
+"""
+
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.services.jingle_service import JingleService
+from api.tasks import job_queue
+from api.utils import metrics
+from api.utils.config import AppConfig
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (card and jingle generation)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--types', nargs='+', help='Job types to run (default: all)')
+        parser.add_argument('--threads', type=int, help='Jobs this process runs at once')
+        parser.add_argument('--drain', action='store_true', help='Exit once no job is runnable')
+        parser.add_argument('--metrics-port', type=int, default=AppConfig.JOB_METRICS_PORT,
+                            help='Serve /metrics on 127.0.0.1:PORT (default: JOB_METRICS_PORT, 0 = off)')
+
+    def handle(self, *args, **options):
+        task_types = options['types'] or list(job_queue.JOB_TYPES)
+        unknown = set(task_types) - set(job_queue.JOB_TYPES)
+        if unknown:
+            raise CommandError(f"Unknown job types: {', '.join(sorted(unknown))}")
+
+        worker = job_queue.JobWorker(task_types=task_types, threads=options['threads'])
+
+        if options['drain']:
+            ran = 0
+            while worker.run_once():
+                ran += 1
+            self.stdout.write(f'Ran {ran} job(s)')
+            return
+
+        def shutdown(signum, frame):
+            self.stdout.write('Stopping: finishing running jobs...')
+            worker.stop_event.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        if options['metrics_port'] and not AppConfig.METRICS_TOKEN:
+            self.stderr.write('METRICS_TOKEN is not set, not serving /metrics')
+        elif options['metrics_port']:
+            server = metrics.serve(options['metrics_port'], AppConfig.METRICS_TOKEN, render=_render_metrics)
+            self.stdout.write(f'Serving /metrics on {server.server_address[0]}:{server.server_address[1]}')
+
+        if 'jingle_generation' in task_types:
+            # Deployments without a container start script catalogue new jingle files here
+            JingleService().sync_catalog()
+
+        self.stdout.write(f'Worker {worker.worker_id} running {", ".join(task_types)}')
+        worker.start()
+        worker.stop_event.wait()
+        worker.stop()
+        self.stdout.write('Worker stopped')
+
+
+def _render_metrics() -> str:
+    # Each scrape runs on its own thread; don't leave its DB connection open
+    try:
+        return metrics.registry.render()
+    finally:
+        connection.close()
@@ -0,0 +1,22 @@
+"""
+Jingle catalogue sync
+Catalogues jingle files that reached the jingles directory without going
+through create_jingle (deploy copies, restores) and drops entries whose
+file is gone. Runs at container start, after migrations, and when a
+run_jobs worker for jingle jobs starts.
+
+Usage:
+    python manage.py sync_jingles
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.services.jingle_service import JingleService
+
+
+class Command(BaseCommand):
+    help = 'Reconcile the jingle catalogue with the jingles directory'
+
+    def handle(self, *args, **options):
+        synced = JingleService().sync_catalog()
+        self.stdout.write(f"Jingle catalogue: {synced['added']} added, {synced['removed']} removed")
@@ -0,0 +1,111 @@
+"""
+Request middleware
+- QueryProfilerMiddleware measures query count, database time and total
+  time of every request. Values go to the /metrics histograms per view;
+  with DEBUG (or REQUEST_PROFILE_HEADERS) they are also sent as response
+  headers, and slow or query-heavy requests are logged
+- LogLevelsMiddleware applies log level overrides (manage.py log_levels)
+"""
+
+import logging
+import time
+
+from django.conf import settings
+
+from .utils.config import AppConfig
+from .utils.log_control import refresh_levels
+from .utils.metrics import registry
+from .utils.query_profiler import profile_queries
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS = registry.histogram(
+    'music_bingo_request_seconds',
+    'Time to produce a response (streaming bodies excluded)',
+    ('view', 'method')
+)
+REQUEST_DB_SECONDS = registry.histogram(
+    'music_bingo_request_db_seconds',
+    'Database time per request',
+    ('view', 'method')
+)
+REQUEST_QUERIES = registry.histogram(
+    'music_bingo_request_queries',
+    'Queries per request',
+    ('view', 'method'),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+)
+
+
+class QueryProfilerMiddleware:
+    """
+    Per-request query count, DB time and latency
+
+    Features:
+    - Histograms labelled by URL name (not path), so cardinality stays
+      bounded
+    - X-Query-Count / X-DB-Time-Ms / X-Response-Time-Ms and Server-Timing
+      headers in debug
+    - Warns about requests over REQUEST_SLOW_MS or REQUEST_QUERY_WARN
+    - Streaming responses are measured up to the first byte; queries of
+      the stream itself are not counted
+    """
+
+    def __init__(self, get_response):
+        """
+        Initialize Query Profiler Middleware
+
+        Args:
+            get_response: Next handler in the middleware chain
+        """
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with profile_queries() as profile:
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        REQUEST_SECONDS.observe(total, view, request.method)
+        REQUEST_DB_SECONDS.observe(profile.db_seconds, view, request.method)
+        REQUEST_QUERIES.observe(profile.count, view, request.method)
+
+        if settings.DEBUG or AppConfig.REQUEST_PROFILE_HEADERS:
+            response['X-Query-Count'] = str(profile.count)
+            response['X-DB-Time-Ms'] = f'{profile.db_seconds * 1000:.1f}'
+            response['X-Response-Time-Ms'] = f'{total * 1000:.1f}'
+            response['Server-Timing'] = (
+                f'db;dur={profile.db_seconds * 1000:.1f};desc="{profile.count} queries", '
+                f'total;dur={total * 1000:.1f}'
+            )
+
+        if total * 1000 > AppConfig.REQUEST_SLOW_MS or profile.count > AppConfig.REQUEST_QUERY_WARN:
+            logger.warning(
+                "Slow request %s %s (%s): %.0f ms, %d queries, %.0f ms in DB",
+                request.method, request.path, view, total * 1000, profile.count, profile.db_seconds * 1000
+            )
+        return response
+
+
+class LogLevelsMiddleware:
+    """
+    Apply changed log levels before handling a request
+
+    refresh_levels() stats the override file at most once per
+    LOG_LEVELS_CHECK_SECONDS, so this costs nothing on most requests.
+    """
+
+    def __init__(self, get_response):
+        """
+        Initialize Log Levels Middleware
+
+        Args:
+            get_response: Next handler in the middleware chain
+        """
+        self.get_response = get_response
+
+    def __call__(self, request):
+        refresh_levels()
+        return self.get_response(request)
@@ -0,0 +1,67 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:14
+
+import json
+from datetime import datetime, timezone
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def import_existing_jingles(apps, schema_editor):
+    """Catalogue jingle files already on disk, folding in legacy sidecar JSON"""
+    from api.utils.config import AppConfig
+
+    Jingle = apps.get_model('api', 'Jingle')
+    jingles_dir = AppConfig.get_data_path('jingles')
+    if not jingles_dir.exists():
+        return
+
+    for file_path in jingles_dir.glob('*.mp3'):
+        metadata = {}
+        metadata_path = file_path.with_suffix('.json')
+        if metadata_path.exists():
+            try:
+                with open(metadata_path, 'r') as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                metadata = {}
+
+        stat = file_path.stat()
+        Jingle.objects.get_or_create(
+            filename=file_path.name,
+            defaults={
+                'size_bytes': stat.st_size,
+                'text': metadata.pop('text', '') or '',
+                'metadata': metadata,
+                'created_at': datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc),
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_add_genres_to_bingo_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Jingle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(help_text='Audio file in data/jingles', max_length=255, unique=True)),
+                ('size_bytes', models.IntegerField(default=0)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('text', models.TextField(blank=True)),
+                ('music_prompt', models.CharField(blank=True, max_length=500)),
+                ('voice_id', models.CharField(blank=True, max_length=100)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='api_jingle_created_f88705_idx')],
+            },
+        ),
+        migrations.RunPython(import_existing_jingles, reverse_code=migrations.RunPython.noop),
+    ]
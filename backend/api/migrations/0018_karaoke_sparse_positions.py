@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:19
+
+from django.db import migrations, models
+
+POSITION_GAP = 1024
+
+
+def respace_active_entries(apps, schema_editor):
+    """
+    Give active entries distinct, gapped positions
+
+    The old scheme renumbered pending entries from 1 after a cancel, which
+    could collide with the current singer's position.
+    """
+    KaraokeQueue = apps.get_model('api', 'KaraokeQueue')
+    active = KaraokeQueue.objects.filter(status__in=['pending', 'singing'])
+
+    for session_id in active.values_list('session_id', flat=True).distinct():
+        entries = list(active.filter(session_id=session_id))
+        # Current singer first, then the pending queue in its existing order
+        entries.sort(key=lambda e: (e.status != 'singing', e.position, e.id))
+        for rank, entry in enumerate(entries, start=1):
+            entry.position = rank * POSITION_GAP
+        KaraokeQueue.objects.bulk_update(entries, ['position'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_jingle_catalogue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='karaokequeue',
+            name='position',
+            field=models.IntegerField(help_text='Sparse sort key (lower = sooner); see KaraokeQueueService'),
+        ),
+        migrations.RunPython(respace_active_entries, reverse_code=migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='karaokequeue',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'singing'])), fields=('session', 'position'), name='unique_active_karaoke_position'),
+        ),
+    ]
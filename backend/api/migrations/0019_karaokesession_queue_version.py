@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_karaoke_sparse_positions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='karaokesession',
+            name='queue_version',
+            field=models.PositiveIntegerField(default=0, help_text='Bumped on every queue change; live screens watch it'),
+        ),
+    ]
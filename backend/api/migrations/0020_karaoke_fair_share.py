@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_karaokesession_queue_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='karaokequeue',
+            name='fair_key',
+            field=models.FloatField(blank=True, help_text='Fair-share sort key (virtual sign-up time); set in fair mode', null=True),
+        ),
+        migrations.AddField(
+            model_name='karaokesession',
+            name='scheduling_mode',
+            field=models.CharField(choices=[('fifo', 'First come, first served'), ('fair', 'Fair share')], default='fifo', help_text='How new sign-ups are placed in the queue', max_length=10),
+        ),
+    ]
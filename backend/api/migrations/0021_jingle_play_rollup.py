@@ -0,0 +1,71 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:36
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.db.models.functions import TruncHour
+
+
+def backfill_rollups(apps, schema_editor):
+    """Roll existing play history up into hourly counters"""
+    JinglePlayHistory = apps.get_model('api', 'JinglePlayHistory')
+    JinglePlayRollup = apps.get_model('api', 'JinglePlayRollup')
+
+    rows = JinglePlayHistory.objects.annotate(hour=TruncHour('played_at')).values(
+        'schedule_id', 'jingle_filename', 'venue_name', 'hour'
+    ).annotate(plays=Count('id'), last=Max('played_at')).order_by()
+
+    JinglePlayRollup.objects.bulk_create([
+        JinglePlayRollup(
+            schedule_ref=row['schedule_id'] or 0,
+            jingle_filename=row['jingle_filename'],
+            venue_name=row['venue_name'],
+            hour=row['hour'],
+            play_count=row['plays'],
+            last_played_at=row['last'],
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_karaoke_fair_share'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jingleplayhistory',
+            name='venue_name',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='jingleplayhistory',
+            name='played_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='JinglePlayRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('schedule_ref', models.IntegerField(default=0, help_text='JingleSchedule id (0 = unscheduled play); kept after the schedule is deleted')),
+                ('jingle_filename', models.CharField(max_length=255)),
+                ('venue_name', models.CharField(blank=True, default='', max_length=255)),
+                ('hour', models.DateTimeField(help_text='Start of the hour (UTC)')),
+                ('play_count', models.IntegerField(default=0)),
+                ('last_played_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Jingle Play Rollup',
+                'verbose_name_plural': 'Jingle Play Rollups',
+                'ordering': ['-hour'],
+                'indexes': [models.Index(fields=['venue_name', 'hour'], name='api_jinglep_venue_n_f704c3_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='jingleplayrollup',
+            constraint=models.UniqueConstraint(fields=('schedule_ref', 'jingle_filename', 'venue_name', 'hour'), name='unique_jingle_play_rollup'),
+        ),
+        migrations.RunPython(backfill_rollups, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_jingle_play_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskstatus',
+            name='attempts',
+            field=models.IntegerField(default=0, help_text='Times a worker has claimed this job'),
+        ),
+        migrations.AddField(
+            model_name='taskstatus',
+            name='available_at',
+            field=models.DateTimeField(blank=True, help_text='Queued job may run from (null: not queued)', null=True),
+        ),
+        migrations.AddField(
+            model_name='taskstatus',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Running job is presumed lost after', null=True),
+        ),
+        migrations.AddField(
+            model_name='taskstatus',
+            name='max_attempts',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='taskstatus',
+            name='payload',
+            field=models.JSONField(blank=True, help_text='Arguments for the job handler', null=True),
+        ),
+        migrations.AddField(
+            model_name='taskstatus',
+            name='priority',
+            field=models.IntegerField(default=0, help_text='Higher priority jobs are claimed first'),
+        ),
+        migrations.AddField(
+            model_name='taskstatus',
+            name='worker_id',
+            field=models.CharField(blank=True, help_text='Worker holding the lease', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='taskstatus',
+            index=models.Index(fields=['status', '-priority', 'available_at'], name='task_queue_idx'),
+        ),
+    ]
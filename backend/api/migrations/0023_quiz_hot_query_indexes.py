@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-18 22:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_task_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='karaokequeue',
+            index=models.Index(fields=['session', 'status', 'position'], name='karaoke_queue_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizteam',
+            index=models.Index(fields=['session', '-total_score', 'team_name'], name='quiz_team_leaderboard_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teamanswer',
+            index=models.Index(fields=['question', '-submitted_at'], name='team_answer_feed_idx'),
+        ),
+    ]
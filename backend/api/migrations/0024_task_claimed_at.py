@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 22:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_quiz_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskstatus',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When the current attempt was claimed (database clock)', null=True),
+        ),
+    ]
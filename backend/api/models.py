@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from datetime import datetime, date
 
 # Create your models here.
@@ -30,11 +31,22 @@ class TaskStatus(models.Model):
     # Metadata
     metadata = models.JSONField(null=True, blank=True, help_text="Additional task parameters")
     
+    # Job queue (see api.tasks.job_queue)
+    payload = models.JSONField(null=True, blank=True, help_text="Arguments for the job handler")
+    priority = models.IntegerField(default=0, help_text="Higher priority jobs are claimed first")
+    attempts = models.IntegerField(default=0, help_text="Times a worker has claimed this job")
+    max_attempts = models.IntegerField(default=1)
+    available_at = models.DateTimeField(null=True, blank=True, help_text="Queued job may run from (null: not queued)")
+    lease_expires_at = models.DateTimeField(null=True, blank=True, help_text="Running job is presumed lost after")
+    claimed_at = models.DateTimeField(null=True, blank=True, help_text="When the current attempt was claimed (database clock)")
+    worker_id = models.CharField(max_length=100, blank=True, help_text="Worker holding the lease")
+    
     class Meta:
         ordering = ['-started_at']
         indexes = [
             models.Index(fields=['status', '-started_at']),
             models.Index(fields=['task_type', '-started_at']),
+            models.Index(fields=['status', '-priority', 'available_at'], name='task_queue_idx'),
         ]
     
     def __str__(self):
@@ -115,6 +127,12 @@ class JingleSchedule(models.Model):
         ('regular', 'Regular - Every 5-7 rounds'),
         ('often', 'Often - Every 3-4 rounds'),
     ]
+    # Rounds between plays, as served to the game by /api/jingle-schedules/active
+    REPEAT_INTERVALS = {
+        'occasional': 8,
+        'regular': 5,
+        'often': 3,
+    }
     repeat_pattern = models.CharField(
         max_length=20,
         choices=REPEAT_CHOICES,
@@ -157,38 +175,8 @@ class JingleSchedule(models.Model):
         Returns:
             bool: True if schedule should be active now
         """
-        if not self.enabled:
-            return False
-        
-        now = datetime.now()
-        today = date.today()
-        
-        # Check date range
-        if today < self.start_date:
-            return False
-        if self.end_date and today > self.end_date:
-            return False
-        
-        # Check time range (if specified)
-        if self.time_start and self.time_end:
-            current_time = now.time()
-            if not (self.time_start <= current_time <= self.time_end):
-                return False
-        
-        # Check day of week
-        day_map = {
-            0: self.monday,
-            1: self.tuesday,
-            2: self.wednesday,
-            3: self.thursday,
-            4: self.friday,
-            5: self.saturday,
-            6: self.sunday,
-        }
-        if not day_map[today.weekday()]:
-            return False
-        
-        return True
+        from .services.schedule_service import ScheduleService
+        return ScheduleService().is_schedule_active(self)
     
     def get_interval(self):
         """
@@ -197,12 +185,7 @@ class JingleSchedule(models.Model):
         Returns:
             int: Number of rounds between jingle plays
         """
-        patterns = {
-            'occasional': 9,  # Average of 8-10
-            'regular': 6,     # Average of 5-7
-            'often': 3,       # Average of 3-4
-        }
-        return patterns.get(self.repeat_pattern, 6)
+        return self.REPEAT_INTERVALS.get(self.repeat_pattern, self.REPEAT_INTERVALS['regular'])
 
 
 class JinglePlayHistory(models.Model):
@@ -218,7 +201,8 @@ class JinglePlayHistory(models.Model):
         related_name='play_history'
     )
     jingle_filename = models.CharField(max_length=255)
-    played_at = models.DateTimeField(auto_now_add=True)
+    venue_name = models.CharField(max_length=255, blank=True, default='')
+    played_at = models.DateTimeField(default=timezone.now)
     round_number = models.IntegerField()
     
     class Meta:
@@ -230,6 +214,78 @@ class JinglePlayHistory(models.Model):
         return f"{self.jingle_filename} played at {self.played_at}"
 
 
+class JinglePlayRollup(models.Model):
+    """
+    Hourly jingle play counters per venue
+    Maintained by PlayHistoryWriter alongside JinglePlayHistory so analytics
+    and jingle rotation never scan the raw history
+    """
+    schedule_ref = models.IntegerField(default=0, help_text="JingleSchedule id (0 = unscheduled play); kept after the schedule is deleted")
+    jingle_filename = models.CharField(max_length=255)
+    venue_name = models.CharField(max_length=255, blank=True, default='')
+    hour = models.DateTimeField(help_text="Start of the hour (UTC)")
+    play_count = models.IntegerField(default=0)
+    last_played_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-hour']
+        verbose_name = "Jingle Play Rollup"
+        verbose_name_plural = "Jingle Play Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['schedule_ref', 'jingle_filename', 'venue_name', 'hour'],
+                name='unique_jingle_play_rollup'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['venue_name', 'hour']),
+        ]
+    
+    def __str__(self):
+        return f"{self.jingle_filename} @ {self.venue_name or 'all venues'} {self.hour:%Y-%m-%d %H}:00 x{self.play_count}"
+
+
+class Jingle(models.Model):
+    """
+    Catalogue of generated jingle files
+    Serves listings without globbing the jingles directory or reading sidecar JSON
+    """
+    filename = models.CharField(max_length=255, unique=True, help_text="Audio file in data/jingles")
+    size_bytes = models.IntegerField(default=0)
+    duration_seconds = models.FloatField(null=True, blank=True)
+    
+    # Generation inputs
+    text = models.TextField(blank=True)
+    music_prompt = models.CharField(max_length=500, blank=True)
+    voice_id = models.CharField(max_length=100, blank=True)
+    
+    # Free-form metadata (previously the jingle_*.json sidecar)
+    metadata = models.JSONField(default=dict, blank=True)
+    
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+        ]
+    
+    def __str__(self):
+        return self.filename
+    
+    def to_dict(self, include_metadata: bool = True):
+        """Listing format used by /api/jingles"""
+        data = {
+            'filename': self.filename,
+            'created': self.created_at.isoformat(),
+            'size': self.size_bytes,
+            'duration_seconds': self.duration_seconds,
+        }
+        if include_metadata:
+            data['metadata'] = {'text': self.text, **self.metadata} if self.text else self.metadata
+        return data
+
+
 class VenueConfiguration(models.Model):
     """
     Store venue-specific configuration for Music Bingo
@@ -328,6 +384,11 @@ class KaraokeSession(models.Model):
         ('ended', 'Ended'),
     ]
     
+    SCHEDULING_MODES = [
+        ('fifo', 'First come, first served'),
+        ('fair', 'Fair share'),
+    ]
+    
     venue_name = models.CharField(
         max_length=200,
         help_text="Venue hosting this karaoke session"
@@ -348,6 +409,16 @@ class KaraokeSession(models.Model):
         default=True,
         help_text="Automatically advance to next singer when song completes"
     )
+    scheduling_mode = models.CharField(
+        max_length=10,
+        choices=SCHEDULING_MODES,
+        default='fifo',
+        help_text="How new sign-ups are placed in the queue"
+    )
+    queue_version = models.PositiveIntegerField(
+        default=0,
+        help_text="Bumped on every queue change; live screens watch it"
+    )
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -438,7 +509,7 @@ class KaraokeQueue(models.Model):
     
     # Queue Management
     position = models.IntegerField(
-        help_text="Position in queue (1 = next up)"
+        help_text="Sparse sort key (lower = sooner); see KaraokeQueueService"
     )
     status = models.CharField(
         max_length=20,
@@ -446,6 +517,11 @@ class KaraokeQueue(models.Model):
         default='pending',
         help_text="Current status in queue"
     )
+    fair_key = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Fair-share sort key (virtual sign-up time); set in fair mode"
+    )
     
     # Timestamps
     requested_at = models.DateTimeField(auto_now_add=True)
@@ -456,6 +532,18 @@ class KaraokeQueue(models.Model):
         ordering = ['session', 'position']
         verbose_name = "Karaoke Queue Entry"
         verbose_name_plural = "Karaoke Queue Entries"
+        constraints = [
+            # Concurrent sign-ups/moves can't land on the same slot
+            models.UniqueConstraint(
+                fields=['session', 'position'],
+                condition=models.Q(status__in=['pending', 'singing']),
+                name='unique_active_karaoke_position',
+            ),
+        ]
+        indexes = [
+            # Queue by status in play order (also covers status='pending' alone)
+            models.Index(fields=['session', 'status', 'position'], name='karaoke_queue_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.song_title} ({self.status})"
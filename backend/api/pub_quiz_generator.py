@@ -8,7 +8,8 @@ import random
 import os
 import logging
 from typing import List, Dict, Any
-from openai import OpenAI
+
+from .utils.metrics import span
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -322,7 +323,8 @@ Generate exactly {num_questions} questions now.
         logger.info(f"🔢 [OPENAI] Generation ID: {timestamp}")
         
         try:
-            # Initialize OpenAI client
+            # Initialize OpenAI client (the SDK is slow to import, load it on first use)
+            from openai import OpenAI
             client = OpenAI(api_key=api_key)
             logger.info(f"🤖 [OPENAI] Calling GPT-4o-mini with temperature=1.0 for maximum diversity")
             
@@ -382,16 +384,17 @@ Return ONLY a valid JSON array with this exact structure:
   }}
 ]"""
 
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a professional pub quiz question writer. Generate only valid JSON. No markdown, no code blocks, just pure JSON. Each question must be completely unique and different from others."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=1.0,  # Increased for more diversity
-                max_tokens=2000,
-                seed=None  # Allow random variation
-            )
+            with span('quiz', 'openai_call'):
+                response = client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": "You are a professional pub quiz question writer. Generate only valid JSON. No markdown, no code blocks, just pure JSON. Each question must be completely unique and different from others."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=1.0,  # Increased for more diversity
+                    max_tokens=2000,
+                    seed=None  # Allow random variation
+                )
             
             logger.info(f"✅ [OPENAI] Received response from GPT-4o-mini")
             
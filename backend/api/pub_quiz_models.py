@@ -134,6 +134,10 @@ class QuizTeam(models.Model):
     class Meta:
         ordering = ['-total_score', 'team_name']
         unique_together = ['session', 'team_name']
+        indexes = [
+            # Leaderboard (host stream, stats) read in index order
+            models.Index(fields=['session', '-total_score', 'team_name'], name='quiz_team_leaderboard_idx'),
+        ]
         verbose_name = "Quiz Team"
         verbose_name_plural = "Quiz Teams"
     
@@ -250,6 +254,10 @@ class TeamAnswer(models.Model):
     class Meta:
         unique_together = ['team', 'question']
         ordering = ['question__round_number', 'question__question_number']
+        indexes = [
+            # Answers to the current question, newest first (host stream, polled every second)
+            models.Index(fields=['question', '-submitted_at'], name='team_answer_feed_idx'),
+        ]
     
     def __str__(self):
         return f"{self.team.team_name}: {self.answer_text}"
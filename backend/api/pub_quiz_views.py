@@ -7,6 +7,7 @@ from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
+from django.db import connection
 from django.db.models import Count, Q
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
@@ -14,7 +15,6 @@ from rest_framework.response import Response
 from rest_framework import status
 import json
 import os
-import qrcode
 from io import BytesIO
 import base64
 import time
@@ -24,47 +24,19 @@ from .pub_quiz_models import (
     PubQuizSession, QuizTeam, QuizGenre, QuizQuestion,
     QuizRound, TeamAnswer, BuzzerDevice, GenreVote
 )
+from .utils.log_control import debug_category
+from .utils.metrics import span
+from .utils.pub_quiz_helpers import get_session_by_code_or_id
 
 logger = logging.getLogger(__name__)
 
 # Global dict to track last question position per session for SSE sync
 _player_question_positions = {}
 
+# Per-poll stream details and host control traces (off unless enabled, see LOG_LEVELS)
+stream_log = debug_category('quiz_stream')
+host_log = debug_category('quiz_host')
 
-# ============================================================================
-# HELPER FUNCTIONS
-# ============================================================================
-
-def get_session_by_code_or_id(session_identifier):
-    """
-    Get session by session_code (string) or id (int).
-    This allows backward compatibility with numeric IDs.
-    """
-    logger.info(f"🔎 [GET_SESSION] Looking for session: '{session_identifier}'")
-    logger.info(f"🔎 [GET_SESSION] Total sessions in DB: {PubQuizSession.objects.count()}")
-    
-    try:
-        # Try as session_code first
-        logger.info(f"🔎 [GET_SESSION] Trying by session_code...")
-        session = PubQuizSession.objects.get(session_code=session_identifier)
-        logger.info(f"✅ [GET_SESSION] Found by session_code: {session.id}")
-        return session
-    except PubQuizSession.DoesNotExist:
-        logger.warning(f"⚠️ [GET_SESSION] Not found by session_code, trying numeric ID...")
-        try:
-            # Fallback to numeric ID
-            session = PubQuizSession.objects.get(id=int(session_identifier))
-            logger.info(f"✅ [GET_SESSION] Found by numeric ID: {session.id}")
-            return session
-        except (PubQuizSession.DoesNotExist, ValueError) as e:
-            logger.error(f"❌ [GET_SESSION] Session not found anywhere: {e}")
-            # List all session codes for debugging
-            all_codes = list(PubQuizSession.objects.values_list('session_code', flat=True))
-            logger.error(f"❌ [GET_SESSION] Available session codes: {all_codes}")
-            return None
-    except ValueError as e:
-        logger.error(f"❌ [GET_SESSION] ValueError: {e}")
-        return None
 from .pub_quiz_generator import PubQuizGenerator, initialize_genres_in_db
 
 logger = logging.getLogger(__name__)
@@ -85,12 +57,21 @@ def get_sessions(request):
     if status_filter:
         sessions = sessions.filter(status=status_filter)
     
-    sessions = sessions.order_by('-date', '-id')[:20]
+    sessions = list(sessions.order_by('-date', '-id')[:20])
+    
+    # Team and question counts for all listed sessions in one query each
+    ids = [s.id for s in sessions]
+    team_counts = dict(
+        QuizTeam.objects.filter(session_id__in=ids).values_list('session_id').annotate(n=Count('id')).order_by()
+    )
+    question_counts = dict(
+        QuizQuestion.objects.filter(session_id__in=ids).values_list('session_id').annotate(n=Count('id')).order_by()
+    )
     
     data = []
     for s in sessions:
-        team_count = s.teams.count()
-        question_count = QuizQuestion.objects.filter(session=s).count()
+        team_count = team_counts.get(s.id, 0)
+        question_count = question_counts.get(s.id, 0)
         
         data.append({
             'id': s.id,
@@ -342,6 +323,7 @@ def generate_qr_code(request, session_id):
     registration_url = f"/pub-quiz/register/{session_id}"
     
     # Generar QR
+    import qrcode
     qr = qrcode.QRCode(version=1, box_size=10, border=5)
     qr.add_data(registration_url)
     qr.make(fit=True)
@@ -486,7 +468,7 @@ def generate_quiz_questions(request, session_id):
         
         # Generate questions in parallel (max 4 concurrent API calls)
         all_round_questions = []
-        with ThreadPoolExecutor(max_workers=4) as executor:
+        with span('quiz', 'generate_rounds'), ThreadPoolExecutor(max_workers=4) as executor:
             future_to_round = {executor.submit(generate_round_questions, round_info): round_info for round_info in rounds_to_generate}
             
             for idx, future in enumerate(as_completed(future_to_round)):
@@ -510,24 +492,25 @@ def generate_quiz_questions(request, session_id):
         logger.info(f"💾 [GENERATE_QUESTIONS] Saving questions to database...")
         
         total_questions_saved = 0
-        for round_data in all_round_questions:
-            for q_data in round_data['questions']:
-                QuizQuestion.objects.create(
-                    session=session,
-                    genre=round_data['genre_obj'],
-                    round_number=round_data['round_number'],
-                    question_number=q_data['question_number'],
-                    question_text=q_data['question'],
-                    correct_answer=q_data['answer'],
-                    alternative_answers=q_data.get('alternative_answers', []),
-                    difficulty=q_data.get('difficulty', 'medium'),
-                    question_type=q_data.get('question_type', 'written'),
-                    options=q_data.get('options', {}),
-                    correct_option=q_data.get('correct_option', ''),
-                    fun_fact=q_data.get('fun_fact', ''),
-                    hints=q_data.get('hints', ''),
-                )
-                total_questions_saved += 1
+        with span('quiz', 'db_save'):
+            for round_data in all_round_questions:
+                for q_data in round_data['questions']:
+                    QuizQuestion.objects.create(
+                        session=session,
+                        genre=round_data['genre_obj'],
+                        round_number=round_data['round_number'],
+                        question_number=q_data['question_number'],
+                        question_text=q_data['question'],
+                        correct_answer=q_data['answer'],
+                        alternative_answers=q_data.get('alternative_answers', []),
+                        difficulty=q_data.get('difficulty', 'medium'),
+                        question_type=q_data.get('question_type', 'written'),
+                        options=q_data.get('options', {}),
+                        correct_option=q_data.get('correct_option', ''),
+                        fun_fact=q_data.get('fun_fact', ''),
+                        hints=q_data.get('hints', ''),
+                    )
+                    total_questions_saved += 1
         
         logger.info(f"✅ [GENERATE_QUESTIONS] Saved {total_questions_saved} questions to database")
         session.generation_progress = {'progress': 95, 'status': 'Finalizing quiz...'}
@@ -571,32 +554,23 @@ def generate_quiz_questions(request, session_id):
 @api_view(['GET'])
 def quiz_host_data(request, session_id):
     """Obtiene datos para la vista del host"""
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.info(f"📊 [HOST_DATA] ========== REQUEST START ==========")
-    logger.info(f"📊 [HOST_DATA] Request for session_id: '{session_id}' (type: {type(session_id).__name__})")
-    logger.info(f"📊 [HOST_DATA] Total sessions in DB at request time: {PubQuizSession.objects.count()}")
-    
     session = get_session_by_code_or_id(session_id)
     if not session:
-        logger.error(f"❌ [HOST_DATA] Session '{session_id}' not found!")
+        logger.warning(f"❌ [HOST_DATA] Session '{session_id}' not found!")
         return Response({"error": "Session not found"}, status=404)
     teams = session.teams.all().order_by('-total_score')
     rounds = session.rounds.all()
     
     # Get all questions for this session
-    questions = QuizQuestion.objects.filter(session=session).order_by('round_number', 'question_number')
+    questions = list(QuizQuestion.objects.filter(session=session).order_by('round_number', 'question_number'))
     
-    logger.info(f"✅ [HOST_DATA] Found {teams.count()} teams, {rounds.count()} rounds, {questions.count()} questions")
-    logger.info(f"⏱️ [HOST_DATA] question_started_at: {session.question_started_at}")
-    
-    # Get current question details
+    # Get current question details (from the loaded list, no extra query)
     current_question_obj = None
     if session.current_round and session.current_question:
-        current_question_obj = questions.filter(
-            round_number=session.current_round,
-            question_number=session.current_question
-        ).first()
+        current_question_obj = next((
+            q for q in questions
+            if q.round_number == session.current_round and q.question_number == session.current_question
+        ), None)
     
     return Response({
         'session': {
@@ -667,7 +641,7 @@ def start_quiz(request, session_id):
         first_round.save()
     
     # Obtener TODAS las preguntas del quiz
-    all_questions = QuizQuestion.objects.filter(session=session).order_by('round_number', 'question_number')
+    all_questions = QuizQuestion.objects.filter(session=session).select_related('genre').order_by('round_number', 'question_number')
     
     questions_data = []
     for q in all_questions:
@@ -720,7 +694,7 @@ def get_all_questions(request, session_id):
     if not session:
         return Response({"error": "Session not found"}, status=404)
     
-    questions = QuizQuestion.objects.filter(session=session).order_by('round_number', 'question_number')
+    questions = QuizQuestion.objects.filter(session=session).select_related('genre').order_by('round_number', 'question_number')
     
     questions_data = []
     for q in questions:
@@ -936,39 +910,20 @@ def bulk_delete_sessions(request):
 @api_view(['POST'])
 def next_question(request, session_id):
     """Avanza a la siguiente pregunta"""
-    print(f"\n\n========== [NEXT] ENDPOINT CALLED ==========")
-    print(f"[NEXT] Session ID: {session_id}")
-    print(f"[NEXT] Request method: {request.method}")
-    
     session = get_session_by_code_or_id(session_id)
-    print(f"[NEXT] Session found: {session.session_code}")
-    print(f"[NEXT] Current status: {session.status}")
-    print(f"[NEXT] Current round: {session.current_round}")
-    print(f"[NEXT] Current question: {session.current_question}")
-    print(f"[NEXT] Total rounds: {session.total_rounds}")
-    print(f"[NEXT] Questions per round: {session.questions_per_round}")
-    print(f"[NEXT] Session found: {session.session_code}")
-    print(f"[NEXT] Current status: {session.status}")
-    print(f"[NEXT] Current round: {session.current_round}")
-    print(f"[NEXT] Current question: {session.current_question}")
-    print(f"[NEXT] Total rounds: {session.total_rounds}")
-    print(f"[NEXT] Questions per round: {session.questions_per_round}")
     if not session:
         return Response({"error": "Session not found"}, status=404)
     
-    logger.info(f"🔄 [NEXT] Current state - Round: {session.current_round}, Question: {session.current_question}, Status: {session.status}")
+    host_log.log("[NEXT] %s before: round %s/%s, question %s/%s, status %s",
+                 session.session_code, session.current_round, session.total_rounds,
+                 session.current_question, session.questions_per_round, session.status)
     
     # 🔧 FIX: Si estamos en halftime, el primer "Next" debe pasar a in_progress
     # Y mostrar la primera pregunta del nuevo round (que ya está en current_question=1)
     if session.status == 'halftime':
-        print(f"\n▶️ [HALFTIME] Currently in halftime status")
-        print(f"▶️ [HALFTIME] Round: {session.current_round}, Question: {session.current_question}")
-        print(f"▶️ [HALFTIME] User clicked Next - resuming to 'in_progress'")
-        print(f"▶️ [HALFTIME] Will display Round {session.current_round}, Question {session.current_question}")
         session.status = 'in_progress'
         session.save()
-        print(f"✅ [HALFTIME] Status changed to 'in_progress', quiz continues")
-        print(f"📡 [HALFTIME] Frontend will receive question_update via SSE for Round {session.current_round}, Q{session.current_question}")
+        logger.info(f"▶️ [HALFTIME] {session.session_code} resumed: Round {session.current_round}, Question {session.current_question}")
         return Response({
             'success': True,
             'current_round': session.current_round,
@@ -977,31 +932,17 @@ def next_question(request, session_id):
             'message': f'Resuming to Round {session.current_round}, Question {session.current_question}'
         })
     
-    print(f"\n[NEXT] Not in halftime, proceeding with normal flow...")
     total_questions_in_round = session.questions_per_round
-    print(f"[NEXT] Questions in round: {total_questions_in_round}")
-    
-    print(f"\n[NEXT] Checking if we need to advance...")
-    print(f"[NEXT] current_question ({session.current_question}) < total_questions_in_round ({total_questions_in_round})?")
-    
-    logger.info(f"🔍 [NEXT] total_questions_in_round: {total_questions_in_round}, current_question: {session.current_question}")
     
     if session.current_question < total_questions_in_round:
-        print(f"\n➡️ [NEXT] YES - Moving to next question in same round")
         session.current_question += 1
         # Keep question_started_at as None - frontend will set it after TTS via start-countdown
         # DO NOT reset to timezone.now() here as it would start countdown before TTS finishes
         session.question_started_at = None
         # Ensure status is in_progress when showing a new question
         session.status = 'in_progress'
-        print(f"➡️ [NEXT] New question: {session.current_question} (still in round {session.current_round})")
-        logger.info(f"➡️ [NEXT] Moving to question {session.current_question} (still in round {session.current_round}), question_started_at reset to None (will be set after TTS)")
     else:
-        print(f"\n🎯 [NEXT] NO - Last question of round, need to change round")
         # Siguiente ronda
-        logger.info(f"🎯 [NEXT] ❗ LAST QUESTION OF ROUND - current_question ({session.current_question}) >= total ({total_questions_in_round})")
-        logger.info(f"🎯 [NEXT] Will advance from Round {session.current_round} to Round {session.current_round + 1}")
-        
         current_round = session.rounds.filter(round_number=session.current_round).first()
         if current_round:
             current_round.is_completed = True
@@ -1010,27 +951,15 @@ def next_question(request, session_id):
             logger.info(f"✅ [NEXT] Round {session.current_round} marked as completed")
         
         if session.current_round < session.total_rounds:
-            old_round = session.current_round
             session.current_round += 1
             session.current_question = 1
             session.question_started_at = None  # Will be set by frontend after TTS
-            print(f"🔄 [NEXT] Changed from Round {old_round} to Round {session.current_round}, Question reset to 1")
             
             # Verificar si es halftime
             next_round = session.rounds.filter(round_number=session.current_round).first()
-            print(f"🔍 [NEXT] next_round: {next_round}")
-            if next_round:
-                print(f"🔍 [NEXT] is_halftime_before: {next_round.is_halftime_before}")
-            
             if next_round and next_round.is_halftime_before:
-                print(f"🍻 [HALFTIME] ❗❗❗ Detected is_halftime_before=True for round {session.current_round}")
-                print(f"🍻 [HALFTIME] Previous round completed: {session.current_round - 1}")
-                print(f"🍻 [HALFTIME] Next round will be: {session.current_round}")
-                print(f"🍻 [HALFTIME] Setting status to 'halftime' for break")
                 session.status = 'halftime'
-                print(f"✅ [HALFTIME] Status saved, SSE will notify frontend")
-            else:
-                print(f"⚠️ [NEXT] No halftime detected for round {session.current_round} (is_halftime_before={next_round.is_halftime_before if next_round else 'N/A'})")
+                logger.info(f"🍻 [HALFTIME] {session.session_code}: break before Round {session.current_round}")
             
             if next_round:
                 next_round.started_at = timezone.now()
@@ -1040,25 +969,9 @@ def next_question(request, session_id):
             session.status = 'completed'
             logger.info(f"🏉 [NEXT] Quiz completed!")
     
-    print(f"\n[NEXT] About to save session...")
-    print(f"[NEXT] Final state before save:")
-    print(f"[NEXT]   - Round: {session.current_round}")
-    print(f"[NEXT]   - Question: {session.current_question}")
-    print(f"[NEXT]   - Status: {session.status}")
-    logger.info(f"💾 [NEXT] About to save session - Final state: Round {session.current_round}, Question {session.current_question}, Status: {session.status}")
     session.save()
-    print(f"[NEXT] ✅ Session saved successfully!")
-    logger.info(f"✅ [NEXT] Session saved successfully")
-    
-    # 📡 SYNC: Get current question details to send to players
-    current_question_obj = QuizQuestion.objects.filter(
-        session=session,
-        round_number=session.current_round,
-        question_number=session.current_question
-    ).first()
-    
-    logger.info(f"📡 [SYNC] Broadcasting question_update to all connected players")
-    logger.info(f"📡 [SYNC] Round: {session.current_round}, Question: {session.current_question}")
+    host_log.log("[NEXT] %s after: round %s, question %s, status %s",
+                 session.session_code, session.current_round, session.current_question, session.status)
     
     return Response({
         'success': True,
@@ -1170,7 +1083,8 @@ def quiz_stream(request, session_id):
                 
                 # Detect status change
                 status_changed = session.status != last_status
-                logger.info(f"🔍 [SSE] Status check: current={session.status}, last={last_status}, changed={status_changed}, quiz_started_sent={quiz_started_sent}")
+                stream_log.log("[SSE] %s status check: current=%s, last=%s, changed=%s, quiz_started_sent=%s",
+                               session_id, session.status, last_status, status_changed, quiz_started_sent)
                 
                 # NEW: Send questions when quiz is in_progress (either just started OR player connected late)
                 should_send_questions = (
@@ -1180,13 +1094,10 @@ def quiz_stream(request, session_id):
                 )
                 
                 if should_send_questions:
-                    logger.info(f"🎬 [SSE] ✅ CONDITIONS MET! Quiz started! Sending all questions to players...")
-                    logger.info(f"🎬 [SSE] - status_changed: {status_changed}")
-                    logger.info(f"🎬 [SSE] - session.status: {session.status}")
-                    logger.info(f"🎬 [SSE] - quiz_started_sent: {quiz_started_sent}")
+                    stream_log.log("[SSE] %s quiz started (status_changed=%s), sending all questions", session_id, status_changed)
                     
                     # Get ALL questions
-                    all_questions = QuizQuestion.objects.filter(session=session).order_by('round_number', 'question_number')
+                    all_questions = QuizQuestion.objects.filter(session=session).select_related('genre').order_by('round_number', 'question_number')
                     
                     questions_data = []
                     for q in all_questions:
@@ -1220,7 +1131,7 @@ def quiz_stream(request, session_id):
                     }
                     
                     yield f"data: {json.dumps(data)}\n\n"
-                    logger.info(f"✅ [SSE] Sent {len(questions_data)} questions to players")
+                    logger.info(f"✅ [SSE] Sent {len(questions_data)} questions to a player of {session_id}")
                     
                     quiz_started_sent = True
                     last_status = session.status
@@ -1231,11 +1142,11 @@ def quiz_stream(request, session_id):
                     current_position = f"{session.current_round}.{session.current_question}"
                     last_position = _player_question_positions.get(session_id, None)
                     
-                    logger.info(f"🔍 [SYNC] Position check - current: {current_position}, last: {last_position}, status: {session.status}")
+                    stream_log.log("[SYNC] %s position check - current: %s, last: %s",
+                                   session_id, current_position, last_position)
                     
                     if last_position != current_position and last_position is not None:
-                        logger.info(f"📡 [SYNC] ⚡ Question changed from {last_position} to {current_position}")
-                        logger.info(f"📡 [SYNC] Preparing question_update event for players...")
+                        stream_log.log("[SYNC] %s question changed from %s to %s", session_id, last_position, current_position)
                         
                         # Get timing config
                         timing_config = {
@@ -1253,11 +1164,10 @@ def quiz_stream(request, session_id):
                         }
                         
                         yield f"data: {json.dumps(question_update_data)}\n\n"
-                        logger.info(f"✅ [SYNC] Sent question_update to players: Round {session.current_round}, Question {session.current_question}")
+                        stream_log.log("[SYNC] %s sent question_update: Round %s, Question %s",
+                                       session_id, session.current_round, session.current_question)
                     elif last_position is None:
-                        logger.info(f"🔍 [SYNC] First poll - initializing position to {current_position}")
-                    else:
-                        logger.info(f"🔍 [SYNC] No change detected")
+                        stream_log.log("[SYNC] %s first poll - position %s", session_id, current_position)
                     
                     # Update stored position
                     _player_question_positions[session_id] = current_position
@@ -1267,7 +1177,6 @@ def quiz_stream(request, session_id):
                     if session.status == 'ready' or session.status == 'registration':
                         yield f"data: {json.dumps({'type': 'waiting', 'message': 'Waiting for quiz to start', 'status': session.status})}\n\n"
                     elif session.status == 'halftime':
-                        print(f"🍻 [SSE] ❗ Halftime status detected! Sending halftime event to players...")
                         halftime_data = {
                             'type': 'halftime',
                             'message': 'Halftime break - please wait',
@@ -1276,7 +1185,7 @@ def quiz_stream(request, session_id):
                             'next_round': session.current_round
                         }
                         yield f"data: {json.dumps(halftime_data)}\n\n"
-                        print(f"✅ [SSE] Halftime event sent to players")
+                        stream_log.log("[SSE] %s halftime event sent", session_id)
                     else:
                         yield f"data: {json.dumps({'type': 'status_change', 'status': session.status})}\n\n"
                     
@@ -1292,6 +1201,9 @@ def quiz_stream(request, session_id):
                 # Send comment-based heartbeat (lightweight, doesn't trigger client events)
                 yield f": heartbeat\n\n"
                 
+                # Don't hold a DB connection while idle; the next poll reopens one
+                connection.close()
+                
                 # Wait before checking again (1 second)
                 time.sleep(1)
                 
@@ -1352,9 +1264,8 @@ def host_stream(request, session_id):
                 # Check for generation progress
                 progress_data = session.generation_progress
                 if progress_data:
-                    logger.info(f"🔍 [SSE] Found progress data for {session_id}: {progress_data}")
                     if progress_data != last_progress:
-                        logger.info(f"📤 [SSE] Sending progress update: {progress_data}")
+                        stream_log.log("[SSE] %s sending progress update: %s", session_id, progress_data)
                         yield f"data: {json.dumps({'type': 'generation_progress', 'progress': progress_data['progress'], 'status': progress_data['status']})}\n\n"
                         last_progress = progress_data
                         
@@ -1363,9 +1274,8 @@ def host_stream(request, session_id):
                             logger.info(f"✅ [SSE] Generation 100% reached, closing SSE for {session_id}")
                             yield f"data: {json.dumps({'type': 'generation_complete', 'message': 'Generation complete, closing connection'})}\n\n"
                             break
-                else:
-                    if last_progress is not None:
-                        logger.info(f"🔍 [SSE] No progress data for {session_id}")
+                elif last_progress is not None:
+                    stream_log.log("[SSE] %s progress data cleared", session_id)
                 
                 # Check if session ended
                 if session.status == 'completed':
@@ -1393,7 +1303,7 @@ def host_stream(request, session_id):
                         session=session,
                         round_number=session.current_round,
                         question_number=session.current_question
-                    ).first()
+                    ).select_related('genre').first()
                 
                 if current_q:
                     # Count answers for this question
@@ -1496,6 +1406,9 @@ def host_stream(request, session_id):
                 # This prevents proxy/Cloud Run timeouts without generating client events
                 yield f": heartbeat\n\n"
                 
+                # Don't hold a DB connection while idle; the next poll reopens one
+                connection.close()
+                
                 # Wait 1 second before next check
                 time.sleep(1)
                 
@@ -1858,16 +1771,15 @@ def generate_answer_sheets(request):
         
         # Get all questions organized by round
         questions_by_round = []
-        rounds = QuizRound.objects.filter(session=session).order_by('round_number')
+        rounds = QuizRound.objects.filter(session=session).select_related('genre').order_by('round_number')
+        
+        session_questions = {}
+        for q in QuizQuestion.objects.filter(session=session).order_by('round_number', 'question_number'):
+            session_questions.setdefault(q.round_number, []).append(q)
         
         for round_obj in rounds:
-            questions = QuizQuestion.objects.filter(
-                session=session, 
-                round_number=round_obj.round_number
-            ).order_by('question_number')
-            
             round_questions = []
-            for q in questions:
+            for q in session_questions.get(round_obj.round_number, []):
                 question_data = {
                     'number': q.question_number,
                     'text': q.question_text,
@@ -4,28 +4,53 @@ Business logic extracted from views
 """
 
 # Core services
-from .storage_service import GCSStorageService, upload_to_gcs
+from .storage_service import (
+    StorageBackend,
+    GCSStorageService,
+    LocalStorageBackend,
+    S3StorageBackend,
+    get_storage,
+    upload_to_gcs,
+)
 from .tts_service import TTSService
 from .music_service import MusicGenerationService
+from .music_bed_cache import MusicBedCache
 
 # Domain services
 from .jingle_service import JingleService
 from .schedule_service import ScheduleService
+from .schedule_timetable import ScheduleTimetable
+from .playout_planner import PlayoutPlanner
+from .play_history import PlayHistoryService
 from .session_service import BingoSessionService
 from .card_generation_service import CardGenerationService
 from .pub_quiz_service import PubQuizService
+from .karaoke_queue_service import KaraokeQueueService
+from .karafun_cache import KarafunCache
+from .song_index import SongIndex
 
 __all__ = [
     # Core services
+    'StorageBackend',
     'GCSStorageService',
+    'LocalStorageBackend',
+    'S3StorageBackend',
+    'get_storage',
     'upload_to_gcs',
     'TTSService',
     'MusicGenerationService',
+    'MusicBedCache',
     
     # Domain services
     'JingleService',
     'ScheduleService',
+    'ScheduleTimetable',
+    'PlayoutPlanner',
+    'PlayHistoryService',
     'BingoSessionService',
     'CardGenerationService',
     'PubQuizService',
+    'KaraokeQueueService',
+    'KarafunCache',
+    'SongIndex',
 ]
@@ -5,7 +5,9 @@ Handles command preparation and validation for card generation
 
 import logging
 import base64
+import os
 import tempfile
+import time
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
@@ -23,12 +25,14 @@ class CardGenerationService:
     - Prepare generation commands
     - Handle logo data (base64, URLs)
     - Build command line arguments
+    - Prune generated files past their retention period
     """
     
     def __init__(self):
         """Initialize Card Generation Service"""
         self.script_path = BASE_DIR / 'generate_cards.py'
         self.logos_dir = DATA_DIR / 'logos'
+        self.cards_dir = DATA_DIR / 'cards'
     
     def validate_generation_params(self, params: Dict[str, Any]) -> bool:
         """
@@ -253,3 +257,52 @@ class CardGenerationService:
                 return False
         
         return False
+    
+    def prune_outputs(self, max_age_days: Optional[float] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Delete generated files older than the retention period
+        
+        Covers card PDFs and session_*.json files in the cards directory
+        and temp_logo_* uploads; current_session.json and other files are
+        kept. Published copies in object storage are not touched.
+        
+        Args:
+            max_age_days: Retention period (default CARD_RETENTION_DAYS)
+            dry_run: Only report what would be deleted
+            
+        Returns:
+            dict: {'deleted': [names], 'freed_bytes': n, 'kept': n}
+        """
+        if max_age_days is None:
+            max_age_days = AppConfig.CARD_RETENTION_DAYS
+        cutoff = time.time() - max_age_days * 86400
+        
+        deleted, freed, kept = [], 0, 0
+        for directory, matches in (
+            (self.cards_dir, lambda name: name.endswith('.pdf') or (name.startswith('session_') and name.endswith('.json'))),
+            (self.logos_dir, lambda name: name.startswith('temp_logo_')),
+        ):
+            if not directory.is_dir():
+                continue
+            # One directory pass; DirEntry.stat() reuses the listing where it can
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not matches(entry.name):
+                        continue
+                    stat = entry.stat()
+                    if stat.st_mtime >= cutoff:
+                        kept += 1
+                        continue
+                    if not dry_run:
+                        try:
+                            os.unlink(entry.path)
+                        except FileNotFoundError:
+                            continue  # Removed by another worker
+                    deleted.append(entry.name)
+                    freed += stat.st_size
+        
+        logger.info(
+            f"{'Would prune' if dry_run else 'Pruned'} {len(deleted)} generated files "
+            f"({freed / 1024 / 1024:.1f} MB), kept {kept}"
+        )
+        return {'deleted': deleted, 'freed_bytes': freed, 'kept': kept}
@@ -3,19 +3,27 @@ Jingle Service - Orchestrates complete jingle creation
 Combines TTS, music generation, and audio mixing
 """
 
+from __future__ import annotations
+
+import json
 import logging
-import io
 import time
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
+from datetime import datetime, timezone as dt_timezone
 
-from pydub import AudioSegment
+from django.db.models import Q
 
 from .tts_service import TTSService
 from .music_service import MusicGenerationService
-from .storage_service import GCSStorageService
+from .music_bed_cache import MusicBedCache
+from .storage_service import StorageBackend, get_storage
+from ..models import Jingle
 from ..utils.config import AppConfig, DATA_DIR
+from ..utils.metrics import span
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -31,11 +39,15 @@ class JingleService:
     - Audio mixing and processing
     """
     
+    # (mtime_ns, playlist) of the last playlist file read in this process
+    _playlist_cache = None
+    
     def __init__(
         self,
         tts_service: Optional[TTSService] = None,
         music_service: Optional[MusicGenerationService] = None,
-        storage_service: Optional[GCSStorageService] = None
+        storage_service: Optional[StorageBackend] = None,
+        music_bed_cache: Optional[MusicBedCache] = None
     ):
         """
         Initialize Jingle Service with dependencies
@@ -44,11 +56,15 @@ class JingleService:
             tts_service: TTS service instance (created if not provided)
             music_service: Music service instance (created if not provided)
             storage_service: Storage service instance (created if not provided)
+            music_bed_cache: Music bed cache (created if enabled and not provided)
         """
         self.tts_service = tts_service or TTSService()
         self.music_service = music_service or MusicGenerationService()
-        self.storage_service = storage_service or GCSStorageService()
+        self.storage_service = storage_service or get_storage()
         self.jingles_dir = AppConfig.get_data_path('jingles')
+        if music_bed_cache is None and AppConfig.MUSIC_BED_CACHE_ENABLED:
+            music_bed_cache = MusicBedCache(music_service=self.music_service)
+        self.music_bed_cache = music_bed_cache
     
     def create_jingle(
         self,
@@ -95,9 +111,12 @@ class JingleService:
             model_id='eleven_multilingual_v2'
         )
         
-        # Calculate TTS duration
-        tts_audio = AudioSegment.from_mp3(io.BytesIO(tts_bytes))
-        tts_duration_seconds = len(tts_audio) / 1000  # ms to seconds
+        # numpy and pydub load on the first mix, not on every worker boot
+        from .. import audio_mixer
+        
+        # Decode TTS once - the PCM array is reused for mixing
+        tts_pcm = audio_mixer.decode_mp3(tts_bytes)
+        tts_duration_seconds = audio_mixer.duration_ms(tts_pcm) / 1000  # ms to seconds
         logger.info(f"TTS duration: {tts_duration_seconds:.2f}s")
         
         # Step 2: Generate matching music
@@ -106,17 +125,24 @@ class JingleService:
         if task_callback:
             task_callback(30, 'Generating background music')
         
-        music_bytes = self.music_service.generate_music(
-            prompt=music_prompt,
-            duration_seconds=music_duration,
-            use_fallback_on_error=True
-        )
+        if self.music_bed_cache:
+            # Repeat prompts reuse a cached bed instead of calling the music API
+            music_pcm = self.music_bed_cache.get_bed(music_prompt, music_duration)
+        else:
+            music_bytes = self.music_service.generate_music(
+                prompt=music_prompt,
+                duration_seconds=music_duration,
+                use_fallback_on_error=True
+            )
+            music_pcm = audio_mixer.decode_mp3(music_bytes)
         
         # Step 3: Mix audio
         logger.info("Step 3/4: Mixing audio...")
         if task_callback:
             task_callback(60, 'Mixing audio tracks')
-        mixed_audio = self.mix_tts_with_music(tts_bytes, music_bytes)
+        with span('jingle', 'mix'):
+            mixed_pcm = self.mix_pcm(tts_pcm, music_pcm)
+            mixed_audio = audio_mixer.encode_mp3(mixed_pcm)
         
         # Step 4: Save file
         logger.info("Step 4/4: Saving jingle...")
@@ -132,9 +158,18 @@ class JingleService:
         with open(file_path, 'wb') as f:
             f.write(mixed_audio)
         
-        # Calculate final duration
-        final_audio = AudioSegment.from_mp3(io.BytesIO(mixed_audio))
-        actual_duration = len(final_audio) / 1000
+        # Final duration comes from the mixed array - no re-decode needed
+        actual_duration = audio_mixer.duration_ms(mixed_pcm) / 1000
+        
+        with span('jingle', 'db_save'):
+            jingle = Jingle.objects.create(
+                filename=filename,
+                size_bytes=len(mixed_audio),
+                duration_seconds=actual_duration,
+                text=text,
+                music_prompt=music_prompt[:500],
+                voice_id=voice_id or ''
+            )
         
         logger.info(f"✅ Jingle created: {filename} ({actual_duration:.2f}s)")
         
@@ -143,18 +178,14 @@ class JingleService:
             'duration_seconds': actual_duration,
             'size_bytes': len(mixed_audio),
             'file_path': str(file_path),
-            'created_at': datetime.now().isoformat()
+            'created_at': jingle.created_at.isoformat()
         }
     
     def mix_tts_with_music(self, tts_bytes: bytes, music_bytes: bytes) -> bytes:
         """
         Mix TTS audio with background music
         
-        Algorithm:
-        1. Load both audio tracks
-        2. Reduce music volume to -15dB
-        3. Center TTS over music
-        4. Export combined audio
+        Decodes both tracks, mixes them with mix_pcm() and encodes once.
         
         Args:
             tts_bytes: TTS audio as bytes
@@ -163,93 +194,154 @@ class JingleService:
         Returns:
             bytes: Mixed audio as MP3
         """
+        from .. import audio_mixer
+        
         try:
-            # Load audio segments
-            tts_audio = AudioSegment.from_mp3(io.BytesIO(tts_bytes))
-            music_audio = AudioSegment.from_mp3(io.BytesIO(music_bytes))
-            
-            # Reduce music volume (background)
-            music_audio = music_audio - 15  # Reduce by 15dB
-            
-            # Calculate positioning to center TTS
-            tts_duration_ms = len(tts_audio)
-            music_duration_ms = len(music_audio)
-            
-            if music_duration_ms > tts_duration_ms:
-                # Center TTS over music
-                start_position = (music_duration_ms - tts_duration_ms) // 2
-                mixed = music_audio.overlay(tts_audio, position=start_position)
-            else:
-                # TTS is longer, center music under TTS
-                start_position = (tts_duration_ms - music_duration_ms) // 2
-                mixed = tts_audio.overlay(music_audio, position=start_position, gain_during_overlay=-15)
-            
-            # Export to bytes
-            output = io.BytesIO()
-            mixed.export(output, format='mp3')
-            output.seek(0)
-            
-            return output.getvalue()
+            tts_pcm = audio_mixer.decode_mp3(tts_bytes)
+            music_pcm = audio_mixer.decode_mp3(music_bytes)
+            return audio_mixer.encode_mp3(self.mix_pcm(tts_pcm, music_pcm))
             
         except Exception as e:
             logger.error(f"❌ Audio mixing failed: {e}")
             raise
     
-    def list_jingles(self, include_metadata: bool = True) -> List[Dict[str, Any]]:
+    def mix_pcm(self, tts_pcm: np.ndarray, music_pcm: np.ndarray) -> np.ndarray:
+        """
+        Mix decoded TTS and music arrays
+        
+        Algorithm:
+        1. Reduce music volume to -15dB
+        2. Center the shorter track over the longer one
+        3. Duck the music under speech (see audio_mixer.duck_music)
+        4. Sum the tracks (output length = longer track)
+        
+        Args:
+            tts_pcm: TTS PCM array
+            music_pcm: Music PCM array
+            
+        Returns:
+            np.ndarray: Mixed PCM array
+        """
+        from .. import audio_mixer
+        
+        # Reduce music volume (background)
+        music_pcm = audio_mixer.apply_gain(music_pcm, -15)  # Reduce by 15dB
+        
+        if len(music_pcm) > len(tts_pcm):
+            # Center TTS over music, ducking the music while the voice speaks
+            start_position = (len(music_pcm) - len(tts_pcm)) // 2
+            music_pcm = audio_mixer.duck_music(music_pcm, tts_pcm, position=start_position)
+            return audio_mixer.overlay(music_pcm, tts_pcm, position=start_position)
+        
+        # TTS is longer, center music under TTS
+        start_position = (len(tts_pcm) - len(music_pcm)) // 2
+        music_pcm = audio_mixer.duck_music(music_pcm, tts_pcm, position=-start_position)
+        return audio_mixer.overlay(tts_pcm, music_pcm, position=start_position)
+    
+    def list_jingles(
+        self,
+        include_metadata: bool = True,
+        search: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
         """
-        List all available jingles
+        List jingles from the catalogue (newest first)
         
         Args:
-            include_metadata: Include JSON metadata if available
+            include_metadata: Include jingle metadata
+            search: Optional filter on filename, text or music prompt
+            limit: Maximum number of jingles to return (all if None)
+            offset: Number of jingles to skip
             
         Returns:
             list: List of jingle information dictionaries
             
         Example:
             >>> service = JingleService()
-            >>> jingles = service.list_jingles()
+            >>> jingles = service.list_jingles(limit=20)
             >>> for jingle in jingles:
             ...     print(jingle['filename'], jingle['size'])
         """
-        if not self.jingles_dir.exists():
-            logger.warning(f"Jingles directory does not exist: {self.jingles_dir}")
-            return []
+        queryset = self._catalog_queryset(search)[offset:]
+        if limit is not None:
+            queryset = queryset[:limit]
         
-        jingles = []
-        for file_path in self.jingles_dir.glob('*.mp3'):
-            stat = file_path.stat()
-            
-            jingle_info = {
-                'filename': file_path.name,
-                'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                'size': stat.st_size,
-            }
-            
-            # Load metadata if requested
-            if include_metadata:
-                metadata_path = file_path.with_suffix('.json')
-                if metadata_path.exists():
-                    try:
-                        import json
-                        with open(metadata_path, 'r') as f:
-                            jingle_info['metadata'] = json.load(f)
-                    except Exception as e:
-                        logger.warning(f"Error loading metadata for {file_path.name}: {e}")
-                        jingle_info['metadata'] = {}
-                else:
-                    jingle_info['metadata'] = {}
+        jingles = [jingle.to_dict(include_metadata) for jingle in queryset]
+        logger.info(f"Found {len(jingles)} jingles")
+        return jingles
+    
+    def count_jingles(self, search: Optional[str] = None) -> int:
+        """
+        Count catalogued jingles matching a search filter
+        
+        Args:
+            search: Optional filter on filename, text or music prompt
             
-            jingles.append(jingle_info)
+        Returns:
+            int: Number of matching jingles
+        """
+        return self._catalog_queryset(search).count()
+    
+    def _catalog_queryset(self, search: Optional[str] = None):
+        """Catalogue queryset with an optional text filter"""
+        queryset = Jingle.objects.all()
+        if search:
+            queryset = queryset.filter(
+                Q(filename__icontains=search) |
+                Q(text__icontains=search) |
+                Q(music_prompt__icontains=search)
+            )
+        return queryset
+    
+    def sync_catalog(self) -> Dict[str, int]:
+        """
+        Reconcile the catalogue with the jingles directory
         
-        # Sort by creation time (newest first)
-        jingles.sort(key=lambda x: x['created'], reverse=True)
+        Adds files copied in by hand (importing legacy sidecar JSON) and
+        drops entries whose file has gone. Run by `manage.py sync_jingles`
+        at container start and by run_jobs workers on startup.
         
-        logger.info(f"Found {len(jingles)} jingles")
-        return jingles
+        Returns:
+            dict: Counts of added and removed entries
+        """
+        files = {path.name: path for path in self.jingles_dir.glob('*.mp3')} if self.jingles_dir.exists() else {}
+        known = set(Jingle.objects.values_list('filename', flat=True))
+        
+        added = 0
+        for filename in files.keys() - known:
+            stat = files[filename].stat()
+            metadata = self._read_sidecar(files[filename])
+            Jingle.objects.create(
+                filename=filename,
+                size_bytes=stat.st_size,
+                text=metadata.pop('text', '') or '',
+                metadata=metadata,
+                created_at=datetime.fromtimestamp(stat.st_ctime, tz=dt_timezone.utc)
+            )
+            added += 1
+        
+        removed, _ = Jingle.objects.filter(filename__in=known - files.keys()).delete()
+        
+        logger.info(f"✅ Jingle catalogue synced: {added} added, {removed} removed")
+        return {'added': added, 'removed': removed}
+    
+    @staticmethod
+    def _read_sidecar(file_path: Path) -> Dict[str, Any]:
+        """Read a legacy jingle_*.json metadata sidecar if present"""
+        metadata_path = file_path.with_suffix('.json')
+        if not metadata_path.exists():
+            return {}
+        try:
+            with open(metadata_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Error loading metadata for {file_path.name}: {e}")
+            return {}
     
     def delete_jingle(self, filename: str) -> bool:
         """
-        Delete a jingle file and its metadata
+        Delete a jingle file and its catalogue entry
         
         Args:
             filename: Name of jingle file to delete
@@ -258,21 +350,22 @@ class JingleService:
             bool: True if deleted successfully
         """
         file_path = self.jingles_dir / filename
+        deleted, _ = Jingle.objects.filter(filename=filename).delete()
         
         if not file_path.exists():
-            logger.warning(f"Jingle not found: {filename}")
-            return False
+            if not deleted:
+                logger.warning(f"Jingle not found: {filename}")
+            return bool(deleted)
         
         try:
             # Delete MP3 file
             file_path.unlink()
             logger.info(f"✅ Deleted jingle: {filename}")
             
-            # Delete metadata if exists
+            # Delete legacy metadata sidecar if exists
             metadata_path = file_path.with_suffix('.json')
             if metadata_path.exists():
                 metadata_path.unlink()
-                logger.info(f"✅ Deleted metadata: {metadata_path.name}")
             
             return True
             
@@ -303,22 +396,12 @@ class JingleService:
         Returns:
             dict: Metadata dictionary (empty if not found)
         """
-        metadata_path = (self.jingles_dir / filename).with_suffix('.json')
-        
-        if not metadata_path.exists():
-            return {}
-        
-        try:
-            import json
-            with open(metadata_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading metadata: {e}")
-            return {}
+        jingle = Jingle.objects.filter(filename=filename).first()
+        return jingle.to_dict()['metadata'] if jingle else {}
     
     def save_jingle_metadata(self, filename: str, metadata: Dict[str, Any]) -> bool:
         """
-        Save metadata for a jingle
+        Save metadata for a catalogued jingle
         
         Args:
             filename: Jingle filename
@@ -327,45 +410,53 @@ class JingleService:
         Returns:
             bool: True if saved successfully
         """
-        metadata_path = (self.jingles_dir / filename).with_suffix('.json')
-        
-        try:
-            import json
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            logger.info(f"✅ Saved metadata for {filename}")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Error saving metadata: {e}")
+        metadata = dict(metadata)
+        fields = {'metadata': metadata}
+        if 'text' in metadata:
+            fields['text'] = metadata.pop('text') or ''
+        
+        updated = Jingle.objects.filter(filename=filename).update(**fields)
+        if not updated:
+            logger.error(f"❌ Cannot save metadata, jingle not catalogued: {filename}")
             return False
+        logger.info(f"✅ Saved metadata for {filename}")
+        return True
     
     def get_playlist(self) -> Dict[str, Any]:
         """
         Get current jingle playlist configuration
         
+        The parsed file is cached per process and re-read only when its
+        modification time changes.
+        
         Returns:
             dict: Playlist configuration
         """
         playlist_file = DATA_DIR / 'jingle_playlist.json'
+        default = {
+            'jingles': [],
+            'enabled': False,
+            'interval': 3
+        }
         
-        if not playlist_file.exists():
-            return {
-                'jingles': [],
-                'enabled': False,
-                'interval': 3
-            }
+        try:
+            mtime = playlist_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return default
+        
+        cached = JingleService._playlist_cache
+        if cached and cached[0] == mtime:
+            return dict(cached[1])
         
         try:
-            import json
             with open(playlist_file, 'r') as f:
-                return json.load(f)
+                playlist = json.load(f)
         except Exception as e:
             logger.error(f"Error loading playlist: {e}")
-            return {
-                'jingles': [],
-                'enabled': False,
-                'interval': 3
-            }
+            return default
+        
+        JingleService._playlist_cache = (mtime, playlist)
+        return dict(playlist)
     
     def save_playlist(self, jingles: List[str], enabled: bool, interval: int) -> bool:
         """
@@ -381,10 +472,11 @@ class JingleService:
         """
         playlist_file = DATA_DIR / 'jingle_playlist.json'
         
-        # Validate jingle files exist
+        # Validate jingles against the catalogue in one query
+        known = set(Jingle.objects.filter(filename__in=jingles).values_list('filename', flat=True))
         validated_jingles = []
         for filename in jingles:
-            if self.get_jingle_path(filename):
+            if filename in known:
                 validated_jingles.append(filename)
             else:
                 logger.warning(f"Jingle not found, skipping: {filename}")
@@ -396,9 +488,9 @@ class JingleService:
         }
         
         try:
-            import json
             with open(playlist_file, 'w') as f:
                 json.dump(playlist, f, indent=2)
+            JingleService._playlist_cache = (playlist_file.stat().st_mtime_ns, playlist)
             logger.info(f"✅ Saved playlist: {len(validated_jingles)} jingles, enabled={enabled}")
             return True
         except Exception as e:
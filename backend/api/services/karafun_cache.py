@@ -0,0 +1,167 @@
+"""
+Karafun Cache - TTL cache in front of the Karafun Business API
+Serves devices and sessions from Django's cache and refreshes stale
+entries in the background instead of calling the API on every request
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from django.core.cache import cache as default_cache
+
+from ..karafun_client import KarafunAPIClient
+from ..utils.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class KarafunCache:
+    """
+    Stale-while-revalidate cache for Karafun API reads
+
+    Features:
+    - Fresh entries (younger than ttl) are served without an API call
+    - Stale entries (up to ttl + stale_ttl) are served immediately while
+      one background thread per key refreshes them
+    - Older entries have expired from the cache and are fetched inline
+    - If a background refresh fails, the stale data keeps being served
+    - Creating a session invalidates every cached session list
+    """
+
+    KEY_PREFIX = 'karafun'
+
+    # Keys currently being refreshed (shared across instances in this process)
+    _refreshing = set()
+    _refresh_lock = threading.Lock()
+
+    def __init__(
+        self,
+        client: KarafunAPIClient,
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+        cache=None
+    ):
+        """
+        Initialize Karafun Cache
+
+        Args:
+            client: Karafun API client used on a miss or refresh
+            ttl: Seconds an entry is served without revalidating
+            stale_ttl: Further seconds a stale entry may be served while refreshing
+            cache: Django cache backend (defaults to the default cache)
+        """
+        self.client = client
+        self.ttl = ttl if ttl is not None else AppConfig.KARAFUN_CACHE_TTL
+        self.stale_ttl = stale_ttl if stale_ttl is not None else AppConfig.KARAFUN_CACHE_STALE_TTL
+        self.cache = cache or default_cache
+
+    # ------------------------------------------------------------------
+    # Cached reads
+    # ------------------------------------------------------------------
+
+    def list_devices(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Karafun devices for the account
+
+        Args:
+            refresh: Bypass the cache and fetch now
+        """
+        return self._get('devices', self.client.list_devices, refresh)
+
+    def get_sessions(
+        self,
+        start_at_timestamp: Optional[str] = None,
+        end_at_timestamp: Optional[str] = None,
+        refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Karafun sessions between two dates
+
+        Args:
+            start_at_timestamp: Start date in ISO 8601 format
+            end_at_timestamp: End date in ISO 8601 format
+            refresh: Bypass the cache and fetch now
+        """
+        generation = self.cache.get(self._key('sessions_generation'), 0)
+        key = f'sessions:{generation}:{start_at_timestamp or ""}:{end_at_timestamp or ""}'
+        return self._get(
+            key,
+            lambda: self.client.get_sessions(start_at_timestamp, end_at_timestamp),
+            refresh
+        )
+
+    # ------------------------------------------------------------------
+    # Writes (pass through and invalidate)
+    # ------------------------------------------------------------------
+
+    def create_session(self, **kwargs) -> Dict[str, Any]:
+        """Create a Karafun session and invalidate cached session lists"""
+        session = self.client.create_session(**kwargs)
+        self.invalidate_sessions()
+        return session
+
+    def invalidate_sessions(self) -> None:
+        """Drop all cached session lists by moving to a new key generation"""
+        key = self._key('sessions_generation')
+        self.cache.set(key, self.cache.get(key, 0) + 1, timeout=None)
+
+    def invalidate_devices(self) -> None:
+        """Drop the cached device list"""
+        self.cache.delete(self._key('devices'))
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _key(self, name: str) -> str:
+        return f'{self.KEY_PREFIX}:{name}'
+
+    def _get(self, name: str, fetch: Callable[[], Any], refresh: bool) -> Any:
+        key = self._key(name)
+        entry = None if refresh else self.cache.get(key)
+
+        if entry is None:
+            logger.info(f"Karafun cache MISS: {name}")
+            return self._fetch(key, fetch)
+
+        if time.time() - entry['fetched_at'] > self.ttl:
+            self.refresh_in_background(key, fetch)
+        return entry['data']
+
+    def _fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """Call the API and cache the result for ttl + stale_ttl"""
+        data = fetch()
+        self.cache.set(
+            key,
+            {'data': data, 'fetched_at': time.time()},
+            timeout=self.ttl + self.stale_ttl
+        )
+        return data
+
+    def refresh_in_background(self, key: str, fetch: Callable[[], Any]) -> Optional[threading.Thread]:
+        """
+        Re-fetch a stale entry in a daemon thread
+
+        Returns:
+            threading.Thread or None if a refresh for the key is already running
+        """
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return None
+            self._refreshing.add(key)
+
+        def background_refresh():
+            try:
+                logger.info(f"🔄 Refreshing Karafun cache: {key}")
+                self._fetch(key, fetch)
+            except Exception as e:
+                logger.warning(f"Karafun cache refresh failed for {key}, serving stale data: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        thread = threading.Thread(target=background_refresh, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,207 @@
+"""
+Karaoke Event Hub - Live queue fan-out for singer and host screens
+One shared snapshot per session is built per change and pushed to every
+connected screen, so streaming clients never poll the database themselves
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Any, Optional
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+
+from ..models import KaraokeSession, KaraokeQueue
+from .karaoke_queue_service import KaraokeQueueService
+
+logger = logging.getLogger(__name__)
+
+
+class KaraokeEventHub:
+    """
+    In-process publish/subscribe hub for karaoke queue events
+
+    Features:
+    - publish() bumps KaraokeSession.queue_version, builds the queue view
+      once and hands the same event to every local subscriber
+    - One watcher thread per process polls queue_version for all watched
+      sessions in a single query, picking up changes made by other workers
+    - Slow clients only ever hold the latest few events (bounded queues)
+    """
+
+    # Seconds between cross-process version checks
+    POLL_INTERVAL = 1.0
+
+    # Events buffered per subscriber before the oldest is dropped
+    SUBSCRIBER_BUFFER = 16
+
+    def __init__(self, watch: bool = True):
+        """
+        Initialize Karaoke Event Hub
+
+        Args:
+            watch: Run the cross-process version watcher thread
+        """
+        self.watch = watch
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)  # session_id -> {queue.Queue}
+        self._versions: Dict[int, int] = {}   # session_id -> last broadcast version
+        self._latest: Dict[int, Dict[str, Any]] = {}  # session_id -> last event
+        self._watcher: Optional[threading.Thread] = None
+        self.queue_service = KaraokeQueueService()
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    def subscribe(self, session_id: int) -> queue.Queue:
+        """
+        Register a screen for a session's events
+
+        The returned queue starts with the latest snapshot so a new screen
+        renders immediately.
+
+        Returns:
+            queue.Queue: Events for this subscriber
+        """
+        subscriber = queue.Queue(maxsize=self.SUBSCRIBER_BUFFER)
+
+        with self._lock:
+            latest = self._latest.get(session_id)
+        if latest is None:
+            latest = self._snapshot_event(session_id, 'snapshot')
+
+        with self._lock:
+            if latest['version'] >= self._versions.get(session_id, -1):
+                self._versions[session_id] = latest['version']
+                self._latest[session_id] = latest
+            subscriber.put_nowait(self._latest[session_id])
+            self._subscribers[session_id].add(subscriber)
+            self._start_watcher()
+
+        return subscriber
+
+    def unsubscribe(self, session_id: int, subscriber: queue.Queue) -> None:
+        """Remove a screen; forget the session once nobody is watching it"""
+        with self._lock:
+            subscribers = self._subscribers.get(session_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[session_id]
+                self._latest.pop(session_id, None)
+                self._versions.pop(session_id, None)
+
+    def subscriber_count(self, session_id: Optional[int] = None) -> int:
+        """Number of connected screens (for one session or all)"""
+        with self._lock:
+            if session_id is not None:
+                return len(self._subscribers.get(session_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, session_id: int, event_type: str, entry: Optional[KaraokeQueue] = None) -> None:
+        """
+        Publish a queue change once the current transaction commits
+
+        Args:
+            session_id: Karaoke session ID
+            event_type: 'add', 'cancel', 'complete', 'advance', 'move' or 'reorder'
+            entry: Queue entry the event is about
+        """
+        entry_data = self.queue_service.serialize_entry(entry) if entry else None
+        transaction.on_commit(lambda: self._publish_now(session_id, event_type, entry_data))
+
+    def _publish_now(self, session_id: int, event_type: str, entry_data: Optional[Dict[str, Any]]) -> None:
+        try:
+            KaraokeSession.objects.filter(id=session_id).update(queue_version=F('queue_version') + 1)
+            # Nobody on this process is listening - other workers pick up the version bump
+            if not self.subscriber_count(session_id):
+                return
+            event = self._snapshot_event(session_id, event_type, entry_data)
+            self._broadcast(session_id, event)
+        except Exception as e:
+            logger.error(f"Karaoke event publish failed for session {session_id}: {e}", exc_info=True)
+
+    def _snapshot_event(self, session_id: int, event_type: str,
+                        entry_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build one event carrying the full queue view (shared by all screens)"""
+        session = KaraokeSession.objects.get(id=session_id)
+        view = self.queue_service.build_queue_view(session)
+        return {
+            'type': event_type,
+            'version': session.queue_version,
+            'entry': entry_data,
+            'session': {
+                'id': session.id,
+                'venue_name': session.venue_name,
+                'status': session.status,
+                'scheduling_mode': session.scheduling_mode,
+                'queue_count': view['count'],
+            },
+            'current_singer': view['current_singer'],
+            'queue': view['queue'],
+        }
+
+    def _broadcast(self, session_id: int, event: Dict[str, Any]) -> None:
+        with self._lock:
+            if event['version'] < self._versions.get(session_id, -1):
+                return  # A newer snapshot already went out
+            self._versions[session_id] = event['version']
+            self._latest[session_id] = event
+
+            for subscriber in self._subscribers.get(session_id, ()):
+                if subscriber.full():
+                    # Drop the oldest event; every event carries the full view
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+                subscriber.put_nowait(event)
+
+    # ------------------------------------------------------------------
+    # Cross-process watcher
+    # ------------------------------------------------------------------
+
+    def _start_watcher(self) -> None:
+        """Start the watcher thread if needed (caller holds the lock)"""
+        if not self.watch or (self._watcher and self._watcher.is_alive()):
+            return
+        self._watcher = threading.Thread(target=self._watch_versions, name='karaoke-event-watcher', daemon=True)
+        self._watcher.start()
+
+    def _watch_versions(self) -> None:
+        """Poll queue_version for every watched session in one query"""
+        try:
+            while True:
+                time.sleep(self.POLL_INTERVAL)
+                with self._lock:
+                    watched = dict(self._versions)
+                    session_ids = list(self._subscribers)
+                    if not session_ids:
+                        self._watcher = None
+                        return
+
+                try:
+                    close_old_connections()
+                    versions = KaraokeSession.objects.filter(
+                        id__in=session_ids
+                    ).values_list('id', 'queue_version')
+                    for session_id, version in versions:
+                        if version > watched.get(session_id, -1):
+                            self._broadcast(session_id, self._snapshot_event(session_id, 'sync'))
+                except Exception as e:
+                    logger.error(f"Karaoke event watcher error: {e}", exc_info=True)
+        finally:
+            connection.close()
+
+
+# Shared hub for this process
+karaoke_events = KaraokeEventHub()
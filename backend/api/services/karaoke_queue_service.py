@@ -0,0 +1,451 @@
+"""
+Karaoke Queue Service - Karaoke queue ordering and views
+Computes wait times for a whole queue from a single query and keeps
+queue order with sparse positions so reordering never renumbers the queue
+"""
+
+import logging
+from collections import Counter
+from typing import Dict, Any, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, IntegerField, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import KaraokeSession, KaraokeQueue
+from ..utils.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class KaraokeQueueService:
+    """
+    Service for karaoke queue state
+
+    Features:
+    - Whole-queue view (current singer + pending entries) in one query
+    - Wait times from each song's real duration (prefix sum)
+    - Accounts for how far into their song the current singer is
+    - Sparse positions: insert, cancel and move are single-row writes,
+      the queue is only rebalanced when two neighbours run out of gap
+    - Optional fair-share mode: sign-ups are slotted by a key built from
+      the singer's earlier turns, sign-up time and song length, so the
+      next singer is always the first position (an index lookup)
+    """
+    
+    # Spacing between consecutive positions after insert/rebalance
+    POSITION_GAP = 1024
+    
+    # Statuses that hold a position (unique per session)
+    ACTIVE_STATUSES = ('pending', 'singing')
+    
+    # Attempts before giving up on a position collision
+    MAX_RETRIES = 3
+    
+    # Statuses that count as a turn for fair-share scheduling
+    TURN_STATUSES = ('pending', 'singing', 'completed')
+
+    def __init__(self):
+        """Initialize Karaoke Queue Service"""
+        pass
+
+    def build_queue_view(self, session: KaraokeSession, now=None) -> Dict[str, Any]:
+        """
+        Build the queue view for a session in O(n)
+
+        Loads the current singer and all pending entries in one query, then
+        walks the pending entries once accumulating song durations.
+
+        Args:
+            session: Karaoke session
+            now: Reference time (defaults to timezone.now())
+
+        Returns:
+            dict: {
+                'current_singer': {...} or None,
+                'queue': [{..., 'estimated_wait': minutes, 'estimated_wait_seconds': s}, ...],
+                'count': number of pending entries,
+                'total_wait_seconds': time until the queue is empty
+            }
+        """
+        now = now or timezone.now()
+
+        entries = KaraokeQueue.objects.filter(
+            session=session,
+            status__in=['pending', 'singing']
+        ).order_by('position', 'id')
+
+        current = None
+        pending = []
+        for entry in entries:
+            if entry.status == 'singing':
+                current = current or entry
+            else:
+                pending.append(entry)
+
+        # Time left for the current singer
+        wait_seconds = self._remaining_seconds(current, now) if current else 0
+
+        queue = []
+        for rank, entry in enumerate(pending, start=1):
+            data = self.serialize_entry(entry)
+            data['position'] = rank  # 1 = next up
+            data['estimated_wait_seconds'] = wait_seconds
+            data['estimated_wait'] = round(wait_seconds / 60)
+            queue.append(data)
+            wait_seconds += entry.duration
+
+        return {
+            'current_singer': self.serialize_current(current, now) if current else None,
+            'queue': queue,
+            'count': len(queue),
+            'total_wait_seconds': wait_seconds,
+        }
+
+    def get_entry_wait(self, entry: KaraokeQueue) -> Optional[Dict[str, Any]]:
+        """
+        Queue view data for a single pending entry
+
+        Args:
+            entry: Queue entry
+
+        Returns:
+            dict or None if the entry is no longer pending
+        """
+        view = self.build_queue_view(entry.session)
+        return next((item for item in view['queue'] if item['id'] == entry.id), None)
+
+    # ------------------------------------------------------------------
+    # Ordering
+    # ------------------------------------------------------------------
+    
+    def add_entry(self, session: KaraokeSession, **fields) -> KaraokeQueue:
+        """
+        Append an entry to the end of the queue
+        
+        In fair-share mode the entry is then moved ahead of every pending
+        entry with a larger fair key. The position is computed inside the INSERT (MAX + gap), so two
+        simultaneous sign-ups cannot read the same maximum; if they still
+        collide on the unique active position the insert is retried.
+        
+        Args:
+            session: Karaoke session
+            **fields: KaraokeQueue field values
+            
+        Returns:
+            KaraokeQueue: Created entry (position loaded)
+        """
+        last_position = KaraokeQueue.objects.filter(
+            session_id=session.id,
+            status__in=self.ACTIVE_STATUSES
+        ).order_by('-position').values('position')[:1]
+        
+        if session.scheduling_mode == 'fair' and fields.get('fair_key') is None:
+            fields['fair_key'] = self.fair_share_key(
+                session, fields.get('name') or '', int(fields.get('duration') or session.avg_song_duration)
+            )
+        
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                with transaction.atomic():
+                    entry = KaraokeQueue.objects.create(
+                        session=session,
+                        position=Coalesce(Subquery(last_position), Value(0)) + self.POSITION_GAP,
+                        **fields
+                    )
+                break
+            except IntegrityError:
+                if attempt == self.MAX_RETRIES - 1:
+                    raise
+                logger.warning(f"Queue position collision in session {session.id}, retrying")
+        
+        entry.refresh_from_db(fields=['position'])
+        if entry.fair_key is not None:
+            self._place_fair(entry)
+        return entry
+    
+    def cancel_entry(self, entry_id: int) -> bool:
+        """
+        Cancel a pending entry with a single UPDATE (no renumbering)
+        
+        Args:
+            entry_id: Queue entry ID
+            
+        Returns:
+            bool: True if a pending entry was cancelled
+        """
+        return KaraokeQueue.objects.filter(
+            id=entry_id,
+            status='pending'
+        ).update(status='cancelled') == 1
+    
+    def move_entry(self, entry: KaraokeQueue, direction: str) -> bool:
+        """
+        Move a pending entry one place up or down
+        
+        Args:
+            entry: Pending queue entry
+            direction: 'up' or 'down'
+            
+        Returns:
+            bool: True if the entry moved (False at the end of the queue)
+            
+        Raises:
+            ValueError: If direction is invalid
+        """
+        pending = self._pending(entry.session_id).exclude(id=entry.id)
+        
+        if direction == 'up':
+            ahead = list(pending.filter(position__lt=entry.position).order_by('-position')[:2])
+            if not ahead:
+                return False
+            after_id = ahead[1].id if len(ahead) > 1 else None
+        elif direction == 'down':
+            behind = pending.filter(position__gt=entry.position).order_by('position').first()
+            if not behind:
+                return False
+            after_id = behind.id
+        else:
+            raise ValueError("direction must be 'up' or 'down'")
+        
+        return self.reorder_entry(entry, after_id)
+    
+    def reorder_entry(self, entry: KaraokeQueue, after_id: Optional[int] = None) -> bool:
+        """
+        Place a pending entry directly after another (drag-to-reorder)
+        
+        The entry gets the midpoint between its new neighbours, so only its
+        own row is written. If the neighbours are adjacent the queue is
+        rebalanced first.
+        
+        Args:
+            entry: Pending queue entry to move
+            after_id: Entry to place it after (None = front of the queue)
+            
+        Returns:
+            bool: True if the entry was moved
+            
+        Raises:
+            KaraokeQueue.DoesNotExist: If after_id is not pending in the session
+        """
+        for attempt in range(self.MAX_RETRIES):
+            position = self._slot_after(entry, after_id)
+            if position is None:
+                self.rebalance(entry.session_id)
+                position = self._slot_after(entry, after_id)
+            try:
+                with transaction.atomic():
+                    moved = KaraokeQueue.objects.filter(
+                        id=entry.id,
+                        status='pending'
+                    ).update(position=position)
+                break
+            except IntegrityError:
+                if attempt == self.MAX_RETRIES - 1:
+                    raise
+        
+        entry.position = position
+        return moved == 1
+    
+    def rebalance(self, session_id: int) -> int:
+        """
+        Re-space pending entries POSITION_GAP apart in one UPDATE
+        
+        Returns:
+            int: Number of entries updated
+        """
+        ids = list(self._pending(session_id).order_by('position', 'id').values_list('id', flat=True))
+        updated = self._respace(session_id, ids)
+        logger.info(f"Rebalanced karaoke queue for session {session_id}: {updated} entries")
+        return updated
+    
+    def next_entry(self, session: KaraokeSession) -> Optional[KaraokeQueue]:
+        """
+        Next singer: the pending entry with the lowest position
+        
+        Both modes keep the queue ordered by position, so this is a single
+        index-ordered lookup however long the queue is.
+        """
+        return self._pending(session.id).order_by('position').first()
+    
+    # ------------------------------------------------------------------
+    # Fair-share scheduling
+    # ------------------------------------------------------------------
+    
+    def fair_share_key(self, session: KaraokeSession, name: str, duration: int,
+                       now=None, turns: Optional[int] = None) -> float:
+        """
+        Fair-share sort key for a sign-up (lower = sooner)
+        
+        The key is the sign-up time pushed back by penalties, so the order
+        between two entries never changes as time passes and time waited
+        is accounted for by the sign-up time itself:
+        - each earlier turn by the same singer adds KARAOKE_TURN_PENALTY_SECONDS
+          (first-timers slot in ahead of regulars)
+        - songs longer than the session average add their overrun
+        - during peak hours, songs over KARAOKE_PEAK_MAX_SONG_SECONDS add a
+          heavier overrun penalty
+        
+        Args:
+            session: Karaoke session
+            name: Singer name (matched case-insensitively)
+            duration: Song duration in seconds
+            now: Sign-up time (defaults to timezone.now())
+            turns: Singer's earlier turns (counted from the queue if omitted)
+            
+        Returns:
+            float: Key in epoch seconds
+        """
+        now = now or timezone.now()
+        if turns is None:
+            turns = KaraokeQueue.objects.filter(
+                session_id=session.id,
+                name__iexact=name,
+                status__in=self.TURN_STATUSES
+            ).count()
+        
+        penalty = turns * AppConfig.KARAOKE_TURN_PENALTY_SECONDS
+        penalty += max(duration - session.avg_song_duration, 0) * AppConfig.KARAOKE_LONG_SONG_WEIGHT
+        if self.is_peak_time(now):
+            penalty += (max(duration - AppConfig.KARAOKE_PEAK_MAX_SONG_SECONDS, 0)
+                        * AppConfig.KARAOKE_PEAK_OVERRUN_WEIGHT)
+        return now.timestamp() + penalty
+    
+    @staticmethod
+    def is_peak_time(now=None) -> bool:
+        """Whether local time falls in the configured peak hours"""
+        hour = timezone.localtime(now or timezone.now()).hour
+        start, end = AppConfig.KARAOKE_PEAK_START_HOUR, AppConfig.KARAOKE_PEAK_END_HOUR
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+    
+    def set_scheduling_mode(self, session: KaraokeSession, mode: str) -> int:
+        """
+        Switch a session between 'fifo' and 'fair' scheduling
+        
+        Switching to fair keys every pending entry from its sign-up time
+        and the singer's turns so far, then re-spaces the queue in that
+        order with one UPDATE. Switching back to fifo keeps the current order.
+        
+        Returns:
+            int: Number of entries reordered
+            
+        Raises:
+            ValueError: If mode is unknown
+        """
+        if mode not in dict(KaraokeSession.SCHEDULING_MODES):
+            raise ValueError(f"Unknown scheduling mode: {mode}")
+        
+        session.scheduling_mode = mode
+        session.save(update_fields=['scheduling_mode'])
+        if mode != 'fair':
+            return 0
+        
+        turns = Counter(
+            name.lower() for name in KaraokeQueue.objects.filter(
+                session_id=session.id,
+                status__in=('singing', 'completed')
+            ).values_list('name', flat=True)
+        )
+        entries = list(self._pending(session.id).order_by('requested_at', 'id'))
+        for entry in entries:
+            singer = entry.name.lower()
+            entry.fair_key = self.fair_share_key(
+                session, entry.name, entry.duration, now=entry.requested_at, turns=turns[singer]
+            )
+            turns[singer] += 1
+        KaraokeQueue.objects.bulk_update(entries, ['fair_key'])
+        
+        entries.sort(key=lambda e: (e.fair_key, e.position))
+        return self._respace(session.id, [e.id for e in entries])
+    
+    def _place_fair(self, entry: KaraokeQueue) -> bool:
+        """Move a new entry ahead of the first pending entry with a larger key"""
+        others = self._pending(entry.session_id).exclude(id=entry.id)
+        successor = others.filter(fair_key__gt=entry.fair_key).order_by('position').first()
+        if successor is None:
+            return False  # Appended position is already right
+        after_id = others.filter(
+            position__lt=successor.position
+        ).order_by('-position').values_list('id', flat=True).first()
+        return self.reorder_entry(entry, after_id)
+    
+    def _respace(self, session_id: int, ids) -> int:
+        """
+        Give pending entries positions POSITION_GAP apart in the order given
+        
+        New positions start above every active position so the unique
+        constraint never sees an intermediate collision.
+        """
+        if not ids:
+            return 0
+        
+        active = KaraokeQueue.objects.filter(session_id=session_id, status__in=self.ACTIVE_STATUSES)
+        base = max(active.values_list('position', flat=True))
+        whens = [
+            When(id=entry_id, then=Value(base + self.POSITION_GAP * rank))
+            for rank, entry_id in enumerate(ids, start=1)
+        ]
+        return KaraokeQueue.objects.filter(id__in=ids).update(
+            position=Case(*whens, output_field=IntegerField())
+        )
+    
+    def _pending(self, session_id: int):
+        return KaraokeQueue.objects.filter(session_id=session_id, status='pending')
+    
+    def _slot_after(self, entry: KaraokeQueue, after_id: Optional[int]) -> Optional[int]:
+        """Free position between after_id and its successor, or None if no gap"""
+        pending = self._pending(entry.session_id).exclude(id=entry.id)
+        # The current singer also holds a unique position, so it bounds gaps too
+        others = KaraokeQueue.objects.filter(
+            session_id=entry.session_id,
+            status__in=self.ACTIVE_STATUSES
+        ).exclude(id=entry.id).order_by('position').values_list('position', flat=True)
+        
+        if after_id is None:
+            high = pending.order_by('position').values_list('position', flat=True).first()
+            if high is None:
+                return entry.position
+            low = others.filter(position__lt=high).last()
+            if low is None:
+                return high - self.POSITION_GAP
+        else:
+            low = pending.get(id=after_id).position
+            high = others.filter(position__gt=low).first()
+            if high is None:
+                return low + self.POSITION_GAP
+        
+        if high - low < 2:
+            return None
+        return (low + high) // 2
+    
+    @staticmethod
+    def _remaining_seconds(current: KaraokeQueue, now) -> int:
+        """Seconds left in the current singer's song"""
+        if not current.started_at:
+            return current.duration
+        elapsed = (now - current.started_at).total_seconds()
+        return max(int(current.duration - elapsed), 0)
+
+    @staticmethod
+    def serialize_entry(entry: KaraokeQueue) -> Dict[str, Any]:
+        """Queue entry fields shared by singer and host screens"""
+        return {
+            'id': entry.id,
+            'name': entry.name,
+            'song_title': entry.song_title,
+            'artist': entry.artist,
+            'duration': entry.duration,
+            'position': entry.position,
+            'audio_url': entry.audio_url,
+            'lyrics_url': entry.lyrics_url,
+        }
+
+    def serialize_current(self, current: KaraokeQueue, now=None) -> Dict[str, Any]:
+        """Current singer with time remaining"""
+        data = self.serialize_entry(current)
+        data['started_at'] = current.started_at.isoformat() if current.started_at else None
+        data['remaining_seconds'] = self._remaining_seconds(current, now or timezone.now())
+        return data
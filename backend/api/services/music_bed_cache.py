@@ -0,0 +1,209 @@
+"""
+Music Bed Cache - Reusable background music for jingle generation
+Stores decoded music beds locally so repeat prompts skip the music API
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import requests
+
+from .music_service import MusicGenerationService
+from ..utils.config import AppConfig
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MusicBedCache:
+    """
+    Local cache of decoded background music beds
+
+    Features:
+    - Keyed by normalised prompt + duration bucket
+    - Beds stored as int16 PCM (.npy)
+    - Trim or loop a cached bed to the exact length needed
+    - Stale beds served immediately and refreshed in a background thread
+    - Fallback tones (API errors) are never cached
+    """
+
+    # Beds are generated at the next multiple of this many seconds
+    BUCKET_SECONDS = 5
+
+    # Keys currently being refreshed (shared across instances in this process)
+    _refreshing = set()
+    _refresh_lock = threading.Lock()
+
+    def __init__(
+        self,
+        music_service: Optional[MusicGenerationService] = None,
+        cache_dir: Optional[Path] = None,
+        refresh_after_seconds: Optional[int] = None
+    ):
+        """
+        Initialize Music Bed Cache
+
+        Args:
+            music_service: Music service used on a miss (created if not provided)
+            cache_dir: Directory for cached beds (defaults to data/music_beds)
+            refresh_after_seconds: Age after which a hit triggers a background refresh
+        """
+        self.music_service = music_service or MusicGenerationService()
+        self.cache_dir = Path(cache_dir) if cache_dir else AppConfig.get_data_path('music_beds')
+        self.refresh_after_seconds = (
+            refresh_after_seconds if refresh_after_seconds is not None
+            else AppConfig.MUSIC_BED_REFRESH_DAYS * 86400
+        )
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace"""
+        return ' '.join(re.sub(r'[^a-z0-9]+', ' ', (prompt or '').lower()).split())
+
+    @classmethod
+    def duration_bucket(cls, duration_seconds: int) -> int:
+        """Round a duration up to its bucket, within the jingle duration limits"""
+        bucket = -(-int(duration_seconds) // cls.BUCKET_SECONDS) * cls.BUCKET_SECONDS
+        return min(max(bucket, AppConfig.MIN_JINGLE_DURATION), AppConfig.MAX_JINGLE_DURATION)
+
+    def bed_path(self, prompt: str, duration_seconds: int) -> Path:
+        """Path of the cached bed for a prompt/duration"""
+        digest = hashlib.sha1(self.normalize_prompt(prompt).encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f'bed_{digest}_{self.duration_bucket(duration_seconds)}s.npy'
+
+    def get_bed(self, prompt: str, duration_seconds: float) -> np.ndarray:
+        """
+        Get a music bed exactly duration_seconds long
+
+        Args:
+            prompt: Music generation prompt
+            duration_seconds: Required length in seconds
+
+        Returns:
+            np.ndarray: float32 PCM array (samples, channels)
+        """
+        # numpy and pydub load on the first mix, not on every worker boot
+        from .. import audio_mixer
+
+        path = self.bed_path(prompt, duration_seconds)
+        bed = self._load(path)
+
+        if bed is not None:
+            logger.info(f"🎵 Music bed cache HIT: {path.name}")
+            if time.time() - path.stat().st_mtime > self.refresh_after_seconds:
+                self.refresh_in_background(prompt, duration_seconds)
+        else:
+            logger.info(f"🎵 Music bed cache MISS: {path.name}")
+            bed = self._generate(prompt, duration_seconds, path)
+
+        return self.fit_to_length(bed, audio_mixer.ms_to_samples(duration_seconds * 1000))
+
+    @staticmethod
+    def fit_to_length(bed: np.ndarray, num_samples: int) -> np.ndarray:
+        """Trim or loop a bed to num_samples, fading out if it was cut"""
+        from .. import audio_mixer
+
+        if len(bed) == num_samples:
+            return bed
+        fitted = audio_mixer.loop_to_length(bed, num_samples)
+        return audio_mixer.apply_fades(fitted, fade_out_ms=audio_mixer.DEFAULT_FADE_MS)
+
+    def refresh_in_background(self, prompt: str, duration_seconds: int) -> bool:
+        """
+        Regenerate a cached bed in a daemon thread
+
+        Returns:
+            bool: True if a refresh was started (False if one is already running)
+        """
+        path = self.bed_path(prompt, duration_seconds)
+        with self._refresh_lock:
+            if path.name in self._refreshing:
+                return False
+            self._refreshing.add(path.name)
+
+        def background_refresh():
+            try:
+                logger.info(f"🔄 Refreshing music bed: {path.name}")
+                self._generate(prompt, duration_seconds, path)
+            except Exception as e:
+                logger.warning(f"Music bed refresh failed for {path.name}: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(path.name)
+
+        thread = threading.Thread(target=background_refresh, daemon=True)
+        thread.start()
+        return True
+
+    def clear(self) -> int:
+        """
+        Delete all cached beds
+
+        Returns:
+            int: Number of beds deleted
+        """
+        if not self.cache_dir.exists():
+            return 0
+        count = 0
+        for bed_file in self.cache_dir.glob('bed_*.npy'):
+            bed_file.unlink()
+            count += 1
+        logger.info(f"✅ Cleared {count} music beds")
+        return count
+
+    def _load(self, path: Path) -> Optional[np.ndarray]:
+        """Load a cached bed as float32, or None if missing/corrupt"""
+        import numpy as np
+
+        if not path.exists():
+            return None
+        try:
+            return np.load(path).astype(np.float32) / 32768.0
+        except Exception as e:
+            logger.warning(f"Discarding unreadable music bed {path.name}: {e}")
+            return None
+
+    def _generate(self, prompt: str, duration_seconds: int, path: Path) -> np.ndarray:
+        """Generate a bed at bucket length, cache it and return it as float32"""
+        from .. import audio_mixer
+
+        bucket = self.duration_bucket(duration_seconds)
+        if not self.music_service.api_key:
+            logger.warning("⚠️ API key not configured, using uncached fallback tone")
+            return audio_mixer.decode_mp3(self.music_service.generate_fallback_tone(bucket))
+        try:
+            music_bytes = self.music_service.generate_music(
+                prompt=prompt,
+                duration_seconds=bucket,
+                use_fallback_on_error=False
+            )
+        except requests.RequestException as e:
+            # Serve a fallback tone but don't cache it; invalid prompts still raise ValueError
+            logger.warning(f"⚠️ Music generation failed, using uncached fallback tone: {e}")
+            return audio_mixer.decode_mp3(self.music_service.generate_fallback_tone(bucket))
+
+        pcm = audio_mixer.decode_mp3(music_bytes)
+        self._store(path, pcm)
+        return pcm
+
+    def _store(self, path: Path, pcm: np.ndarray) -> None:
+        """Atomically write a bed as int16 PCM"""
+        import numpy as np
+        from .. import audio_mixer
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        int_pcm = (np.clip(pcm, -1.0, 32767 / 32768) * 32768).astype(np.int16)
+        tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npy')
+        np.save(tmp_path, int_pcm)
+        os.replace(tmp_path, path)
+        logger.info(f"✅ Cached music bed: {path.name} ({audio_mixer.duration_ms(pcm)}ms)")
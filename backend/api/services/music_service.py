@@ -8,13 +8,12 @@ import io
 from typing import Optional
 
 import requests
-from pydub import AudioSegment
-from pydub.generators import Sine
 
 from ..utils.config import (
     ELEVENLABS_API_KEY,
     AppConfig
 )
+from ..utils.metrics import span
 
 logger = logging.getLogger(__name__)
 
@@ -127,7 +126,7 @@ class MusicGenerationService:
         if not self.api_key:
             if use_fallback_on_error:
                 logger.warning("⚠️ API key not configured, using fallback tone")
-                return self._generate_fallback_tone(duration_seconds)
+                return self.generate_fallback_tone(duration_seconds)
             raise ValueError("ElevenLabs API key not configured")
         
         # Validate parameters
@@ -145,12 +144,13 @@ class MusicGenerationService:
         
         try:
             # Make request
-            response = requests.post(
-                url,
-                headers=self._get_headers(),
-                json=payload,
-                timeout=60  # Music generation can take longer
-            )
+            with span('jingle', 'music_call'):
+                response = requests.post(
+                    url,
+                    headers=self._get_headers(),
+                    json=payload,
+                    timeout=60  # Music generation can take longer
+                )
             
             if not response.ok:
                 error_msg = f'ElevenLabs Music API error: {response.status_code}'
@@ -158,7 +158,7 @@ class MusicGenerationService:
                 
                 if use_fallback_on_error:
                     logger.warning("⚠️ Using fallback tone due to API error")
-                    return self._generate_fallback_tone(duration_seconds)
+                    return self.generate_fallback_tone(duration_seconds)
                 
                 response.raise_for_status()
             
@@ -172,7 +172,7 @@ class MusicGenerationService:
             
             if use_fallback_on_error:
                 logger.warning("⚠️ Using fallback tone due to request error")
-                return self._generate_fallback_tone(duration_seconds)
+                return self.generate_fallback_tone(duration_seconds)
             
             raise
     
@@ -206,7 +206,7 @@ class MusicGenerationService:
             use_fallback_on_error=True
         )
     
-    def _generate_fallback_tone(self, duration_seconds: int) -> bytes:
+    def generate_fallback_tone(self, duration_seconds: int) -> bytes:
         """
         Generate a simple fallback tone when API is unavailable
         
@@ -219,6 +219,8 @@ class MusicGenerationService:
         logger.info(f"🎵 Generating fallback tone: {duration_seconds}s")
         
         try:
+            from pydub.generators import Sine  # Only needed for the fallback, keep it off the boot path
+            
             # Generate a simple 440Hz tone (A4)
             tone = Sine(440).to_audio_segment(duration=duration_seconds * 1000)
             
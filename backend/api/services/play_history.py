@@ -0,0 +1,280 @@
+"""
+Play History - Buffered jingle play tracking and hourly rollups
+Collects plays in memory, writes them to JinglePlayHistory in bulk and
+keeps JinglePlayRollup counters in step, so analytics and jingle rotation
+read a few rollup rows instead of scanning the raw history
+"""
+
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, List, Optional
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Max, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ..models import JinglePlayHistory, JinglePlayRollup, JingleSchedule
+from ..utils.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class PlayHistoryService:
+    """
+    Buffered writer and reader for jingle play history
+
+    Features:
+    - record() only appends to an in-process buffer; the buffer is flushed
+      with one bulk insert once it holds flush_size plays or its oldest
+      play is flush_interval seconds old (daemon timer), and at exit
+    - Each flush adds its plays to the hourly (schedule, jingle, venue)
+      rollup counters with one UPDATE ... SET play_count = play_count + n
+      per key, so concurrent workers never lose counts
+    - A failed flush puts its plays back in the buffer for the next try
+    - Analytics and last-played lookups read only the rollup table;
+      last_played() also sees plays still waiting in this process's buffer
+
+    Plays buffered in other processes reach analytics within flush_interval.
+    """
+
+    def __init__(self, flush_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        """
+        Initialize Play History Service
+
+        Args:
+            flush_size: Buffered plays that trigger an immediate flush
+            flush_interval: Seconds a play may wait in the buffer
+        """
+        self.flush_size = flush_size or AppConfig.PLAY_HISTORY_FLUSH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else AppConfig.PLAY_HISTORY_FLUSH_SECONDS
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One flush at a time per process
+        self._buffer: List[Dict[str, Any]] = []
+        self._timer: Optional[threading.Timer] = None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        jingle_filename: str,
+        round_number: int,
+        schedule_id: Optional[int] = None,
+        venue_name: str = '',
+        played_at: Optional[datetime] = None
+    ) -> int:
+        """
+        Buffer one jingle play
+
+        Returns:
+            int: Plays still waiting to be written
+        """
+        play = {
+            'schedule_id': schedule_id,
+            'jingle_filename': jingle_filename,
+            'venue_name': (venue_name or '').strip(),
+            'round_number': round_number,
+            'played_at': (played_at or timezone.now()).astimezone(dt_timezone.utc),
+        }
+        with self._lock:
+            self._buffer.append(play)
+            pending = len(self._buffer)
+            start_timer = self._timer is None and pending < self.flush_size
+
+            if start_timer:
+                self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if pending >= self.flush_size:
+            return self.flush()
+        return pending
+
+    def flush(self) -> int:
+        """
+        Write all buffered plays and update their rollups
+
+        Returns:
+            int: Plays still waiting (non-zero only if the write failed)
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not batch:
+                return 0
+
+            try:
+                with transaction.atomic():
+                    self._write(batch)
+                logger.info(f"🎵 Wrote {len(batch)} jingle plays")
+                return 0
+            except Exception as e:
+                logger.error(f"Jingle play flush failed, keeping {len(batch)} plays buffered: {e}")
+                with self._lock:
+                    self._buffer = batch + self._buffer
+                    return len(self._buffer)
+
+    @property
+    def pending(self) -> int:
+        """Plays waiting in this process's buffer"""
+        with self._lock:
+            return len(self._buffer)
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _write(batch: List[Dict[str, Any]]) -> None:
+        """Bulk insert history rows and add them to the rollups (inside a transaction)"""
+        # Schedules deleted since the play was recorded keep their rollup
+        # reference but lose the history foreign key, as SET_NULL would
+        referenced = {play['schedule_id'] for play in batch if play['schedule_id']}
+        existing = set(
+            JingleSchedule.objects.filter(id__in=referenced).values_list('id', flat=True)
+        ) if referenced else set()
+
+        JinglePlayHistory.objects.bulk_create([
+            JinglePlayHistory(
+                schedule_id=play['schedule_id'] if play['schedule_id'] in existing else None,
+                jingle_filename=play['jingle_filename'],
+                venue_name=play['venue_name'],
+                round_number=play['round_number'],
+                played_at=play['played_at'],
+            )
+            for play in batch
+        ])
+
+        counters: Dict[tuple, List] = defaultdict(lambda: [0, None])
+        for play in batch:
+            hour = play['played_at'].replace(minute=0, second=0, microsecond=0)
+            counter = counters[(play['schedule_id'] or 0, play['jingle_filename'], play['venue_name'], hour)]
+            counter[0] += 1
+            counter[1] = max(counter[1], play['played_at']) if counter[1] else play['played_at']
+
+        for (schedule_ref, filename, venue_name, hour), (plays, last) in counters.items():
+            key = {
+                'schedule_ref': schedule_ref,
+                'jingle_filename': filename,
+                'venue_name': venue_name,
+                'hour': hour,
+            }
+            increment = {
+                'play_count': F('play_count') + plays,
+                'last_played_at': Greatest(F('last_played_at'), last),
+            }
+            if JinglePlayRollup.objects.filter(**key).update(**increment):
+                continue
+            try:
+                with transaction.atomic():
+                    JinglePlayRollup.objects.create(play_count=plays, last_played_at=last, **key)
+            except IntegrityError:
+                # Another worker created the row first
+                JinglePlayRollup.objects.filter(**key).update(**increment)
+
+    # ------------------------------------------------------------------
+    # Reads (rollups only)
+    # ------------------------------------------------------------------
+
+    def last_played(self, schedule_ids: List[int]) -> Dict[int, datetime]:
+        """
+        Most recent play per schedule
+
+        Returns:
+            dict: {schedule_id: datetime} for schedules that have been played
+        """
+        if not schedule_ids:
+            return {}
+        last = dict(
+            JinglePlayRollup.objects.filter(schedule_ref__in=schedule_ids).values(
+                'schedule_ref'
+            ).annotate(last=Max('last_played_at')).values_list('schedule_ref', 'last')
+        )
+        wanted = set(schedule_ids)
+        with self._lock:
+            for play in self._buffer:
+                schedule_id = play['schedule_id']
+                if schedule_id in wanted and (schedule_id not in last or play['played_at'] > last[schedule_id]):
+                    last[schedule_id] = play['played_at']
+        return last
+
+    def analytics(
+        self,
+        venue_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        schedule_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Aggregated play counts from the hourly rollups
+
+        Args:
+            venue_name: Only plays at this venue
+            since: Start of the window (defaults to PLAY_ANALYTICS_DEFAULT_DAYS ago)
+            until: End of the window (defaults to now)
+            schedule_id: Only plays of this schedule
+
+        Returns:
+            dict: {
+                'total_plays': n,
+                'jingles': [{'jingle_filename', 'plays', 'last_played_at'}, ...] most played first,
+                'venues': [{'venue_name', 'plays'}, ...],
+                'hourly': [{'hour', 'plays'}, ...] oldest first
+            }
+        """
+        until = until or timezone.now()
+        since = since or until - timedelta(days=AppConfig.PLAY_ANALYTICS_DEFAULT_DAYS)
+
+        rollups = JinglePlayRollup.objects.filter(
+            hour__gte=since.replace(minute=0, second=0, microsecond=0),
+            hour__lt=until
+        )
+        if venue_name:
+            rollups = rollups.filter(venue_name=venue_name)
+        if schedule_id:
+            rollups = rollups.filter(schedule_ref=schedule_id)
+        rollups = rollups.order_by()
+
+        jingles = [
+            {
+                'jingle_filename': row['jingle_filename'],
+                'plays': row['plays'],
+                'last_played_at': row['last'].isoformat(),
+            }
+            for row in rollups.values('jingle_filename').annotate(
+                plays=Sum('play_count'), last=Max('last_played_at')
+            ).order_by('-plays', 'jingle_filename')
+        ]
+        venues = list(
+            rollups.values('venue_name').annotate(plays=Sum('play_count')).order_by('-plays', 'venue_name')
+        )
+        hourly = [
+            {'hour': row['hour'].isoformat(), 'plays': row['plays']}
+            for row in rollups.values('hour').annotate(plays=Sum('play_count')).order_by('hour')
+        ]
+
+        return {
+            'since': since.isoformat(),
+            'until': until.isoformat(),
+            'total_plays': sum(row['plays'] for row in jingles),
+            'jingles': jingles,
+            'venues': venues,
+            'hourly': hourly,
+        }
+
+
+# Shared writer for this process; anything still buffered is written at exit
+play_history = PlayHistoryService()
+atexit.register(play_history.flush)
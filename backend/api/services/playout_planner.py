@@ -0,0 +1,176 @@
+"""
+Playout Planner - Precomputed running order for a bingo game
+Interleaves the session's songs with scheduled jingles and the game's
+fixed announcements in one pass, so the host can prefetch assets in order
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.utils import timezone
+
+from ..models import BingoSession, Jingle
+from ..utils.config import AppConfig
+from .play_history import play_history
+from .schedule_service import ScheduleService
+
+logger = logging.getLogger(__name__)
+
+
+class PlayoutPlanner:
+    """
+    Builds the full playout list for a bingo session
+
+    Rules (as played by game.js):
+    - Welcome announcement before the first song
+    - Before song N, at most one jingle: the highest-priority active
+      schedule whose interval divides N; ties go to the schedule played
+      least recently (play rollups, then this plan), so equal
+      priorities rotate instead of the newest always winning
+    - 10-song summary after every 10th song, halfway announcement after
+      song floor(total / 2)
+
+    Schedules are evaluated at each song's estimated start time against
+    the compiled schedule timetable, so windows opening mid-game land in
+    the right place. Schedules edited mid-game change schedule_version,
+    which the game checks before each song.
+    """
+
+    SUMMARY_EVERY = 10
+
+    def __init__(self, schedule_service: Optional[ScheduleService] = None):
+        """
+        Initialize Playout Planner
+
+        Args:
+            schedule_service: Schedule service (created if not provided)
+        """
+        self.schedule_service = schedule_service or ScheduleService()
+
+    def plan(
+        self,
+        session: BingoSession,
+        start_at: Optional[datetime] = None,
+        from_round: int = 1,
+        seconds_per_song: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Plan the rest of a game
+
+        Args:
+            session: Bingo session (song order = song_pool)
+            start_at: When round from_round starts (defaults to now)
+            from_round: First song number to plan (1-based, for resumed games)
+            seconds_per_song: Estimated announcement + preview + gap per song
+
+        Returns:
+            dict: {
+                'items': [{'type': 'announcement'|'jingle'|'song', 'round': n, 'estimated_at': iso, ...}],
+                'jingles': {round: jingle item},
+                'assets': [jingle URLs in first-play order],
+                'replan_after': iso time when the schedule set next changes,
+                'schedule_version': ScheduleService.get_version() the plan was made from
+            }
+        """
+        start_at = start_at or timezone.now()
+        seconds_per_song = seconds_per_song or AppConfig.PLAYOUT_SECONDS_PER_SONG
+        songs = session.song_pool or []
+        total = len(songs)
+        halfway = total // 2
+
+        # Read before the timetable: an edit in between makes the plan look stale, not current
+        schedule_version = self.schedule_service.get_version()
+        timetable = self.schedule_service.get_timetable(
+            venue_name=session.venue_name,
+            session_id=session.session_id
+        )
+        schedule_ids = [entry['id'] for entry in timetable.entries]
+        last_played = self._last_played(schedule_ids)
+        jingle_seconds = self._jingle_durations([entry['jingle_filename'] for entry in timetable.entries])
+
+        items: List[Dict[str, Any]] = []
+        jingles: Dict[int, Dict[str, Any]] = {}
+        assets: List[str] = []
+        clock = start_at
+        sequence = 0  # Breaks last-played ties between jingles planned in this game
+
+        def add(item_type: str, round_number: int, seconds: float, **fields):
+            nonlocal clock
+            item = {'type': item_type, 'round': round_number, 'estimated_at': clock.isoformat(), **fields}
+            items.append(item)
+            clock += timedelta(seconds=seconds)
+            return item
+
+        for round_number in range(max(from_round, 1), total + 1):
+            if round_number == 1:
+                add('announcement', round_number, AppConfig.PLAYOUT_ANNOUNCEMENT_SECONDS, kind='welcome')
+
+            due = [
+                entry for entry in timetable.active_at(self.schedule_service.local_now(clock))
+                if round_number % entry['interval'] == 0
+            ]
+            if due:
+                top = max(entry['priority'] for entry in due)
+                choice = min(
+                    (entry for entry in due if entry['priority'] == top),
+                    key=lambda entry: last_played.get(entry['id'], (0, 0.0))
+                )
+                sequence += 1
+                last_played[choice['id']] = (1, float(sequence))
+                url = f"/api/jingles/{choice['jingle_filename']}"
+                jingles[round_number] = add(
+                    'jingle', round_number,
+                    jingle_seconds.get(choice['jingle_filename'], AppConfig.DEFAULT_JINGLE_DURATION),
+                    schedule_id=choice['id'],
+                    jingle_name=choice['jingle_name'],
+                    jingle_filename=choice['jingle_filename'],
+                    url=url
+                )
+                if url not in assets:
+                    assets.append(url)
+
+            song = songs[round_number - 1]
+            add('song', round_number, seconds_per_song, song={
+                key: song.get(key) for key in ('id', 'title', 'artist', 'preview_url')
+            })
+
+            if round_number % self.SUMMARY_EVERY == 0:
+                add('announcement', round_number, AppConfig.PLAYOUT_ANNOUNCEMENT_SECONDS, kind='ten_song_summary')
+            if round_number == halfway:
+                add('announcement', round_number, AppConfig.PLAYOUT_ANNOUNCEMENT_SECONDS, kind='halfway')
+
+        replan_after = timetable.next_change(self.schedule_service.local_now(start_at))
+        logger.info(f"Planned playout for session {session.session_id}: "
+                    f"{total} songs, {len(jingles)} jingles from round {from_round}")
+        return {
+            'session_id': session.session_id,
+            'from_round': from_round,
+            'total_rounds': total,
+            'items': items,
+            'jingles': jingles,
+            'assets': assets,
+            'estimated_end': clock.isoformat(),
+            'replan_after': timezone.make_aware(replan_after).isoformat(),
+            'schedule_version': schedule_version,
+        }
+
+    @staticmethod
+    def _last_played(schedule_ids: List[int]) -> Dict[int, tuple]:
+        """Most recent play per schedule as a sortable (0, timestamp) key"""
+        return {
+            schedule_id: (0, played_at.timestamp())
+            for schedule_id, played_at in play_history.last_played(schedule_ids).items()
+        }
+
+    @staticmethod
+    def _jingle_durations(filenames: List[str]) -> Dict[str, float]:
+        """Catalogue durations for the scheduled jingle files"""
+        if not filenames:
+            return {}
+        return dict(
+            Jingle.objects.filter(
+                filename__in=set(filenames),
+                duration_seconds__isnull=False
+            ).values_list('filename', 'duration_seconds')
+        )
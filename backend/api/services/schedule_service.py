@@ -4,12 +4,15 @@ Handles schedule creation, validation, and active schedule evaluation
 """
 
 import logging
+import threading
 from typing import Dict, Any, List, Optional
 from datetime import datetime, date, time as dt_time
-from django.db.models import Q
+from django.db.models import Count, Max, Q
+from django.utils import timezone
 
 from ..models import JingleSchedule, BingoSession
 from ..utils.config import AppConfig
+from .schedule_timetable import ScheduleTimetable, WEEKDAY_FIELDS
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +26,17 @@ class ScheduleService:
     - Evaluate active schedules based on current date/time
     - Filter by venue and session
     - Priority-based ordering
+    - Compiled timetable per venue/session scope, recompiled only when
+      a schedule is created, updated or deleted; active lists are cached
+      until the next schedule boundary
     """
     
+    # Compiled timetables and active lists per (venue_name, session_id)
+    # scope, shared by all instances in this process
+    _timetables: Dict[tuple, tuple] = {}     # scope -> (version, ScheduleTimetable)
+    _active_cache: Dict[tuple, tuple] = {}   # scope -> (version, valid_from, valid_until, active)
+    _cache_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize Schedule Service"""
         pass
@@ -284,6 +296,9 @@ class ScheduleService:
         """
         Get schedules that are currently active
         
+        Looks the moment up in the scope's compiled timetable; the result
+        is reused until the next boundary or schedule change.
+        
         Args:
             venue_name: Filter by venue
             session_id: Filter by session
@@ -292,31 +307,40 @@ class ScheduleService:
         Returns:
             list: Active schedules with metadata
         """
-        if current_datetime is None:
-            current_datetime = datetime.now()
+        now = self.local_now(current_datetime)
+        scope = (venue_name or None, session_id or None)
+        version = self._schedules_version()
         
-        # Get filtered schedules
-        all_schedules = self.get_schedules(
-            venue_name=venue_name,
-            session_id=session_id,
-            enabled_only=True
-        )
+        cached = self._active_cache.get(scope)
+        if cached and cached[0] == version and cached[1] <= now < cached[2]:
+            return [dict(item) for item in cached[3]]
         
-        # Filter to active schedules
-        active_schedules = []
-        for schedule in all_schedules:
-            if self.is_schedule_active(schedule, current_datetime):
-                active_schedules.append({
-                    'id': schedule.id,
-                    'jingle_name': schedule.jingle_name,
-                    'jingle_filename': schedule.jingle_filename,
-                    'interval': self._get_interval_from_pattern(schedule.repeat_pattern),
-                    'priority': schedule.priority,
-                    'repeat_pattern': schedule.repeat_pattern
-                })
-        
-        logger.info(f"Found {len(active_schedules)} active schedules (total: {len(all_schedules)})")
-        return active_schedules
+        timetable = self._get_timetable(scope, version)
+        active_schedules = timetable.active_at(now)
+        with self._cache_lock:
+            self._active_cache[scope] = (version, now, timetable.next_change(now), active_schedules)
+        
+        logger.info(f"Found {len(active_schedules)} active schedules (total: {len(timetable.entries)})")
+        return [dict(item) for item in active_schedules]
+    
+    def get_next_change(
+        self,
+        venue_name: Optional[str] = None,
+        session_id: Optional[str] = None,
+        current_datetime: Optional[datetime] = None
+    ) -> datetime:
+        """
+        When the active schedule set may next change (local time)
+        
+        Args:
+            venue_name: Filter by venue
+            session_id: Filter by session
+            current_datetime: Override current time (for testing)
+            
+        Returns:
+            datetime: Next boundary (naive local time)
+        """
+        return self.get_timetable(venue_name, session_id).next_change(self.local_now(current_datetime))
     
     def is_schedule_active(
         self,
@@ -336,12 +360,9 @@ class ScheduleService:
         if not schedule.enabled:
             return False
         
-        if current_datetime is None:
-            current_datetime = datetime.now()
-        
+        current_datetime = self.local_now(current_datetime)
         current_date = current_datetime.date()
         current_time = current_datetime.time()
-        current_weekday = current_datetime.weekday()  # 0=Monday, 6=Sunday
         
         # Check date range
         if current_date < schedule.start_date:
@@ -357,21 +378,74 @@ class ScheduleService:
         if schedule.time_end and current_time > schedule.time_end:
             return False
         
-        # Check day of week
-        day_checks = [
-            schedule.monday,
-            schedule.tuesday,
-            schedule.wednesday,
-            schedule.thursday,
-            schedule.friday,
-            schedule.saturday,
-            schedule.sunday
-        ]
-        
-        if not day_checks[current_weekday]:
-            return False
+        # Check day of week (0=Monday, 6=Sunday)
+        return bool(getattr(schedule, WEEKDAY_FIELDS[current_datetime.weekday()]))
+    
+    def get_version(self) -> str:
+        """
+        Token that changes whenever any schedule is created, updated or deleted
         
-        return True
+        Returns:
+            str: Opaque version; clients holding a plan re-plan when it differs
+        """
+        count, changed = self._schedules_version()
+        return f"{count}:{changed.isoformat() if changed else ''}"
+    
+    def get_timetable(
+        self,
+        venue_name: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> ScheduleTimetable:
+        """
+        Compiled timetable for a venue/session scope (for planning ahead)
+        
+        Args:
+            venue_name: Filter by venue
+            session_id: Filter by session
+            
+        Returns:
+            ScheduleTimetable: Up-to-date compiled timetable
+        """
+        scope = (venue_name or None, session_id or None)
+        return self._get_timetable(scope, self._schedules_version())
+    
+    def _get_timetable(self, scope: tuple, version: tuple) -> ScheduleTimetable:
+        """Compiled timetable for a scope, recompiled if schedules changed"""
+        cached = self._timetables.get(scope)
+        if cached and cached[0] == version:
+            return cached[1]
+        
+        venue_name, session_id = scope
+        schedules = list(self.get_schedules(
+            venue_name=venue_name,
+            session_id=session_id,
+            enabled_only=True
+        ))
+        timetable = ScheduleTimetable(schedules, JingleSchedule.REPEAT_INTERVALS)
+        with self._cache_lock:
+            self._timetables[scope] = (version, timetable)
+        logger.info(f"Compiled schedule timetable for {scope}: "
+                    f"{len(schedules)} schedules, {len(timetable.boundaries)} boundaries")
+        return timetable
+    
+    @staticmethod
+    def _schedules_version() -> tuple:
+        """
+        Changes whenever any schedule is created, updated or deleted
+        
+        One aggregate query, so every worker notices edits made elsewhere.
+        """
+        stats = JingleSchedule.objects.aggregate(count=Count('id'), changed=Max('updated_at'))
+        return stats['count'], stats['changed']
+    
+    @staticmethod
+    def local_now(current_datetime: Optional[datetime] = None) -> datetime:
+        """Naive local time (schedules are stored as venue wall-clock times)"""
+        if current_datetime is None:
+            current_datetime = timezone.now()
+        if timezone.is_aware(current_datetime):
+            current_datetime = timezone.localtime(current_datetime).replace(tzinfo=None)
+        return current_datetime
     
     def _parse_time(self, time_str: Optional[str]) -> Optional[dt_time]:
         """Parse time string to time object"""
@@ -393,9 +467,4 @@ class ScheduleService:
         Returns:
             int: Number of rounds between jingles
         """
-        intervals = {
-            'occasional': 8,  # Every 8 rounds
-            'regular': 5,     # Every 5 rounds
-            'often': 3        # Every 3 rounds
-        }
-        return intervals.get(pattern, 5)
+        return JingleSchedule.REPEAT_INTERVALS.get(pattern, JingleSchedule.REPEAT_INTERVALS['regular'])
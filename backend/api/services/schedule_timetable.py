@@ -0,0 +1,130 @@
+"""
+Schedule Timetable - Compiled weekly timetable for jingle schedules
+Turns a set of schedules into sorted second-of-week boundaries so
+"what is active now" and "when does that change" are bisect lookups
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Dict, List, Sequence
+
+from ..models import JingleSchedule
+
+DAY_SECONDS = 86400
+WEEK_SECONDS = 7 * DAY_SECONDS
+
+WEEKDAY_FIELDS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+
+def _seconds(value: dt_time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+class ScheduleTimetable:
+    """
+    Immutable timetable compiled from enabled schedules
+
+    Each schedule contributes one [start, end) interval per selected
+    weekday (time_start/time_end inclusive, as in
+    ScheduleService.is_schedule_active). A sweep over all interval edges
+    gives the sorted boundaries and, for each segment between two
+    boundaries, the schedules active in it (in priority order).
+    Date ranges are checked on the few schedules of the matching segment.
+    """
+
+    def __init__(self, schedules: Sequence[JingleSchedule], intervals: Dict[str, int]):
+        """
+        Compile a timetable
+
+        Args:
+            schedules: Enabled schedules, highest priority first
+            intervals: Rounds between plays per repeat pattern
+        """
+        self.entries: List[Dict[str, Any]] = []
+        edges: Dict[int, List[tuple]] = {0: []}
+        date_edges = set()
+
+        for rank, schedule in enumerate(schedules):
+            self.entries.append({
+                'id': schedule.id,
+                'jingle_name': schedule.jingle_name,
+                'jingle_filename': schedule.jingle_filename,
+                'interval': intervals.get(schedule.repeat_pattern, intervals['regular']),
+                'priority': schedule.priority,
+                'repeat_pattern': schedule.repeat_pattern,
+                'start_date': schedule.start_date,
+                'end_date': schedule.end_date,
+            })
+            date_edges.add(schedule.start_date)
+            if schedule.end_date:
+                date_edges.add(schedule.end_date + timedelta(days=1))
+
+            start = _seconds(schedule.time_start) if schedule.time_start else 0
+            end = _seconds(schedule.time_end) + 1 if schedule.time_end else DAY_SECONDS
+            if start >= end:
+                continue  # Window can never match
+            for day, field in enumerate(WEEKDAY_FIELDS):
+                if getattr(schedule, field):
+                    edges.setdefault(day * DAY_SECONDS + start, []).append((rank, True))
+                    edges.setdefault(day * DAY_SECONDS + end, []).append((rank, False))
+
+        # Sweep the edges once, snapshotting the active set per segment
+        self.boundaries: List[int] = []
+        self.segments: List[List[int]] = []
+        active = set()
+        for point in sorted(edges):
+            for rank, starts in edges[point]:
+                if not starts:
+                    active.discard(rank)
+            for rank, starts in edges[point]:
+                if starts:
+                    active.add(rank)
+            segment = sorted(active)
+            if point >= WEEK_SECONDS or (self.segments and segment == self.segments[-1]):
+                continue  # Not a change (e.g. an all-day schedule crossing midnight)
+            self.boundaries.append(point)
+            self.segments.append(segment)
+
+        self.date_edges: List[date] = sorted(date_edges)
+
+    @staticmethod
+    def week_second(moment: datetime) -> int:
+        """Seconds since Monday 00:00 of moment's week"""
+        return moment.weekday() * DAY_SECONDS + _seconds(moment.time())
+
+    def active_at(self, moment: datetime) -> List[Dict[str, Any]]:
+        """
+        Schedules active at a (naive, local) moment
+
+        Returns:
+            list: Active schedules, highest priority first
+        """
+        segment = self.segments[bisect_right(self.boundaries, self.week_second(moment)) - 1]
+        today = moment.date()
+        active = []
+        for rank in segment:
+            entry = self.entries[rank]
+            if today < entry['start_date'] or (entry['end_date'] and today > entry['end_date']):
+                continue
+            active.append({key: entry[key] for key in (
+                'id', 'jingle_name', 'jingle_filename', 'interval', 'priority', 'repeat_pattern'
+            )})
+        return active
+
+    def next_change(self, moment: datetime) -> datetime:
+        """
+        Earliest moment after `moment` at which the active set may change
+
+        Never late, but may be early (e.g. a weekly boundary of a schedule
+        that is outside its date range).
+        """
+        second = self.week_second(moment)
+        index = bisect_right(self.boundaries, second)
+        next_second = self.boundaries[index] if index < len(self.boundaries) else WEEK_SECONDS
+        week_start = datetime.combine(moment.date(), dt_time()) - timedelta(days=moment.weekday())
+        change = week_start + timedelta(seconds=next_second)
+
+        date_index = bisect_right(self.date_edges, moment.date())
+        if date_index < len(self.date_edges):
+            change = min(change, datetime.combine(self.date_edges[date_index], dt_time()))
+        return change
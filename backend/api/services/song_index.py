@@ -0,0 +1,176 @@
+"""
+Song Index - Local autocomplete for the karaoke request form
+Prefix index over every song already requested at any venue, held in
+memory so each keystroke is a bisect instead of an external API call
+"""
+
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional
+
+from django.db import connection
+from django.db.models import Count, Max
+
+from ..models import KaraokeQueue
+from ..utils.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class SongIndex:
+    """
+    In-memory song autocomplete index
+
+    Features:
+    - Built from KaraokeQueue history in one grouped query
+    - Sorted (word, song) list: the last typed word is a prefix lookup
+      by bisect, earlier words must match whole words
+    - Results ranked by how often the song has been requested
+    - New requests are added incrementally; the full index is rebuilt in
+      the background once it is older than the TTL
+    """
+
+    def __init__(self, ttl: Optional[int] = None):
+        """
+        Initialize Song Index
+
+        Args:
+            ttl: Seconds before the index is rebuilt from the database
+        """
+        self.ttl = ttl if ttl is not None else AppConfig.SONG_INDEX_TTL
+        self._lock = threading.Lock()
+        self._songs: List[Dict[str, Any]] = []
+        self._by_key: Dict[tuple, int] = {}     # (title, artist) normalised -> song index
+        self._words: List[tuple] = []           # sorted (word, song index)
+        self._built_at = 0.0
+        self._rebuilding = False
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, drop apostrophes and other punctuation, collapse whitespace"""
+        text = re.sub(r"['\u2019]", '', (text or '').lower())
+        return ' '.join(re.sub(r'[^\w]+', ' ', text).split())
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Songs matching a partially typed title/artist
+
+        Args:
+            query: Text typed so far (e.g. 'queen bohem')
+            limit: Maximum results
+
+        Returns:
+            list: [{'title', 'artist', 'duration', 'plays'}, ...] most requested first
+        """
+        words = self.normalize(query).split()
+        if not words:
+            return []
+        self._ensure_fresh()
+
+        prefix, required = words[-1], set(words[:-1])
+        with self._lock:
+            start = bisect_left(self._words, (prefix,))
+            seen = set()
+            matches = []
+            for word, song_id in self._words[start:]:
+                if not word.startswith(prefix):
+                    break
+                if song_id in seen:
+                    continue
+                seen.add(song_id)
+                song = self._songs[song_id]
+                if required <= song['words']:
+                    matches.append(song)
+
+        matches.sort(key=lambda s: (-s['plays'], s['title'].lower()))
+        return [
+            {'title': s['title'], 'artist': s['artist'], 'duration': s['duration'], 'plays': s['plays']}
+            for s in matches[:limit]
+        ]
+
+    def add(self, title: str, artist: str, duration: Optional[int] = None) -> None:
+        """Record a requested song without waiting for the next rebuild"""
+        if not self.normalize(title):
+            return
+        with self._lock:
+            self._add_song(title, artist, duration, plays=1, keep_sorted=True)
+
+    def rebuild(self) -> int:
+        """
+        Rebuild the index from the queue history
+
+        Returns:
+            int: Number of distinct songs indexed
+        """
+        rows = KaraokeQueue.objects.exclude(song_title='').values(
+            'song_title', 'artist'
+        ).annotate(plays=Count('id'), duration=Max('duration'))
+
+        fresh = SongIndex(ttl=self.ttl)
+        for row in rows:
+            fresh._add_song(row['song_title'], row['artist'], row['duration'], row['plays'])
+        fresh._words.sort()
+
+        with self._lock:
+            self._songs, self._by_key, self._words = fresh._songs, fresh._by_key, fresh._words
+            self._built_at = time.time()
+        logger.info(f"🎵 Song index rebuilt: {len(fresh._songs)} songs")
+        return len(fresh._songs)
+
+    def _ensure_fresh(self) -> None:
+        """Build on first use; afterwards rebuild stale indexes in the background"""
+        if not self._built_at:
+            self.rebuild()
+            return
+        if time.time() - self._built_at <= self.ttl:
+            return
+
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def background_rebuild():
+            try:
+                self.rebuild()
+            except Exception as e:
+                logger.warning(f"Song index rebuild failed, keeping old index: {e}")
+            finally:
+                self._rebuilding = False
+                connection.close()
+
+        threading.Thread(target=background_rebuild, daemon=True).start()
+
+    def _add_song(self, title: str, artist: str, duration: Optional[int], plays: int,
+                  keep_sorted: bool = False) -> None:
+        """Merge a song into the index (caller holds the lock or owns the index)"""
+        key = (self.normalize(title), self.normalize(artist))
+        song_id = self._by_key.get(key)
+        if song_id is not None:
+            song = self._songs[song_id]
+            song['plays'] += plays
+            song['duration'] = max(song['duration'] or 0, duration or 0) or None
+            return
+
+        words = set(key[0].split()) | set(key[1].split())
+        song_id = len(self._songs)
+        self._songs.append({
+            'title': title.strip(),
+            'artist': (artist or '').strip(),
+            'duration': duration,
+            'plays': plays,
+            'words': words,
+        })
+        self._by_key[key] = song_id
+        for word in words:
+            if keep_sorted:
+                insort(self._words, (word, song_id))
+            else:
+                self._words.append((word, song_id))
+
+
+# Shared index for this process
+song_index = SongIndex()
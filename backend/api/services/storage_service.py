@@ -1,70 +1,337 @@
 """
-Google Cloud Storage Service
-Handles file uploads, downloads, and management with GCS
+Object Storage Service
+Handles file uploads, downloads, and management through pluggable
+backends: Google Cloud Storage, the local data/ tree (served by Django
+or nginx) and S3-compatible object stores
 """
 
+import hashlib
 import logging
-from typing import Optional, BinaryIO
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
 
-from google.cloud import storage
-
-from ..utils.config import GCS_BUCKET_NAME
+from ..utils.config import AppConfig, GCS_BUCKET_NAME
+from ..utils.file_serving import CONTENT_HASH_RE, IMMUTABLE_MAX_AGE
 
 logger = logging.getLogger(__name__)
 
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(local_file_path: Union[str, Path]) -> str:
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(local_file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_hash_key(local_file_path: Union[str, Path], prefix: str) -> str:
+    """
+    Content-addressed object key for a file
+
+    Example:
+        >>> content_hash_key('/tmp/music_bingo_cards.pdf', 'cards')
+        'cards/music_bingo_cards_3f2a9c1e0b7d4a6f.pdf'
+
+    The 16-digit hash suffix is what file_serving treats as immutable, and
+    identical files map to the same key, so re-uploads can be skipped.
+    """
+    path = Path(local_file_path)
+    return f"{prefix.strip('/')}/{path.stem}_{content_hash(path)[:16]}{path.suffix}"
+
+
+def _content_type(name: str, content_type: Optional[str] = None) -> str:
+    return content_type or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def _cache_control(name: str) -> Optional[str]:
+    """Long-lived caching for content-hashed keys"""
+    if CONTENT_HASH_RE.search(name):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return None
+
+
+class StorageBackend:
+    """
+    Base class for object storage backends
+
+    Features:
+    - upload_file / upload_bytes / delete_file / file_exists / public_url
+    - public_url() needs no network call, so a URL can be embedded in
+      other files before its object is uploaded
+    - upload_deduplicated(): content-hash keys, skips objects already stored
+    - upload_many(): concurrent uploads on a small thread pool
+    - open_upload() / upload_while_written(): chunked uploads that start
+      before the whole file exists
+    """
+
+    name = 'base'
+
+    def upload_file(self, local_file_path: str, destination_blob_name: str, make_public: bool = True,
+                    content_type: Optional[str] = None) -> str:
+        """Upload a local file and return its public URL"""
+        raise NotImplementedError
+
+    def upload_bytes(self, file_bytes: bytes, destination_blob_name: str,
+                     content_type: str = 'application/octet-stream', make_public: bool = True) -> str:
+        """Upload bytes and return their public URL"""
+        raise NotImplementedError
+
+    def delete_file(self, blob_name: str) -> bool:
+        """Delete an object; True if deleted"""
+        raise NotImplementedError
+
+    def file_exists(self, blob_name: str) -> bool:
+        """Check whether an object exists"""
+        raise NotImplementedError
+
+    def public_url(self, blob_name: str) -> str:
+        """Public URL of an object (computed, not fetched)"""
+        raise NotImplementedError
+
+    def get_signed_url(self, blob_name: str, expiration_seconds: int = 3600) -> str:
+        """Time-limited URL; backends without signing return the public URL"""
+        return self.public_url(blob_name)
+
+    def open_upload(self, destination_blob_name: str, make_public: bool = True,
+                    content_type: Optional[str] = None) -> 'ChunkedUpload':
+        """Start an upload that is sent in chunks as data is written to it"""
+        raise NotImplementedError
+
+    def upload_while_written(
+        self,
+        local_file_path: str,
+        destination_blob_name: str,
+        finished: threading.Event,
+        make_public: bool = True,
+        poll_interval: float = 0.1,
+        cancelled: Optional[threading.Event] = None
+    ) -> str:
+        """
+        Upload a file that another process is still writing
+
+        Bytes are read as they are appended and sent chunk by chunk through
+        open_upload(); once `finished` is set the rest of the file is sent
+        and the upload completed, so it ends within one chunk of the last write.
+        Setting `cancelled` (e.g. the writer failed) discards the partial upload.
+
+        Returns:
+            str: Public URL of the uploaded file
+
+        Raises:
+            RuntimeError: If cancelled
+        """
+        upload = self.open_upload(destination_blob_name, make_public=make_public)
+        try:
+            with open(local_file_path, 'rb') as f:
+                while True:
+                    if cancelled is not None and cancelled.is_set():
+                        raise RuntimeError(f'Upload of {destination_blob_name} cancelled')
+                    done = finished.is_set()  # Checked before reading so no trailing bytes are missed
+                    data = f.read(upload.chunk_size)
+                    if data:
+                        upload.write(data)
+                    elif done:
+                        break
+                    else:
+                        finished.wait(poll_interval)
+            return upload.close()
+        except BaseException:
+            upload.abort()
+            raise
+
+    def upload_deduplicated(self, local_file_path: str, prefix: str, make_public: bool = True) -> Tuple[str, str, bool]:
+        """
+        Upload a file under its content-hash key unless it is already stored
+
+        Returns:
+            tuple: (public URL, key, whether the file was uploaded)
+        """
+        key = content_hash_key(local_file_path, prefix)
+        if self.file_exists(key):
+            logger.info(f"⏭️ {key} already stored, skipping upload")
+            return self.public_url(key), key, False
+        return self.upload_file(local_file_path, key, make_public), key, True
+
+    def upload_many(
+        self,
+        uploads: Sequence[Tuple[str, str]],
+        make_public: bool = True,
+        skip_existing: bool = False,
+        return_exceptions: bool = False,
+        max_workers: Optional[int] = None
+    ) -> List[Union[str, Exception]]:
+        """
+        Upload several files concurrently
+
+        Args:
+            uploads: (local file path, destination key) pairs
+            make_public: Whether to make the objects publicly readable
+            skip_existing: Don't re-upload keys that already exist (for content-hash keys)
+            return_exceptions: Return failures in place of URLs instead of raising the first one
+            max_workers: Thread pool size (defaults to STORAGE_UPLOAD_WORKERS)
+
+        Returns:
+            list: Public URLs (or exceptions) in the order of uploads
+        """
+        def upload(local_file_path: str, key: str) -> str:
+            if skip_existing and self.file_exists(key):
+                logger.info(f"⏭️ {key} already stored, skipping upload")
+                return self.public_url(key)
+            return self.upload_file(local_file_path, key, make_public)
+
+        workers = min(max_workers or AppConfig.STORAGE_UPLOAD_WORKERS, len(uploads)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(upload, str(path), key) for path, key in uploads]
 
-class GCSStorageService:
+        results = []
+        for future in futures:
+            error = future.exception()
+            if error is not None and not return_exceptions:
+                raise error
+            results.append(error if error is not None else future.result())
+        return results
+
+
+class ChunkedUpload:
+    """
+    Write-only handle for an upload in progress
+
+    write() buffers data and sends each full chunk_size part; close()
+    sends the remainder, completes the upload and returns the public URL.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None):
+        self.chunk_size = chunk_size or AppConfig.STORAGE_CHUNK_SIZE
+        self.size = 0
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        self.size += len(data)
+        while len(self._buffer) >= self.chunk_size:
+            part = bytes(self._buffer[:self.chunk_size])
+            del self._buffer[:self.chunk_size]
+            self._send(part)
+
+    def close(self) -> str:
+        part, self._buffer = bytes(self._buffer), bytearray()
+        return self._complete(part)
+
+    def abort(self) -> None:
+        """Discard the partial upload"""
+
+    def _send(self, part: bytes) -> None:
+        raise NotImplementedError
+
+    def _complete(self, last_part: bytes) -> str:
+        raise NotImplementedError
+
+
+class _GCSUpload(ChunkedUpload):
+    """Resumable upload session; each chunk is committed as it is sent"""
+
+    def __init__(self, service: 'GCSStorageService', blob_name: str, make_public: bool, content_type: Optional[str]):
+        super().__init__(service.chunk_size)
+        self.blob = service._blob(blob_name)
+        self.make_public = make_public
+        self.writer = self.blob.open('wb', chunk_size=self.chunk_size,
+                                     content_type=_content_type(blob_name, content_type))
+
+    def _send(self, part: bytes) -> None:
+        self.writer.write(part)
+
+    def _complete(self, last_part: bytes) -> str:
+        self.writer.write(last_part)
+        self.writer.close()
+        if self.make_public:
+            self.blob.make_public()
+        logger.info(f"✅ Uploaded {self.size} bytes in chunks to gs://{self.blob.bucket.name}/{self.blob.name}")
+        return self.blob.public_url
+
+
+class GCSStorageService(StorageBackend):
     """
     Service for Google Cloud Storage operations
-    
+
     Features:
     - File upload with public URLs
-    - Automatic bucket configuration
+    - One storage client per process, shared by all instances
+    - Files above STORAGE_CHUNK_SIZE use chunked resumable uploads
+      (failed chunks are retried from the last committed offset)
     - Error handling and logging
     - Support for both file paths and bytes
     """
-    
-    def __init__(self, bucket_name: Optional[str] = None):
+
+    name = 'gcs'
+
+    # Shared across instances in this process (client creation loads credentials)
+    _client = None
+    _client_lock = threading.Lock()
+
+    def __init__(self, bucket_name: Optional[str] = None, chunk_size: Optional[int] = None):
         """
         Initialize GCS Storage Service
-        
+
         Args:
             bucket_name: GCS bucket name (defaults to config value)
+            chunk_size: Resumable upload chunk size (defaults to STORAGE_CHUNK_SIZE)
         """
         self.bucket_name = bucket_name or GCS_BUCKET_NAME
-        self.client = None
+        self.chunk_size = chunk_size or AppConfig.STORAGE_CHUNK_SIZE
         self.bucket = None
-    
+
     def _get_client(self):
-        """Lazy initialization of storage client"""
-        if self.client is None:
-            self.client = storage.Client()
-        return self.client
-    
+        """Lazy initialization of the shared storage client"""
+        if GCSStorageService._client is None:
+            with GCSStorageService._client_lock:
+                if GCSStorageService._client is None:
+                    from google.cloud import storage
+                    GCSStorageService._client = storage.Client()
+        return GCSStorageService._client
+
     def _get_bucket(self):
         """Lazy initialization of bucket"""
         if self.bucket is None:
             client = self._get_client()
             self.bucket = client.bucket(self.bucket_name)
         return self.bucket
-    
-    def upload_file(self, local_file_path: str, destination_blob_name: str, make_public: bool = True) -> str:
+
+    def _blob(self, blob_name: str, size: int = 0):
+        """Blob handle; large uploads get a chunk size, which makes them resumable"""
+        chunk_size = self.chunk_size if size > self.chunk_size else None
+        blob = self._get_bucket().blob(blob_name, chunk_size=chunk_size)
+        blob.cache_control = _cache_control(blob_name)
+        return blob
+
+    def upload_file(self, local_file_path: str, destination_blob_name: str, make_public: bool = True,
+                    content_type: Optional[str] = None) -> str:
         """
         Upload a file to Google Cloud Storage and return a public URL
         Files are auto-deleted after 7 days via bucket lifecycle policy
-        
+
         Args:
             local_file_path: Path to local file to upload
             destination_blob_name: Destination path in GCS bucket
             make_public: Whether to make the blob publicly readable (default: True)
-        
+            content_type: MIME type (guessed from the name if not given)
+
         Returns:
             str: Public URL of uploaded file
-            
+
         Raises:
             Exception: If upload fails
-            
+
         Example:
             >>> service = GCSStorageService()
             >>> url = service.upload_file('/tmp/file.pdf', 'cards/file.pdf')
@@ -72,78 +339,79 @@ class GCSStorageService:
             'https://storage.googleapis.com/bucket/cards/file.pdf'
         """
         try:
-            bucket = self._get_bucket()
-            blob = bucket.blob(destination_blob_name)
-            
+            blob = self._blob(destination_blob_name, os.path.getsize(local_file_path))
+
             # Upload the file
-            blob.upload_from_filename(local_file_path)
+            blob.upload_from_filename(
+                local_file_path,
+                content_type=_content_type(destination_blob_name, content_type)
+            )
             logger.info(f"✅ Uploaded {local_file_path} to gs://{self.bucket_name}/{destination_blob_name}")
-            
+
             # Make blob publicly readable if requested
             if make_public:
                 blob.make_public()
                 logger.info(f"✅ Made blob public: {blob.public_url}")
-            
+
             # Return public URL
             return blob.public_url
-            
+
         except Exception as e:
             logger.error(f"❌ Failed to upload to GCS: {e}")
             raise
-    
+
     def upload_bytes(
-        self, 
-        file_bytes: bytes, 
-        destination_blob_name: str, 
+        self,
+        file_bytes: bytes,
+        destination_blob_name: str,
         content_type: str = 'application/octet-stream',
         make_public: bool = True
     ) -> str:
         """
         Upload bytes directly to GCS without saving to disk
-        
+
         Args:
             file_bytes: File content as bytes
             destination_blob_name: Destination path in GCS bucket
             content_type: MIME type of the file
             make_public: Whether to make the blob publicly readable
-        
+
         Returns:
             str: Public URL of uploaded file
-            
+
         Example:
             >>> service = GCSStorageService()
             >>> url = service.upload_bytes(b'data', 'file.txt', 'text/plain')
         """
         try:
-            bucket = self._get_bucket()
-            blob = bucket.blob(destination_blob_name)
+            blob = self._blob(destination_blob_name, len(file_bytes))
             blob.content_type = content_type
-            
+
             # Upload bytes
             blob.upload_from_string(file_bytes)
             logger.info(f"✅ Uploaded {len(file_bytes)} bytes to gs://{self.bucket_name}/{destination_blob_name}")
-            
+
             # Make public if requested
             if make_public:
                 blob.make_public()
                 logger.info(f"✅ Made blob public: {blob.public_url}")
-            
+
             return blob.public_url
-            
+
         except Exception as e:
             logger.error(f"❌ Failed to upload bytes to GCS: {e}")
             raise
-    
+
     def delete_file(self, blob_name: str) -> bool:
         """
         Delete a file from GCS
-        
+
         Args:
             blob_name: Name of the blob to delete
-            
+
         Returns:
             bool: True if deleted successfully
-            
+
         Example:
             >>> service = GCSStorageService()
             >>> service.delete_file('cards/old_file.pdf')
@@ -157,14 +425,14 @@ class GCSStorageService:
         except Exception as e:
             logger.error(f"❌ Failed to delete from GCS: {e}")
             return False
-    
+
     def file_exists(self, blob_name: str) -> bool:
         """
         Check if a file exists in GCS
-        
+
         Args:
             blob_name: Name of the blob to check
-            
+
         Returns:
             bool: True if file exists
         """
@@ -175,54 +443,367 @@ class GCSStorageService:
         except Exception as e:
             logger.error(f"❌ Error checking file existence: {e}")
             return False
-    
+
+    def open_upload(self, destination_blob_name: str, make_public: bool = True,
+                    content_type: Optional[str] = None) -> ChunkedUpload:
+        """Start a chunked resumable upload"""
+        return _GCSUpload(self, destination_blob_name, make_public, content_type)
+
+    def public_url(self, blob_name: str) -> str:
+        """Public URL of a blob (same as blob.public_url)"""
+        return f"https://storage.googleapis.com/{self.bucket_name}/{quote(blob_name, safe='/~')}"
+
     def get_signed_url(self, blob_name: str, expiration_seconds: int = 3600) -> str:
         """
         Generate a signed URL with expiration time
-        
+
         Args:
             blob_name: Name of the blob
             expiration_seconds: URL expiration time in seconds (default: 1 hour)
-            
+
         Returns:
             str: Signed URL
-            
+
         Example:
             >>> service = GCSStorageService()
             >>> url = service.get_signed_url('private/file.pdf', 7200)
         """
         try:
-            from datetime import timedelta
-            
             bucket = self._get_bucket()
             blob = bucket.blob(blob_name)
-            
+
             url = blob.generate_signed_url(
                 version="v4",
                 expiration=timedelta(seconds=expiration_seconds),
                 method="GET"
             )
-            
+
             logger.info(f"✅ Generated signed URL for {blob_name} (expires in {expiration_seconds}s)")
             return url
-            
+
         except Exception as e:
             logger.error(f"❌ Failed to generate signed URL: {e}")
             raise
 
 
+class _LocalUpload(ChunkedUpload):
+    """Chunks appended to a temporary file that is renamed into place on close"""
+
+    def __init__(self, backend: 'LocalStorageBackend', blob_name: str):
+        super().__init__()
+        self.backend = backend
+        self.blob_name = blob_name
+        self.path = backend._path(blob_name)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self.tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f'.{self.path.name}.', suffix='.part')
+        self.file = os.fdopen(fd, 'wb')
+
+    def _send(self, part: bytes) -> None:
+        self.file.write(part)
+
+    def _complete(self, last_part: bytes) -> str:
+        self.file.write(last_part)
+        self.file.close()
+        os.chmod(self.tmp_name, 0o644)
+        os.replace(self.tmp_name, self.path)
+        return self.backend.public_url(self.blob_name)
+
+    def abort(self) -> None:
+        self.file.close()
+        Path(self.tmp_name).unlink(missing_ok=True)
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Storage in a local directory, served from /data/ (or by nginx via
+    DATA_ACCEL_REDIRECT_PREFIX)
+
+    Features:
+    - Files are copied in chunks to a temporary file and renamed into
+      place, so a partial upload is never visible
+    - No credentials or network: works offline and in tests
+    """
+
+    name = 'local'
+
+    def __init__(self, root: Optional[Union[str, Path]] = None, base_url: Optional[str] = None):
+        """
+        Initialize Local Storage Backend
+
+        Args:
+            root: Directory holding the objects (defaults to LOCAL_STORAGE_DIR)
+            base_url: URL prefix the directory is served at (defaults to LOCAL_STORAGE_URL)
+        """
+        self.root = Path(root or AppConfig.LOCAL_STORAGE_DIR).resolve()
+        self.base_url = (base_url if base_url is not None else AppConfig.LOCAL_STORAGE_URL).rstrip('/') + '/'
+
+    def _path(self, blob_name: str) -> Path:
+        """Object path inside root, rejecting directory traversal"""
+        path = (self.root / blob_name).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f'Invalid object key: {blob_name}')
+        return path
+
+    def _write(self, blob_name: str, write) -> Path:
+        path = self._path(blob_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return path
+
+    def upload_file(self, local_file_path: str, destination_blob_name: str, make_public: bool = True,
+                    content_type: Optional[str] = None) -> str:
+        def copy(f):
+            with open(local_file_path, 'rb') as source:
+                shutil.copyfileobj(source, f, AppConfig.STORAGE_CHUNK_SIZE)
+
+        self._write(destination_blob_name, copy)
+        logger.info(f"✅ Stored {local_file_path} at {self.root / destination_blob_name}")
+        return self.public_url(destination_blob_name)
+
+    def upload_bytes(self, file_bytes: bytes, destination_blob_name: str,
+                     content_type: str = 'application/octet-stream', make_public: bool = True) -> str:
+        self._write(destination_blob_name, lambda f: f.write(file_bytes))
+        logger.info(f"✅ Stored {len(file_bytes)} bytes at {self.root / destination_blob_name}")
+        return self.public_url(destination_blob_name)
+
+    def open_upload(self, destination_blob_name: str, make_public: bool = True,
+                    content_type: Optional[str] = None) -> ChunkedUpload:
+        return _LocalUpload(self, destination_blob_name)
+
+    def delete_file(self, blob_name: str) -> bool:
+        try:
+            self._path(blob_name).unlink()
+            return True
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Failed to delete {blob_name}: {e}")
+            return False
+
+    def file_exists(self, blob_name: str) -> bool:
+        try:
+            return self._path(blob_name).is_file()
+        except ValueError:
+            return False
+
+    def public_url(self, blob_name: str) -> str:
+        return self.base_url + quote(blob_name)
+
+
+class _S3Upload(ChunkedUpload):
+    """Multipart upload; each chunk is sent as one part"""
+
+    def __init__(self, backend: 'S3StorageBackend', blob_name: str, make_public: bool, content_type: Optional[str]):
+        super().__init__()
+        self.backend = backend
+        self.client = backend._get_client()
+        self.key = blob_name
+        self.parts: List[Dict] = []
+        self.upload_id = self.client.create_multipart_upload(
+            Bucket=backend.bucket_name, Key=blob_name,
+            **backend._extra_args(blob_name, content_type, make_public)
+        )['UploadId']
+
+    def _send(self, part: bytes) -> None:
+        number = len(self.parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.backend.bucket_name, Key=self.key, UploadId=self.upload_id,
+            PartNumber=number, Body=part
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': number})
+
+    def _complete(self, last_part: bytes) -> str:
+        if last_part or not self.parts:
+            self._send(last_part)
+        self.client.complete_multipart_upload(
+            Bucket=self.backend.bucket_name, Key=self.key, UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.parts}
+        )
+        logger.info(f"✅ Uploaded {self.size} bytes in {len(self.parts)} parts to s3://{self.backend.bucket_name}/{self.key}")
+        return self.backend.public_url(self.key)
+
+    def abort(self) -> None:
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=self.backend.bucket_name, Key=self.key, UploadId=self.upload_id
+            )
+        except Exception as e:
+            logger.warning(f"Could not abort multipart upload of {self.key}: {e}")
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Storage in an S3-compatible bucket (AWS S3, MinIO, Cloudflare R2, ...)
+
+    Features:
+    - One boto3 client per process, shared by all instances
+    - Files above STORAGE_CHUNK_SIZE are sent as multipart uploads with
+      parts uploaded in parallel (STORAGE_UPLOAD_WORKERS)
+    - Requires boto3, which is only imported when this backend is used
+    """
+
+    name = 's3'
+
+    _clients: Dict[tuple, object] = {}
+    _client_lock = threading.Lock()
+
+    def __init__(
+        self,
+        bucket_name: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        public_base_url: Optional[str] = None
+    ):
+        """
+        Initialize S3 Storage Backend
+
+        Args:
+            bucket_name: Bucket (defaults to S3_BUCKET_NAME)
+            endpoint_url: Endpoint for non-AWS stores (defaults to S3_ENDPOINT_URL)
+            region: Region (defaults to S3_REGION)
+            public_base_url: Public URL prefix, e.g. a CDN (defaults to S3_PUBLIC_URL)
+        """
+        self.bucket_name = bucket_name or AppConfig.S3_BUCKET_NAME
+        self.endpoint_url = endpoint_url or AppConfig.S3_ENDPOINT_URL or None
+        self.region = region or AppConfig.S3_REGION
+        self.public_base_url = public_base_url or AppConfig.S3_PUBLIC_URL
+        if not self.bucket_name:
+            raise ValueError('S3_BUCKET_NAME is not configured')
+
+    def _get_client(self):
+        key = (self.endpoint_url, self.region)
+        with self._client_lock:
+            if key not in self._clients:
+                try:
+                    import boto3
+                except ImportError as e:
+                    raise ImportError('The s3 storage backend requires boto3 (pip install boto3)') from e
+                self._clients[key] = boto3.client('s3', endpoint_url=self.endpoint_url, region_name=self.region)
+            return self._clients[key]
+
+    def _extra_args(self, blob_name: str, content_type: Optional[str], make_public: bool) -> dict:
+        extra = {'ContentType': _content_type(blob_name, content_type)}
+        cache_control = _cache_control(blob_name)
+        if cache_control:
+            extra['CacheControl'] = cache_control
+        if make_public:
+            extra['ACL'] = 'public-read'
+        return extra
+
+    def upload_file(self, local_file_path: str, destination_blob_name: str, make_public: bool = True,
+                    content_type: Optional[str] = None) -> str:
+        from boto3.s3.transfer import TransferConfig
+
+        config = TransferConfig(
+            multipart_threshold=AppConfig.STORAGE_CHUNK_SIZE,
+            multipart_chunksize=AppConfig.STORAGE_CHUNK_SIZE,
+            max_concurrency=AppConfig.STORAGE_UPLOAD_WORKERS
+        )
+        try:
+            self._get_client().upload_file(
+                local_file_path, self.bucket_name, destination_blob_name,
+                ExtraArgs=self._extra_args(destination_blob_name, content_type, make_public),
+                Config=config
+            )
+            logger.info(f"✅ Uploaded {local_file_path} to s3://{self.bucket_name}/{destination_blob_name}")
+            return self.public_url(destination_blob_name)
+        except Exception as e:
+            logger.error(f"❌ Failed to upload to S3: {e}")
+            raise
+
+    def upload_bytes(self, file_bytes: bytes, destination_blob_name: str,
+                     content_type: str = 'application/octet-stream', make_public: bool = True) -> str:
+        try:
+            self._get_client().put_object(
+                Bucket=self.bucket_name, Key=destination_blob_name, Body=file_bytes,
+                **self._extra_args(destination_blob_name, content_type, make_public)
+            )
+            logger.info(f"✅ Uploaded {len(file_bytes)} bytes to s3://{self.bucket_name}/{destination_blob_name}")
+            return self.public_url(destination_blob_name)
+        except Exception as e:
+            logger.error(f"❌ Failed to upload bytes to S3: {e}")
+            raise
+
+    def open_upload(self, destination_blob_name: str, make_public: bool = True,
+                    content_type: Optional[str] = None) -> ChunkedUpload:
+        return _S3Upload(self, destination_blob_name, make_public, content_type)
+
+    def delete_file(self, blob_name: str) -> bool:
+        try:
+            self._get_client().delete_object(Bucket=self.bucket_name, Key=blob_name)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to delete from S3: {e}")
+            return False
+
+    def file_exists(self, blob_name: str) -> bool:
+        try:
+            self._get_client().head_object(Bucket=self.bucket_name, Key=blob_name)
+            return True
+        except Exception:
+            return False
+
+    def public_url(self, blob_name: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url.rstrip('/')}/{quote(blob_name)}"
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket_name}/{quote(blob_name)}"
+        return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{quote(blob_name)}"
+
+    def get_signed_url(self, blob_name: str, expiration_seconds: int = 3600) -> str:
+        return self._get_client().generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket_name, 'Key': blob_name},
+            ExpiresIn=expiration_seconds
+        )
+
+
+STORAGE_BACKENDS = {
+    'gcs': GCSStorageService,
+    'local': LocalStorageBackend,
+    's3': S3StorageBackend,
+}
+
+_backends: Dict[str, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_storage(backend: Optional[str] = None) -> StorageBackend:
+    """
+    Shared storage backend instance for this process
+
+    Args:
+        backend: 'gcs', 'local' or 's3' (defaults to STORAGE_BACKEND)
+
+    Raises:
+        ValueError: For an unknown backend name
+    """
+    name = (backend or AppConfig.STORAGE_BACKEND).lower()
+    with _backends_lock:
+        if name not in _backends:
+            if name not in STORAGE_BACKENDS:
+                raise ValueError(f"Unknown storage backend '{name}'. Use one of: {', '.join(STORAGE_BACKENDS)}")
+            _backends[name] = STORAGE_BACKENDS[name]()
+        return _backends[name]
+
+
 # Convenience function for backward compatibility with existing code
 def upload_to_gcs(local_file_path: str, destination_blob_name: str) -> str:
     """
     Legacy function wrapper for backward compatibility
     Upload a file to Google Cloud Storage and return a public URL
-    
+
     Args:
         local_file_path: Path to local file
         destination_blob_name: Destination path in bucket
-        
+
     Returns:
         str: Public URL of uploaded file
     """
-    service = GCSStorageService()
-    return service.upload_file(local_file_path, destination_blob_name)
+    return get_storage('gcs').upload_file(local_file_path, destination_blob_name)
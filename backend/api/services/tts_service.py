@@ -13,6 +13,7 @@ from ..utils.config import (
     ELEVENLABS_VOICE_ID,
     AppConfig
 )
+from ..utils.metrics import span
 
 logger = logging.getLogger(__name__)
 
@@ -134,12 +135,13 @@ class TTSService:
         logger.info(f"🎤 Generating TTS: {len(text)} chars, voice={voice_id}, model={model_id}")
         
         # Make request
-        response = requests.post(
-            url,
-            headers=self._get_headers(),
-            json=payload,
-            timeout=30
-        )
+        with span('tts', 'tts_call'):
+            response = requests.post(
+                url,
+                headers=self._get_headers(),
+                json=payload,
+                timeout=30
+            )
         
         if not response.ok:
             error_msg = f'ElevenLabs API error: {response.status_code}'
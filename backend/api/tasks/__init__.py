@@ -1,12 +1,18 @@
 """
 Asynchronous tasks for Music Bingo API
-Background task execution
+Background task execution through the database-backed job queue
 """
 
 from .card_generation_tasks import run_card_generation_task
 from .jingle_generation_tasks import run_jingle_generation_task
+from .job_queue import JobQueueFull, JobWorker, admit, ensure_worker, queue_position
 
 __all__ = [
     'run_card_generation_task',
     'run_jingle_generation_task',
+    'JobQueueFull',
+    'JobWorker',
+    'admit',
+    'ensure_worker',
+    'queue_position',
 ]
@@ -1,220 +1,506 @@
 """
 Card Generation Background Tasks
-Handles async card generation using subprocess
+Handles async card generation using subprocess, run by job queue workers
 """
 
 import json
 import logging
 import subprocess
 import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from pathlib import Path
+from typing import Any, Dict, Optional
 from django.utils import timezone
-from api.services.storage_service import upload_to_gcs
+from api.models import TaskStatus
+from api.services.card_generation_service import CardGenerationService
+from api.services.storage_service import StorageBackend, content_hash_key, get_storage
+from api.utils.config import AppConfig
+from api.utils.metrics import TaskTimings, collect_timings, record, span, timed
+from .job_queue import JobQueueFull, enqueue, register_job_type
+from .task_progress import task_progress
 
 logger = logging.getLogger(__name__)
 
+# Structured lines printed by generate_cards.py
+SESSION_FILE_MARKER = 'SESSION_FILE: '
+PDF_OUTPUT_MARKER = 'PDF_OUTPUT: '
+GENERATION_RESULT_MARKER = 'GENERATION_RESULT: '  # JSON: exact artefact paths and stats
 
-def run_card_generation_task(task_id: str, task_model, cmd: list, base_dir: Path) -> None:
+
+def parse_generator_line(line: str, artefacts: Dict[str, Any]) -> None:
+    """Record the artefact paths and stats a generator output line announces"""
+    if line.startswith(SESSION_FILE_MARKER):
+        artefacts['session_file'] = line[len(SESSION_FILE_MARKER):].strip()
+    elif line.startswith(PDF_OUTPUT_MARKER):
+        artefacts['pdf_file'] = line[len(PDF_OUTPUT_MARKER):].strip()
+    elif line.startswith(GENERATION_RESULT_MARKER):
+        try:
+            artefacts.update(json.loads(line[len(GENERATION_RESULT_MARKER):]))
+        except ValueError as e:
+            logger.warning(f"Unreadable generation result: {e}")
+
+
+def _session_upload_key(session_data: Dict[str, Any]) -> str:
+    """Unique object key for a session file"""
+    venue_safe = session_data.get('venue_name', 'venue').replace(' ', '_').replace('/', '_')
+    players = session_data.get('num_players', 25)
+    game_num = session_data.get('game_number', 1)
+    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+    return f'sessions/{venue_safe}_{players}p_game{game_num}_{timestamp}.json'
+
+
+def _save_session_file(session_file: Path, session_data: Dict[str, Any]) -> None:
+    with open(session_file, 'w', encoding='utf-8') as f:
+        json.dump(session_data, f, indent=2, ensure_ascii=False)
+
+
+class CardUploadPipeline:
+    """
+    Publishes a generation run's files while the generator is still running
+
+    - SESSION_FILE (printed before rendering): the PDF's final URL is known
+      from its key, so the session JSON is stamped with it and uploaded
+      while the card batches render
+    - PDF_OUTPUT (printed when the merged PDF starts being written): the
+      PDF is uploaded in chunks as the file grows
+    - finish() (generator exited): the last chunk is sent and both uploads
+      are awaited, so the URL is ready within one chunk of the last page
+    """
+
+    def __init__(self, task_id: str, storage: StorageBackend, attempt: int = 1):
+        """
+        Initialize Card Upload Pipeline
+
+        Args:
+            task_id: Task identifier
+            storage: Storage backend to publish to
+            attempt: Job attempt (with task_id, makes the PDF key unique per run)
+        """
+        self.task_id = task_id
+        self.attempt = attempt
+        self.storage = storage
+        self.finished = threading.Event()
+        self.cancelled = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f'card-upload-{task_id[:8]}')
+        self.session_file: Optional[Path] = None
+        self.session_data: Optional[Dict[str, Any]] = None
+        self.session_future = None
+        self.pdf_path: Optional[Path] = None
+        self.pdf_future = None
+
+    def pdf_key(self, pdf_path: Path) -> str:
+        """
+        Object key for this run's PDF
+
+        Known before the PDF exists, so it is not content-addressed and must
+        not look like it: the attempt suffix keeps the key off CONTENT_HASH_RE
+        (no immutable caching), and a retried run never reuses a URL.
+        """
+        return f"cards/{pdf_path.stem}_{self.task_id.replace('-', '')[:16]}_a{self.attempt}{pdf_path.suffix}"
+
+    @property
+    def started(self) -> bool:
+        return self.pdf_future is not None
+
+    def handle_line(self, line: str) -> None:
+        """Start uploads when the generator announces its files"""
+        if line.startswith(SESSION_FILE_MARKER):
+            self._publish_session(Path(line[len(SESSION_FILE_MARKER):].strip()))
+        elif line.startswith(PDF_OUTPUT_MARKER):
+            self.pdf_path = Path(line[len(PDF_OUTPUT_MARKER):].strip())
+            logger.info(f"Task {self.task_id}: Streaming {self.pdf_path.name} to {self.storage.name} storage")
+            self.pdf_future = self.executor.submit(
+                self.storage.upload_while_written,
+                str(self.pdf_path), self.pdf_key(self.pdf_path), self.finished,
+                cancelled=self.cancelled
+            )
+
+    def _publish_session(self, session_file: Path) -> None:
+        try:
+            with open(session_file, 'r', encoding='utf-8') as f:
+                session_data = json.load(f)
+            session_data['pdf_url'] = self.storage.public_url(self.pdf_key(Path(session_data['pdf_file'])))
+            _save_session_file(session_file, session_data)
+        except Exception as e:
+            logger.warning(f"Task {self.task_id}: Could not prepare session file: {e}")
+            return
+
+        self.session_file, self.session_data = session_file, session_data
+        logger.info(f"Task {self.task_id}: Uploading session file while cards render...")
+        self.session_future = self.executor.submit(
+            self.storage.upload_file, str(session_file), _session_upload_key(session_data)
+        )
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Complete the uploads after the generator exited successfully
+
+        Returns:
+            dict: {'pdf_url', 'pdf_key', 'pdf_path', 'session_url', 'session_data'}
+
+        Raises:
+            Exception: If the PDF upload failed (session upload failures are logged)
+        """
+        self.finished.set()
+        try:
+            pdf_url = self.pdf_future.result()
+            session_url = None
+            if self.session_future is not None:
+                try:
+                    session_url = self.session_future.result()
+                    logger.info(f"Task {self.task_id}: Session file uploaded to {session_url}")
+                except Exception as e:
+                    logger.warning(f"Task {self.task_id}: Could not upload session file: {e}")
+            return {
+                'pdf_url': pdf_url,
+                'pdf_key': self.pdf_key(self.pdf_path),
+                'pdf_path': self.pdf_path,
+                'session_url': session_url,
+                'session_data': self.session_data,
+            }
+        finally:
+            self.executor.shutdown(wait=False)
+
+    def abort(self) -> None:
+        """The generator failed: discard the partial PDF upload"""
+        self.cancelled.set()
+        self.finished.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _publish_after_run(task_id: str, storage: StorageBackend, artefacts: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
-    Run card generation task in background thread
-    
+    Upload the run's PDF and session file once generation is done
+    (used when the PDF was not streamed while it was written)
+
     Args:
-        task_id: Unique task identifier
-        task_model: TaskStatus model instance
-        cmd: Command list to execute
-        base_dir: Base directory for command execution
+        artefacts: Paths announced by the generator (see parse_generator_line)
+
+    Returns:
+        dict like CardUploadPipeline.finish(), or None if the run produced no PDF
     """
-    def background_task():
+    latest_pdf = Path(artefacts['pdf_file']) if artefacts.get('pdf_file') else None
+    if latest_pdf is None or not latest_pdf.exists():
+        return None
+
+    # The PDF key is content-addressed, so its URL is known up front and
+    # both files upload concurrently (identical PDFs are skipped)
+    pdf_key = content_hash_key(latest_pdf, 'cards')
+    public_url = storage.public_url(pdf_key)
+    uploads = [(str(latest_pdf), pdf_key)]
+
+    session_file = Path(artefacts['session_file']) if artefacts.get('session_file') else None
+    session_data = None
+    if session_file is not None and session_file.exists():
         try:
-            logger.info(f"Task {task_id}: Processing started")
-            task_model.status = 'processing'
-            task_model.save(update_fields=['status'])
-            
-            logger.info(f"Task {task_id}: Running command: {' '.join(cmd)}")
-            
-            # Run with real-time output capture for progress tracking
-            # Use bufsize=1 for line buffering and universal_newlines for text mode
-            process = subprocess.Popen(
-                cmd,
-                cwd=str(base_dir),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            stdout_lines = []
-            stderr_lines = []
-            
-            # Read output line by line for progress tracking
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    line = output.strip()
-                    stdout_lines.append(line)
-                    logger.info(f"Task {task_id}: {line}")
-                    
-                    # Parse progress from output
-                    if 'progress' in line.lower() or '%' in line:
-                        try:
-                            # Try to extract percentage from line
-                            if '%' in line:
-                                pct_str = line.split('%')[0].split()[-1]
-                                progress = int(float(pct_str))
-                                task_model.progress = min(progress, 95)  # Cap at 95 until complete
-                                task_model.save(update_fields=['progress'])
-                        except (ValueError, IndexError):
-                            pass
-            
-            # Capture any remaining stderr
-            stderr = process.stderr.read()
-            if stderr:
-                stderr_lines.append(stderr)
-                logger.warning(f"Task {task_id}: stderr: {stderr}")
-            
-            # Wait for completion
-            return_code = process.wait()
-            
-            if return_code == 0:
-                # Success - find generated PDF
-                task_model.progress = 100
-                task_model.status = 'completed'
-                
-                # Try to find the generated PDF
-                cards_dir = base_dir / 'data' / 'cards'
-                pdf_files = sorted(cards_dir.glob('*.pdf'), key=lambda x: x.stat().st_mtime, reverse=True)
-                
-                if pdf_files:
-                    latest_pdf = pdf_files[0]
-                    
-                    # Upload PDF to Google Cloud Storage
+            with open(session_file, 'r', encoding='utf-8') as f:
+                session_data = json.load(f)
+            session_data['pdf_url'] = public_url
+            _save_session_file(session_file, session_data)
+            uploads.append((str(session_file), _session_upload_key(session_data)))
+        except Exception as session_error:
+            logger.warning(f"Task {task_id}: Could not prepare session file: {session_error}")
+
+    logger.info(f"Task {task_id}: Uploading {len(uploads)} files to {storage.name} storage...")
+    urls = storage.upload_many(uploads, skip_existing=True, return_exceptions=True)
+    if isinstance(urls[0], Exception):
+        raise urls[0]
+
+    session_url = None
+    if len(urls) > 1:
+        if isinstance(urls[1], Exception):
+            logger.warning(f"Task {task_id}: Could not upload session file: {urls[1]}")
+        else:
+            session_url = urls[1]
+            logger.info(f"Task {task_id}: Session file uploaded to {session_url}")
+
+    return {
+        'pdf_url': urls[0],
+        'pdf_key': pdf_key,
+        'pdf_path': latest_pdf,
+        'session_url': session_url,
+        'session_data': session_data,
+    }
+
+
+@timed('card', 'db_save')
+def _update_bingo_session(task_id: str, session_id: Optional[str], session_data: Dict[str, Any], pdf_url: str) -> None:
+    """Save the generated song pool and PDF URL on the BingoSession"""
+    logger.info(f"Task {task_id}: Attempting to update BingoSession {session_id}")
+    if not session_id:
+        logger.warning(f"Task {task_id}: No session_id in metadata - cannot update database")
+        return
+
+    try:
+        from api.models import BingoSession
+        bingo_session = BingoSession.objects.get(session_id=session_id)
+        logger.info(f"Task {task_id}: Found BingoSession {session_id}")
+        logger.info(f"   Venue: {bingo_session.venue_name}")
+        logger.info(f"   Current song_pool size: {len(bingo_session.song_pool)}")
+
+        songs_to_save = session_data.get('songs', [])
+        logger.info(f"   New song_pool size: {len(songs_to_save)}")
+
+        bingo_session.song_pool = songs_to_save
+        bingo_session.pdf_url = pdf_url
+        bingo_session.save(update_fields=['song_pool', 'pdf_url'])
+
+        logger.info(f"Task {task_id}: ✅ Updated BingoSession {session_id}")
+        logger.info(f"   Saved {len(songs_to_save)} songs to database")
+        logger.info(f"   PDF URL: {pdf_url}")
+    except Exception as db_error:
+        logger.error(f"Task {task_id}: ❌ Could not update BingoSession: {db_error}", exc_info=True)
+
+
+def _generation_stats(artefacts: Dict[str, Any]) -> Dict[str, Any]:
+    """Stats from the generator's result for the task result (what game.js logs)"""
+    stats = {key: artefacts[key] for key in ('num_cards', 'num_pages', 'generation_time') if key in artefacts}
+    if 'pdf_bytes' in artefacts:
+        stats['file_size_mb'] = round(artefacts['pdf_bytes'] / (1024 * 1024), 2)
+    return stats
+
+
+def execute_card_generation(task_model) -> None:
+    """
+    Run a queued card generation job (job queue handler)
+
+    The result carries a 'timings' breakdown: the generator's own stages
+    (pool_load, distribution, render, merge, ...) inside 'generate', then
+    'upload' and 'db_save'.
+
+    Args:
+        task_model: Claimed TaskStatus; payload holds 'cmd' and 'base_dir'
+
+    Raises:
+        Exception: If the generator failed (the job queue retries or fails the task)
+    """
+    with collect_timings() as timings:
+        _generate_and_publish(task_model, timings)
+
+
+def _generate_and_publish(task_model, timings: TaskTimings) -> None:
+    task_id = task_model.task_id
+    cmd = task_model.payload['cmd']
+    base_dir = Path(task_model.payload['base_dir'])
+    pipeline = None
+    try:
+        logger.info(f"Task {task_id}: Processing started (attempt {task_model.attempts})")
+
+        try:
+            pipeline = CardUploadPipeline(task_id, get_storage(), attempt=task_model.attempts)
+        except Exception as storage_error:
+            logger.error(f"Task {task_id}: Storage unavailable, uploads disabled - {storage_error}")
+
+        logger.info(f"Task {task_id}: Running command: {' '.join(cmd)}")
+
+        # Run with real-time output capture for progress tracking
+        # Use bufsize=1 for line buffering and universal_newlines for text mode
+        generate_start = time.perf_counter()
+        process = subprocess.Popen(
+            cmd,
+            cwd=str(base_dir),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            universal_newlines=True
+        )
+
+        stdout_lines = []
+        stderr_lines = []
+        artefacts: Dict[str, Any] = {}  # Exact paths and stats announced by the generator
+
+        # Read output line by line for progress tracking
+        while True:
+            output = process.stdout.readline()
+            if output == '' and process.poll() is not None:
+                break
+            if output:
+                line = output.strip()
+                stdout_lines.append(line)
+                logger.info(f"Task {task_id}: {line}")
+
+                # Start uploads as soon as the generator announces its files
+                parse_generator_line(line, artefacts)
+                if pipeline is not None:
+                    pipeline.handle_line(line)
+
+                # Parse progress from output
+                if 'progress' in line.lower() or '%' in line:
                     try:
-                        logger.info(f"Task {task_id}: Uploading {latest_pdf.name} to GCS...")
-                        public_url = upload_to_gcs(
-                            str(latest_pdf),
-                            f'cards/{latest_pdf.name}'
-                        )
-                        
-                        # Get session_id from task metadata
-                        session_id = task_model.metadata.get('session_id') if task_model.metadata else None
-                        
-                        # Update session file with GCS URL and upload to GCS
-                        # Use session-specific file if session_id exists
-                        session_file = cards_dir / f'session_{session_id}.json' if session_id else cards_dir / 'current_session.json'
-                        session_json_url = None
-                        session_data = None
-                        
-                        if session_file.exists():
-                            try:
-                                with open(session_file, 'r', encoding='utf-8') as f:
-                                    session_data = json.load(f)
-                                session_data['pdf_url'] = public_url
-                                
-                                # Save updated session file locally
-                                with open(session_file, 'w', encoding='utf-8') as f:
-                                    json.dump(session_data, f, indent=2, ensure_ascii=False)
-                                
-                                # Upload session file to GCS with unique name
-                                venue_safe = session_data.get('venue_name', 'venue').replace(' ', '_').replace('/', '_')
-                                players = session_data.get('num_players', 25)
-                                game_num = session_data.get('game_number', 1)
-                                timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-                                session_filename = f'sessions/{venue_safe}_{players}p_game{game_num}_{timestamp}.json'
-                                
-                                logger.info(f"Task {task_id}: Uploading session file to GCS as {session_filename}...")
-                                session_json_url = upload_to_gcs(
-                                    str(session_file),
-                                    session_filename
-                                )
-                                logger.info(f"Task {task_id}: Session file uploaded to {session_json_url}")
-                                
-                                # Update BingoSession in database with song_pool and pdf_url
-                                # (session_id already retrieved above)
-                                logger.info(f"Task {task_id}: Attempting to update BingoSession {session_id}")
-                                
-                                if session_id:
-                                    try:
-                                        from api.models import BingoSession
-                                        bingo_session = BingoSession.objects.get(session_id=session_id)
-                                        logger.info(f"Task {task_id}: Found BingoSession {session_id}")
-                                        logger.info(f"   Venue: {bingo_session.venue_name}")
-                                        logger.info(f"   Current song_pool size: {len(bingo_session.song_pool)}")
-                                        
-                                        songs_to_save = session_data.get('songs', [])
-                                        logger.info(f"   New song_pool size: {len(songs_to_save)}")
-                                        
-                                        bingo_session.song_pool = songs_to_save
-                                        bingo_session.pdf_url = public_url
-                                        bingo_session.save(update_fields=['song_pool', 'pdf_url'])
-                                        
-                                        logger.info(f"Task {task_id}: ✅ Updated BingoSession {session_id}")
-                                        logger.info(f"   Saved {len(songs_to_save)} songs to database")
-                                        logger.info(f"   PDF URL: {public_url}")
-                                        
-                                        # Verify save
-                                        bingo_session.refresh_from_db()
-                                        logger.info(f"   Verification: song_pool now has {len(bingo_session.song_pool)} songs")
-                                    except Exception as db_error:
-                                        logger.error(f"Task {task_id}: ❌ Could not update BingoSession: {db_error}", exc_info=True)
-                                else:
-                                    logger.warning(f"Task {task_id}: No session_id in metadata - cannot update database")
-                                
-                            except Exception as session_error:
-                                logger.warning(f"Task {task_id}: Could not upload session file: {session_error}")
-                        
-                        task_model.result = {
-                            'pdf_url': public_url,
-                            'session_url': session_json_url,
-                            'session_data': session_data,  # Include full session data in response
-                            'session_id': task_model.metadata.get('session_id') if task_model.metadata else None,
-                            'filename': latest_pdf.name,
-                            'message': 'Cards generated and uploaded successfully'
-                        }
-                        logger.info(f"Task {task_id}: SUCCESS - Uploaded to {public_url}")
-                        
-                    except Exception as upload_error:
-                        # If upload fails, still provide local path as fallback
-                        logger.error(f"Task {task_id}: Upload failed - {upload_error}")
-                        task_model.result = {
-                            'pdf_url': f'/api/cards/{latest_pdf.name}',
-                            'filename': latest_pdf.name,
-                            'message': 'Cards generated but upload failed',
-                            'error': str(upload_error)
-                        }
-                else:
+                        # Try to extract percentage from line
+                        if '%' in line:
+                            pct_str = line.split('%')[0].split()[-1]
+                            progress = int(float(pct_str))
+                            # Pushed to stream clients at once, written to the DB coalesced
+                            task_progress.update(task_id, progress=min(progress, 95))  # Cap at 95 until complete
+                    except (ValueError, IndexError):
+                        pass
+
+        # Capture any remaining stderr
+        stderr = process.stderr.read()
+        if stderr:
+            stderr_lines.append(stderr)
+            logger.warning(f"Task {task_id}: stderr: {stderr}")
+
+        # Wait for completion
+        return_code = process.wait()
+        record('card', 'generate', time.perf_counter() - generate_start, 'ok' if return_code == 0 else 'error')
+        for stage, seconds in artefacts.get('timings', {}).items():
+            record('card', stage, seconds)
+
+        if return_code == 0:
+            # Success - publish the generated PDF
+            task_model.progress = 100
+            task_model.status = 'completed'
+
+            session_id = task_model.metadata.get('session_id') if task_model.metadata else None
+            published = None
+            generation = _generation_stats(artefacts)
+
+            try:
+                if pipeline is None:
+                    raise RuntimeError('Storage backend unavailable')
+                with span('card', 'upload'):
+                    if pipeline.started:
+                        published = pipeline.finish()
+                    else:
+                        published = _publish_after_run(task_id, pipeline.storage, artefacts)
+
+                if published is None:
                     task_model.result = {
                         'message': 'Cards generated but PDF not found'
                     }
                     logger.warning(f"Task {task_id}: Completed but no PDF found")
-                
-                task_model.completed_at = timezone.now()
-                task_model.save(update_fields=['progress', 'status', 'result', 'completed_at'])
-                
-            else:
-                # Failed
-                error_msg = f"Card generation failed with return code {return_code}"
-                if stderr_lines:
-                    error_msg += f": {' '.join(stderr_lines)}"
-                
-                task_model.status = 'failed'
-                task_model.error = error_msg
-                task_model.completed_at = timezone.now()
-                task_model.save(update_fields=['status', 'error', 'completed_at'])
-                
-                logger.error(f"Task {task_id}: FAILED - {error_msg}")
-                
-        except Exception as e:
-            logger.error(f"Task {task_id}: ERROR - {e}", exc_info=True)
-            task_model.status = 'failed'
-            task_model.error = str(e)
+                else:
+                    public_url = published['pdf_url']
+                    session_data = published['session_data']
+                    if session_data is not None:
+                        _update_bingo_session(task_id, session_id, session_data, public_url)
+
+                    task_model.result = {
+                        'pdf_url': public_url,
+                        'session_url': published['session_url'],
+                        'session_data': session_data,  # Include full session data in response
+                        'session_id': session_id,
+                        'filename': published['pdf_path'].name,
+                        'storage_key': published['pdf_key'],
+                        'message': 'Cards generated and uploaded successfully',
+                        **generation
+                    }
+                    logger.info(f"Task {task_id}: SUCCESS - Uploaded to {public_url}")
+
+            except Exception as upload_error:
+                # If upload fails, still provide local path as fallback
+                logger.error(f"Task {task_id}: Upload failed - {upload_error}")
+                pdf_path = Path(artefacts['pdf_file']) if artefacts.get('pdf_file') else None
+
+                if pdf_path is None or not pdf_path.exists():
+                    task_model.result = {
+                        'message': 'Cards generated but PDF not found'
+                    }
+                else:
+                    local_url = f'/api/cards/{pdf_path.name}'
+                    if pipeline is not None and pipeline.session_data is not None:
+                        pipeline.session_data['pdf_url'] = local_url
+                        _save_session_file(pipeline.session_file, pipeline.session_data)
+                    task_model.result = {
+                        'pdf_url': local_url,
+                        'filename': pdf_path.name,
+                        'message': 'Cards generated but upload failed',
+                        'error': str(upload_error),
+                        **generation
+                    }
+
+            task_model.result['timings'] = timings.as_dict()
             task_model.completed_at = timezone.now()
-            task_model.save(update_fields=['status', 'error', 'completed_at'])
-    
-    # Start background thread
-    thread = threading.Thread(target=background_task, daemon=True)
-    thread.start()
-    
-    logger.info(f"Task {task_id}: Background thread started")
+            task_model.save(update_fields=['progress', 'status', 'result', 'completed_at'])
+            schedule_card_cleanup()
+
+        else:
+            error_msg = f"Card generation failed with return code {return_code}"
+            if stderr_lines:
+                error_msg += f": {' '.join(stderr_lines)}"
+            raise RuntimeError(error_msg)
+
+    except Exception:
+        # The queue retries or fails the job; never publish a partial PDF
+        if pipeline is not None:
+            pipeline.abort()
+        raise
+
+
+def run_card_generation_task(task_id: str, task_model, cmd: list, base_dir: Path) -> None:
+    """
+    Queue card generation for a worker
+
+    Args:
+        task_id: Unique task identifier
+        task_model: TaskStatus model instance
+        cmd: Command list to execute
+        base_dir: Base directory for command execution
+
+    Raises:
+        JobQueueFull: Too many card jobs are waiting (the task is marked failed)
+    """
+    enqueue(task_model, {'cmd': [str(arg) for arg in cmd], 'base_dir': str(base_dir)})
+
+
+def execute_card_cleanup(task_model) -> None:
+    """
+    Prune generated card files past their retention period (job queue handler)
+
+    Args:
+        task_model: Claimed TaskStatus; payload may hold 'max_age_days'
+    """
+    pruned = CardGenerationService().prune_outputs(**(task_model.payload or {}))
+    task_model.status = 'completed'
+    task_model.progress = 100
+    task_model.result = {
+        'deleted': len(pruned['deleted']),
+        'freed_bytes': pruned['freed_bytes'],
+        'kept': pruned['kept'],
+    }
+    task_model.completed_at = timezone.now()
+    task_model.save(update_fields=['status', 'progress', 'result', 'completed_at'])
+
+
+def schedule_card_cleanup() -> Optional[str]:
+    """
+    Queue a cleanup job unless one was queued within CARD_CLEANUP_INTERVAL_HOURS
+
+    Returns:
+        str: Task ID of the queued job, or None
+    """
+    since = timezone.now() - timedelta(hours=AppConfig.CARD_CLEANUP_INTERVAL_HOURS)
+    try:
+        if TaskStatus.objects.filter(task_type='card_cleanup', started_at__gte=since).exists():
+            return None
+        task = TaskStatus.objects.create(task_id=str(uuid.uuid4()), task_type='card_cleanup')
+        enqueue(task, {})
+    except JobQueueFull:
+        return None
+    except Exception as e:
+        # Never fails the generation job that scheduled it
+        logger.warning(f"Could not queue card cleanup: {e}")
+        return None
+    return task.task_id
+
+
+register_job_type(
+    'card_generation',
+    execute_card_generation,
+    concurrency=AppConfig.JOB_CONCURRENCY_CARD_GENERATION,
+    max_attempts=2,
+    priority=10  # A host is waiting to start the game
+)
+
+register_job_type(
+    'card_cleanup',
+    execute_card_cleanup,
+    concurrency=1,
+    priority=-10  # Only when no generation is waiting
+)
@@ -0,0 +1,418 @@
+"""
+Job Queue - Durable background jobs on top of TaskStatus
+Queued jobs are TaskStatus rows with a payload; workers (a thread in each
+web process, or `python manage.py run_jobs`) claim them with a leased
+compare-and-set UPDATE, so the queue works on SQLite and Postgres with
+no extra services and survives worker restarts
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from django.db import close_old_connections, connection
+from django.db.models import Count, F, Q
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from api.models import TaskStatus
+from api.utils.config import AppConfig
+from api.utils.log_control import refresh_levels
+from api.utils.metrics import registry, span
+from .task_progress import task_progress
+
+logger = logging.getLogger(__name__)
+
+# task_type -> {'handler', 'concurrency', 'max_attempts', 'priority'}
+JOB_TYPES: Dict[str, Dict[str, Any]] = {}
+
+
+class JobQueueFull(Exception):
+    """Raised when a job type already has JOB_MAX_QUEUED jobs waiting"""
+
+    def __init__(self, task_type: str, waiting: int):
+        self.task_type = task_type
+        self.waiting = waiting
+        self.retry_after = AppConfig.JOB_RETRY_BACKOFF_SECONDS * 3
+        super().__init__(f"Too many {task_type.replace('_', ' ')} jobs waiting ({waiting}), try again shortly")
+
+
+def register_job_type(
+    task_type: str,
+    handler: Callable[[TaskStatus], None],
+    concurrency: int = 1,
+    max_attempts: int = 1,
+    priority: int = 0
+) -> None:
+    """
+    Register the handler that runs jobs of a task type
+
+    Args:
+        task_type: TaskStatus.task_type the handler runs
+        handler: Called with the claimed TaskStatus; marks it completed or
+            raises (the queue then retries or fails the job)
+        concurrency: Jobs of this type running at once across all workers
+        max_attempts: Claims before a failing job is given up
+        priority: Default priority (higher is claimed first)
+    """
+    JOB_TYPES[task_type] = {
+        'handler': handler,
+        'concurrency': concurrency,
+        'max_attempts': max_attempts,
+        'priority': priority,
+    }
+
+
+# ============================================================================
+# Admission and enqueueing
+# ============================================================================
+
+def _waiting(task_type: str):
+    return TaskStatus.objects.filter(task_type=task_type, status='pending', available_at__isnull=False)
+
+
+def admit(task_type: str) -> None:
+    """
+    Check a new job of this type would be accepted
+
+    Raises:
+        JobQueueFull: If JOB_MAX_QUEUED jobs of the type are already waiting
+    """
+    waiting = _waiting(task_type).count()
+    if waiting >= AppConfig.JOB_MAX_QUEUED:
+        raise JobQueueFull(task_type, waiting)
+
+
+def enqueue(task: TaskStatus, payload: Dict[str, Any], priority: Optional[int] = None) -> TaskStatus:
+    """
+    Queue a job for its TaskStatus row
+
+    Args:
+        task: Saved TaskStatus whose task_type has a registered handler
+        payload: JSON arguments for the handler (stored on the row)
+        priority: Overrides the job type's default priority
+
+    Returns:
+        TaskStatus: The queued task
+
+    Raises:
+        JobQueueFull: The queue is full; the task is marked failed
+    """
+    job_type = JOB_TYPES[task.task_type]
+    try:
+        admit(task.task_type)
+    except JobQueueFull as e:
+        task.status = 'failed'
+        task.error = str(e)
+        task.completed_at = timezone.now()
+        task.save(update_fields=['status', 'error', 'completed_at'])
+        raise
+
+    task.status = 'pending'
+    task.payload = payload
+    task.priority = job_type['priority'] if priority is None else priority
+    task.attempts = 0
+    task.max_attempts = job_type['max_attempts']
+    task.available_at = timezone.now()
+    task.save(update_fields=['status', 'payload', 'priority', 'attempts', 'max_attempts', 'available_at'])
+    logger.info(f"Task {task.task_id}: Queued {task.task_type} (priority {task.priority})")
+
+    ensure_worker()
+    return task
+
+
+def queue_position(task: TaskStatus) -> Optional[int]:
+    """1-based position of a waiting job among jobs of its type, None if not waiting"""
+    if task.status != 'pending' or task.available_at is None:
+        return None
+    ahead = _waiting(task.task_type).filter(
+        Q(priority__gt=task.priority) |
+        Q(priority=task.priority, available_at__lt=task.available_at)
+    ).count()
+    return ahead + 1
+
+
+# ============================================================================
+# Claiming, completion and recovery
+# ============================================================================
+
+def _running(task_types: Iterable[str]):
+    # Finished jobs clear their lease; expired leases still count until recovered
+    return TaskStatus.objects.filter(
+        task_type__in=list(task_types), status='processing', lease_expires_at__isnull=False
+    ).order_by()
+
+
+def claim_next(worker_id: str, task_types: Optional[Iterable[str]] = None) -> Optional[TaskStatus]:
+    """
+    Claim the highest-priority runnable job whose type has a free slot
+
+    Returns:
+        TaskStatus: The claimed job (status 'processing', leased to worker_id), or None
+    """
+    task_types = [t for t in (task_types or JOB_TYPES) if t in JOB_TYPES]
+    running = dict(_running(task_types).values('task_type').annotate(n=Count('task_id')).values_list('task_type', 'n'))
+    open_types = [t for t in task_types if running.get(t, 0) < JOB_TYPES[t]['concurrency']]
+    if not open_types:
+        return None
+
+    now = timezone.now()
+    candidates = TaskStatus.objects.filter(
+        status='pending', available_at__lte=now, task_type__in=open_types
+    ).order_by('-priority', 'available_at').values_list('task_id', 'task_type')[:10]
+
+    for task_id, task_type in candidates:
+        claimed = TaskStatus.objects.filter(task_id=task_id, status='pending').update(
+            status='processing',
+            worker_id=worker_id,
+            attempts=F('attempts') + 1,
+            current_step='',
+            claimed_at=Now(),
+            lease_expires_at=now + timedelta(seconds=AppConfig.JOB_LEASE_SECONDS)
+        )
+        if not claimed:
+            continue  # Another worker got it first
+
+        # Workers racing for the last slot all see the same running set:
+        # the earliest claims keep their slots, the rest go back to the queue
+        limit = JOB_TYPES[task_type]['concurrency']
+        keep = _running([task_type]).order_by('claimed_at', 'task_id').values_list('task_id', flat=True)[:limit]
+        if task_id not in list(keep):
+            TaskStatus.objects.filter(task_id=task_id, worker_id=worker_id, status='processing').update(
+                status='pending', worker_id='', attempts=F('attempts') - 1, lease_expires_at=None
+            )
+            continue
+
+        return TaskStatus.objects.get(task_id=task_id)
+    return None
+
+
+def _retry_or_fail(task: TaskStatus, error: str, **guard) -> int:
+    """Requeue a failed attempt with exponential backoff, or fail the job for good"""
+    now = timezone.now()
+    if task.attempts < task.max_attempts:
+        delay = AppConfig.JOB_RETRY_BACKOFF_SECONDS * 2 ** max(task.attempts - 1, 0)
+        changes = {
+            'status': 'pending',
+            'progress': 0,
+            'current_step': f'Retrying (attempt {task.attempts + 1} of {task.max_attempts})',
+            'available_at': now + timedelta(seconds=delay),
+        }
+        logger.warning(f"Task {task.task_id}: Attempt {task.attempts} failed, retrying in {delay}s - {error}")
+    else:
+        changes = {'status': 'failed', 'completed_at': now}
+        logger.error(f"Task {task.task_id}: FAILED after {task.attempts} attempt(s) - {error}")
+    return TaskStatus.objects.filter(task_id=task.task_id, **guard).update(
+        error=error, worker_id='', lease_expires_at=None, **changes
+    )
+
+
+def recover_expired_leases() -> int:
+    """
+    Requeue (or fail) jobs whose worker stopped renewing the lease
+
+    Returns:
+        int: Jobs recovered
+    """
+    recovered = 0
+    for task in TaskStatus.objects.filter(status='processing', lease_expires_at__lt=timezone.now()):
+        error = f"Worker {task.worker_id or 'unknown'} stopped while running the job"
+        # Guarded on the old lease, so only one recovering worker wins
+        recovered += _retry_or_fail(task, error, status='processing', lease_expires_at=task.lease_expires_at)
+    return recovered
+
+
+def host_saturated() -> Optional[str]:
+    """Why this machine should not start another job now, or None"""
+    try:
+        import psutil
+        free_mb = psutil.virtual_memory().available / (1024 * 1024)
+        if free_mb < AppConfig.JOB_MIN_FREE_MEMORY_MB:
+            return f'{free_mb:.0f} MB memory free'
+    except ImportError:
+        pass
+    try:
+        load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        if load > AppConfig.JOB_MAX_LOAD_PER_CPU:
+            return f'load {load:.2f} per CPU'
+    except (AttributeError, OSError):
+        pass  # No load average on this platform
+    return None
+
+
+# ============================================================================
+# Workers
+# ============================================================================
+
+class JobWorker:
+    """
+    Claims and runs queued jobs
+
+    Features:
+    - Per-type concurrency limits hold across all workers and processes
+      (they are counted from the database, not per worker)
+    - Leases are renewed by a heartbeat thread while jobs run; jobs of a
+      worker that died are requeued once their lease expires
+    - Failed attempts are retried with exponential backoff up to the job
+      type's max_attempts
+    - No new jobs are started while memory or load are over the admission
+      thresholds; they wait in the queue instead
+    """
+
+    def __init__(self, task_types: Optional[Iterable[str]] = None, threads: Optional[int] = None,
+                 worker_id: Optional[str] = None):
+        """
+        Initialize Job Worker
+
+        Args:
+            task_types: Job types this worker runs (default: all registered)
+            threads: Jobs run at once by this worker (default: sum of the types' concurrency)
+            worker_id: Lease owner name (default: host:pid:random)
+        """
+        self.task_types: List[str] = list(task_types or JOB_TYPES)
+        self.threads = threads or sum(JOB_TYPES[t]['concurrency'] for t in self.task_types) or 1
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.stop_event = threading.Event()
+        self._active: Set[str] = set()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._next_recovery = 0.0
+
+    def run_once(self) -> Optional[str]:
+        """
+        Claim and run one job in the calling thread
+
+        Returns:
+            str: ID of the job that ran, or None if nothing was runnable
+        """
+        now = timezone.now().timestamp()
+        if now >= self._next_recovery:
+            self._next_recovery = now + AppConfig.JOB_LEASE_SECONDS / 2
+            recover_expired_leases()
+
+        reason = host_saturated()
+        if reason:
+            logger.debug(f"Worker {self.worker_id}: Not starting jobs ({reason})")
+            return None
+
+        task = claim_next(self.worker_id, self.task_types)
+        if task is None:
+            return None
+        self._run(task)
+        return task.task_id
+
+    def _run(self, task: TaskStatus) -> None:
+        logger.info(f"Task {task.task_id}: Claimed by {self.worker_id} (attempt {task.attempts})")
+        with self._lock:
+            self._active.add(task.task_id)
+        task_progress.publish(task)
+        try:
+            with span('job', task.task_type):
+                JOB_TYPES[task.task_type]['handler'](task)
+        except Exception as e:
+            logger.error(f"Task {task.task_id}: ERROR - {e}", exc_info=True)
+            _retry_or_fail(task, str(e), worker_id=self.worker_id)
+        else:
+            mine = TaskStatus.objects.filter(task_id=task.task_id, worker_id=self.worker_id)
+            # Handlers normally mark the task completed themselves
+            mine.filter(status='processing').update(status='completed', progress=100, completed_at=timezone.now())
+            mine.update(lease_expires_at=None)
+        finally:
+            with self._lock:
+                self._active.discard(task.task_id)
+        task.refresh_from_db()
+        task_progress.publish(task)
+
+    def heartbeat(self) -> int:
+        """Extend the leases of the jobs this worker is running"""
+        with self._lock:
+            active = list(self._active)
+        if not active:
+            return 0
+        return TaskStatus.objects.filter(
+            task_id__in=active, worker_id=self.worker_id, status='processing'
+        ).update(lease_expires_at=timezone.now() + timedelta(seconds=AppConfig.JOB_LEASE_SECONDS))
+
+    def _loop(self) -> None:
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                refresh_levels()
+                try:
+                    ran = self.run_once()
+                except Exception as e:
+                    logger.error(f"Worker {self.worker_id}: Queue error - {e}", exc_info=True)
+                    ran = None
+                if not ran:
+                    _wakeup.wait(AppConfig.JOB_POLL_SECONDS)
+                    _wakeup.clear()
+        finally:
+            connection.close()
+
+    def _heartbeat_loop(self) -> None:
+        try:
+            while not self.stop_event.wait(AppConfig.JOB_LEASE_SECONDS / 3):
+                close_old_connections()
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    logger.warning(f"Worker {self.worker_id}: Could not renew leases - {e}")
+        finally:
+            connection.close()
+
+    def start(self) -> None:
+        """Start the worker and heartbeat threads"""
+        logger.info(f"Worker {self.worker_id}: Running {', '.join(self.task_types)} with {self.threads} thread(s)")
+        for i in range(self.threads):
+            self._threads.append(threading.Thread(target=self._loop, name=f'job-worker-{i}', daemon=True))
+        self._threads.append(threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming jobs and wait for running ones to finish"""
+        self.stop_event.set()
+        _wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+
+def _queue_metrics() -> str:
+    """Waiting and running jobs per type (computed when /metrics is scraped)"""
+    counts = {(task_type, status): 0 for task_type in JOB_TYPES for status in ('pending', 'processing')}
+    rows = TaskStatus.objects.filter(
+        task_type__in=list(JOB_TYPES), status__in=('pending', 'processing')
+    ).values('task_type', 'status').annotate(n=Count('task_id')).order_by()
+    for row in rows:
+        counts[(row['task_type'], row['status'])] = row['n']
+
+    lines = ['# HELP music_bingo_jobs Queued (pending) and running (processing) jobs',
+             '# TYPE music_bingo_jobs gauge']
+    for (task_type, status), n in sorted(counts.items()):
+        lines.append(f'music_bingo_jobs{{task_type="{task_type}",status="{status}"}} {n}')
+    return '\n'.join(lines)
+
+
+registry.add_collector(_queue_metrics)
+
+
+# Embedded worker for this process (JOB_WORKER_MODE=embedded)
+_embedded_worker: Optional[JobWorker] = None
+_embedded_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def ensure_worker() -> None:
+    """Start this process's embedded worker if configured, and wake it"""
+    global _embedded_worker
+    if AppConfig.JOB_WORKER_MODE != 'embedded':
+        return
+    with _embedded_lock:
+        if _embedded_worker is None:
+            _embedded_worker = JobWorker()
+            _embedded_worker.start()
+    _wakeup.set()
@@ -0,0 +1,304 @@
+"""
+Task Progress Bus - Live progress for background jobs
+Running jobs report progress in memory; it is pushed to stream subscribers
+at once and written to TaskStatus at most once per persist interval, so
+clients get smooth progress without a database write per update
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from api.models import TaskStatus
+from api.utils.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ('completed', 'failed')
+
+
+def task_status_payload(task: TaskStatus) -> Dict[str, Any]:
+    """Client view of a task (GET /api/tasks/<id> and its stream)"""
+    end = task.completed_at or timezone.now()
+    payload = {
+        'task_id': task.task_id,
+        'status': task.status,
+        'progress': task.progress,
+        'elapsed_time': round((end - task.started_at).total_seconds(), 2)
+    }
+
+    if task.current_step:
+        payload['current_step'] = task.current_step
+
+    if task.status == 'completed' and task.result:
+        payload['result'] = task.result
+    elif task.status == 'failed' and task.error:
+        payload['error'] = task.error
+    elif task.status == 'pending':
+        from .job_queue import queue_position
+        payload['queue_position'] = queue_position(task)
+
+    return payload
+
+
+class TaskProgressBus:
+    """
+    In-process publish/subscribe bus for task progress
+
+    Features:
+    - update() keeps a running job's latest progress in memory and pushes
+      it to this process's subscribers immediately
+    - Progress is persisted at most once per persist_interval per task:
+      the first update is written at once, later ones coalesce into one
+      trailing write of the latest value; status changes (claimed,
+      retried, finished) are written by the job queue and handlers
+    - Subscribers to jobs running in other processes are fed by one
+      watcher thread polling all of them in a single query
+    - Slow clients only ever hold the latest few events (bounded queues)
+    """
+
+    # Seconds between cross-process checks
+    POLL_INTERVAL = 1.0
+
+    # Events buffered per subscriber before the oldest is dropped
+    SUBSCRIBER_BUFFER = 16
+
+    def __init__(self, persist_interval: Optional[float] = None, watch: bool = True):
+        """
+        Initialize Task Progress Bus
+
+        Args:
+            persist_interval: Minimum seconds between progress writes per task
+            watch: Run the cross-process watcher thread
+        """
+        self.persist_interval = (
+            persist_interval if persist_interval is not None else AppConfig.TASK_PROGRESS_PERSIST_MS / 1000
+        )
+        self.watch = watch
+        self._lock = threading.Lock()
+        self._running: Dict[str, Dict[str, Any]] = {}  # task_id -> live state of jobs in this process
+        self._subscribers = defaultdict(set)            # task_id -> {queue.Queue}
+        self._sent: Dict[str, tuple] = {}               # task_id -> last (status, progress, step) sent
+        self._watcher: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Publishing (job side)
+    # ------------------------------------------------------------------
+
+    def update(self, task_id: str, progress: Optional[int] = None, current_step: Optional[str] = None) -> None:
+        """
+        Report progress of a running job
+
+        Args:
+            task_id: Task identifier
+            progress: Percentage (0-100)
+            current_step: Step name shown to clients
+        """
+        with self._lock:
+            state = self._running.get(task_id)
+            if state is None:
+                state = self._running[task_id] = self._new_state(task_id)
+            if progress is not None:
+                state['progress'] = progress
+            if current_step is not None:
+                state['current_step'] = current_step
+            state['dirty'] = True
+
+            wait = state['persisted_at'] + self.persist_interval - time.monotonic()
+            persist_now = wait <= 0 and state['timer'] is None
+            if wait > 0 and state['timer'] is None:
+                state['timer'] = threading.Timer(wait, self._timed_persist, args=(task_id,))
+                state['timer'].daemon = True
+                state['timer'].start()
+            event = self._state_payload(state)
+
+        self._broadcast(task_id, event)
+        if persist_now:
+            self._persist(task_id)
+
+    def publish(self, task: TaskStatus) -> None:
+        """
+        Push a task's saved state (after a status change) to subscribers
+
+        Processing tasks keep their live state here; anything else drops it,
+        along with any progress write still pending.
+        """
+        with self._lock:
+            if task.status == 'processing':
+                state = self._running.get(task.task_id) or self._new_state(task.task_id)
+                state.update(progress=task.progress, current_step=task.current_step, started_at=task.started_at)
+                self._running[task.task_id] = state
+            else:
+                state = self._running.pop(task.task_id, None)
+                if state and state['timer'] is not None:
+                    state['timer'].cancel()
+        self._broadcast(task.task_id, task_status_payload(task))
+
+    def flush(self) -> None:
+        """Write every pending progress update now"""
+        with self._lock:
+            pending = [task_id for task_id, state in self._running.items() if state['dirty']]
+        for task_id in pending:
+            self._persist(task_id)
+
+    def _new_state(self, task_id: str) -> Dict[str, Any]:
+        return {
+            'task_id': task_id,
+            'progress': 0,
+            'current_step': '',
+            'started_at': None,
+            'dirty': False,
+            'persisted_at': 0.0,
+            'timer': None,
+        }
+
+    @staticmethod
+    def _state_payload(state: Dict[str, Any]) -> Dict[str, Any]:
+        payload = {
+            'task_id': state['task_id'],
+            'status': 'processing',
+            'progress': state['progress'],
+        }
+        if state['started_at']:
+            payload['elapsed_time'] = round((timezone.now() - state['started_at']).total_seconds(), 2)
+        if state['current_step']:
+            payload['current_step'] = state['current_step']
+        return payload
+
+    def _persist(self, task_id: str) -> int:
+        with self._lock:
+            state = self._running.get(task_id)
+            if state is None or not state['dirty']:
+                return 0
+            state['dirty'] = False
+            state['persisted_at'] = time.monotonic()
+            state['timer'] = None
+            fields = {'progress': state['progress'], 'current_step': state['current_step']}
+        # Never overwrite a final state saved in the meantime
+        return TaskStatus.objects.filter(task_id=task_id, status='processing').update(**fields)
+
+    def _timed_persist(self, task_id: str) -> None:
+        try:
+            self._persist(task_id)
+        except Exception as e:
+            logger.error(f"Task {task_id}: Progress write failed - {e}")
+        finally:
+            connection.close()
+
+    # ------------------------------------------------------------------
+    # Subscribers (stream side)
+    # ------------------------------------------------------------------
+
+    def subscribe(self, task: TaskStatus) -> queue.Queue:
+        """
+        Register a client for a task's progress
+
+        The returned queue starts with the task's current state.
+
+        Returns:
+            queue.Queue: Status payloads for this subscriber
+        """
+        subscriber = queue.Queue(maxsize=self.SUBSCRIBER_BUFFER)
+        with self._lock:
+            state = self._running.get(task.task_id)
+            if state is not None:
+                subscriber.put_nowait(self._state_payload(state))
+            else:
+                subscriber.put_nowait(task_status_payload(task))
+                self._sent[task.task_id] = (task.status, task.progress, task.current_step)
+            self._subscribers[task.task_id].add(subscriber)
+            self._start_watcher()
+        return subscriber
+
+    def unsubscribe(self, task_id: str, subscriber: queue.Queue) -> None:
+        """Remove a client; forget the task once nobody is watching it"""
+        with self._lock:
+            subscribers = self._subscribers.get(task_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[task_id]
+                self._sent.pop(task_id, None)
+
+    def subscriber_count(self, task_id: Optional[str] = None) -> int:
+        """Number of connected clients (for one task or all)"""
+        with self._lock:
+            if task_id is not None:
+                return len(self._subscribers.get(task_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def _broadcast(self, task_id: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(task_id)
+            if not subscribers:
+                return
+            self._sent[task_id] = (event['status'], event['progress'], event.get('current_step', ''))
+            for subscriber in subscribers:
+                if subscriber.full():
+                    # Drop the oldest event; every event carries the full state
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+                subscriber.put_nowait(event)
+
+    # ------------------------------------------------------------------
+    # Cross-process watcher
+    # ------------------------------------------------------------------
+
+    def _start_watcher(self) -> None:
+        """Start the watcher thread if needed (caller holds the lock)"""
+        if not self.watch or (self._watcher and self._watcher.is_alive()):
+            return
+        self._watcher = threading.Thread(target=self._watch_tasks, name='task-progress-watcher', daemon=True)
+        self._watcher.start()
+
+    def check_remote(self) -> int:
+        """
+        Push changes to watched tasks that run in other processes
+
+        Returns:
+            int: Events broadcast
+        """
+        with self._lock:
+            remote = [task_id for task_id in self._subscribers if task_id not in self._running]
+            sent = dict(self._sent)
+        if not remote:
+            return 0
+
+        changed = 0
+        for task in TaskStatus.objects.filter(task_id__in=remote):
+            if (task.status, task.progress, task.current_step) != sent.get(task.task_id):
+                self._broadcast(task.task_id, task_status_payload(task))
+                changed += 1
+        return changed
+
+    def _watch_tasks(self) -> None:
+        """Poll every watched remote task in one query"""
+        try:
+            while True:
+                time.sleep(self.POLL_INTERVAL)
+                with self._lock:
+                    if not self._subscribers:
+                        self._watcher = None
+                        return
+                try:
+                    close_old_connections()
+                    self.check_remote()
+                except Exception as e:
+                    logger.error(f"Task progress watcher error: {e}", exc_info=True)
+        finally:
+            connection.close()
+
+
+# Shared bus for this process; pending progress is written at exit
+task_progress = TaskProgressBus()
+atexit.register(task_progress.flush)
@@ -0,0 +1,103 @@
+import shutil
+import unittest
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from api import audio_mixer
+
+
+def _tone(seconds, freq=440.0, amplitude=0.5, sample_rate=audio_mixer.SAMPLE_RATE):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    mono = (np.sin(2 * np.pi * freq * t) * amplitude).astype(np.float32)
+    return np.stack([mono, mono], axis=1)
+
+
+class PCMOperationsTest(SimpleTestCase):
+    def test_gain_matches_decibels(self):
+        pcm = np.full((10, 2), 0.5, dtype=np.float32)
+        louder = audio_mixer.apply_gain(pcm, 6)
+        self.assertAlmostEqual(float(louder[0, 0]), 0.5 * 10 ** (6 / 20), places=5)
+
+    def test_fades_ramp_from_and_to_silence(self):
+        pcm = np.ones((44100, 2), dtype=np.float32)
+        faded = audio_mixer.apply_fades(pcm, fade_in_ms=100, fade_out_ms=100)
+        self.assertEqual(faded[0, 0], 0.0)
+        self.assertEqual(faded[22050, 0], 1.0)
+        self.assertLess(faded[-1, 0], 0.001)
+        # Input untouched
+        self.assertEqual(pcm[0, 0], 1.0)
+
+    def test_loop_to_length_tiles_and_trims(self):
+        pcm = np.arange(6, dtype=np.float32).reshape(3, 2)
+        looped = audio_mixer.loop_to_length(pcm, 7)
+        self.assertEqual(len(looped), 7)
+        np.testing.assert_array_equal(looped[3], pcm[0])
+        self.assertEqual(len(audio_mixer.loop_to_length(pcm, 2)), 2)
+
+    def test_overlay_keeps_base_length_and_clips(self):
+        base = np.full((100, 2), 0.8, dtype=np.float32)
+        top = np.full((50, 2), 0.5, dtype=np.float32)
+        mixed = audio_mixer.overlay(base, top, position=75)
+        self.assertEqual(len(mixed), 100)
+        self.assertEqual(mixed[74, 0], np.float32(0.8))
+        self.assertEqual(mixed[80, 0], 1.0)
+
+    def test_mix_pcm_extends_music_to_tts_length(self):
+        tts = _tone(2.0, freq=880)
+        music = _tone(0.5)
+        mixed = audio_mixer.mix_pcm(tts, music)
+        self.assertEqual(len(mixed), len(tts))
+        self.assertEqual(audio_mixer.duration_ms(mixed), 2000)
+
+
+@unittest.skipUnless(shutil.which('ffmpeg'), 'ffmpeg not installed')
+class MP3RoundTripTest(SimpleTestCase):
+    def test_render_jingle_reports_durations_without_redecoding(self):
+        tts_bytes = audio_mixer.encode_mp3(_tone(1.0, freq=880))
+        music_bytes = audio_mixer.encode_mp3(_tone(3.0))
+
+        result = audio_mixer.render_jingle(tts_bytes, music_bytes)
+
+        self.assertTrue(result['audio_bytes'])
+        # MP3 encoder padding adds a few ms either side
+        self.assertAlmostEqual(result['duration_ms'], result['music_duration_ms'], delta=1)
+        self.assertAlmostEqual(result['tts_duration_ms'], 1000, delta=100)
+
+
+class DuckingTest(SimpleTestCase):
+    def _voice_with_gap(self):
+        # 1s speech, 1s silence, 1s speech
+        voice = _tone(3.0, freq=880, amplitude=0.3)
+        voice[44100:88200] = 0.0
+        return voice
+
+    def test_envelope_separates_speech_from_silence(self):
+        envelope = audio_mixer.rms_envelope(self._voice_with_gap())
+        self.assertEqual(len(envelope), 300)
+        self.assertGreater(envelope[50], audio_mixer.DUCK_THRESHOLD_DB)
+        self.assertLess(envelope[150], audio_mixer.DUCK_THRESHOLD_DB)
+
+    def test_music_is_attenuated_only_under_speech(self):
+        music = np.ones((44100 * 5, 2), dtype=np.float32)
+        ducked = audio_mixer.duck_music(music, self._voice_with_gap(), depth_db=8)
+
+        fully_ducked = 10 ** (-8 / 20)
+        self.assertAlmostEqual(float(ducked[22050, 0]), fully_ducked, places=2)
+        # Release has mostly recovered by the middle of the gap
+        self.assertGreater(float(ducked[44100 + 30000, 0]), 0.9)
+        # Well after the voice ends the music is untouched
+        self.assertEqual(float(ducked[-1, 0]), 1.0)
+
+    def test_attack_is_smoothed(self):
+        music = np.ones((44100, 2), dtype=np.float32)
+        voice = _tone(1.0, freq=880, amplitude=0.3)
+        ducked = audio_mixer.duck_music(music, voice, depth_db=8, attack_ms=50)
+        second_block = float(ducked[661, 0])
+        self.assertLess(second_block, 1.0)
+        self.assertGreater(second_block, 10 ** (-8 / 20))
+
+    def test_zero_depth_disables_ducking(self):
+        music = np.ones((1000, 2), dtype=np.float32)
+        voice = _tone(0.02, amplitude=0.5)
+        self.assertIs(audio_mixer.duck_music(music, voice, depth_db=0), music)
@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import CancelledError
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from api.models import TaskStatus
+from api.services.card_generation_service import CardGenerationService
+from api.services.storage_service import LocalStorageBackend
+from api.tasks import job_queue
+from api.tasks.card_generation_tasks import (
+    CardUploadPipeline, _publish_after_run, parse_generator_line, schedule_card_cleanup
+)
+from api.utils.config import AppConfig
+from api.utils.file_serving import CONTENT_HASH_RE
+
+
+class CardUploadPipelineTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cards_dir = Path(self.tmp.name) / 'cards'
+        self.cards_dir.mkdir()
+        self.storage = LocalStorageBackend(root=Path(self.tmp.name) / 'storage', base_url='/data/storage/')
+        self.task_id = str(uuid.uuid4())
+        self.pipeline = CardUploadPipeline(self.task_id, self.storage)
+
+        self.pdf = self.cards_dir / 'music_bingo_cards_s1.pdf'
+        self.session_file = self.cards_dir / 'session_s1.json'
+        self.session_file.write_text(json.dumps({
+            'venue_name': 'The Crown', 'num_players': 2, 'game_number': 1,
+            'pdf_file': str(self.pdf), 'songs': [{'id': '1'}]
+        }))
+
+    def test_session_uploads_before_pdf_and_pdf_streams(self):
+        self.pipeline.handle_line(f'SESSION_FILE: {self.session_file}')
+        expected_url = f"/data/storage/cards/music_bingo_cards_s1_{self.task_id.replace('-', '')[:16]}_a1.pdf"
+        self.assertEqual(self.pipeline.session_future.result(timeout=5).split('/')[3], 'sessions')
+        self.assertEqual(json.loads(self.session_file.read_text())['pdf_url'], expected_url)
+
+        with open(self.pdf, 'wb') as f:
+            self.pipeline.handle_line(f'PDF_OUTPUT: {self.pdf}')
+            f.write(b'%PDF-1.4 ' + b'x' * 1000)
+        published = self.pipeline.finish()
+
+        self.assertEqual(published['pdf_url'], expected_url)
+        self.assertEqual(published['session_data']['songs'], [{'id': '1'}])
+        self.assertEqual((self.storage.root / published['pdf_key']).read_bytes(), self.pdf.read_bytes())
+
+    def test_pdf_key_is_per_attempt_and_not_immutable(self):
+        retry = CardUploadPipeline(self.task_id, self.storage, attempt=2)
+        self.assertNotEqual(retry.pdf_key(self.pdf), self.pipeline.pdf_key(self.pdf))
+        self.assertIsNone(CONTENT_HASH_RE.search(retry.pdf_key(self.pdf)))
+
+    def test_abort_discards_partial_pdf(self):
+        self.pdf.write_bytes(b'%PDF-1.4 partial')
+        self.pipeline.handle_line(f'PDF_OUTPUT: {self.pdf}')
+        future = self.pipeline.pdf_future
+        self.pipeline.abort()
+        with self.assertRaises((RuntimeError, CancelledError)):
+            future.result(timeout=5)
+        self.assertFalse(self.storage.file_exists(self.pipeline.pdf_key(self.pdf)))
+
+    def test_after_run_publishes_the_announced_files_only(self):
+        self.pdf.write_bytes(b'%PDF-1.4 the crown')
+        # Another venue's PDF, written later, must not be picked up
+        (self.cards_dir / 'music_bingo_cards_s2.pdf').write_bytes(b'%PDF-1.4 the anchor')
+
+        artefacts = {}
+        for line in [f'SESSION_FILE: {self.session_file}', 'Progress 50%',
+                     'GENERATION_RESULT: ' + json.dumps({'pdf_file': str(self.pdf), 'num_cards': 4})]:
+            parse_generator_line(line, artefacts)
+        self.assertEqual(artefacts['num_cards'], 4)
+
+        published = _publish_after_run(self.task_id, self.storage, artefacts)
+        self.assertEqual(published['pdf_path'], self.pdf)
+        self.assertEqual((self.storage.root / published['pdf_key']).read_bytes(), b'%PDF-1.4 the crown')
+        self.assertEqual(published['session_data']['pdf_url'], published['pdf_url'])
+
+        self.assertIsNone(_publish_after_run(self.task_id, self.storage, {}))
+
+
+class CardRetentionTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.service = CardGenerationService()
+        self.service.cards_dir = Path(tmp.name) / 'cards'
+        self.service.logos_dir = Path(tmp.name) / 'logos'
+        self.service.cards_dir.mkdir()
+        self.service.logos_dir.mkdir()
+
+    def _file(self, directory, name, age_days):
+        path = directory / name
+        path.write_bytes(b'x' * 10)
+        mtime = time.time() - age_days * 86400
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_prunes_old_generated_files_only(self):
+        cards, logos = self.service.cards_dir, self.service.logos_dir
+        self._file(cards, 'music_bingo_cards_old.pdf', 10)
+        self._file(cards, 'session_old.json', 10)
+        self._file(logos, 'temp_logo_1.png', 10)
+        keep = [
+            self._file(cards, 'music_bingo_cards_new.pdf', 1),
+            self._file(cards, 'current_session.json', 10),
+            self._file(logos, 'pub_logo.png', 10),
+        ]
+
+        dry = self.service.prune_outputs(max_age_days=7, dry_run=True)
+        self.assertEqual(len(dry['deleted']), 3)
+        self.assertTrue((cards / 'session_old.json').exists())
+
+        pruned = self.service.prune_outputs(max_age_days=7)
+        self.assertEqual(sorted(pruned['deleted']),
+                         ['music_bingo_cards_old.pdf', 'session_old.json', 'temp_logo_1.png'])
+        self.assertEqual((pruned['freed_bytes'], pruned['kept']), (30, 1))
+        self.assertTrue(all(path.exists() for path in keep))
+
+    def test_cleanup_job_is_queued_at_most_once_per_interval(self):
+        with mock.patch.object(AppConfig, 'JOB_WORKER_MODE', 'external'):
+            task_id = schedule_card_cleanup()
+            self.assertIsNotNone(task_id)
+            self.assertIsNone(schedule_card_cleanup())
+
+        with mock.patch.object(job_queue, 'host_saturated', return_value=None), \
+                mock.patch('api.tasks.card_generation_tasks.CardGenerationService', return_value=self.service):
+            self._file(self.service.cards_dir, 'session_old.json', 30)
+            job_queue.JobWorker(task_types=['card_cleanup']).run_once()
+
+        task = TaskStatus.objects.get(task_id=task_id)
+        self.assertEqual((task.status, task.result['deleted']), ('completed', 1))
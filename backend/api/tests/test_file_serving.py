@@ -0,0 +1,78 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase
+
+from api.utils.file_serving import cache_control_for, parse_range, serve_data_file
+
+
+def _body(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+class ServeDataFileTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        (self.root / 'jingle.mp3').write_bytes(bytes(range(256)) * 4)
+        self.factory = RequestFactory()
+
+    def _get(self, **headers):
+        request = self.factory.get('/data/jingle.mp3', **headers)
+        return serve_data_file(request, 'jingle.mp3', root=self.root, immutable=True)
+
+    def test_full_response_has_validators_and_cache_headers(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(_body(response)), 1024)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertTrue(response['ETag'])
+        self.assertTrue(response['Last-Modified'])
+
+    def test_byte_range(self):
+        response = self._get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(_body(response), bytes(range(10, 20)))
+
+    def test_unsatisfiable_range(self):
+        response = self._get(HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_if_none_match_returns_304(self):
+        etag = self._get()['ETag']
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_stale_if_range_serves_whole_file(self):
+        response = self._get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_traversal_is_rejected(self):
+        request = self.factory.get('/data/x')
+        with self.assertRaises(Http404):
+            serve_data_file(request, '../secret.txt', root=self.root / 'sub')
+
+    def test_accel_redirect_delegates_to_nginx(self):
+        with mock.patch('api.utils.file_serving.AppConfig.DATA_DIR', self.root), \
+                mock.patch('api.utils.file_serving.AppConfig.DATA_ACCEL_REDIRECT_PREFIX', '/protected-data/'):
+            response = self._get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-data/jingle.mp3')
+        self.assertEqual(response.content, b'')
+
+    def test_parse_range_forms(self):
+        self.assertEqual(parse_range('bytes=-100', 1024), (924, 1023))
+        self.assertEqual(parse_range('bytes=1000-2000', 1024), (1000, 1023))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1024))
+
+    def test_only_hash_suffixes_are_immutable(self):
+        self.assertIn('immutable', cache_control_for('cards_3f2a9c1e0b7d4a6f.pdf'))
+        self.assertNotIn('immutable', cache_control_for('jingle_1736812345678901.mp3'))
+        self.assertNotIn('immutable', cache_control_for('jingle_1736812345.mp3'))
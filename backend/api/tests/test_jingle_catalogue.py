@@ -0,0 +1,97 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.models import Jingle
+from api.services.jingle_service import JingleService
+
+
+class JingleCatalogueTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = JingleService(
+            tts_service=mock.Mock(),
+            music_service=mock.Mock(),
+            storage_service=mock.Mock(),
+            music_bed_cache=mock.Mock(),
+        )
+        self.service.jingles_dir = Path(self.tmp.name)
+        # The catalogue migration imports whatever is in data/jingles
+        Jingle.objects.all().delete()
+
+    def _write_jingle(self, filename, metadata=None):
+        path = self.service.jingles_dir / filename
+        path.write_bytes(b'\xff\xfb' * 100)
+        if metadata is not None:
+            path.with_suffix('.json').write_text(json.dumps(metadata))
+        return path
+
+    def test_sync_imports_files_and_drops_missing(self):
+        self._write_jingle('jingle_1.mp3', {'text': 'Happy hour', 'voiceName': 'Rachel'})
+        self._write_jingle('jingle_2.mp3')
+        Jingle.objects.create(filename='gone.mp3')
+
+        self.assertEqual(self.service.sync_catalog(), {'added': 2, 'removed': 1})
+
+        jingle = Jingle.objects.get(filename='jingle_1.mp3')
+        self.assertEqual(jingle.text, 'Happy hour')
+        self.assertEqual(jingle.size_bytes, 200)
+        self.assertEqual(
+            self.service.get_jingle_metadata('jingle_1.mp3'),
+            {'text': 'Happy hour', 'voiceName': 'Rachel'},
+        )
+
+    def test_sync_command_catalogues_copied_files(self):
+        self._write_jingle('copied.mp3')
+        out = StringIO()
+        with mock.patch('api.management.commands.sync_jingles.JingleService', return_value=self.service):
+            call_command('sync_jingles', stdout=out)
+
+        self.assertTrue(Jingle.objects.filter(filename='copied.mp3').exists())
+        self.assertIn('1 added', out.getvalue())
+
+    def test_listing_pages_and_filters_without_touching_files(self):
+        for i in range(5):
+            Jingle.objects.create(filename=f'jingle_{i}.mp3', text=f'Promo {i}', size_bytes=i)
+        Jingle.objects.create(filename='taco.mp3', music_prompt='mariachi taco tuesday')
+
+        with mock.patch.object(Path, 'glob') as glob:
+            page = self.service.list_jingles(limit=2, offset=1)
+            glob.assert_not_called()
+
+        self.assertEqual(len(page), 2)
+        self.assertEqual(self.service.count_jingles(), 6)
+        self.assertEqual(
+            [j['filename'] for j in self.service.list_jingles(search='TACO')],
+            ['taco.mp3'],
+        )
+        self.assertEqual(page[0]['metadata']['text'][:5], 'Promo')
+
+    def test_delete_removes_file_and_entry(self):
+        self._write_jingle('jingle_1.mp3')
+        self.service.sync_catalog()
+
+        self.assertTrue(self.service.delete_jingle('jingle_1.mp3'))
+        self.assertFalse(Jingle.objects.filter(filename='jingle_1.mp3').exists())
+        self.assertFalse((self.service.jingles_dir / 'jingle_1.mp3').exists())
+        self.assertFalse(self.service.delete_jingle('jingle_1.mp3'))
+
+    def test_save_playlist_validates_against_catalogue(self):
+        Jingle.objects.create(filename='a.mp3')
+        playlist_file = Path(self.tmp.name) / 'jingle_playlist.json'
+
+        with mock.patch('api.services.jingle_service.DATA_DIR', Path(self.tmp.name)):
+            self.assertTrue(self.service.save_playlist(['a.mp3', 'missing.mp3'], True, 2))
+            self.assertEqual(self.service.get_playlist()['jingles'], ['a.mp3'])
+
+            # Cached until the file changes on disk
+            with mock.patch('builtins.open', side_effect=AssertionError('re-read')):
+                self.assertTrue(self.service.get_playlist()['enabled'])
+
+        self.assertTrue(playlist_file.exists())
@@ -0,0 +1,178 @@
+import sys
+import tempfile
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import TaskStatus
+from api.services.storage_service import LocalStorageBackend
+from api.tasks import job_queue
+from api.tasks.job_queue import JobQueueFull, JobWorker, enqueue, recover_expired_leases
+from api.utils.config import AppConfig
+
+
+def _task(task_type='test_job', **fields):
+    return TaskStatus.objects.create(task_id=str(uuid.uuid4()), task_type=task_type, **fields)
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        self.ran = []
+        self.fail = False
+
+        def handler(task):
+            self.ran.append(task.payload['n'])
+            if self.fail:
+                raise RuntimeError('boom')
+
+        patchers = [
+            mock.patch.object(AppConfig, 'JOB_WORKER_MODE', 'external'),
+            mock.patch.object(AppConfig, 'JOB_MAX_QUEUED', 3),
+            mock.patch.object(job_queue, 'host_saturated', return_value=None),
+            mock.patch.dict(job_queue.JOB_TYPES),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        job_queue.register_job_type('test_job', handler, concurrency=1, max_attempts=2)
+        job_queue.register_job_type('other_job', handler, concurrency=1)
+        self.worker = JobWorker(task_types=['test_job', 'other_job'], worker_id='worker-1')
+
+    def test_jobs_run_by_priority_and_complete(self):
+        enqueue(_task(), {'n': 1})
+        enqueue(_task(), {'n': 2}, priority=5)
+        while self.worker.run_once():
+            pass
+        self.assertEqual(self.ran, [2, 1])
+
+        task = TaskStatus.objects.get(payload__n=1)
+        self.assertEqual((task.status, task.progress, task.attempts), ('completed', 100, 1))
+        self.assertIsNone(task.lease_expires_at)
+
+    def test_concurrency_limit_is_shared_between_workers(self):
+        _task(status='processing', worker_id='worker-2',
+              lease_expires_at=timezone.now() + timedelta(minutes=1))
+        waiting = enqueue(_task(), {'n': 1})
+        enqueue(_task('other_job'), {'n': 2})
+
+        self.worker.run_once()
+        self.assertEqual(self.ran, [2])
+        self.assertIsNone(self.worker.run_once())
+        self.assertEqual(job_queue.queue_position(TaskStatus.objects.get(pk=waiting.pk)), 1)
+
+    def test_racing_claims_keep_the_earliest_claims_not_the_oldest_jobs(self):
+        job_queue.register_job_type('pair_job', lambda task: None, concurrency=2)
+        lease = timezone.now() + timedelta(minutes=1)
+        running = _task('pair_job', status='processing', worker_id='worker-2', lease_expires_at=lease,
+                        claimed_at=timezone.now() - timedelta(seconds=30))
+        # Another worker claimed an older job at the same moment as this one
+        racer = _task('pair_job', status='processing', worker_id='worker-3', lease_expires_at=lease,
+                      claimed_at=timezone.now())
+        waiting = enqueue(_task('pair_job'), {'n': 1})
+        TaskStatus.objects.filter(pk__in=[racer.pk, waiting.pk]).update(
+            started_at=running.started_at - timedelta(hours=1)
+        )
+
+        # Both workers counted one running job before either claim landed
+        stale = job_queue._running(['pair_job']).exclude(pk=racer.pk)
+        with mock.patch.object(job_queue, '_running', side_effect=[stale, job_queue._running(['pair_job'])]):
+            self.assertIsNone(job_queue.claim_next('worker-1', ['pair_job']))
+        self.assertEqual(TaskStatus.objects.get(pk=waiting.pk).status, 'pending')
+        self.assertEqual(job_queue._running(['pair_job']).count(), 2)
+
+    def test_failed_attempt_is_retried_with_backoff_then_failed(self):
+        self.fail = True
+        task = enqueue(_task(), {'n': 1})
+        self.worker.run_once()
+
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, task.error), ('pending', 1, 'boom'))
+        self.assertGreater(task.available_at, timezone.now())
+        self.assertIsNone(self.worker.run_once())
+
+        TaskStatus.objects.filter(pk=task.pk).update(available_at=timezone.now())
+        self.worker.run_once()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('failed', 2))
+        self.assertIsNotNone(task.completed_at)
+
+    def test_expired_lease_is_requeued(self):
+        task = enqueue(_task(), {'n': 1})
+        TaskStatus.objects.filter(pk=task.pk).update(
+            status='processing', attempts=1, worker_id='dead-worker',
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(recover_expired_leases(), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.worker_id), ('pending', ''))
+        self.assertIn('dead-worker', task.error)
+
+        # Out of attempts: the job fails instead
+        TaskStatus.objects.filter(pk=task.pk).update(
+            status='processing', attempts=2, lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        recover_expired_leases()
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'failed')
+
+    def test_heartbeat_extends_running_leases(self):
+        task = enqueue(_task(), {'n': 1})
+        claimed = job_queue.claim_next('worker-1', ['test_job'])
+        self.worker._active.add(claimed.task_id)
+        TaskStatus.objects.filter(pk=task.pk).update(lease_expires_at=timezone.now())
+        self.assertEqual(self.worker.heartbeat(), 1)
+        task.refresh_from_db()
+        self.assertGreater(task.lease_expires_at, timezone.now() + timedelta(seconds=AppConfig.JOB_LEASE_SECONDS - 5))
+
+    def test_admission_control(self):
+        for n in range(3):
+            enqueue(_task(), {'n': n})
+        rejected = _task()
+        with self.assertRaises(JobQueueFull):
+            enqueue(rejected, {'n': 4})
+        rejected.refresh_from_db()
+        self.assertEqual(rejected.status, 'failed')
+
+        with mock.patch.object(job_queue, 'host_saturated', return_value='50 MB memory free'):
+            self.assertIsNone(self.worker.run_once())
+        self.assertEqual(self.ran, [])
+
+    def test_status_endpoint_reports_queue_position(self):
+        enqueue(_task(), {'n': 1})
+        task = enqueue(_task(), {'n': 2})
+        response = self.client.get(f'/api/tasks/{task.task_id}')
+        self.assertEqual(response.json()['queue_position'], 2)
+
+
+class CardGenerationJobTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patchers = [
+            mock.patch.object(AppConfig, 'JOB_WORKER_MODE', 'external'),
+            mock.patch.object(job_queue, 'host_saturated', return_value=None),
+            mock.patch('api.tasks.card_generation_tasks.get_storage',
+                       return_value=LocalStorageBackend(root=Path(tmp.name), base_url='/data/storage/')),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_failing_generator_is_retried_then_failed(self):
+        from api.tasks import run_card_generation_task
+
+        task = _task('card_generation', metadata={})
+        run_card_generation_task(task.task_id, task, [sys.executable, '-c', 'import sys; sys.exit(3)'],
+                                 Path(tempfile.gettempdir()))
+        worker = JobWorker(task_types=['card_generation'])
+        worker.run_once()
+        TaskStatus.objects.filter(pk=task.pk).update(available_at=timezone.now())
+        worker.run_once()
+
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('failed', 2))
+        self.assertIn('return code 3', task.error)
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from api.services.karafun_cache import KarafunCache
+
+
+class KarafunCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.api = mock.Mock()
+        self.api.list_devices.return_value = [{'id': 1080, 'name': 'Main bar'}]
+        self.api.get_sessions.return_value = [{'id': 7}]
+        backend = LocMemCache('karafun-test', {})
+        backend.clear()
+        self.cache = KarafunCache(self.api, ttl=60, stale_ttl=600, cache=backend)
+
+    def _age_entry(self, name, seconds):
+        key = self.cache._key(name)
+        entry = self.cache.cache.get(key)
+        entry['fetched_at'] -= seconds
+        self.cache.cache.set(key, entry)
+
+    def test_fresh_entries_skip_the_api(self):
+        for _ in range(3):
+            self.assertEqual(self.cache.list_devices()[0]['id'], 1080)
+        self.assertEqual(self.api.list_devices.call_count, 1)
+
+    def test_refresh_flag_bypasses_cache(self):
+        self.cache.list_devices()
+        self.cache.list_devices(refresh=True)
+        self.assertEqual(self.api.list_devices.call_count, 2)
+
+    def test_stale_entry_is_served_while_refreshing(self):
+        self.cache.list_devices()
+        self._age_entry('devices', 120)
+        self.api.list_devices.return_value = [{'id': 2000}]
+
+        with mock.patch('api.services.karafun_cache.threading.Thread') as thread_cls:
+            self.assertEqual(self.cache.list_devices()[0]['id'], 1080)
+            self.assertEqual(self.cache.list_devices()[0]['id'], 1080)
+        thread_cls.assert_called_once()  # One refresh per key at a time
+
+        thread_cls.call_args.kwargs['target']()
+        self.assertEqual(self.cache.list_devices()[0]['id'], 2000)
+
+    def test_failed_refresh_keeps_stale_data(self):
+        self.cache.list_devices()
+        self._age_entry('devices', 120)
+        self.api.list_devices.side_effect = RuntimeError('API down')
+
+        thread = self.cache.refresh_in_background(self.cache._key('devices'), self.api.list_devices)
+        thread.join(timeout=5)
+        self.assertEqual(self.cache.list_devices()[0]['id'], 1080)
+
+    def test_creating_a_session_invalidates_session_lists(self):
+        self.cache.get_sessions('2026-01-01', '2026-01-02')
+        self.cache.get_sessions('2026-01-01', '2026-01-02')
+        self.assertEqual(self.api.get_sessions.call_count, 1)
+
+        self.cache.create_session(device_id=1080, start_at_timestamp='a', end_at_timestamp='b')
+        self.cache.get_sessions('2026-01-01', '2026-01-02')
+        self.assertEqual(self.api.get_sessions.call_count, 2)
@@ -0,0 +1,68 @@
+import queue
+
+from django.test import TestCase
+
+from api.models import KaraokeSession
+from api.services.karaoke_events import KaraokeEventHub
+from api.services.karaoke_queue_service import KaraokeQueueService
+
+
+class KaraokeEventHubTest(TestCase):
+    def setUp(self):
+        self.session = KaraokeSession.objects.create(venue_name='The Crown', status='active')
+        self.hub = KaraokeEventHub(watch=False)
+
+    def _add(self, name, publish=True):
+        entry = KaraokeQueueService().add_entry(
+            self.session, name=name, song_id='x', song_title='Song', artist='Artist'
+        )
+        if publish:
+            self._publish(entry)
+        return entry
+
+    def _publish(self, entry):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hub.publish(self.session.id, 'add', entry)
+
+    def test_new_subscriber_gets_snapshot(self):
+        self._add('Ann')
+        subscriber = self.hub.subscribe(self.session.id)
+        event = subscriber.get_nowait()
+        self.assertEqual(event['type'], 'snapshot')
+        self.assertEqual([e['name'] for e in event['queue']], ['Ann'])
+
+    def test_one_snapshot_fans_out_to_every_subscriber(self):
+        subscribers = [self.hub.subscribe(self.session.id) for _ in range(50)]
+        for subscriber in subscribers:
+            subscriber.get_nowait()
+
+        # Version bump + session + queue view, however many screens listen
+        entry = self._add('Ann', publish=False)
+        with self.assertNumQueries(3):
+            self._publish(entry)
+
+        events = [subscriber.get_nowait() for subscriber in subscribers]
+        self.assertTrue(all(event is events[0] for event in events))
+        self.assertEqual(events[0]['type'], 'add')
+        self.assertEqual(events[0]['entry']['name'], 'Ann')
+        self.session.refresh_from_db()
+        self.assertEqual(events[0]['version'], self.session.queue_version)
+
+    def test_slow_subscriber_keeps_latest_events(self):
+        subscriber = self.hub.subscribe(self.session.id)
+        for i in range(KaraokeEventHub.SUBSCRIBER_BUFFER + 5):
+            self._add(f'Singer {i}')
+
+        events = []
+        while True:
+            try:
+                events.append(subscriber.get_nowait())
+            except queue.Empty:
+                break
+        self.assertEqual(len(events), KaraokeEventHub.SUBSCRIBER_BUFFER)
+        self.assertEqual(events[-1]['entry']['name'], f'Singer {KaraokeEventHub.SUBSCRIBER_BUFFER + 4}')
+
+    def test_unsubscribe_forgets_idle_session(self):
+        subscriber = self.hub.subscribe(self.session.id)
+        self.hub.unsubscribe(self.session.id, subscriber)
+        self.assertEqual(self.hub.subscriber_count(), 0)
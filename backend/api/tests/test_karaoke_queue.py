@@ -0,0 +1,169 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import KaraokeSession, KaraokeQueue
+from api.services.karaoke_queue_service import KaraokeQueueService
+
+
+def _entry(session, name, position, duration=180, status='pending', **kwargs):
+    return KaraokeQueue.objects.create(
+        session=session, name=name, song_id='x', song_title=f'{name} song',
+        artist='Artist', duration=duration, position=position, status=status, **kwargs
+    )
+
+
+class QueueViewTest(TestCase):
+    def setUp(self):
+        self.session = KaraokeSession.objects.create(venue_name='The Crown', status='active')
+        self.service = KaraokeQueueService()
+
+    def test_wait_times_use_real_durations_and_current_elapsed(self):
+        now = timezone.now()
+        _entry(self.session, 'Singing', 1, duration=200, status='singing',
+               started_at=now - timedelta(seconds=60))
+        _entry(self.session, 'Ann', 2, duration=300)
+        _entry(self.session, 'Bob', 3, duration=120)
+        _entry(self.session, 'Cat', 4)
+        _entry(self.session, 'Done', 0, status='completed')
+
+        with self.assertNumQueries(1):
+            view = self.service.build_queue_view(self.session, now=now)
+
+        self.assertEqual(view['current_singer']['name'], 'Singing')
+        self.assertEqual(view['current_singer']['remaining_seconds'], 140)
+        self.assertEqual([e['name'] for e in view['queue']], ['Ann', 'Bob', 'Cat'])
+        self.assertEqual([e['estimated_wait_seconds'] for e in view['queue']], [140, 440, 560])
+        self.assertEqual(view['queue'][1]['estimated_wait'], 7)
+        self.assertEqual(view['total_wait_seconds'], 740)
+
+    def test_overrunning_singer_counts_as_finished(self):
+        now = timezone.now()
+        _entry(self.session, 'Long', 1, duration=100, status='singing',
+               started_at=now - timedelta(seconds=500))
+        _entry(self.session, 'Next', 2)
+
+        view = self.service.build_queue_view(self.session, now=now)
+        self.assertEqual(view['queue'][0]['estimated_wait_seconds'], 0)
+
+    def test_query_count_is_constant_in_queue_length(self):
+        for i in range(40):
+            _entry(self.session, f'Singer {i}', i + 1)
+
+        with self.assertNumQueries(1):
+            view = self.service.build_queue_view(self.session)
+        self.assertEqual(view['count'], 40)
+
+
+class QueueOrderingTest(TestCase):
+    def setUp(self):
+        self.session = KaraokeSession.objects.create(venue_name='The Crown', status='active')
+        self.service = KaraokeQueueService()
+
+    def _add(self, name):
+        return self.service.add_entry(
+            self.session, name=name, song_id='x', song_title='Song', artist='Artist'
+        )
+
+    def _names(self):
+        return [e['name'] for e in self.service.build_queue_view(self.session)['queue']]
+
+    def test_add_appends_with_gaps_and_ranks_from_one(self):
+        a, b = self._add('Ann'), self._add('Bob')
+        self.assertEqual(b.position - a.position, KaraokeQueueService.POSITION_GAP)
+        queue = self.service.build_queue_view(self.session)['queue']
+        self.assertEqual([e['position'] for e in queue], [1, 2])
+
+    def test_cancel_is_one_statement(self):
+        a = self._add('Ann')
+        self._add('Bob')
+        with self.assertNumQueries(1):
+            self.assertTrue(self.service.cancel_entry(a.id))
+        self.assertEqual(self._names(), ['Bob'])
+        self.assertFalse(self.service.cancel_entry(a.id))
+
+    def test_move_up_and_down_write_only_the_moved_row(self):
+        a, b, c = self._add('Ann'), self._add('Bob'), self._add('Cat')
+        positions = {e.id: e.position for e in (a, b)}
+
+        self.assertTrue(self.service.move_entry(c, 'up'))
+        self.assertEqual(self._names(), ['Ann', 'Cat', 'Bob'])
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual({a.id: a.position, b.id: b.position}, positions)
+
+        self.assertTrue(self.service.move_entry(a, 'down'))
+        self.assertEqual(self._names(), ['Cat', 'Ann', 'Bob'])
+        self.assertFalse(self.service.move_entry(b, 'down'))
+
+    def test_move_to_front_skips_current_singer_position(self):
+        singer = self._add('Singer')
+        KaraokeQueue.objects.filter(id=singer.id).update(status='singing')
+        self._add('Ann')
+        bob = self._add('Bob')
+
+        self.service.reorder_entry(bob, after_id=None)
+        self.assertEqual(self._names(), ['Bob', 'Ann'])
+
+    def test_rebalance_when_gap_runs_out(self):
+        a, b, c = self._add('Ann'), self._add('Bob'), self._add('Cat')
+        KaraokeQueue.objects.filter(id=b.id).update(position=a.position + 1)
+
+        self.service.reorder_entry(c, after_id=a.id)
+        self.assertEqual(self._names(), ['Ann', 'Cat', 'Bob'])
+        positions = list(
+            KaraokeQueue.objects.filter(session=self.session).order_by('position')
+            .values_list('position', flat=True)
+        )
+        self.assertTrue(all(high - low > 1 for low, high in zip(positions, positions[1:])))
+
+
+class FairShareSchedulingTest(TestCase):
+    def setUp(self):
+        self.session = KaraokeSession.objects.create(
+            venue_name='The Crown', status='active', scheduling_mode='fair', avg_song_duration=200
+        )
+        self.service = KaraokeQueueService()
+
+    def _add(self, name, duration=180):
+        return self.service.add_entry(
+            self.session, name=name, song_id='x', song_title='Song', artist='Artist', duration=duration
+        )
+
+    def _names(self):
+        return [e['name'] for e in self.service.build_queue_view(self.session)['queue']]
+
+    @mock.patch.object(KaraokeQueueService, 'is_peak_time', return_value=False)
+    def test_first_timers_slot_in_ahead_of_repeat_singers(self, _):
+        self._add('Ann')
+        self._add('Bob')
+        self._add('ann')  # Second turn, case-insensitive
+        self._add('Cat')
+        self.assertEqual(self._names(), ['Ann', 'Bob', 'Cat', 'ann'])
+
+    @mock.patch.object(KaraokeQueueService, 'is_peak_time', return_value=True)
+    def test_long_songs_drop_back_at_peak(self, _):
+        self._add('Epic', duration=600)
+        self._add('Short')
+        self.assertEqual(self._names(), ['Short', 'Epic'])
+
+    def test_next_singer_is_one_query(self):
+        for name in ('Ann', 'Bob', 'Cat'):
+            self._add(name)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.service.next_entry(self.session).name, 'Ann')
+
+    @mock.patch.object(KaraokeQueueService, 'is_peak_time', return_value=False)
+    def test_switching_to_fair_reorders_pending_queue(self, _):
+        self.session.scheduling_mode = 'fifo'
+        self.session.save()
+        _entry(self.session, 'Ann', 1, status='completed')
+        for name in ('Ann', 'Bob', 'Cat'):
+            self._add(name)
+
+        self.assertEqual(self.service.set_scheduling_mode(self.session, 'fair'), 3)
+        self.assertEqual(self._names(), ['Bob', 'Cat', 'Ann'])
+        with self.assertRaises(ValueError):
+            self.service.set_scheduling_mode(self.session, 'random')
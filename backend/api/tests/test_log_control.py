@@ -0,0 +1,82 @@
+import logging
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.pub_quiz_models import PubQuizSession
+from api.utils import log_control
+from api.utils.config import AppConfig
+from api.utils.log_control import DebugCategory, parse_levels, refresh_levels
+from api.utils.pub_quiz_helpers import get_session_by_code_or_id
+
+
+class LogControlTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patchers = [
+            mock.patch.object(AppConfig, 'LOG_LEVELS', 'debug.test_spam=DEBUG'),
+            mock.patch.object(AppConfig, 'LOG_LEVELS_FILE', Path(tmp.name) / 'log_levels.json'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(refresh_levels, force=True)
+        refresh_levels(force=True)
+
+    def test_parse_levels(self):
+        self.assertEqual(parse_levels(' api.karaoke_views=warning, debug=DEBUG ,'),
+                         {'api.karaoke_views': logging.WARNING, 'debug': logging.DEBUG})
+        with self.assertRaises(ValueError):
+            parse_levels('api.karaoke_views=LOUD')
+
+    def test_debug_lines_are_rate_limited_and_formatted_lazily(self):
+        category = DebugCategory('test_spam', rate=2)
+        argument = mock.Mock(__str__=mock.Mock(return_value='x'))
+        with self.assertLogs('debug.test_spam', level='DEBUG') as logs:
+            for _ in range(5):
+                category.log('poll %s', argument)
+            category._window_start -= 1  # next second
+            category.log('poll %s', argument)
+
+        self.assertEqual(logs.output[-1], 'DEBUG:debug.test_spam:poll x (+3 suppressed)')
+        self.assertEqual(len(logs.output), 3)
+        self.assertEqual(argument.__str__.call_count, 3)  # suppressed lines are never formatted
+
+        quiet = DebugCategory('test_quiet')
+        self.assertFalse(quiet.enabled)
+        quiet.log('poll %s', argument)
+        self.assertEqual(argument.__str__.call_count, 3)
+
+    def test_runtime_overrides_are_picked_up(self):
+        call_command('log_levels', 'debug.test_quiet=DEBUG', 'api.karaoke_views=WARNING', stdout=StringIO())
+        self.assertTrue(refresh_levels(force=True))
+        self.assertTrue(DebugCategory('test_quiet').enabled)
+        self.assertEqual(logging.getLogger('api.karaoke_views').level, logging.WARNING)
+
+        call_command('log_levels', '--reset', stdout=StringIO())
+        refresh_levels(force=True)
+        self.assertFalse(DebugCategory('test_quiet').enabled)
+        self.assertEqual(logging.getLogger('api.karaoke_views').level, logging.NOTSET)
+        self.assertTrue(DebugCategory('test_spam').enabled)  # LOG_LEVELS still applies
+
+    def test_requests_apply_overrides_without_debug_categories(self):
+        call_command('log_levels', 'api.karaoke_views=WARNING', stdout=StringIO())
+        log_control._override_state['checked_at'] = float('-inf')  # check interval elapsed
+
+        self.client.get('/api/health')
+        self.assertEqual(logging.getLogger('api.karaoke_views').level, logging.WARNING)
+
+    def test_session_lookup_diagnostics_only_when_enabled(self):
+        PubQuizSession.objects.create(session_code='QUIZ1', venue_name='Pub')
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_session_by_code_or_id('MISSING'))
+
+        log_control.apply_levels({'debug.session_lookup': logging.DEBUG})
+        with self.assertNumQueries(3), self.assertLogs('debug.session_lookup', level='DEBUG') as logs:
+            get_session_by_code_or_id('MISSING')
+        self.assertIn("['QUIZ1']", logs.output[0])
@@ -0,0 +1,117 @@
+import contextvars
+import threading
+import urllib.error
+import urllib.request
+import uuid
+from unittest import mock
+
+from django.test import TestCase
+
+from api.models import TaskStatus
+from api.tasks import job_queue
+from api.tasks.job_queue import JobWorker, enqueue
+from api.tasks.card_generation_tasks import parse_generator_line
+from api.utils.config import AppConfig
+from api.utils.metrics import Histogram, STAGE_SECONDS, collect_timings, record, serve, span, timed
+
+
+class HistogramTest(TestCase):
+    def test_render_is_cumulative_with_sum_and_count(self):
+        histogram = Histogram('test_seconds', 'Test', ('stage',), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 0.5, 3):
+            histogram.observe(value, 'merge')
+
+        text = histogram.render()
+        self.assertIn('# TYPE test_seconds histogram', text)
+        self.assertIn('test_seconds_bucket{stage="merge",le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{stage="merge",le="1"} 3', text)
+        self.assertIn('test_seconds_bucket{stage="merge",le="+Inf"} 4', text)
+        self.assertIn('test_seconds_sum{stage="merge"} 4.05', text)
+        self.assertIn('test_seconds_count{stage="merge"} 4', text)
+
+        with self.assertRaises(ValueError):
+            histogram.observe(1)
+
+
+class SpanTest(TestCase):
+    def test_spans_fill_the_task_breakdown_and_the_histogram(self):
+        before = STAGE_SECONDS.count('test', 'db_save', 'ok')
+
+        @timed('test', 'db_save')
+        def save():
+            pass
+
+        with collect_timings() as timings:
+            save()
+            save()
+            record('test', 'render', 1.5)
+            # Threads report into the task when run in a copy of its context
+            worker = threading.Thread(target=contextvars.copy_context().run, args=(record, 'test', 'upload', 0.25))
+            worker.start()
+            worker.join()
+            with self.assertRaises(RuntimeError), span('test', 'tts_call'):
+                raise RuntimeError('timeout')
+
+        breakdown = timings.as_dict()
+        self.assertEqual(set(breakdown['stages']), {'db_save', 'render', 'upload', 'tts_call'})
+        self.assertEqual((breakdown['stages']['render'], breakdown['stages']['upload']), (1.5, 0.25))
+        self.assertEqual(STAGE_SECONDS.count('test', 'db_save', 'ok'), before + 2)
+        self.assertGreaterEqual(STAGE_SECONDS.count('test', 'tts_call', 'error'), 1)
+
+        # Outside collect_timings only the histogram is updated
+        record('test', 'render', 1.0)
+        self.assertEqual(timings.stages['render'], 1.5)
+
+    def test_generator_timings_are_parsed(self):
+        artefacts = {}
+        parse_generator_line('GENERATION_RESULT: {"num_cards": 5, "timings": {"merge": 0.2}}', artefacts)
+        self.assertEqual(artefacts['timings'], {'merge': 0.2})
+
+
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        patchers = [
+            mock.patch.object(AppConfig, 'JOB_WORKER_MODE', 'external'),
+            mock.patch.object(job_queue, 'host_saturated', return_value=None),
+            mock.patch.dict(job_queue.JOB_TYPES),
+            mock.patch.object(AppConfig, 'METRICS_TOKEN', 'secret'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_metrics_include_job_runs_and_queue_depth(self):
+        job_queue.register_job_type('metrics_job', lambda task: None, concurrency=1)
+        for _ in range(2):
+            enqueue(TaskStatus.objects.create(task_id=str(uuid.uuid4()), task_type='metrics_job'), {})
+        JobWorker(task_types=['metrics_job']).run_once()
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('music_bingo_stage_seconds_count{pipeline="job",stage="metrics_job",outcome="ok"} 1', body)
+        self.assertIn('music_bingo_jobs{task_type="metrics_job",status="pending"} 1', body)
+
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        with mock.patch.object(AppConfig, 'METRICS_TOKEN', ''):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    def test_worker_process_serves_its_own_metrics(self):
+        record('test', 'worker_stage', 0.2)
+        # The job queue collector's query can't see the test transaction from the server thread
+        server = serve(0, 'secret', render=STAGE_SECONDS.render)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+
+        with self.assertRaises(urllib.error.HTTPError) as denied:
+            urllib.request.urlopen(url, timeout=5)
+        self.assertEqual(denied.exception.code, 403)
+
+        request = urllib.request.Request(url, headers={'Authorization': 'Bearer secret'})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            body = response.read().decode()
+        self.assertIn('music_bingo_stage_seconds_count{pipeline="test",stage="worker_stage",outcome="ok"}', body)
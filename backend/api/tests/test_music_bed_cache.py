@@ -0,0 +1,93 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+import numpy as np
+import requests
+from django.test import SimpleTestCase
+
+from api import audio_mixer
+from api.services.music_bed_cache import MusicBedCache
+
+
+class FakeMusicService:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.api_key = 'key'
+        self.calls = []
+
+    def generate_music(self, prompt, duration_seconds, use_fallback_on_error=True):
+        if not prompt:
+            raise ValueError('Music prompt cannot be empty')
+        self.calls.append((prompt, duration_seconds))
+        if self.fail:
+            raise requests.ConnectionError('API down')
+        return f'{duration_seconds}'.encode()
+
+    def generate_fallback_tone(self, duration_seconds):
+        return f'{duration_seconds}'.encode()
+
+
+def _fake_decode(audio_bytes):
+    """Decode the fake 'MP3' (its duration in seconds) to a constant bed"""
+    seconds = int(audio_bytes.decode())
+    return np.full((seconds * audio_mixer.SAMPLE_RATE, 2), 0.25, dtype=np.float32)
+
+
+@mock.patch('api.audio_mixer.decode_mp3', side_effect=_fake_decode)
+class MusicBedCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.music = FakeMusicService()
+        self.cache = MusicBedCache(self.music, cache_dir=self.tmp.name, refresh_after_seconds=3600)
+
+    def test_key_normalises_prompt_and_buckets_duration(self, _decode):
+        self.assertEqual(
+            self.cache.bed_path('Upbeat,  PUB music!', 7),
+            self.cache.bed_path('upbeat pub music', 9),
+        )
+        self.assertNotEqual(
+            self.cache.bed_path('upbeat pub music', 7),
+            self.cache.bed_path('upbeat pub music', 11),
+        )
+        self.assertEqual(MusicBedCache.duration_bucket(2), 5)
+        self.assertEqual(MusicBedCache.duration_bucket(31), 30)
+
+    def test_repeat_prompt_skips_music_api(self, _decode):
+        first = self.cache.get_bed('upbeat pub music', 7)
+        second = self.cache.get_bed('Upbeat pub music', 8)
+
+        self.assertEqual(self.music.calls, [('upbeat pub music', 10)])
+        self.assertEqual(len(first), 7 * audio_mixer.SAMPLE_RATE)
+        self.assertEqual(len(second), 8 * audio_mixer.SAMPLE_RATE)
+        # int16 round trip keeps the level, trimmed tail fades out
+        self.assertAlmostEqual(float(second[0, 0]), 0.25, places=3)
+        self.assertLess(float(second[-1, 0]), 0.001)
+
+    def test_failed_generation_is_not_cached(self, _decode):
+        self.music.fail = True
+        bed = self.cache.get_bed('jazz', 5)
+        self.assertEqual(len(bed), 5 * audio_mixer.SAMPLE_RATE)
+        self.assertFalse(self.cache.bed_path('jazz', 5).exists())
+
+    def test_invalid_prompt_is_not_masked_by_fallback(self, _decode):
+        with self.assertRaises(ValueError):
+            self.cache.get_bed('', 5)
+
+    def test_stale_bed_is_served_and_refreshed(self, _decode):
+        self.cache.get_bed('jazz', 5)
+        path = self.cache.bed_path('jazz', 5)
+        old = time.time() - 7200
+        os.utime(path, (old, old))
+
+        with mock.patch.object(self.cache, 'refresh_in_background') as refresh:
+            self.cache.get_bed('jazz', 5)
+        refresh.assert_called_once_with('jazz', 5)
+        self.assertEqual(len(self.music.calls), 1)
+
+    def test_clear_removes_beds(self, _decode):
+        self.cache.get_bed('jazz', 5)
+        self.cache.get_bed('rock', 5)
+        self.assertEqual(self.cache.clear(), 2)
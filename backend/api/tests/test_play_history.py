@@ -0,0 +1,134 @@
+from datetime import date, datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import JinglePlayHistory, JinglePlayRollup, JingleSchedule
+from api.services.play_history import PlayHistoryService, play_history
+
+EVENING = timezone.make_aware(datetime(2026, 1, 13, 20, 5))
+
+
+class PlayHistoryServiceTest(TestCase):
+    def setUp(self):
+        self.schedule = JingleSchedule.objects.create(
+            jingle_name='promo', jingle_filename='promo.mp3', start_date=date(2026, 1, 1)
+        )
+        self.history = PlayHistoryService(flush_size=100, flush_interval=60)
+
+    def tearDown(self):
+        self.history.flush()
+
+    def _play(self, minutes=0, venue='The Crown', filename='promo.mp3', schedule=True):
+        return self.history.record(
+            filename, 5,
+            schedule_id=self.schedule.id if schedule else None,
+            venue_name=venue,
+            played_at=EVENING + timedelta(minutes=minutes)
+        )
+
+    def test_plays_are_buffered_then_written_in_bulk(self):
+        for minute in range(10):
+            self._play(minute)
+        self.assertEqual(self.history.pending, 10)
+        self.assertEqual(JinglePlayHistory.objects.count(), 0)
+
+        self.assertEqual(self.history.flush(), 0)
+        self.assertEqual(JinglePlayHistory.objects.count(), 10)
+
+        # Existing rollup: savepoint, schedule lookup, one insert, one update, release
+        for minute in range(10, 40):
+            self._play(minute)
+        with self.assertNumQueries(5):
+            self.history.flush()
+
+        rollup = JinglePlayRollup.objects.get()
+        self.assertEqual(rollup.play_count, 40)
+        self.assertEqual(rollup.hour, EVENING.replace(minute=0))
+        self.assertEqual(rollup.last_played_at, EVENING + timedelta(minutes=39))
+
+    def test_flush_size_triggers_write(self):
+        history = PlayHistoryService(flush_size=3, flush_interval=60)
+        history.record('promo.mp3', 1)
+        history.record('promo.mp3', 2)
+        self.assertEqual(history.record('promo.mp3', 3), 0)
+        self.assertEqual(JinglePlayHistory.objects.count(), 3)
+
+    def test_rollups_accumulate_across_flushes_and_hours(self):
+        self._play(0)
+        self._play(0, venue='The Anchor')
+        self.history.flush()
+        self._play(10)
+        self._play(70)
+        self.history.flush()
+
+        counts = {
+            (r.venue_name, r.hour.hour): r.play_count for r in JinglePlayRollup.objects.all()
+        }
+        self.assertEqual(counts, {('The Crown', 20): 2, ('The Anchor', 20): 1, ('The Crown', 21): 1})
+
+    def test_last_played_reads_rollups_and_buffer(self):
+        self._play(0)
+        self.history.flush()
+        self.assertEqual(self.history.last_played([self.schedule.id]), {self.schedule.id: EVENING})
+
+        self._play(30)
+        self.assertEqual(self.history.last_played([self.schedule.id])[self.schedule.id],
+                         EVENING + timedelta(minutes=30))
+
+    def test_deleted_schedule_keeps_rollup(self):
+        self._play(0)
+        schedule_id = self.schedule.id
+        self.schedule.delete()
+        self.history.flush()
+
+        self.assertIsNone(JinglePlayHistory.objects.get().schedule_id)
+        self.assertEqual(JinglePlayRollup.objects.get().schedule_ref, schedule_id)
+
+    def test_analytics(self):
+        self._play(0)
+        self._play(5)
+        self._play(65, venue='The Anchor')
+        self._play(10, filename='other.mp3', schedule=False)
+        self.history.flush()
+
+        result = self.history.analytics(since=EVENING - timedelta(hours=1), until=EVENING + timedelta(hours=3))
+        self.assertEqual(result['total_plays'], 4)
+        self.assertEqual([(j['jingle_filename'], j['plays']) for j in result['jingles']],
+                         [('promo.mp3', 3), ('other.mp3', 1)])
+        self.assertEqual(result['venues'][0], {'venue_name': 'The Crown', 'plays': 3})
+        self.assertEqual([h['plays'] for h in result['hourly']], [3, 1])
+
+        crown = self.history.analytics(venue_name='The Crown', since=EVENING - timedelta(hours=1),
+                                       until=EVENING + timedelta(hours=3), schedule_id=self.schedule.id)
+        self.assertEqual(crown['total_plays'], 2)
+
+
+class JinglePlayEndpointTest(TestCase):
+    def setUp(self):
+        self.schedule = JingleSchedule.objects.create(
+            jingle_name='promo', jingle_filename='promo.mp3', venue_name='The Crown', start_date=date(2026, 1, 1)
+        )
+
+    def tearDown(self):
+        play_history.flush()
+
+    def test_record_play_and_read_analytics(self):
+        response = self.client.post(f'/api/jingle-schedules/{self.schedule.id}/play',
+                                    {'round_number': 10}, content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        play_history.flush()
+
+        history = JinglePlayHistory.objects.get()
+        self.assertEqual((history.venue_name, history.round_number), ('The Crown', 10))
+
+        response = self.client.get('/api/jingle-schedules/analytics?venue_name=The+Crown')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_plays'], 1)
+
+    def test_unknown_schedule_and_bad_params(self):
+        response = self.client.post('/api/jingle-schedules/9999/play', {'round_number': 1},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/api/jingle-schedules/analytics?since=yesterday')
+        self.assertEqual(response.status_code, 400)
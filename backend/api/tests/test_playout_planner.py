@@ -0,0 +1,91 @@
+from datetime import date, datetime, time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import BingoSession, JingleSchedule
+from api.services.play_history import play_history
+from api.services.playout_planner import PlayoutPlanner
+
+# 2026-01-13 is a Tuesday
+START = timezone.make_aware(datetime(2026, 1, 13, 19, 0))
+
+
+def _schedule(name, **kwargs):
+    kwargs.setdefault('start_date', date(2026, 1, 1))
+    return JingleSchedule.objects.create(jingle_name=name, jingle_filename=f'{name}.mp3', **kwargs)
+
+
+class PlayoutPlannerTest(TestCase):
+    def setUp(self):
+        self.session = BingoSession.objects.create(
+            session_id='plan-test', venue_name='The Crown',
+            song_pool=[{'id': str(i), 'title': f'Song {i}', 'artist': 'Artist'} for i in range(1, 31)]
+        )
+        self.planner = PlayoutPlanner()
+
+    def _jingle_rounds(self, plan):
+        return {round_number: item['jingle_name'] for round_number, item in plan['jingles'].items()}
+
+    def test_interleaves_songs_jingles_and_announcements(self):
+        _schedule('promo', repeat_pattern='regular', priority=5)  # Every 5 songs
+        plan = self.planner.plan(self.session, start_at=START, seconds_per_song=40)
+
+        self.assertEqual(sorted(plan['jingles']), [5, 10, 15, 20, 25, 30])
+        self.assertEqual(plan['assets'], ['/api/jingles/promo.mp3'])
+        kinds = [item.get('kind') or item['type'] for item in plan['items'][:8]]
+        self.assertEqual(kinds, ['welcome', 'song', 'song', 'song', 'song', 'jingle', 'song', 'song'])
+        announcements = [(i['round'], i['kind']) for i in plan['items'] if i['type'] == 'announcement']
+        self.assertEqual(announcements, [(1, 'welcome'), (10, 'ten_song_summary'), (15, 'halfway'),
+                                         (20, 'ten_song_summary'), (30, 'ten_song_summary')])
+
+    def test_priority_wins_and_equal_priorities_rotate(self):
+        _schedule('often_low', repeat_pattern='often', priority=1)
+        _schedule('a', repeat_pattern='regular', priority=9)
+        _schedule('b', repeat_pattern='regular', priority=9)
+        play_history.record('b.mp3', 5, schedule_id=JingleSchedule.objects.get(jingle_name='b').id)
+        play_history.flush()
+
+        rounds = self._jingle_rounds(self.planner.plan(self.session, start_at=START))
+        self.assertEqual([rounds[n] for n in (5, 10, 15, 20)], ['a', 'b', 'a', 'b'])
+        self.assertEqual(rounds[3], 'often_low')
+
+    def test_schedule_window_opening_mid_game(self):
+        _schedule('late', time_start=time(19, 30), repeat_pattern='often')
+        plan = self.planner.plan(self.session, start_at=START, seconds_per_song=120)
+
+        first = plan['jingles'][min(plan['jingles'])]
+        self.assertGreaterEqual(datetime.fromisoformat(first['estimated_at']), START + timedelta(minutes=30))
+        self.assertEqual(plan['replan_after'], timezone.make_aware(datetime(2026, 1, 13, 19, 30)).isoformat())
+
+    def test_resume_from_round(self):
+        _schedule('promo', repeat_pattern='regular')
+        plan = self.planner.plan(self.session, start_at=START, from_round=12)
+        self.assertEqual(plan['items'][0]['round'], 12)
+        self.assertEqual(sorted(plan['jingles']), [15, 20, 25, 30])
+
+    def test_endpoint(self):
+        response = self.client.get('/api/bingo/session/plan-test/playout?from_round=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['from_round'], 2)
+        self.assertEqual(self.client.get('/api/bingo/session/missing/playout').status_code, 404)
+
+    def test_endpoint_without_song_pool(self):
+        # The game falls back to the active schedules instead of an empty plan
+        BingoSession.objects.create(session_id='no-pool', venue_name='The Crown', song_pool=[])
+        self.assertEqual(self.client.get('/api/bingo/session/no-pool/playout').status_code, 404)
+
+    def test_schedule_edits_change_the_version(self):
+        # The game compares this before each song and re-plans mid-game
+        schedule = _schedule('promo', repeat_pattern='regular')
+        plan = self.client.get('/api/bingo/session/plan-test/playout').json()
+        self.assertEqual(self.client.get('/api/jingle-schedules/version').json()['version'],
+                         plan['schedule_version'])
+
+        schedule.enabled = False
+        schedule.save()
+        version = self.client.get('/api/jingle-schedules/version').json()['version']
+        self.assertNotEqual(version, plan['schedule_version'])
+
+        schedule.delete()
+        self.assertNotEqual(self.client.get('/api/jingle-schedules/version').json()['version'], version)
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from api.middleware import REQUEST_QUERIES
+from api.pub_quiz_models import PubQuizSession, QuizGenre, QuizQuestion, QuizRound, QuizTeam
+from api.utils.config import AppConfig
+from api.utils.query_profiler import QueryBudgetMixin
+
+
+def _quiz(code, rounds=3, questions_per_round=5, teams=4):
+    session = PubQuizSession.objects.create(
+        session_code=code, venue_name='Pub', status='in_progress',
+        total_rounds=rounds, questions_per_round=questions_per_round,
+        current_round=1, current_question=2
+    )
+    for number in range(1, rounds + 1):
+        genre = QuizGenre.objects.get_or_create(name=f'Genre {number}')[0]
+        QuizRound.objects.create(session=session, round_number=number, genre=genre, round_name=genre.name)
+        for question in range(1, questions_per_round + 1):
+            QuizQuestion.objects.create(
+                session=session, genre=genre, round_number=number, question_number=question,
+                question_text=f'Q{number}.{question}?', correct_answer='A'
+            )
+    for n in range(teams):
+        QuizTeam.objects.create(session=session, team_name=f'Team {n}')
+    return session
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Per-endpoint ceilings: a query per row (N+1) blows these whatever the fixture size"""
+
+    def setUp(self):
+        self.quizzes = [_quiz(f'QUIZ{n}') for n in range(3)]
+
+    def test_pub_quiz_session_list(self):
+        response = self.assertEndpointBudget(3, '/api/pub-quiz/sessions')
+        self.assertEqual({s['question_count'] for s in response.json()['sessions']}, {15})
+
+    def test_pub_quiz_host_views(self):
+        code = self.quizzes[0].session_code
+        response = self.assertEndpointBudget(5, f'/api/pub-quiz/{code}/host-data')
+        self.assertEqual(response.json()['current_question']['text'], 'Q1.2?')
+        self.assertEndpointBudget(2, f'/api/pub-quiz/{code}/all-questions')
+
+    def test_answer_sheets(self):
+        self.assertEndpointBudget(
+            3, '/api/pub-quiz/generate-answer-sheets', method='post',
+            data={'session_code': self.quizzes[0].session_code, 'num_sheets': 1}, content_type='application/json'
+        )
+
+    def test_budget_failure_lists_the_queries(self):
+        with self.assertRaises(AssertionError) as failure:
+            with self.assertQueryBudget(1, 'team loop'):
+                for team in QuizTeam.objects.all():
+                    team.session.session_code
+        self.assertIn('team loop ran 13 queries, budget is 1', str(failure.exception))
+        self.assertIn('FROM "api_pubquizsession"', str(failure.exception))
+
+
+class QueryProfilerMiddlewareTest(TestCase):
+    def test_debug_headers_and_metrics(self):
+        _quiz('QUIZ0')
+        before = REQUEST_QUERIES.count('pub-quiz-sessions', 'GET')
+        with override_settings(DEBUG=True):
+            response = self.client.get('/api/pub-quiz/sessions')
+        self.assertEqual(response['X-Query-Count'], '3')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertEqual(REQUEST_QUERIES.count('pub-quiz-sessions', 'GET'), before + 1)
+
+        response = self.client.get('/api/pub-quiz/sessions')
+        self.assertNotIn('X-Query-Count', response)
+
+    def test_query_heavy_requests_are_logged(self):
+        with mock.patch.object(AppConfig, 'REQUEST_QUERY_WARN', 0), \
+                self.assertLogs('api.middleware', level='WARNING') as logs:
+            self.client.get('/api/pub-quiz/sessions')
+        self.assertIn('(pub-quiz-sessions)', logs.output[0])
@@ -0,0 +1,89 @@
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+
+from api.models import KaraokeQueue, KaraokeSession
+from api.pub_quiz_models import GenreVote, PubQuizSession, QuizQuestion, QuizTeam, TeamAnswer
+from api.utils.pub_quiz_helpers import get_session_by_code_or_id
+
+
+class QueryPlanTest(TestCase):
+    """
+    Hot queries must be answered from an index, in index order
+
+    SQLite: no full table scan, no temporary sort. PostgreSQL: sequential
+    scans are disabled for the check, since on tiny test tables a seq scan
+    is always the cheapest plan; the query must still be able to use an
+    index (and the named one, where given) without a Sort node.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.session = PubQuizSession.objects.create(session_code='PLAN0001', venue_name='Pub')
+        cls.team = QuizTeam.objects.create(session=cls.session, team_name='Team')
+        cls.question = QuizQuestion.objects.create(
+            session=cls.session, round_number=1, question_number=1, question_text='Q?', correct_answer='A'
+        )
+        cls.karaoke = KaraokeSession.objects.create(venue_name='Bar')
+
+    def plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertIndexPlan(self, queryset, table, index=None, ordered=False):
+        plan = self.plan(queryset)
+        if connection.vendor == 'sqlite':
+            self.assertNotRegex(plan, rf'SCAN {table}\b(?! USING)', plan)
+        else:
+            self.assertNotIn(f'Seq Scan on {table}', plan, plan)
+        if index:
+            self.assertIn(index, plan, plan)
+        if ordered:
+            self.assertNotIn('TEMP B-TREE FOR ORDER BY' if connection.vendor == 'sqlite' else 'Sort', plan, plan)
+
+    def test_current_question_lookup(self):
+        self.assertIndexPlan(
+            QuizQuestion.objects.filter(session=self.session, round_number=1, question_number=1),
+            'api_quizquestion', index='round_number_question_number'
+        )
+
+    def test_answer_feed(self):
+        self.assertIndexPlan(
+            TeamAnswer.objects.filter(question=self.question).order_by('-submitted_at'),
+            'api_teamanswer', index='team_answer_feed_idx', ordered=True
+        )
+
+    def test_leaderboard(self):
+        self.assertIndexPlan(
+            self.session.teams.order_by('-total_score', 'team_name'),
+            'api_quizteam', index='quiz_team_leaderboard_idx', ordered=True
+        )
+
+    def test_genre_vote_tally(self):
+        self.assertIndexPlan(
+            GenreVote.objects.filter(team__session=self.session).values('genre_id').annotate(votes=Count('id')),
+            'api_genrevote'
+        )
+
+    def test_karaoke_queue_by_status(self):
+        self.assertIndexPlan(
+            KaraokeQueue.objects.filter(session=self.karaoke, status='pending').order_by('position'),
+            'api_karaokequeue', index='karaoke_queue_status_idx', ordered=True
+        )
+
+    def test_session_lookup_is_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_session_by_code_or_id('PLAN0001'), self.session)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_session_by_code_or_id(str(self.session.id)), self.session)
+        self.assertIndexPlan(PubQuizSession.objects.filter(session_code='PLAN0001'), 'api_pubquizsession')
+
+    def test_non_ascii_or_oversized_digits_are_not_found(self):
+        for identifier in ('²', '١٢', '9' * 30):
+            self.assertIsNone(get_session_by_code_or_id(identifier))
+
+    def test_code_match_wins_over_id(self):
+        numeric = PubQuizSession.objects.create(session_code=str(self.session.id), venue_name='Other')
+        self.assertEqual(get_session_by_code_or_id(str(self.session.id)), numeric)
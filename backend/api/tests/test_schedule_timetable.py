@@ -0,0 +1,85 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.test import TestCase
+
+from api.models import JingleSchedule
+from api.services.schedule_service import ScheduleService
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# 2026-01-13 is a Tuesday
+TUESDAY_EVENING = datetime(2026, 1, 13, 19, 30)
+
+
+def _schedule(name, days=WEEKDAYS, **kwargs):
+    fields = {day: day in days for day in WEEKDAYS}
+    fields.update(kwargs)
+    fields.setdefault('start_date', date(2026, 1, 1))
+    return JingleSchedule.objects.create(jingle_name=name, jingle_filename=f'{name}.mp3', **fields)
+
+
+class ScheduleTimetableTest(TestCase):
+    def setUp(self):
+        self.service = ScheduleService()
+
+    def _active(self, moment, **scope):
+        return [s['jingle_name'] for s in self.service.get_active_schedules(current_datetime=moment, **scope)]
+
+    def test_active_set_follows_days_times_dates_and_priority(self):
+        _schedule('taco', days=('tuesday',), time_start=time(17), time_end=time(22), priority=10)
+        _schedule('always', priority=1)
+        _schedule('expired', end_date=date(2026, 1, 10))
+        _schedule('disabled', enabled=False)
+        _schedule('crown_only', venue_name='The Crown')
+
+        pub = {'venue_name': 'The Anchor'}
+        self.assertEqual(self._active(TUESDAY_EVENING, **pub), ['taco', 'always'])
+        self.assertEqual(self._active(TUESDAY_EVENING.replace(hour=22, minute=0, second=1), **pub), ['always'])
+        self.assertEqual(self._active(TUESDAY_EVENING + timedelta(days=1), **pub), ['always'])
+        self.assertEqual(self._active(TUESDAY_EVENING, venue_name='The Crown'), ['taco', 'always', 'crown_only'])
+
+    def test_next_change_is_the_next_boundary(self):
+        _schedule('taco', days=('tuesday',), time_start=time(17), time_end=time(22))
+        _schedule('launch', start_date=date(2026, 1, 20))
+
+        self.assertEqual(self.service.get_next_change(current_datetime=TUESDAY_EVENING),
+                         datetime(2026, 1, 13, 22, 0, 1))
+        self.assertEqual(self.service.get_next_change(current_datetime=datetime(2026, 1, 17, 12)),
+                         datetime(2026, 1, 19))  # Week wrap (Monday 00:00)
+        self.assertEqual(self.service.get_next_change(current_datetime=datetime(2026, 1, 19, 1)),
+                         datetime(2026, 1, 20))  # start_date
+
+    def test_cached_until_schedules_change(self):
+        _schedule('always')
+        self._active(TUESDAY_EVENING)
+
+        with self.assertNumQueries(1):  # Version check only
+            self.assertEqual(self._active(TUESDAY_EVENING + timedelta(minutes=5)), ['always'])
+
+        _schedule('new')
+        self.assertEqual(self._active(TUESDAY_EVENING), ['new', 'always'])  # Newest first on ties
+        JingleSchedule.objects.filter(jingle_name='always').delete()
+        self.assertEqual(self._active(TUESDAY_EVENING), ['new'])
+
+    def test_matches_per_schedule_evaluation(self):
+        rng = random.Random(7)
+        for i in range(40):
+            start = rng.choice([None, time(rng.randrange(24), rng.choice([0, 30]))])
+            end = rng.choice([None, time(rng.randrange(24), rng.choice([0, 30]))])
+            _schedule(
+                f's{i}',
+                days=rng.sample(WEEKDAYS, rng.randint(1, 7)),
+                time_start=start, time_end=end,
+                start_date=date(2026, 1, rng.randint(1, 20)),
+                end_date=rng.choice([None, date(2026, 2, rng.randint(1, 28))]),
+                priority=rng.randrange(100),
+            )
+
+        schedules = list(JingleSchedule.objects.all())
+        moment = datetime(2026, 1, 5)
+        for _ in range(300):
+            moment += timedelta(minutes=rng.randrange(1, 600))
+            expected = {s.id for s in schedules if self.service.is_schedule_active(s, moment)}
+            actual = {s['id'] for s in self.service.get_active_schedules(current_datetime=moment)}
+            self.assertEqual(actual, expected, moment)
@@ -0,0 +1,53 @@
+import time
+
+from django.test import TestCase
+
+from api.models import KaraokeSession, KaraokeQueue
+from api.services.song_index import SongIndex
+
+
+class SongIndexTest(TestCase):
+    def setUp(self):
+        session = KaraokeSession.objects.create(venue_name='The Crown')
+        songs = [
+            ('Bohemian Rhapsody', 'Queen', 354),
+            ('bohemian rhapsody', 'QUEEN', 354),
+            ('Don\'t Stop Me Now', 'Queen', 209),
+            ('Dancing Queen', 'ABBA', 231),
+            ('Don\'t Stop Believin\'', 'Journey', 251),
+        ]
+        for position, (title, artist, duration) in enumerate(songs, start=1):
+            KaraokeQueue.objects.create(
+                session=session, name='Singer', song_id='x', song_title=title,
+                artist=artist, duration=duration, position=position, status='completed'
+            )
+        self.index = SongIndex(ttl=3600)
+
+    def _titles(self, query):
+        return [song['title'] for song in self.index.search(query)]
+
+    def test_prefix_search_merges_duplicates_and_ranks_by_plays(self):
+        results = self.index.search('que')
+        self.assertEqual(results[0], {
+            'title': 'Bohemian Rhapsody', 'artist': 'Queen', 'duration': 354, 'plays': 2
+        })
+        self.assertEqual(len(results), 3)
+
+    def test_earlier_words_must_match_whole_words(self):
+        self.assertEqual(self._titles('dont stop be'), ['Don\'t Stop Believin\''])
+        self.assertEqual(self._titles('queen dan'), ['Dancing Queen'])
+        self.assertEqual(self._titles('   '), [])
+
+    def test_added_songs_are_searchable_without_rebuild(self):
+        self.index.search('x')  # Build
+        with self.assertNumQueries(0):
+            self.index.add('Zombie', 'The Cranberries', 306)
+            self.assertEqual(self._titles('zom'), ['Zombie'])
+
+    def test_lookup_is_sub_millisecond(self):
+        for i in range(5000):
+            self.index.add(f'Song number {i}', f'Artist {i % 50}', 200)
+        start = time.perf_counter()
+        for _ in range(100):
+            self.index.search('number 12')
+        self.assertLess((time.perf_counter() - start) / 100, 0.005)
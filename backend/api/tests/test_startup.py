@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest import TestCase
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Wall-time budgets for a cold import (measured ~0.5s and ~0.15s; generous for slow CI)
+APP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', '2.0'))
+CARDS_BUDGET_SECONDS = float(os.getenv('CARDS_IMPORT_BUDGET_SECONDS', '1.0'))
+
+
+def cold_import(statement, modules):
+    """Run statement in a fresh interpreter; return its seconds and which of modules got imported"""
+    code = (
+        'import json, sys, time; start = time.perf_counter(); '
+        f'{statement}; '
+        'elapsed = time.perf_counter() - start; '
+        f'print(json.dumps([elapsed, [m for m in {modules!r} if m in sys.modules]]))'
+    )
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='music_bingo.settings')
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=60)
+    if result.returncode:
+        raise AssertionError(result.stderr)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class StartupBudgetTest(TestCase):
+    """Worker boot must not import heavy SDKs (see test/audit_import_time.py for where time goes)"""
+
+    def test_app_boot(self):
+        elapsed, loaded = cold_import(
+            'import django; django.setup(); import api.urls',
+            ('openai', 'pydub', 'numpy', 'qrcode', 'reportlab', 'google.cloud.storage', 'api.audio_mixer')
+        )
+        self.assertEqual(loaded, [])
+        self.assertLess(elapsed, APP_BUDGET_SECONDS)
+
+    def test_card_generator_import(self):
+        elapsed, loaded = cold_import('import generate_cards', ('requests', 'qrcode', 'pypdf', 'PyPDF2', 'psutil'))
+        self.assertEqual(loaded, [])
+        self.assertLess(elapsed, CARDS_BUDGET_SECONDS)
+
+    def test_audio_stack_loads_on_first_mix(self):
+        _, loaded = cold_import(
+            'import django; django.setup(); '
+            'from api.services.music_bed_cache import MusicBedCache; '
+            'MusicBedCache.fit_to_length(__import__("numpy").zeros((10, 2), "float32"), 10)',
+            ('numpy', 'api.audio_mixer')
+        )
+        self.assertEqual(loaded, ['numpy', 'api.audio_mixer'])
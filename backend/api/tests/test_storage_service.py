@@ -0,0 +1,159 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.services import storage_service
+from api.services.storage_service import (
+    GCSStorageService, LocalStorageBackend, content_hash_key, get_storage
+)
+from api.utils.file_serving import CONTENT_HASH_RE
+
+
+class LocalStorageBackendTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name) / 'storage'
+        self.storage = LocalStorageBackend(root=self.root, base_url='/data/storage/')
+
+    def _file(self, name, content=b'%PDF-1.4 cards'):
+        path = Path(self.tmp.name) / name
+        path.write_bytes(content)
+        return path
+
+    def test_upload_file_and_bytes(self):
+        url = self.storage.upload_file(str(self._file('cards.pdf')), 'cards/cards.pdf')
+        self.assertEqual(url, '/data/storage/cards/cards.pdf')
+        self.assertEqual((self.root / 'cards/cards.pdf').read_bytes(), b'%PDF-1.4 cards')
+        self.assertTrue(self.storage.file_exists('cards/cards.pdf'))
+
+        self.storage.upload_bytes(b'{}', 'sessions/s.json', 'application/json')
+        self.assertEqual((self.root / 'sessions/s.json').read_bytes(), b'{}')
+        self.assertEqual([p.name for p in self.root.rglob('*.part')], [])
+
+        self.assertTrue(self.storage.delete_file('cards/cards.pdf'))
+        self.assertFalse(self.storage.file_exists('cards/cards.pdf'))
+
+    def test_rejects_traversal(self):
+        with self.assertRaises(ValueError):
+            self.storage.upload_bytes(b'x', '../outside.txt')
+        self.assertFalse(self.storage.file_exists('../outside.txt'))
+
+    def test_content_hash_keys_deduplicate(self):
+        pdf = self._file('music_bingo_cards.pdf')
+        key = content_hash_key(pdf, 'cards')
+        self.assertTrue(key.startswith('cards/music_bingo_cards_'))
+        self.assertRegex(key, CONTENT_HASH_RE)
+
+        url, key, uploaded = self.storage.upload_deduplicated(str(pdf), 'cards')
+        self.assertTrue(uploaded)
+        with mock.patch.object(self.storage, 'upload_file') as upload:
+            again_url, again_key, uploaded = self.storage.upload_deduplicated(str(pdf), 'cards')
+        upload.assert_not_called()
+        self.assertEqual((again_url, again_key, uploaded), (url, key, False))
+
+        other = self._file('music_bingo_cards.pdf', b'%PDF-1.4 other cards')
+        self.assertNotEqual(content_hash_key(other, 'cards'), key)
+
+    def test_upload_many_runs_concurrently_and_keeps_order(self):
+        files = [self._file(f'f{i}.json', b'{}') for i in range(3)]
+        active, peak, lock = [0], [0], threading.Lock()
+        original = self.storage.upload_file
+
+        def slow_upload(*args, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return original(*args, **kwargs)
+
+        with mock.patch.object(self.storage, 'upload_file', side_effect=slow_upload):
+            urls = self.storage.upload_many([(f, f'out/{f.name}') for f in files])
+        self.assertEqual(urls, [f'/data/storage/out/f{i}.json' for i in range(3)])
+        self.assertGreater(peak[0], 1)
+
+    def test_upload_many_failures(self):
+        good = self._file('good.json', b'{}')
+        uploads = [(good, 'good.json'), (Path(self.tmp.name) / 'missing.pdf', 'missing.pdf')]
+        with self.assertRaises(FileNotFoundError):
+            self.storage.upload_many(uploads)
+
+        results = self.storage.upload_many(uploads, return_exceptions=True)
+        self.assertEqual(results[0], '/data/storage/good.json')
+        self.assertIsInstance(results[1], FileNotFoundError)
+
+
+class StorageFactoryTest(SimpleTestCase):
+    def tearDown(self):
+        storage_service._backends.clear()
+
+    def test_backends_are_cached_per_process(self):
+        storage_service._backends.clear()
+        self.assertIs(get_storage('local'), get_storage('local'))
+        with mock.patch.object(storage_service.AppConfig, 'STORAGE_BACKEND', 'local'):
+            self.assertIsInstance(get_storage(), LocalStorageBackend)
+        with self.assertRaises(ValueError):
+            get_storage('ftp')
+
+    def test_gcs_client_shared_and_public_url(self):
+        with mock.patch.object(GCSStorageService, '_client', None), \
+                mock.patch('google.cloud.storage.Client') as client_class:
+            GCSStorageService('bucket')._get_client()
+            GCSStorageService('bucket')._get_client()
+        client_class.assert_called_once()
+
+        self.assertEqual(GCSStorageService('bucket').public_url('cards/a b.pdf'),
+                         'https://storage.googleapis.com/bucket/cards/a%20b.pdf')
+
+
+class StreamingUploadTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = LocalStorageBackend(root=Path(self.tmp.name) / 'storage', base_url='/data/storage/')
+        patcher = mock.patch.object(storage_service.AppConfig, 'STORAGE_CHUNK_SIZE', 4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_chunks_are_sent_as_written(self):
+        upload = self.storage.open_upload('cards/out.pdf')
+        with mock.patch.object(upload, '_send', wraps=upload._send) as send:
+            upload.write(b'abcdefghij')
+            self.assertEqual([c.args[0] for c in send.call_args_list], [b'abcd', b'efgh'])
+        self.assertEqual(upload.close(), '/data/storage/cards/out.pdf')
+        self.assertEqual((self.storage.root / 'cards/out.pdf').read_bytes(), b'abcdefghij')
+
+    def test_upload_while_written_follows_the_file(self):
+        source = Path(self.tmp.name) / 'growing.pdf'
+        source.write_bytes(b'')
+        finished = threading.Event()
+
+        def writer():
+            with open(source, 'ab') as f:
+                for i in range(5):
+                    f.write(b'page%d;' % i)
+                    f.flush()
+                    time.sleep(0.02)
+            finished.set()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        url = self.storage.upload_while_written(str(source), 'cards/growing.pdf', finished, poll_interval=0.005)
+        thread.join()
+        self.assertEqual(url, '/data/storage/cards/growing.pdf')
+        self.assertEqual((self.storage.root / 'cards/growing.pdf').read_bytes(), source.read_bytes())
+
+    def test_cancelled_upload_leaves_nothing_behind(self):
+        source = Path(self.tmp.name) / 'partial.pdf'
+        source.write_bytes(b'half a pdf')
+        cancelled = threading.Event()
+        cancelled.set()
+        with self.assertRaises(RuntimeError):
+            self.storage.upload_while_written(str(source), 'cards/partial.pdf', threading.Event(), cancelled=cancelled)
+        self.assertEqual(list(self.storage.root.rglob('*')), [self.storage.root / 'cards'])
@@ -0,0 +1,86 @@
+import json
+import uuid
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import TaskStatus
+from api.tasks.task_progress import TaskProgressBus, task_progress
+
+
+def _task(**fields):
+    fields.setdefault('status', 'processing')
+    return TaskStatus.objects.create(task_id=str(uuid.uuid4()), task_type='card_generation', **fields)
+
+
+class TaskProgressBusTest(TestCase):
+    def setUp(self):
+        self.bus = TaskProgressBus(persist_interval=60, watch=False)
+        self.task = _task()
+
+    def tearDown(self):
+        for state in self.bus._running.values():
+            if state['timer'] is not None:
+                state['timer'].cancel()
+
+    def test_updates_are_pushed_at_once_and_written_coalesced(self):
+        subscriber = self.bus.subscribe(self.task)
+        self.assertEqual(subscriber.get_nowait()['status'], 'processing')
+
+        # First update is written, the rest wait for one trailing write
+        with self.assertNumQueries(1):
+            for progress in range(10, 100, 10):
+                self.bus.update(self.task.task_id, progress=progress, current_step='rendering')
+        self.assertEqual([subscriber.get_nowait()['progress'] for _ in range(9)], list(range(10, 100, 10)))
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.progress, 10)
+        self.bus.flush()
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.progress, self.task.current_step), (90, 'rendering'))
+
+    def test_final_state_drops_pending_progress(self):
+        subscriber = self.bus.subscribe(self.task)
+        self.bus.update(self.task.task_id, progress=10)
+        self.bus.update(self.task.task_id, progress=50)
+
+        self.task.status = 'completed'
+        self.task.progress = 100
+        self.task.result = {'pdf_url': '/data/storage/cards/x.pdf'}
+        self.task.completed_at = timezone.now()
+        self.task.save()
+        self.bus.publish(self.task)
+        self.bus.flush()
+
+        events = [subscriber.get_nowait() for _ in range(4)]
+        self.assertEqual(events[-1]['result'], {'pdf_url': '/data/storage/cards/x.pdf'})
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.progress, 100)
+
+    def test_remote_tasks_are_followed_from_the_database(self):
+        subscriber = self.bus.subscribe(self.task)
+        subscriber.get_nowait()
+        self.assertEqual(self.bus.check_remote(), 0)
+
+        TaskStatus.objects.filter(pk=self.task.pk).update(progress=40)
+        self.assertEqual(self.bus.check_remote(), 1)
+        self.assertEqual(subscriber.get_nowait()['progress'], 40)
+
+        self.bus.unsubscribe(self.task.task_id, subscriber)
+        self.assertEqual(self.bus.subscriber_count(), 0)
+
+
+class TaskStreamEndpointTest(TestCase):
+    def test_stream_ends_with_final_state(self):
+        task = _task(status='failed', error='boom', completed_at=timezone.now())
+        with mock.patch.object(task_progress, 'watch', False):
+            response = self.client.get(f'/api/tasks/{task.task_id}/stream')
+            body = b''.join(response.streaming_content).decode()
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        event = json.loads(body.split('data: ', 1)[1])
+        self.assertEqual((event['status'], event['error']), ('failed', 'boom'))
+        self.assertEqual(task_progress.subscriber_count(task.task_id), 0)
+
+        self.assertEqual(self.client.get('/api/tasks/missing/stream').status_code, 404)
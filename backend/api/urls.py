@@ -7,8 +7,6 @@ logger = logging.getLogger(__name__)
 
 try:
     from . import karaoke_views
-    logger.info("✅ Successfully imported karaoke_views module")
-    logger.info(f"   Available functions: {dir(karaoke_views)}")
 except Exception as e:
     logger.error(f"❌ Failed to import karaoke_views: {e}")
     raise
@@ -16,7 +14,6 @@ except Exception as e:
 # Import pub quiz views
 try:
     from . import pub_quiz_views
-    logger.info("✅ Successfully imported pub_quiz_views module")
 except Exception as e:
     logger.error(f"❌ Failed to import pub_quiz_views: {e}")
     pub_quiz_views = None
@@ -35,7 +32,9 @@ urlpatterns = [
     path('generate-track-announcement', views.generate_track_announcement, name='generate-track-announcement'),
     path('tts', views.generate_tts, name='tts'),  # Alias for frontend compatibility
     path('upload-logo', views.upload_logo, name='upload-logo'),
+    path('cards/<str:filename>', views.download_card, name='download-card'),
     path('tasks/<str:task_id>', views.get_task_status, name='task-status'),
+    path('tasks/<str:task_id>/stream', views.task_stream, name='task-stream'),
     # Jingle endpoints
     path('generate-jingle', views.generate_jingle, name='generate-jingle'),
     path('jingle-tasks/<str:task_id>', views.get_jingle_status, name='jingle-status'),
@@ -45,6 +44,9 @@ urlpatterns = [
     path('playlist', views.manage_playlist, name='manage-playlist'),
     # Jingle Schedule Management - RESTful pattern
     path('jingle-schedules/active', views.get_active_jingles, name='active-schedules'),  # GET: Filter active
+    path('jingle-schedules/version', views.get_schedule_version, name='schedule-version'),  # GET: Re-plan check
+    path('jingle-schedules/analytics', views.jingle_play_analytics, name='jingle-play-analytics'),  # GET: Play counts
+    path('jingle-schedules/<int:schedule_id>/play', views.record_jingle_play, name='record-jingle-play'),  # POST: Log a play
     path('jingle-schedules/<int:schedule_id>/delete', views.delete_jingle_schedule, name='delete-schedule'),  # DELETE
     path('jingle-schedules/<int:schedule_id>', views.update_jingle_schedule, name='update-schedule'),  # PUT: Update
     path('jingle-schedules', views.create_jingle_schedule, name='jingle-schedules'),  # POST: Create, GET: List all
@@ -95,21 +97,26 @@ urlpatterns = [
     path('bingo/sessions', views.bingo_sessions, name='bingo-sessions'),  # POST: Create, GET: List
     path('bingo/session/<str:session_id>', views.bingo_session_detail, name='bingo-session-detail'),  # GET/PUT/DELETE
     path('bingo/session/<str:session_id>/status', views.update_bingo_session_status, name='update-bingo-session-status'),  # PATCH
+    path('bingo/session/<str:session_id>/playout', views.bingo_session_playout, name='bingo-session-playout'),  # GET: Planned running order
     
     # ============================================================
     # KARAOKE ENDPOINTS
     # ============================================================
     # Session Management
     path('karaoke/session', karaoke_views.create_session, name='karaoke-create-session'),  # POST: Create session
+    path('karaoke/session/<int:session_id>/settings', karaoke_views.update_session_settings, name='karaoke-session-settings'),  # PATCH: Queue settings
+    path('karaoke/session/<int:session_id>/stream', karaoke_views.queue_stream, name='karaoke-queue-stream'),  # GET: SSE live queue
     path('karaoke/session/<str:venue_name>', karaoke_views.get_session, name='karaoke-get-session'),  # GET: Get session
     
     # Queue Management
     path('karaoke/queue', karaoke_views.add_to_queue, name='karaoke-add-queue'),  # POST: Add to queue
-    path('karaoke/queue/<int:session_id>', karaoke_views.get_queue, name='karaoke-get-queue'),  # GET: Get queue
-    path('karaoke/queue/<int:entry_id>', karaoke_views.cancel_entry, name='karaoke-cancel'),  # DELETE: Cancel
+    path('karaoke/queue/<int:pk>', karaoke_views.queue_detail, name='karaoke-queue-detail'),  # GET: Get queue (session id), DELETE: Cancel (entry id)
     path('karaoke/queue/<int:entry_id>/complete', karaoke_views.complete_entry, name='karaoke-complete'),  # PATCH: Complete
+    path('karaoke/queue/<int:entry_id>/move', karaoke_views.move_entry, name='karaoke-move'),  # PATCH: Reorder
+    path('karaoke/songs/search', karaoke_views.search_songs, name='karaoke-song-search'),  # GET: Song autocomplete
     
     # Karafun API Integration
     path('karaoke/karafun/devices', karaoke_views.list_karafun_devices, name='karafun-devices'),  # GET: List devices
     path('karaoke/karafun/session', karaoke_views.create_karafun_session, name='karafun-create-session'),  # POST: Create Karafun session
+    path('karaoke/karafun/sessions', karaoke_views.list_karafun_sessions, name='karafun-sessions'),  # GET: List Karafun sessions (cached)
 ]
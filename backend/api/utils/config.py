@@ -40,6 +40,31 @@ class AppConfig:
     DATA_DIR = BASE_DIR / 'data'  # /app/data
     FRONTEND_DIR = BASE_DIR / 'frontend'  # /app/frontend
     
+    # nginx internal location aliased to DATA_DIR (e.g. '/protected-data/').
+    # When set, data files are sent via X-Accel-Redirect instead of by Django.
+    DATA_ACCEL_REDIRECT_PREFIX = os.getenv('DATA_ACCEL_REDIRECT_PREFIX', '')
+    
+    # ============================================================================
+    # OBJECT STORAGE
+    # ============================================================================
+    
+    # Where generated cards and session files are published: 'gcs', 'local' or 's3'
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'gcs')
+    
+    # Local backend: files under DATA_DIR are served at /data/ (or by nginx)
+    LOCAL_STORAGE_DIR = Path(os.getenv('LOCAL_STORAGE_DIR', str(DATA_DIR / 'storage')))
+    LOCAL_STORAGE_URL = os.getenv('LOCAL_STORAGE_URL', '/data/storage/')
+    
+    # S3-compatible backend (AWS, MinIO, R2, ...); requires boto3
+    S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME', '')
+    S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL', '')  # Empty = AWS
+    S3_REGION = os.getenv('S3_REGION', 'us-east-1')
+    S3_PUBLIC_URL = os.getenv('S3_PUBLIC_URL', '')  # Public base URL (CDN), optional
+    
+    # Files above this size are uploaded in resumable chunks / multipart parts
+    STORAGE_CHUNK_SIZE = int(os.getenv('STORAGE_CHUNK_SIZE', str(8 * 1024 * 1024)))  # Multiple of 256KB for GCS
+    STORAGE_UPLOAD_WORKERS = int(os.getenv('STORAGE_UPLOAD_WORKERS', '4'))
+    
     # ============================================================================
     # VALIDATION LIMITS
     # ============================================================================
@@ -87,6 +112,114 @@ class AppConfig:
     TTS_TURBO_MODEL_ID = 'eleven_turbo_v2_5'
     TTS_OUTPUT_FORMAT = 'mp3_44100_128'
     
+    # ============================================================================
+    # MUSIC BED CACHE
+    # ============================================================================
+    
+    # Reuse generated background music for repeat jingle prompts
+    MUSIC_BED_CACHE_ENABLED = os.getenv('MUSIC_BED_CACHE_ENABLED', 'true').lower() == 'true'
+    MUSIC_BED_REFRESH_DAYS = int(os.getenv('MUSIC_BED_REFRESH_DAYS', '7'))  # Refresh stale beds in background
+    
+    # ============================================================================
+    # KARAOKE FAIR-SHARE SCHEDULING
+    # ============================================================================
+    
+    # Each earlier turn by the same singer counts as this many seconds of waiting
+    KARAOKE_TURN_PENALTY_SECONDS = int(os.getenv('KARAOKE_TURN_PENALTY_SECONDS', '900'))
+    # Seconds of penalty per second a song runs over the session average
+    KARAOKE_LONG_SONG_WEIGHT = float(os.getenv('KARAOKE_LONG_SONG_WEIGHT', '1.0'))
+    # Peak hours (local time, may wrap past midnight) and the song length cap during them
+    KARAOKE_PEAK_START_HOUR = int(os.getenv('KARAOKE_PEAK_START_HOUR', '21'))
+    KARAOKE_PEAK_END_HOUR = int(os.getenv('KARAOKE_PEAK_END_HOUR', '1'))
+    KARAOKE_PEAK_MAX_SONG_SECONDS = int(os.getenv('KARAOKE_PEAK_MAX_SONG_SECONDS', '300'))
+    KARAOKE_PEAK_OVERRUN_WEIGHT = float(os.getenv('KARAOKE_PEAK_OVERRUN_WEIGHT', '4.0'))
+    
+    # ============================================================================
+    # KARAFUN CACHE
+    # ============================================================================
+    
+    KARAFUN_CACHE_TTL = int(os.getenv('KARAFUN_CACHE_TTL', '300'))  # Served without revalidating
+    KARAFUN_CACHE_STALE_TTL = int(os.getenv('KARAFUN_CACHE_STALE_TTL', '3600'))  # Served stale while refreshing
+    SONG_INDEX_TTL = int(os.getenv('SONG_INDEX_TTL', '600'))  # Rebuild song autocomplete index after
+    
+    # ============================================================================
+    # PLAYOUT PLANNING
+    # ============================================================================
+    
+    # Estimated running time per song (announcement + 20s preview + 15s gap)
+    PLAYOUT_SECONDS_PER_SONG = int(os.getenv('PLAYOUT_SECONDS_PER_SONG', '45'))
+    PLAYOUT_ANNOUNCEMENT_SECONDS = 10  # Welcome / summary / halfway
+    
+    # ============================================================================
+    # JINGLE PLAY HISTORY
+    # ============================================================================
+    
+    # Plays are buffered in memory and written in bulk once either limit is hit
+    PLAY_HISTORY_FLUSH_SIZE = int(os.getenv('PLAY_HISTORY_FLUSH_SIZE', '50'))
+    PLAY_HISTORY_FLUSH_SECONDS = float(os.getenv('PLAY_HISTORY_FLUSH_SECONDS', '5'))
+    PLAY_ANALYTICS_DEFAULT_DAYS = 30  # Analytics window when no 'since' is given
+    
+    # ============================================================================
+    # JOB QUEUE
+    # ============================================================================
+    
+    # 'embedded': each web process runs a worker thread; 'external': jobs only
+    # run in `python manage.py run_jobs` processes
+    JOB_WORKER_MODE = os.getenv('JOB_WORKER_MODE', 'embedded')
+    # Jobs of each type running at once across all workers (a card job uses ~2 CPUs)
+    JOB_CONCURRENCY_CARD_GENERATION = int(os.getenv('JOB_CONCURRENCY_CARD_GENERATION', '1'))
+    JOB_CONCURRENCY_JINGLE_GENERATION = int(os.getenv('JOB_CONCURRENCY_JINGLE_GENERATION', '2'))
+    JOB_MAX_QUEUED = int(os.getenv('JOB_MAX_QUEUED', '20'))  # Waiting jobs per type before new ones are rejected
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '60'))  # Renewed while running; expired = worker died
+    JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '2'))
+    JOB_RETRY_BACKOFF_SECONDS = int(os.getenv('JOB_RETRY_BACKOFF_SECONDS', '10'))  # Doubles per attempt
+    # Workers don't start jobs while the box is below/above these
+    JOB_MIN_FREE_MEMORY_MB = int(os.getenv('JOB_MIN_FREE_MEMORY_MB', '300'))
+    JOB_MAX_LOAD_PER_CPU = float(os.getenv('JOB_MAX_LOAD_PER_CPU', '1.5'))
+    # Running jobs write their progress to TaskStatus at most this often
+    TASK_PROGRESS_PERSIST_MS = int(os.getenv('TASK_PROGRESS_PERSIST_MS', '1000'))
+    
+    # ============================================================================
+    # GENERATED FILE RETENTION
+    # ============================================================================
+    
+    # Local card PDFs, session files and temp logos older than this are deleted
+    CARD_RETENTION_DAYS = float(os.getenv('CARD_RETENTION_DAYS', '7'))
+    # A cleanup job is queued after card generation at most this often
+    CARD_CLEANUP_INTERVAL_HOURS = float(os.getenv('CARD_CLEANUP_INTERVAL_HOURS', '6'))
+    
+    # ============================================================================
+    # METRICS
+    # ============================================================================
+    
+    # GET /metrics requires 'Authorization: Bearer <token>'; unset disables it
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    # Port run_jobs serves its own /metrics on (0: off; bound to 127.0.0.1)
+    JOB_METRICS_PORT = int(os.getenv('JOB_METRICS_PORT', '0'))
+    
+    # ============================================================================
+    # REQUEST PROFILING
+    # ============================================================================
+    
+    # X-Query-Count / X-DB-Time-Ms / Server-Timing headers (always on with DEBUG)
+    REQUEST_PROFILE_HEADERS = os.getenv('REQUEST_PROFILE_HEADERS', 'false').lower() == 'true'
+    # Requests slower than this or running more queries are logged as warnings
+    REQUEST_SLOW_MS = int(os.getenv('REQUEST_SLOW_MS', '1000'))
+    REQUEST_QUERY_WARN = int(os.getenv('REQUEST_QUERY_WARN', '50'))
+    
+    # ============================================================================
+    # LOGGING
+    # ============================================================================
+    
+    # Per-subsystem levels, e.g. 'api.pub_quiz_views=WARNING,debug.quiz_stream=DEBUG'
+    # ('debug' enables every debug category)
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+    # Runtime overrides written by `python manage.py log_levels`
+    LOG_LEVELS_FILE = Path(os.getenv('LOG_LEVELS_FILE', str(DATA_DIR / 'log_levels.json')))
+    LOG_LEVELS_CHECK_SECONDS = 2  # How often processes look for new overrides
+    # Lines per second each enabled debug category may emit
+    LOG_DEBUG_RATE = float(os.getenv('LOG_DEBUG_RATE', '2'))
+    
     # ============================================================================
     # HELPER METHODS
     # ============================================================================
@@ -0,0 +1,195 @@
+"""
+Static-asset serving for the data/ tree
+
+Serves jingles, card PDFs and other data files with:
+- Byte-range requests (single range, 206 / 416)
+- Conditional GET (ETag, Last-Modified, If-Range)
+- Long-lived cache headers for immutable / content-hashed filenames
+- Optional X-Accel-Redirect delegation to nginx (DATA_ACCEL_REDIRECT_PREFIX)
+"""
+
+import mimetypes
+import re
+from pathlib import Path
+from typing import Optional, Tuple
+
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+from .config import AppConfig
+
+CHUNK_SIZE = 64 * 1024
+
+# One year, the conventional maximum for immutable assets
+IMMUTABLE_MAX_AGE = 31536000
+
+# e.g. cards_3f2a9c1e0b7d4a6f.pdf - a 16+ hex digit content hash before the extension.
+# At least one a-f letter, so timestamp or id suffixes (jingle_1736812345678901.mp3)
+# are not mistaken for hashes; a hash without one just isn't cached as immutable
+CONTENT_HASH_RE = re.compile(r'[._-](?=[0-9]*[a-f])[0-9a-f]{16,}\.[A-Za-z0-9]+$')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def resolve_data_path(root: Path, relative_path: str) -> Path:
+    """
+    Resolve a request path inside root, rejecting directory traversal
+
+    Raises:
+        Http404: If the file does not exist or escapes root
+    """
+    root = Path(root).resolve()
+    file_path = (root / relative_path).resolve()
+    if root not in file_path.parents or not file_path.is_file():
+        raise Http404('File not found')
+    return file_path
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header
+
+    Args:
+        header: Range header value (e.g. 'bytes=0-1023', 'bytes=-500')
+        size: File size in bytes
+
+    Returns:
+        (start, end) inclusive byte offsets, or None if the header should be
+        ignored (malformed or multiple ranges - the full file is served)
+
+    Raises:
+        ValueError: If the range is well-formed but unsatisfiable
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+
+    start, end = match.groups()
+    if start == '':
+        # Suffix range: last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError('Empty suffix range')
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+def _file_chunks(file_path: Path, start: int, length: int):
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def cache_control_for(filename: str, immutable: bool = False) -> str:
+    """Cache-Control value for a data file"""
+    if immutable or CONTENT_HASH_RE.search(filename):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    # Always revalidate - the ETag makes that a cheap 304
+    return 'public, max-age=0, must-revalidate'
+
+
+def serve_data_file(
+    request,
+    relative_path: str,
+    root: Optional[Path] = None,
+    content_type: Optional[str] = None,
+    as_attachment: bool = False,
+    immutable: bool = False
+):
+    """
+    Serve a file from the data directory
+
+    Args:
+        request: Django request
+        relative_path: Path relative to root (e.g. 'jingles/jingle_1.mp3')
+        root: Directory to serve from (defaults to DATA_DIR)
+        content_type: Override the guessed content type
+        as_attachment: Send Content-Disposition: attachment
+        immutable: File never changes under this name (long-lived caching)
+
+    Returns:
+        HttpResponse: 200, 206, 304, 412 or 416 response
+
+    Raises:
+        Http404: If the file does not exist or is outside root
+    """
+    root = Path(root) if root else AppConfig.DATA_DIR
+    file_path = resolve_data_path(root, relative_path)
+    stat = file_path.stat()
+    size = stat.st_size
+
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control_for(file_path.name, immutable)
+        return response
+
+    if content_type is None:
+        content_type, _ = mimetypes.guess_type(file_path.name)
+        content_type = content_type or 'application/octet-stream'
+
+    def set_common_headers(resp):
+        resp['ETag'] = etag
+        resp['Last-Modified'] = http_date(last_modified)
+        resp['Accept-Ranges'] = 'bytes'
+        resp['Cache-Control'] = cache_control_for(file_path.name, immutable)
+        if as_attachment:
+            resp['Content-Disposition'] = f'attachment; filename="{file_path.name}"'
+        return resp
+
+    # Let nginx stream the bytes (it handles ranges itself)
+    accel_prefix = AppConfig.DATA_ACCEL_REDIRECT_PREFIX
+    if accel_prefix and AppConfig.DATA_DIR.resolve() in file_path.parents:
+        data_relative = file_path.relative_to(AppConfig.DATA_DIR.resolve()).as_posix()
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + data_relative
+        return set_common_headers(response)
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return set_common_headers(response)
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _file_chunks(file_path, start, length), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+    else:
+        # FileResponse goes through wsgi.file_wrapper (sendfile under gunicorn)
+        response = FileResponse(open(file_path, 'rb'), content_type=content_type)
+
+    return set_common_headers(response)
+
+
+def _if_range_matches(request, etag: str, last_modified: int) -> bool:
+    """Honour Range only if If-Range (when sent) still matches the file"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
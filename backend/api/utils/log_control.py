@@ -0,0 +1,184 @@
+"""
+Log volume control
+Per-subsystem log levels (LOG_LEVELS, changed at runtime with
+`python manage.py log_levels`) and rate-limited debug categories whose
+diagnostic-only work is skipped unless the category is enabled
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from .config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Debug categories log through 'debug.<name>' loggers, so one level
+# setting ('debug=DEBUG') enables all of them
+CATEGORY_PREFIX = 'debug.'
+
+_levels_lock = threading.Lock()
+_applied: Dict[str, int] = {}  # logger name -> level set from LOG_LEVELS / the override file
+_override_state = {'mtime': None, 'checked_at': float('-inf')}
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """
+    Parse a level spec
+
+    Example:
+        >>> parse_levels('api.pub_quiz_views=WARNING, debug.quiz_stream=DEBUG')
+        {'api.pub_quiz_views': 30, 'debug.quiz_stream': 10}
+
+    Raises:
+        ValueError: For an entry without '=' or an unknown level name
+    """
+    levels = {}
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, level = entry.partition('=')
+        if not sep:
+            raise ValueError(f"Expected logger=LEVEL, got '{entry}'")
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Unknown log level '{level.strip()}'")
+        levels[name.strip()] = value
+    return levels
+
+
+def apply_levels(levels: Dict[str, int]) -> None:
+    """Set logger levels; loggers dropped from the mapping inherit again"""
+    with _levels_lock:
+        for name in set(_applied) - set(levels):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        for name, level in levels.items():
+            logging.getLogger(name).setLevel(level)
+        _applied.clear()
+        _applied.update(levels)
+
+
+def read_overrides() -> Dict[str, str]:
+    """Runtime overrides from LOG_LEVELS_FILE ({} when there is none)"""
+    try:
+        with open(AppConfig.LOG_LEVELS_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_overrides(overrides: Dict[str, str]) -> None:
+    """Save runtime overrides; processes apply them on their next refresh_levels() check"""
+    AppConfig.LOG_LEVELS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    if overrides:
+        with open(AppConfig.LOG_LEVELS_FILE, 'w') as f:
+            json.dump(overrides, f, indent=2, sort_keys=True)
+    else:
+        AppConfig.LOG_LEVELS_FILE.unlink(missing_ok=True)
+
+
+def refresh_levels(force: bool = False) -> bool:
+    """
+    Apply LOG_LEVELS plus the override file when the file changed
+
+    The file is stat'ed at most once per LOG_LEVELS_CHECK_SECONDS, so
+    this is cheap enough to call from hot loops. Called by
+    LogLevelsMiddleware, the job worker loop and DebugCategory.enabled.
+
+    Returns:
+        bool: True if levels were (re)applied
+    """
+    now = time.monotonic()
+    if not force and now - _override_state['checked_at'] < AppConfig.LOG_LEVELS_CHECK_SECONDS:
+        return False
+    _override_state['checked_at'] = now
+
+    try:
+        mtime = AppConfig.LOG_LEVELS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if not force and mtime == _override_state['mtime']:
+        return False
+    _override_state['mtime'] = mtime
+
+    try:
+        levels = parse_levels(AppConfig.LOG_LEVELS)
+        levels.update(parse_levels(','.join(f'{name}={level}' for name, level in read_overrides().items())))
+    except (ValueError, OSError) as e:
+        logger.error(f"Ignoring invalid log levels: {e}")
+        return False
+    apply_levels(levels)
+    return True
+
+
+class DebugCategory:
+    """
+    A named stream of debug lines (logger 'debug.<name>')
+
+    Features:
+    - enabled is a cheap level check: guard diagnostic-only work such as
+      extra queries with it
+    - log() formats lazily (%-style args, like logging) and emits at most
+      `rate` lines per second; suppressed lines are counted and reported
+      on the next line that is emitted
+    """
+
+    def __init__(self, name: str, rate: Optional[float] = None):
+        """
+        Initialize Debug Category
+
+        Args:
+            name: Category name (e.g. 'quiz_stream')
+            rate: Lines per second (default LOG_DEBUG_RATE; 0 = unlimited)
+        """
+        self.name = name
+        self.logger = logging.getLogger(CATEGORY_PREFIX + name)
+        self.rate = AppConfig.LOG_DEBUG_RATE if rate is None else rate
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._emitted = 0
+        self._suppressed = 0
+
+    @property
+    def enabled(self) -> bool:
+        refresh_levels()
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def log(self, msg: str, *args) -> None:
+        """Log a debug line if the category is enabled and under its rate"""
+        if not self.enabled:
+            return
+        if self.rate:
+            now = time.monotonic()
+            with self._lock:
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._emitted = 0
+                if self._emitted >= self.rate:
+                    self._suppressed += 1
+                    return
+                self._emitted += 1
+                suppressed, self._suppressed = self._suppressed, 0
+            if suppressed:
+                msg += ' (+%d suppressed)'
+                args += (suppressed,)
+        self.logger.debug(msg, *args)
+
+
+_categories: Dict[str, DebugCategory] = {}
+
+
+def debug_category(name: str, rate: Optional[float] = None) -> DebugCategory:
+    """Get or create the debug category with this name"""
+    category = _categories.get(name)
+    if category is None:
+        category = _categories.setdefault(name, DebugCategory(name, rate))
+    return category
+
+
+def registered_categories() -> Dict[str, DebugCategory]:
+    """Categories created so far in this process"""
+    return dict(_categories)
@@ -0,0 +1,294 @@
+"""
+Hot-path instrumentation
+Named spans time the stages of the card, quiz, TTS and jingle pipelines.
+Every span is observed in a Prometheus-style histogram (served on /metrics)
+and, inside collect_timings(), added to a per-task timing breakdown that
+the job handlers store in TaskStatus.result['timings']
+"""
+
+import contextvars
+import functools
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+# Upper bounds (seconds): from fast DB saves up to large card runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with labels (Prometheus semantics)
+
+    Features:
+    - observe() is O(log buckets) under one lock; no allocation after
+      the first observation of a label set
+    - render() emits the text exposition format (_bucket, _sum, _count)
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize Histogram
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Label names, in the order values are passed to observe()
+            buckets: Sorted bucket upper bounds (+Inf is added)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """Record one observation for a label set"""
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        """Observations recorded for a label set"""
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return sum(series[:-1]) if series else 0
+
+    def render(self) -> str:
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels in sorted(snapshot):
+            series = snapshot[labels]
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += hits
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]!r}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}')
+        return '\n'.join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """
+    The metrics of this process
+
+    Features:
+    - histogram() returns the existing metric for a name, so modules can
+      declare their metrics at import time in any order
+    - Collectors (callables returning exposition text) add values that
+      are computed at scrape time, such as job queue depth
+    """
+
+    def __init__(self):
+        """Initialize Metrics Registry"""
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Histogram] = {}
+        self._collectors = []
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+            return metric
+
+    def add_collector(self, collector) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        parts = [metric.render() for metric in metrics]
+        for collector in collectors:
+            text = collector()
+            if text:
+                parts.append(text)
+        return '\n'.join(parts) + '\n'
+
+    def reset(self) -> None:
+        """Clear recorded values (tests)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+registry = MetricsRegistry()
+
+
+def scrape_authorized(authorization: str, token: str) -> bool:
+    """True if an Authorization header carries the bearer token (never when no token is set)"""
+    if not token:
+        return False
+    return hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+
+
+def serve(port: int, token: str, host: str = '127.0.0.1', render=None) -> ThreadingHTTPServer:
+    """
+    Serve GET /metrics from a daemon thread
+
+    For processes without a web server (manage.py run_jobs), whose
+    histograms no web process can report.
+
+    Args:
+        port: Port to listen on (0 picks a free one, see server_address)
+        token: Bearer token required on every scrape
+        host: Interface to bind
+        render: Exposition text callable (defaults to registry.render)
+    """
+    render = render or registry.render
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            if not scrape_authorized(self.headers.get('Authorization', ''), token):
+                self.send_error(403)
+                return
+            try:
+                body = render().encode('utf-8')
+            except Exception:
+                self.send_error(500)
+                raise  # Logged by the server's handle_error
+            self.send_response(200)
+            self.send_header('Content-Type', METRICS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood the worker log
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
+
+STAGE_SECONDS = registry.histogram(
+    'music_bingo_stage_seconds',
+    'Duration of pipeline stages (card, quiz, tts, jingle)',
+    ('pipeline', 'stage', 'outcome')
+)
+
+
+class TaskTimings:
+    """Per-task timing breakdown; repeated stages (e.g. save per round) are summed"""
+
+    def __init__(self):
+        """Initialize Task Timings"""
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, object]:
+        """{'stages': {stage: seconds}, 'total': seconds} for TaskStatus.result"""
+        with self._lock:
+            stages = {stage: round(seconds, 3) for stage, seconds in self.stages.items()}
+        return {'stages': stages, 'total': round(time.perf_counter() - self._started, 3)}
+
+
+_current_timings: contextvars.ContextVar[Optional[TaskTimings]] = contextvars.ContextVar(
+    'task_timings', default=None
+)
+
+
+@contextmanager
+def collect_timings() -> Iterator[TaskTimings]:
+    """
+    Collect the spans run in this context into a TaskTimings
+
+    Threads started inside only report into it when they run in a copy of
+    this context (contextvars.copy_context().run).
+    """
+    timings = TaskTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def record(pipeline: str, stage: str, seconds: float, outcome: str = 'ok') -> None:
+    """Record a stage measured elsewhere (e.g. reported by a subprocess)"""
+    STAGE_SECONDS.observe(seconds, pipeline, stage, outcome)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def span(pipeline: str, stage: str) -> Iterator[None]:
+    """
+    Time a block as one pipeline stage
+
+    Example:
+        >>> with span('jingle', 'mix'):
+        ...     mixed = mix_audio(voice, music)
+    """
+    start = time.perf_counter()
+    outcome = 'ok'
+    try:
+        yield
+    except BaseException:
+        outcome = 'error'
+        raise
+    finally:
+        record(pipeline, stage, time.perf_counter() - start, outcome)
+
+
+def timed(pipeline: str, stage: str):
+    """Decorator form of span()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(pipeline, stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
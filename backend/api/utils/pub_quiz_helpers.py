@@ -9,10 +9,17 @@ Shared helper functions used across all pub quiz view modules:
 """
 
 import logging
+
+from django.db.models import Q
+
 from ..pub_quiz_models import PubQuizSession
+from .log_control import debug_category
 
 logger = logging.getLogger(__name__)
 
+# Diagnostics for failed lookups (extra queries; off unless enabled)
+lookup_log = debug_category('session_lookup', rate=0)
+
 
 # ============================================================================
 # SESSION LOOKUP
@@ -22,22 +29,26 @@ def get_session_by_code_or_id(session_identifier):
     """
     Get session by session_code (string) or id (int).
     This allows backward compatibility with numeric IDs.
+    One query either way (both lookups hit a unique index); if a numeric
+    identifier matches one session's code and another's id, the code wins.
     """
-    try:
-        session = PubQuizSession.objects.get(session_code=session_identifier)
-        logger.debug(f"[GET_SESSION] Found by session_code: {session.id}")
+    identifier = str(session_identifier).strip()
+    lookup = Q(session_code=identifier)
+    # ASCII digits only ('²'.isdigit() is True but int() rejects it), short enough for a bigint
+    if identifier.isascii() and identifier.isdecimal() and len(identifier) <= 18:
+        lookup |= Q(id=int(identifier))
+
+    matches = list(PubQuizSession.objects.filter(lookup).order_by()[:2])
+    if matches:
+        session = min(matches, key=lambda s: s.session_code != identifier)
+        logger.debug("[GET_SESSION] Found %s: %s", identifier, session.id)
         return session
-    except PubQuizSession.DoesNotExist:
-        try:
-            session = PubQuizSession.objects.get(id=int(session_identifier))
-            logger.debug(f"[GET_SESSION] Found by numeric ID: {session.id}")
-            return session
-        except (PubQuizSession.DoesNotExist, ValueError):
-            logger.warning(f"[GET_SESSION] Session not found: '{session_identifier}'")
-            return None
-    except ValueError:
-        logger.warning(f"[GET_SESSION] Invalid session identifier: '{session_identifier}'")
-        return None
+
+    logger.warning(f"[GET_SESSION] Session not found: '{session_identifier}'")
+    if lookup_log.enabled:
+        lookup_log.log("[GET_SESSION] %d sessions, codes: %s", PubQuizSession.objects.count(),
+                       list(PubQuizSession.objects.values_list('session_code', flat=True)[:50]))
+    return None
 
 
 # ============================================================================
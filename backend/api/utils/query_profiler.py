@@ -0,0 +1,86 @@
+"""
+Query profiling
+Counts the queries a block of code runs and the time spent in the
+database, for the request profiler middleware and for query-budget
+assertions in tests
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from django.db import connections
+
+
+class QueryProfile:
+    """
+    Query count and database time of one block (a connection execute wrapper)
+
+    Features:
+    - Works with DEBUG off (no connection.queries needed)
+    - Only sees queries run on the installing thread's connection
+    - Keeps the SQL of each query when keep_sql is set (for test failures)
+    """
+
+    def __init__(self, keep_sql: bool = False):
+        """
+        Initialize Query Profile
+
+        Args:
+            keep_sql: Record each statement, not just count and time
+        """
+        self.count = 0
+        self.db_seconds = 0.0
+        self.keep_sql = keep_sql
+        self.statements: List[str] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.count += 1
+            if self.keep_sql:
+                self.statements.append(sql)
+
+
+@contextmanager
+def profile_queries(using: str = 'default', keep_sql: bool = False) -> Iterator[QueryProfile]:
+    """
+    Profile the queries run inside the block
+
+    Example:
+        >>> with profile_queries() as profile:
+        ...     list(PubQuizSession.objects.all())
+        >>> profile.count
+        1
+    """
+    profile = QueryProfile(keep_sql=keep_sql)
+    with connections[using].execute_wrapper(profile):
+        yield profile
+
+
+class QueryBudgetMixin:
+    """
+    Query budget assertions for TestCase classes
+
+    Unlike assertNumQueries, a budget is a ceiling: an endpoint may get
+    cheaper without breaking its test, but any new per-row query fails it
+    with the statements listed.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget: int, label: str = 'block') -> Iterator[QueryProfile]:
+        with profile_queries(keep_sql=True) as profile:
+            yield profile
+        if profile.count > budget:
+            statements = '\n'.join(f'{n}. {sql}' for n, sql in enumerate(profile.statements, 1))
+            self.fail(f'{label} ran {profile.count} queries, budget is {budget}:\n{statements}')
+
+    def assertEndpointBudget(self, budget: int, url: str, method: str = 'get', **kwargs):
+        """Request url with the test client; fail if it needs more than budget queries"""
+        with self.assertQueryBudget(budget, f'{method.upper()} {url}'):
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400, f'{method.upper()} {url} returned {response.status_code}')
+        return response
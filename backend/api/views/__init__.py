@@ -2,7 +2,7 @@
 Modular Views Package
 
 This package organizes API views by domain:
-- core_views: Health check, pool data, task status, config
+- core_views: Health check, pool data, task status, metrics, config
 - card_views: Card generation and logo upload
 - tts_views: Text-to-Speech operations and announcements
 - jingle_views: Jingle generation, listing, and playlist management
@@ -17,13 +17,16 @@ from .core_views import (
     get_pool,
     get_session,
     get_task_status,
+    task_stream,
+    metrics,
     get_config
 )
 
 # Card generation
 from .card_views import (
     generate_cards_async,
-    upload_logo
+    upload_logo,
+    download_card
 )
 
 # Text-to-Speech
@@ -50,8 +53,11 @@ from .jingle_views import (
 from .schedule_views import (
     create_jingle_schedule,
     get_active_jingles,
+    get_schedule_version,
     update_jingle_schedule,
-    delete_jingle_schedule
+    delete_jingle_schedule,
+    record_jingle_play,
+    jingle_play_analytics
 )
 
 # Venue configuration
@@ -63,7 +69,8 @@ from .venue_views import (
 from .session_views import (
     bingo_sessions,
     bingo_session_detail,
-    update_bingo_session_status
+    update_bingo_session_status,
+    bingo_session_playout
 )
 __all__ = [
     # Core
@@ -71,10 +78,13 @@ __all__ = [
     'get_pool',
     'get_session',
     'get_task_status',
+    'task_stream',
+    'metrics',
     'get_config',
     # Card
     'generate_cards_async',
     'upload_logo',
+    'download_card',
     # TTS
     'generate_tts',
     'generate_tts_preview',
@@ -90,12 +100,16 @@ __all__ = [
     # Schedule
     'create_jingle_schedule',
     'get_active_jingles',
+    'get_schedule_version',
     'update_jingle_schedule',
     'delete_jingle_schedule',
+    'record_jingle_play',
+    'jingle_play_analytics',
     # Venue
     'venue_config',
     # Session
     'bingo_sessions',
     'bingo_session_detail',
     'update_bingo_session_status',
+    'bingo_session_playout',
 ]
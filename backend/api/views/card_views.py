@@ -4,6 +4,7 @@ Card Generation Views
 This module handles bingo card generation and logo management:
 - generate_cards_async: Asynchronously generate PDF bingo cards with custom branding
 - upload_logo: Handle venue logo uploads for card customization
+- download_card: Serve locally stored card PDFs (GCS upload fallback)
 
 Card generation supports:
 - Custom venue names and branding
@@ -18,6 +19,7 @@ import json
 import logging
 import uuid
 import time
+from django.http import Http404
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view
@@ -25,12 +27,13 @@ from rest_framework.response import Response
 
 from ..models import TaskStatus
 from ..services.card_generation_service import CardGenerationService
-from ..tasks import run_card_generation_task
+from ..tasks import JobQueueFull, admit, run_card_generation_task
 
 logger = logging.getLogger(__name__)
 
 # Get paths from config
 from ..utils.config import BASE_DIR, DATA_DIR
+from ..utils.file_serving import serve_data_file
 
 
 @api_view(['POST'])
@@ -156,6 +159,9 @@ def generate_cards_async(request):
         logger.info(f"  social_media: {social_media}, include_qr: {include_qr}")
         logger.info(f"  prizes: {prize_4corners}, {prize_first_line}, {prize_full_house}")
         
+        # Reject before creating a session if the queue is full
+        admit('card_generation')
+        
         # Create or get BingoSession for this card generation
         from ..models import BingoSession
         from ..services.session_service import BingoSessionService
@@ -249,10 +255,12 @@ def generate_cards_async(request):
             'session_id': session_id
         })
         
-        # Run task in background using task module
+        # Queue the job for a worker
         run_card_generation_task(task_id, task, cmd, BASE_DIR)
         
         return Response({'task_id': task_id, 'status': 'pending'}, status=202)
+    except JobQueueFull as e:
+        return Response({'error': str(e)}, status=503, headers={'Retry-After': str(e.retry_after)})
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
@@ -306,3 +314,27 @@ def upload_logo(request):
     except Exception as e:
         logger.error(f"Error uploading logo: {e}", exc_info=True)
         return Response({'error': str(e)}, status=500)
+
+
+@api_view(['GET'])
+def download_card(request, filename):
+    """
+    Download a generated card PDF from local storage
+    GET /api/cards/<filename>
+    
+    Fallback URL returned by card generation when the GCS upload fails.
+    Supports Range and conditional requests.
+    """
+    try:
+        return serve_data_file(
+            request,
+            filename,
+            root=DATA_DIR / 'cards',
+            content_type='application/pdf'
+        )
+        
+    except Http404:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving card PDF: {e}", exc_info=True)
+        raise Http404('Error serving file')
@@ -5,6 +5,8 @@ This module provides core utility endpoints for the Music Bingo application:
 - health_check: System health monitoring endpoint
 - get_pool: Retrieve music pool data
 - get_task_status: Check status of async tasks (card generation, jingle generation)
+- task_stream: Server-Sent Events stream of a task's progress
+- metrics: Prometheus-style stage timings and job queue depth
 - get_config: Get public configuration settings
 
 These endpoints provide essential infrastructure services used across the application.
@@ -12,16 +14,26 @@ These endpoints provide essential infrastructure services used across the applic
 
 import json
 import logging
+import queue
+import time
 
-from django.utils import timezone
+from django.db import connection
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from ..models import TaskStatus
-from ..utils.config import DATA_DIR, VENUE_NAME
+from ..tasks import ensure_worker
+from ..tasks.task_progress import FINAL_STATUSES, task_progress, task_status_payload
+from ..utils.config import AppConfig, DATA_DIR, VENUE_NAME
+from ..utils.metrics import METRICS_CONTENT_TYPE, registry, scrape_authorized
 
 logger = logging.getLogger(__name__)
 
+# Task progress stream
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_MAX_CONNECTION_TIME = 300  # Close after 5 minutes; clients reconnect
+
 
 @api_view(['GET'])
 def health_check(request):
@@ -164,28 +176,71 @@ def get_task_status(request, task_id):
     except TaskStatus.DoesNotExist:
         return Response({'error': 'Task not found'}, status=404)
     
-    # Calculate elapsed time
-    if task.completed_at:
-        elapsed_seconds = (task.completed_at - task.started_at).total_seconds()
-    else:
-        elapsed_seconds = (timezone.now() - task.started_at).total_seconds()
+    if task.status in ('pending', 'processing'):
+        ensure_worker()  # Picks up jobs queued before this process started
     
-    response = {
-        'task_id': task.task_id,
-        'status': task.status,
-        'progress': task.progress,
-        'elapsed_time': round(elapsed_seconds, 2)
-    }
+    return Response(task_status_payload(task))
+
+
+def task_stream(request, task_id):
+    """
+    GET /api/tasks/<task_id>/stream
+    Server-Sent Events stream of a task's status
     
-    if task.current_step:
-        response['current_step'] = task.current_step
+    Each event has the same shape as GET /api/tasks/<task_id>. Progress of
+    jobs running in this process is pushed as it happens; other jobs are
+    followed by the bus's shared watcher. The stream ends after the
+    completed or failed event.
+    """
+    try:
+        task = TaskStatus.objects.get(task_id=task_id)
+    except TaskStatus.DoesNotExist:
+        return JsonResponse({'error': 'Task not found'}, status=404)
     
-    if task.status == 'completed' and task.result:
-        response['result'] = task.result
-    elif task.status == 'failed' and task.error:
-        response['error'] = task.error
+    if task.status in ('pending', 'processing'):
+        ensure_worker()
     
-    return Response(response)
+    def event_generator():
+        subscriber = task_progress.subscribe(task)
+        # The bus does the queries; don't hold a DB connection for the whole stream
+        connection.close()
+        connection_start = time.monotonic()
+        try:
+            while time.monotonic() - connection_start < STREAM_MAX_CONNECTION_TIME:
+                try:
+                    event = subscriber.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+                if event['status'] in FINAL_STATUSES:
+                    return
+            # EventSource reconnects automatically
+            yield f"data: {json.dumps({'type': 'timeout'})}\n\n"
+        finally:
+            task_progress.unsubscribe(task_id, subscriber)
+    
+    response = StreamingHttpResponse(
+        event_generator(),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
+    return response
+
+
+def metrics(request):
+    """
+    GET /metrics
+    Stage histograms and job counts in the Prometheus text format
+    
+    Values are per process: each web process serves its own, and
+    run_jobs workers serve theirs on --metrics-port. METRICS_TOKEN must be
+    sent as a Bearer token; while it is unset, /metrics is disabled.
+    """
+    if not scrape_authorized(request.headers.get('Authorization', ''), AppConfig.METRICS_TOKEN):
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    return HttpResponse(registry.render(), content_type=METRICS_CONTENT_TYPE)
 
 
 @api_view(['GET'])
@@ -21,7 +21,7 @@ Supports ElevenLabs TTS and Music Generation APIs.
 
 import logging
 import uuid
-from django.http import HttpResponse, FileResponse, Http404
+from django.http import HttpResponse, Http404
 from django.utils import timezone
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
@@ -30,8 +30,9 @@ from ..models import TaskStatus
 from ..services.jingle_service import JingleService
 from ..services.music_service import MusicGenerationService
 from ..validators import validate_jingle_input
-from ..tasks import run_jingle_generation_task
+from ..tasks import JobQueueFull, admit, ensure_worker, queue_position, run_jingle_generation_task
 from ..utils.config import ELEVENLABS_API_KEY, ELEVENLABS_VOICE_ID, DATA_DIR
+from ..utils.file_serving import serve_data_file
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +67,9 @@ def generate_jingle(request):
         logger.info(f"Generating jingle for text: '{text[:50]}...'")
         logger.info(f"Starting jingle generation: text='{text}', music_prompt='{music_prompt}', voice_settings={voice_settings_payload}")
         
+        # Reject before creating anything if the queue is full
+        admit('jingle_generation')
+        
         # Generate task ID
         task_id = str(uuid.uuid4())
         
@@ -84,12 +88,10 @@ def generate_jingle(request):
             }
         )
         
-        # Run task in background using task module
-        jingle_service = JingleService()
+        # Queue the job for a worker
         run_jingle_generation_task(
             task_id=task_id,
             task_model=task,
-            jingle_service=jingle_service,
             text=text,
             voice_id=voice_id,
             music_prompt=music_prompt,
@@ -99,9 +101,11 @@ def generate_jingle(request):
         return Response({
             'task_id': task_id,
             'status': 'pending',
-            'message': 'Jingle generation started'
+            'message': 'Jingle generation queued'
         }, status=202)
         
+    except JobQueueFull as e:
+        return Response({'error': str(e)}, status=503, headers={'Retry-After': str(e.retry_after)})
     except Exception as e:
         logger.error(f"Error starting jingle generation: {e}", exc_info=True)
         return Response({'error': str(e)}, status=500)
@@ -134,6 +138,10 @@ def get_jingle_status(request, task_id):
             response['result'] = task.result
         if task.error:
             response['error'] = task.error
+        if task.status == 'pending':
+            response['queue_position'] = queue_position(task)
+        if task.status in ('pending', 'processing'):
+            ensure_worker()  # Picks up jobs queued before this process started
         
         return Response(response)
         
@@ -149,24 +157,20 @@ def download_jingle(request, filename):
     """
     Download generated jingle
     GET /api/jingles/<filename>
+    
+    Supports Range and conditional requests. Jingle filenames are never
+    reused, so responses are cacheable indefinitely.
     """
     try:
-        jingles_dir = DATA_DIR / 'jingles'
-        file_path = jingles_dir / filename
-        
-        if not file_path.exists():
-            raise Http404('Jingle not found')
-        
-        # Security check: prevent directory traversal
-        if not str(file_path.resolve()).startswith(str(jingles_dir.resolve())):
-            raise Http404('Invalid file path')
-        
-        logger.info(f"Serving jingle: {file_path}")
-        
-        response = FileResponse(open(file_path, 'rb'), content_type='audio/mpeg')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        logger.info(f"Serving jingle: {filename}")
+        return serve_data_file(
+            request,
+            filename,
+            root=DATA_DIR / 'jingles',
+            content_type='audio/mpeg',
+            as_attachment=True,
+            immutable=True
+        )
         
     except Http404:
         raise
@@ -214,27 +218,28 @@ def generate_music_preview(request):
 @api_view(['GET'])
 def list_jingles(request):
     """
-    List all generated jingles
-    GET /api/jingles
-    Returns: [{"filename": "...", "created": "...", "size": 12345, "metadata": {...}}, ...]
+    List generated jingles from the catalogue
+    GET /api/jingles?search=happy&limit=20&offset=0
+    Returns: {"jingles": [{"filename": "...", "created": "...", "size": 12345, "metadata": {...}}, ...],
+              "total": 42}
     """
     try:
-        logger.info(f'\n{"="*60}')
-        logger.info('📥 GET /api/jingles - List jingles endpoint called')
-        logger.info(f'Request method: {request.method}')
-        logger.info(f'Request path: {request.path}')
+        search = request.GET.get('search') or None
+        try:
+            limit = int(request.GET['limit']) if 'limit' in request.GET else None
+            offset = int(request.GET.get('offset', 0))
+        except ValueError:
+            return Response({'error': 'limit and offset must be integers'}, status=400)
+        if (limit is not None and limit < 0) or offset < 0:
+            return Response({'error': 'limit and offset must not be negative'}, status=400)
         
         # Use JingleService to list jingles
         jingle_service = JingleService()
-        jingles = jingle_service.list_jingles()
-        
-        logger.info(f'✅ Found {len(jingles)} jingles')
-        for jingle in jingles:
-            logger.info(f"  - {jingle['filename']}")
+        jingles = jingle_service.list_jingles(search=search, limit=limit, offset=offset)
+        total = jingle_service.count_jingles(search=search)
         
-        response = Response({'jingles': jingles})
-        logger.info(f'Returning jingles response: {response.status_code}')
-        return response
+        logger.debug('Listed %d of %d jingles', len(jingles), total)
+        return Response({'jingles': jingles, 'total': total})
         
     except Exception as e:
         logger.error(f"Error listing jingles: {e}", exc_info=True)
@@ -4,8 +4,11 @@ Jingle Schedule Management Views
 This module provides scheduling system for automated jingle playback:
 - create_jingle_schedule: Create/list jingle schedules with time/date constraints
 - get_active_jingles: Get currently active jingles based on schedule rules
+- get_schedule_version: Version token of the schedule set (for re-planning)
 - update_jingle_schedule: Update existing schedule parameters
 - delete_jingle_schedule: Remove jingle schedules
+- record_jingle_play: Log a jingle play (buffered, written in bulk)
+- jingle_play_analytics: Play counts per jingle, venue and hour
 
 Schedule Features:
 - Date ranges (start_date, end_date)
@@ -24,9 +27,15 @@ Active schedule evaluation considers:
 """
 
 import logging
+from datetime import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from ..models import JingleSchedule
+from ..services.play_history import play_history
 from ..services.schedule_service import ScheduleService
 
 logger = logging.getLogger(__name__)
@@ -62,11 +71,6 @@ def create_jingle_schedule(request):
         "message": "Schedule created successfully"
     }
     """
-    logger.info(f'\n{"="*60}')
-    logger.info(f'{request.method} /api/jingle-schedules endpoint called')
-    logger.info(f'Request method: {request.method}')
-    logger.info(f'Request content-type: {request.content_type}')
-    
     if request.method == 'GET':
         # List all schedules
         try:
@@ -80,6 +84,13 @@ def create_jingle_schedule(request):
                 venue_name=venue_name,
                 session_id=session_id
             )
+            # One timetable lookup instead of evaluating each schedule
+            active_ids = {
+                active['id'] for active in schedule_service.get_active_schedules(
+                    venue_name=venue_name,
+                    session_id=session_id
+                )
+            }
             
             # Serialize model objects to dicts
             schedules_list = []
@@ -104,15 +115,15 @@ def create_jingle_schedule(request):
                         'sunday': schedule.sunday,
                     },
                     'repeat_pattern': schedule.repeat_pattern,
+                    'interval': schedule.get_interval(),
+                    'is_active_now': schedule.id in active_ids,
                     'enabled': schedule.enabled,
                     'priority': schedule.priority,
                     'created_at': schedule.created_at.isoformat() if schedule.created_at else None,
                     'updated_at': schedule.updated_at.isoformat() if schedule.updated_at else None,
                 })
             
-            logger.info(f'✅ Listed {len(schedules_list)} jingle schedules')
-            for schedule in schedules_list:
-                logger.info(f"  - {schedule['jingle_name']} (enabled: {schedule['enabled']}, priority: {schedule['priority']})")
+            logger.debug('Listed %d jingle schedules', len(schedules_list))
             
             return Response({
                 'schedules': schedules_list
@@ -157,7 +168,7 @@ def get_active_jingles(request):
     Get all currently active jingle schedules
     GET /api/jingle-schedules/active
     
-    Evaluates each schedule based on:
+    Looks up the compiled schedule timetable; a schedule is active with:
     - enabled flag
     - current date within date range
     - current time within time range (if specified)
@@ -171,16 +182,13 @@ def get_active_jingles(request):
                 "id": 1,
                 "jingle_name": "Tuesday Night Taco Promotion",
                 "jingle_filename": "jingle_67890.mp3",
-                "interval": 6,
+                "interval": 5,
                 "priority": 10
             }
-        ]
+        ],
+        "next_change": "2026-01-14T22:00:01+00:00"
     }
     """
-    logger.info(f'\n{"="*60}')
-    logger.info('📥 GET /api/jingle-schedules/active - Get active jingles endpoint called')
-    logger.info(f'Request method: {request.method}')
-    logger.info(f'Request path: {request.path}')
     try:
         # Get venue_name from query params
         venue_name = request.GET.get('venue_name')
@@ -192,13 +200,17 @@ def get_active_jingles(request):
             venue_name=venue_name,
             session_id=session_id
         )
+        next_change = schedule_service.get_next_change(
+            venue_name=venue_name,
+            session_id=session_id
+        )
         
-        logger.info(f'✅ Found {len(active_schedules)} active jingle schedules')
-        for schedule in active_schedules:
-            logger.info(f"  - {schedule['jingle_name']} (interval: {schedule['interval']}, priority: {schedule['priority']})")
+        logger.debug('Found %d active jingle schedules', len(active_schedules))
         
         return Response({
-            'active_jingles': active_schedules
+            'active_jingles': active_schedules,
+            # Clients can keep this list until then
+            'next_change': timezone.make_aware(next_change).isoformat()
         })
         
     except Exception as e:
@@ -208,6 +220,30 @@ def get_active_jingles(request):
         }, status=500)
 
 
+@api_view(['GET'])
+def get_schedule_version(request):
+    """
+    Version of the schedule set
+    GET /api/jingle-schedules/version
+    
+    Changes whenever any schedule is created, updated or deleted. A game
+    holding a playout plan compares it with the plan's schedule_version
+    before each song and re-plans when it differs (one aggregate query).
+    
+    Returns: {
+        "version": "4:2026-01-14T18:02:11.503000+00:00"
+    }
+    """
+    try:
+        return Response({'version': ScheduleService().get_version()})
+        
+    except Exception as e:
+        logger.error(f"Error getting schedule version: {e}", exc_info=True)
+        return Response({
+            'error': str(e)
+        }, status=500)
+
+
 @api_view(['PUT'])
 def update_jingle_schedule(request, schedule_id):
     """
@@ -388,3 +424,98 @@ def delete_jingle_schedule(request, schedule_id):
         return Response({
             'error': str(e)
         }, status=500)
+
+
+@api_view(['POST'])
+def record_jingle_play(request, schedule_id):
+    """
+    Record that a scheduled jingle was played
+    POST /api/jingle-schedules/<schedule_id>/play
+    
+    Body: {
+        "round_number": 10,
+        "venue_name": "The Crown"   (optional, defaults to the schedule's venue)
+    }
+    
+    The play is buffered and written with other plays in bulk.
+    
+    Returns: {
+        "success": true,
+        "pending": 3
+    }
+    """
+    schedule = JingleSchedule.objects.filter(id=schedule_id).values('jingle_filename', 'venue_name').first()
+    if not schedule:
+        return Response({
+            'error': f'Schedule with id {schedule_id} not found'
+        }, status=404)
+    
+    try:
+        round_number = int(request.data.get('round_number', 0))
+    except (TypeError, ValueError):
+        return Response({
+            'error': 'round_number must be an integer'
+        }, status=400)
+    
+    pending = play_history.record(
+        schedule['jingle_filename'],
+        round_number,
+        schedule_id=schedule_id,
+        venue_name=request.data.get('venue_name') or schedule['venue_name'] or ''
+    )
+    return Response({
+        'success': True,
+        'pending': pending
+    }, status=202)
+
+
+def _parse_moment(value):
+    """ISO datetime or date (start of day) from a query param, or None"""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        moment = datetime.combine(day, datetime.min.time())
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+
+@api_view(['GET'])
+def jingle_play_analytics(request):
+    """
+    Jingle play counts from the hourly rollups
+    GET /api/jingle-schedules/analytics?venue_name=The+Crown&since=2026-01-01&until=2026-02-01&schedule_id=3
+    
+    All params optional; the window defaults to the last 30 days.
+    
+    Returns: {
+        "total_plays": 42,
+        "jingles": [{"jingle_filename": "jingle_67890.mp3", "plays": 30, "last_played_at": "..."}],
+        "venues": [{"venue_name": "The Crown", "plays": 42}],
+        "hourly": [{"hour": "2026-01-13T20:00:00+00:00", "plays": 4}]
+    }
+    """
+    try:
+        since = _parse_moment(request.GET.get('since'))
+        until = _parse_moment(request.GET.get('until'))
+        schedule_id = request.GET.get('schedule_id')
+        schedule_id = int(schedule_id) if schedule_id else None
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=400)
+    
+    try:
+        return Response(play_history.analytics(
+            venue_name=request.GET.get('venue_name'),
+            since=since,
+            until=until,
+            schedule_id=schedule_id
+        ))
+    except Exception as e:
+        logger.error(f"Error building jingle play analytics: {e}", exc_info=True)
+        return Response({
+            'error': str(e)
+        }, status=500)
@@ -5,6 +5,7 @@ This module manages active bingo game sessions:
 - bingo_sessions: Create new session or list all sessions (POST/GET)
 - bingo_session_detail: Get/update/delete specific session (GET/PUT/DELETE)
 - update_bingo_session_status: Update session status (PATCH)
+- bingo_session_playout: Planned running order with jingles (GET)
 
 Session Lifecycle:
 1. pending: Session created, waiting to start
@@ -30,6 +31,7 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from ..services.session_service import BingoSessionService
+from ..services.playout_planner import PlayoutPlanner
 from ..validators import validate_session_status
 
 logger = logging.getLogger(__name__)
@@ -175,3 +177,33 @@ def update_bingo_session_status(request, session_id):
     except Exception as e:
         logger.error(f"Error updating session status: {e}", exc_info=True)
         return Response({'error': str(e)}, status=500)
+
+
+@api_view(['GET'])
+def bingo_session_playout(request, session_id):
+    """
+    Planned running order for the rest of a game
+    GET /api/bingo/session/<session_id>/playout?from_round=1
+    
+    Returns songs, scheduled jingles and announcements in play order,
+    plus the jingle URLs to prefetch. Re-fetch after replan_after (when
+    the active schedules change) or when resuming a game.
+    
+    404 when the session has no song pool (nothing to plan); the game
+    then checks the active schedules each round instead.
+    """
+    try:
+        from_round = int(request.GET.get('from_round', 1))
+        
+        session = BingoSessionService().get_session(session_id)
+        if not session.song_pool:
+            return Response({'error': f'Session {session_id} has no song pool to plan'}, status=404)
+        plan = PlayoutPlanner().plan(session, from_round=from_round)
+        
+        return Response(plan)
+        
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400 if 'not found' not in str(e).lower() else 404)
+    except Exception as e:
+        logger.error(f"Error planning playout for {session_id}: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
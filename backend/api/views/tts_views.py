@@ -20,6 +20,7 @@ from rest_framework.response import Response
 from ..services.tts_service import TTSService
 from ..validators import validate_tts_input
 from ..utils.config import ELEVENLABS_API_KEY, ELEVENLABS_VOICE_ID, DATA_DIR, VENUE_NAME, OPENAI_API_KEY
+from ..utils.metrics import span
 
 logger = logging.getLogger(__name__)
 
@@ -262,15 +263,16 @@ Generate ONE announcement (just the text, no quotes or extra formatting):"""
         logger.info(f"🤖 Generating AI announcement for: {title} by {artist} ({release_year})")
         
         # Call OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an energetic music bingo host creating short, engaging track introductions. Never mention song titles or artist names."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.9,  # High creativity for variation
-            max_tokens=50
-        )
+        with span('tts', 'openai_call'):
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are an energetic music bingo host creating short, engaging track introductions. Never mention song titles or artist names."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.9,  # High creativity for variation
+                max_tokens=50
+            )
         
         announcement = response.choices[0].message.content.strip()
         
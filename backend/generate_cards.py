@@ -18,12 +18,10 @@ import sys
 import argparse
 from pathlib import Path
 from typing import List, Dict, Set, Optional
-import requests
 from io import BytesIO
 import multiprocessing as mp
 from concurrent.futures import ProcessPoolExecutor
 import tempfile
-import psutil
 
 # ReportLab imports
 from reportlab.lib.pagesizes import A4, landscape
@@ -34,14 +32,8 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.pdfgen import canvas
 
-# QR Code generation
-import qrcode
-
-# PDF Merging
-try:
-    from pypdf import PdfWriter, PdfReader
-except ImportError:
-    from PyPDF2 import PdfWriter, PdfReader
+# requests, qrcode, pypdf and psutil are imported where used: render
+# workers re-import this module and only need ReportLab
 
 
 class BingoCell(Flowable):
@@ -283,6 +275,7 @@ def generate_qr_code(url: str, size: int = 150) -> Optional[BytesIO]:
         return None
     
     try:
+        import qrcode
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -339,6 +332,7 @@ def download_logo(url: str) -> Optional[BytesIO]:
     
     # Download from URL
     try:
+        import requests
         response = requests.get(url, timeout=10)
         if response.status_code == 200:
             return BytesIO(response.content)
@@ -814,10 +808,30 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
                   game_number: int = 1, game_date: str = None,
                   prize_4corners: str = '', prize_first_line: str = '', prize_full_house: str = '',
                   voice_id: str = 'JBFqnCBsd6RMkjVDRZzb', decades: List[str] = None,
-                  genres: List[str] = None, session_id: str = None):
-    """Generate all bingo cards"""
+                  genres: List[str] = None, session_id: str = None,
+                  seed: Optional[int] = None, pool_size: Optional[int] = None,
+                  parallel: bool = True, stage_times: Optional[Dict[str, float]] = None):
+    """
+    Generate all bingo cards
+
+    seed makes song selection and distribution reproducible (the seed of
+    every run is returned, so a production run can be replayed); pool_size
+    keeps only the first songs of the pool; parallel=False renders in this
+    process. stage_times is filled as each stage finishes, so a benchmark
+    can watch progress live.
+    """
     import time
     start_time = time.time()
+    if stage_times is None:
+        stage_times = {}  # Seconds per stage, reported to the backend in GENERATION_RESULT
+
+    if seed is None:
+        # Unique per run even for rapid successive generations
+        import hashlib
+        import uuid
+        seed_str = f"{time.time()}-{uuid.uuid4()}-{venue_name}-{game_number}-{num_players}-{random.random()}"
+        seed = int(hashlib.md5(seed_str.encode()).hexdigest()[:8], 16)
+    random.seed(seed)
     
     # 🔍 DEBUG: Log function parameters
     print(f"\n🔍 [DEBUG] generate_cards() called with:")
@@ -838,6 +852,7 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
     print(f"📄 PDF will be saved to: {OUTPUT_FILE.name}")
     
     # Memory monitoring
+    import psutil
     process = psutil.Process()
     mem_start = process.memory_info()
     
@@ -866,6 +881,7 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
                 session_data = json.load(f)
                 if 'songs' in session_data and len(session_data['songs']) > 0:
                     selected_songs = session_data['songs']
+                    stage_times['pool_load'] = time.time() - step_start
                     print(f"✓ Loaded {len(selected_songs)} pre-selected songs from {session_file.name} ({time.time()-step_start:.2f}s)")
                     print(f"   🎯 Using EXACT songs from session to match database")
         except Exception as e:
@@ -876,14 +892,9 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
     if selected_songs is None:
         all_songs = load_pool()
         mem_after_load = process.memory_info()
+        stage_times['pool_load'] = time.time() - step_start
         print(f"✓ Loaded {len(all_songs)} songs from pool ({time.time()-step_start:.2f}s) - Memory: {mem_after_load.rss / 1024 / 1024:.1f} MB")
         
-        # Log first songs in pool to verify what we loaded
-        print(f"\n📚 [POOL DEBUG] First 5 songs in pool.json:")
-        for i, song in enumerate(all_songs[:5], 1):
-            print(f"   #{i}: {song['title']} - {song['artist']} ({song.get('release_year', 'N/A')})")
-        sys.stdout.flush()
-        
         # Filter by decades if specified
         if decades:
             filtered_songs = []
@@ -905,12 +916,6 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
             print(f"✓ Filtered to {len(filtered_songs)} songs from decades {decades}")
             all_songs = filtered_songs
             
-            # Log first songs after filtering
-            print(f"\n🎚️ [FILTER DEBUG] First 5 songs after decade filter:")
-            for i, song in enumerate(all_songs[:5], 1):
-                print(f"   #{i}: {song['title']} - {song['artist']} ({song.get('release_year', 'N/A')})")
-            sys.stdout.flush()
-            
             if len(all_songs) == 0:
                 print("⚠️  WARNING: No songs found for selected decades, using all songs")
                 all_songs = load_pool()
@@ -926,12 +931,6 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
             print(f"✓ Filtered to {len(filtered_songs)} songs from genres {genres}")
             all_songs = filtered_songs
             
-            # Log first songs after filtering
-            print(f"\n🎸 [GENRE FILTER DEBUG] First 5 songs after genre filter:")
-            for i, song in enumerate(all_songs[:5], 1):
-                print(f"   #{i}: {song['title']} - {song['artist']} ({song.get('genre', 'N/A')})")
-            sys.stdout.flush()
-            
             if len(all_songs) == 0:
                 print("⚠️  WARNING: No songs found for selected genres, using all songs")
                 all_songs = load_pool()
@@ -941,57 +940,18 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
         optimal_songs = calculate_optimal_songs(num_players)
         print(f"✓ Using {optimal_songs} songs for {num_players} players ({time.time()-step_start:.3f}s)")
         
-        # Shuffle and select songs with randomization based on timestamp
-        # This ensures different song selection for each session
-        step_start = time.time()
-        import hashlib
-        import uuid
-        
-        # Create a UNIQUE seed using UUID + timestamp + venue + game number + random component
-        # This ensures maximum randomness even for rapid successive generations
-        unique_id = str(uuid.uuid4())
-        random_component = random.random()
-        seed_str = f"{time.time()}-{unique_id}-{venue_name}-{game_number}-{num_players}-{random_component}"
-        seed_hash = int(hashlib.md5(seed_str.encode()).hexdigest()[:8], 16)
-        random.seed(seed_hash)
-        
-        # Log BEFORE shuffling to see original order
-        print(f"\n{'='*80}")
-        print(f"🔍 [SONG SELECTION DEBUG - DETAILED]")
-        print(f"{'='*80}")
-        print(f"   📊 Total songs in pool: {len(all_songs)}")
-        print(f"   🎯 Need to select: {optimal_songs} songs for {num_players} players")
-        print(f"   🔢 Random seed string: {seed_str}")
-        print(f"   🔑 Random seed hash: {seed_hash}")
-        print(f"   🆔 Unique ID: {unique_id}")
-        print(f"\n   📋 First 10 songs BEFORE shuffle:")
-        for i, s in enumerate(all_songs[:10], 1):
-            print(f"      {i:2d}. {s['title']:40s} - {s['artist']:30s} [ID: {s.get('id', 'N/A')}]")
+        if pool_size:
+            all_songs = all_songs[:pool_size]
         
-        # Shuffle the entire pool MULTIPLE times for better randomization
+        # Shuffle the pool (seeded above) and select songs
+        step_start = time.time()
         shuffled_pool = all_songs.copy()
-        print(f"\n   🔀 Shuffling pool 3 times for maximum randomness...")
         for shuffle_round in range(3):  # Shuffle 3 times
             random.shuffle(shuffled_pool)
-            print(f"\n   After shuffle #{shuffle_round + 1} - First 5 songs:")
-            for i, s in enumerate(shuffled_pool[:5], 1):
-                print(f"      {i}. {s['title']:40s} - {s['artist']}")
-        
-        # Then select from shuffled pool
         selected_songs = shuffled_pool[:min(optimal_songs, len(shuffled_pool))]
         
-        print(f"\n{'='*80}")
-        print(f"✅ FINAL SELECTION: {len(selected_songs)} songs selected (seed: {seed_hash})")
-        print(f"{'='*80}")
-        print(f"   ⏱️  Selection time: {time.time()-step_start:.3f}s")
-        print(f"   🆔 Session UUID: {unique_id}")
-        print(f"\n   🎵 First 15 songs that will be used in cards:")
-        for i, song in enumerate(selected_songs[:15], 1):
-            print(f"      {i:2d}. {song['title']:40s} - {song['artist']:30s} [Year: {song.get('release_year', 'N/A')}]")
-        print(f"\n   🎵 Last 5 songs in selection:")
-        for i, song in enumerate(selected_songs[-5:], len(selected_songs)-4):
-            print(f"      {i:2d}. {song['title']:40s} - {song['artist']:30s} [Year: {song.get('release_year', 'N/A')}]")
-        print(f"{'='*80}\n")
+        stage_times['song_selection'] = time.time() - step_start
+        print(f"✅ Selected {len(selected_songs)} of {len(all_songs)} songs (seed: {seed}, {time.time()-step_start:.3f}s)")
         sys.stdout.flush()
     
     # Create output directory
@@ -1027,6 +987,7 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
                 pub_logo_path = temp_logo.name
                 temp_logo.close()
                 
+                stage_times['logo'] = time.time() - step_start
                 mem_after_logo = process.memory_info()
                 print(f"✓ Loaded pub logo ({time.time()-step_start:.2f}s) - Memory: {mem_after_logo.rss / 1024 / 1024:.1f} MB")
             except Exception as e:
@@ -1040,6 +1001,7 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
         qr_buffer_cache = generate_qr_code(social_media)
         if qr_buffer_cache:
             qr_buffer_data = qr_buffer_cache.getvalue()  # Get bytes for serialization
+            stage_times['qr_code'] = time.time() - step_start
             mem_after_qr = process.memory_info()
             print(f"✓ Generated QR code ({time.time()-step_start:.2f}s) - Memory: {mem_after_qr.rss / 1024 / 1024:.1f} MB")
     
@@ -1055,20 +1017,14 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
     step_start = time.time()
     print(f"\n🎵 Distributing songs uniquely across {num_cards} cards...")
     all_card_songs = distribute_songs_unique(selected_songs, num_cards, SONGS_PER_CARD)
+    stage_times['distribution'] = time.time() - step_start
     print(f"✓ Songs distributed uniquely ({time.time()-step_start:.2f}s)")
     print(f"   Each card has {SONGS_PER_CARD} unique songs")
     print(f"   Total unique songs used: {len(set(song['id'] for card in all_card_songs for song in card))}")
-    
-    # Log first card's songs for debugging
-    print(f"\n{'='*80}")
-    print(f"🎴 [CARD #1 SONGS - Will appear on actual printed card]")
-    print(f"{'='*80}")
-    for i, song in enumerate(all_card_songs[0][:SONGS_PER_CARD], 1):
-        print(f"   {i:2d}. {song['title']:40s} - {song['artist']:30s} [ID: {song.get('id', 'N/A')}]")
-    print(f"{'='*80}\n")
     sys.stdout.flush()
     
     # *** CRITICAL VALIDATION: Check for duplicate songs within each card ***
+    step_start = time.time()
     print(f"\n🔍 Validating cards for duplicates...")
     duplicates_found = False
     for card_idx, card in enumerate(all_card_songs):
@@ -1085,12 +1041,47 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
     if duplicates_found:
         raise ValueError("CRITICAL ERROR: Duplicate songs found within cards! Cannot generate PDF.")
     
+    stage_times['validation'] = time.time() - step_start
     print(f"✅ Validation passed: All {num_cards} cards have unique songs (no duplicates within any card)")
     
-    # Check if parallel processing is beneficial
+    # *** CRITICAL: Save session file with exact songs used ***
+    # This ensures the game plays THE SAME songs that are printed on cards
+    # Use session-specific filename to avoid conflicts between sessions
+    # Written before rendering so the backend can publish it while cards render
+    step_start = time.time()
+    session_file = OUTPUT_DIR / f"session_{session_id}.json" if session_id else OUTPUT_DIR / "current_session.json"
+    session_data = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "venue_name": venue_name,
+        "num_players": num_players,
+        "num_cards": num_cards,
+        "songs_per_card": SONGS_PER_CARD,
+        "game_number": game_number,
+        "game_date": game_date,
+        "prize_4corners": prize_4corners,
+        "prize_first_line": prize_first_line,
+        "prize_full_house": prize_full_house,
+        "voice_id": voice_id,  # For TTS announcements
+        "decades": decades if decades else [],  # For filtering songs
+        "pdf_file": str(OUTPUT_FILE),  # Local PDF path
+        "songs": selected_songs  # The EXACT songs used in the cards
+    }
+    
+    with open(session_file, 'w', encoding='utf-8') as f:
+        json.dump(session_data, f, indent=2, ensure_ascii=False)
+    
+    # Also save to current_session.json for backwards compatibility
+    if session_id:
+        current_path = OUTPUT_DIR / "current_session.json"
+        with open(current_path, 'w', encoding='utf-8') as f:
+            json.dump(session_data, f, indent=2, ensure_ascii=False)
+    
+    stage_times['session_write'] = time.time() - step_start
+    print(f"SESSION_FILE: {session_file}", flush=True)  # Structured marker for backend upload pipeline
+    
     # MEMORY-OPTIMIZED: Limit workers to avoid OOM on App Platform
     num_cpus = mp.cpu_count()
-    use_parallel = True  # Always use parallel - it's faster
+    use_parallel = parallel  # Parallel unless asked otherwise - it's faster
     
     if use_parallel:
         # **PARALLEL GENERATION** - MEMORY-OPTIMIZED for cloud deployment
@@ -1145,6 +1136,7 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
                     print(f"  ❌ Batch {i} failed: {e}")
                     raise
         
+        stage_times['render'] = time.time() - parallel_start
         print(f"  ✓ All batches generated ({time.time()-parallel_start:.2f}s)")
         mem_info = process.memory_info()
         print(f"  📈 Final memory: {mem_info.rss / 1024 / 1024:.1f} MB")
@@ -1154,6 +1146,11 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
         print(f"PROGRESS: 90")  # Structured progress for merging stage
         merge_start = time.time()
         
+        try:
+            from pypdf import PdfWriter, PdfReader
+        except ImportError:
+            from PyPDF2 import PdfWriter, PdfReader
+        
         merger = PdfWriter()
         for pdf_path in temp_pdfs:
             reader = PdfReader(pdf_path)
@@ -1161,8 +1158,11 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
                 merger.add_page(page)
         
         with open(str(OUTPUT_FILE), 'wb') as output_file:
+            # Structured marker: the backend uploads the file in chunks as it is written
+            print(f"PDF_OUTPUT: {OUTPUT_FILE}", flush=True)
             merger.write(output_file)
         
+        stage_times['merge'] = time.time() - merge_start
         print(f"PROGRESS: 100")  # Completed
         print(f"   ✓ PDF merged ({time.time()-merge_start:.2f}s)")
         
@@ -1218,6 +1218,7 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
         print(f"\n📝 Building PDF document...")
         build_start = time.time()
         doc.build(story)
+        stage_times['render'] = time.time() - cards_start  # Layout happens in build; nothing to merge
         print(f"   ✓ PDF built ({time.time()-build_start:.2f}s)")
     
     # Cleanup temp logo file
@@ -1230,36 +1231,6 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
     
     total_time = time.time() - start_time
     
-    # *** CRITICAL: Save session file with exact songs used ***
-    # This ensures the game plays THE SAME songs that are printed on cards
-    # Use session-specific filename to avoid conflicts between sessions
-    session_file = OUTPUT_DIR / f"session_{session_id}.json" if session_id else OUTPUT_DIR / "current_session.json"
-    session_data = {
-        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-        "venue_name": venue_name,
-        "num_players": num_players,
-        "num_cards": num_cards,
-        "songs_per_card": SONGS_PER_CARD,
-        "game_number": game_number,
-        "game_date": game_date,
-        "prize_4corners": prize_4corners,
-        "prize_first_line": prize_first_line,
-        "prize_full_house": prize_full_house,
-        "voice_id": voice_id,  # For TTS announcements
-        "decades": decades if decades else [],  # For filtering songs
-        "pdf_file": str(OUTPUT_FILE),  # Local PDF path
-        "songs": selected_songs  # The EXACT songs used in the cards
-    }
-    
-    with open(session_file, 'w', encoding='utf-8') as f:
-        json.dump(session_data, f, indent=2, ensure_ascii=False)
-    
-    # Also save to current_session.json for backwards compatibility
-    if session_id:
-        current_path = OUTPUT_DIR / "current_session.json"
-        with open(current_path, 'w', encoding='utf-8') as f:
-            json.dump(session_data, f, indent=2, ensure_ascii=False)
-    
     print(f"\n✅ Session file saved: {session_file}")
     print(f"   ⚠️  IMPORTANT: Use this session file when starting the game!")
     print(f"   This ensures songs played match the printed cards.")
@@ -1281,7 +1252,13 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
         'num_pages': (num_cards + 1) // 2,  # 2 cards per page
         'songs_per_card': SONGS_PER_CARD,
         'total_songs': len(selected_songs),
-        'session_file': str(session_file)
+        'session_id': session_id,
+        'session_file': str(session_file),
+        'pdf_file': str(OUTPUT_FILE),
+        'pdf_bytes': OUTPUT_FILE.stat().st_size,
+        'generation_time': round(total_time, 2),
+        'seed': seed,
+        'timings': {stage: round(seconds, 3) for stage, seconds in stage_times.items()}
     }
 
 
@@ -1318,6 +1295,9 @@ if __name__ == '__main__':
     parser.add_argument('--decades', default=None, help='Comma-separated list of decades to filter (e.g., 1980s,1990s,2000s)')
     parser.add_argument('--genres', default=None, help='Comma-separated list of genres to filter (e.g., Rock,Pop,Dance)')
     parser.add_argument('--session_id', default=None, help='Unique session ID for PDF filename')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed (reproduces a previous run)')
+    parser.add_argument('--pool_size', type=int, default=None, help='Use only the first N songs of the pool')
+    parser.add_argument('--sequential', action='store_true', help='Render in one process')
     
     args = parser.parse_args()
     
@@ -1333,7 +1313,7 @@ if __name__ == '__main__':
         genres_list = [g.strip() for g in args.genres.split(',')]
         print(f"🎸 Filtering songs by genres: {genres_list}")
     
-    generate_cards(
+    result = generate_cards(
         venue_name=args.venue_name,
         num_players=args.num_players,
         pub_logo=args.pub_logo,
@@ -1347,5 +1327,11 @@ if __name__ == '__main__':
         voice_id=args.voice_id,
         decades=decades_list,
         genres=genres_list,
-        session_id=args.session_id
+        session_id=args.session_id,
+        seed=args.seed,
+        pool_size=args.pool_size,
+        parallel=not args.sequential
     )
+    
+    # Structured marker for the backend: exact artefact paths and stats
+    print(f"GENERATION_RESULT: {json.dumps(result)}", flush=True)
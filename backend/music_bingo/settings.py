@@ -40,6 +40,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.middleware.LogLevelsMiddleware",
+    "api.middleware.QueryProfilerMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -92,7 +94,10 @@ if os.getenv('DATABASE_URL'):
     DATABASES = {
         'default': dj_database_url.config(
             default=os.getenv('DATABASE_URL'),
-            conn_max_age=600,  # Connection pooling
+            # Persistent connections are per thread: with gthread workers each
+            # thread would keep its own for the whole max age. 0 closes them at
+            # the end of every request (see the connection budget in Dockerfile)
+            conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', '0')),
             conn_health_checks=True,  # Health checks for connections
             ssl_require=False  # Cloud SQL via Unix socket no necesita SSL
         )
@@ -21,6 +21,9 @@ from django.views.static import serve
 from django.conf import settings
 from pathlib import Path
 
+from api.utils.file_serving import serve_data_file
+from api.views import metrics
+
 # Serve frontend static files
 # In Docker: /app/music_bingo/urls.py -> parent = /app/music_bingo -> parent = /app
 BASE_DIR = Path(__file__).resolve().parent.parent  # /app
@@ -98,6 +101,7 @@ def bingo_sessions_view(request):
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
+    path("metrics", metrics, name="metrics"),
     
     # HTML pages - MUST come before catch-all patterns
     path("jingle-manager", jingle_manager_view, name="jingle-manager-no-slash"),
@@ -124,7 +128,7 @@ urlpatterns = [
     # Static files
     re_path(r'^(?P<path>game\.js|styles\.css|config\.js|env-loader\.js|jingle\.js|jingle-manager\.js)$', lambda request, path: serve(request, path, document_root=str(FRONTEND_DIR))),
     re_path(r'^assets/(?P<path>.*)$', lambda request, path: serve(request, path, document_root=str(FRONTEND_DIR / 'assets'))),
-    re_path(r'^data/(?P<path>.*)$', lambda request, path: serve(request, path, document_root=str(DATA_DIR))),
+    re_path(r'^data/(?P<path>.*)$', lambda request, path: serve_data_file(request, path, root=DATA_DIR)),
     
     # Index pages - MUST be last
     path("index.html", index_view, name="index-html"),
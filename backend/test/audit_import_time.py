@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Import-time audit: what a cold start spends its time importing
+
+Runs each target in a fresh interpreter with `python -X importtime`, then
+prints the wall time, the packages with the most import time (self time
+summed per top-level package) and the slowest modules by cumulative time.
+Heavy SDKs that are supposed to load lazily are flagged if they show up.
+
+Targets:
+    app     django.setup() + api.urls (what a gunicorn worker does at boot)
+    cards   import generate_cards (what every render worker does)
+
+Usage:
+    python test/audit_import_time.py [--target app|cards|all] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Target -> (code, modules loaded on first use only; seeing one at startup is a regression)
+TARGETS = {
+    'app': ('import django; django.setup(); import api.urls',
+            ('openai', 'pydub', 'numpy', 'qrcode', 'reportlab', 'google.cloud.storage', 'api.audio_mixer')),
+    'cards': ('import generate_cards',
+              ('requests', 'qrcode', 'pypdf', 'PyPDF2', 'psutil')),
+}
+
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def audit(target, top):
+    statement, lazy_modules = TARGETS[target]
+    code = (
+        'import sys, time; start = time.perf_counter(); '
+        f'{statement}; '
+        'print(time.perf_counter() - start); '
+        f'print(",".join(m for m in {lazy_modules!r} if m in sys.modules))'
+    )
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='music_bingo.settings')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    wall, loaded = result.stdout.splitlines()[-2:]
+
+    modules = []
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            modules.append((int(cumulative_us), name))
+            packages[name.split('.')[0]] += int(self_us)
+
+    print("=" * 72)
+    print(f"{target}: {statement}")
+    print(f"Wall time: {float(wall) * 1000:.0f} ms, {len(modules)} modules")
+    print("-" * 72)
+    print(f"{'package':<40}{'self ms':>12}")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:<40}{self_us / 1000:>12.1f}")
+    print("-" * 72)
+    print(f"{'module':<56}{'cumulative ms':>16}")
+    for cumulative_us, name in sorted(modules, reverse=True)[:top]:
+        print(f"{name:<56}{cumulative_us / 1000:>16.1f}")
+    if loaded:
+        print(f"⚠️  Loaded at startup but meant to be lazy: {loaded}")
+    return not loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time audit of the app and card generator')
+    parser.add_argument('--target', choices=[*TARGETS, 'all'], default='all')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    targets = list(TARGETS) if args.target == 'all' else [args.target]
+    ok = all([audit(target, args.top) for target in targets])
+    print("=" * 72)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
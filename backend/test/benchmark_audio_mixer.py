@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Benchmark: NumPy PCM mixing engine vs the old pydub overlay path
+
+Synthesises a TTS-like track and a music bed, encodes them to MP3, then
+times the full jingle pipeline both ways:
+
+- pydub: decode both MP3s, gain, fade, loop, overlay, export, then decode
+  the TTS and the final mix again to measure durations (what
+  JingleService.create_jingle used to do)
+- numpy: decode once, mix as array math, encode once, durations from arrays
+
+Requires ffmpeg on PATH (installed in the Docker image).
+
+Usage:
+    python test/benchmark_audio_mixer.py [--iterations 5] [--tts-seconds 8] [--music-seconds 12]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pydub import AudioSegment
+
+from api import audio_mixer
+
+
+def synth_tts(seconds, sample_rate=audio_mixer.SAMPLE_RATE):
+    """Speech-like signal: noise bursts shaped by a syllable envelope"""
+    rng = np.random.default_rng(42)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = np.clip(np.sin(2 * np.pi * 3.0 * t), 0, None) ** 2
+    mono = (rng.standard_normal(len(t)) * 0.3 * envelope).astype(np.float32)
+    return np.stack([mono, mono], axis=1)
+
+
+def synth_music(seconds, sample_rate=audio_mixer.SAMPLE_RATE):
+    """Simple chord bed"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    mono = sum(np.sin(2 * np.pi * f * t) for f in (220.0, 277.18, 329.63)) * 0.2
+    return np.stack([mono, mono], axis=1).astype(np.float32)
+
+
+def pydub_pipeline(tts_bytes, music_bytes, tts_volume=3, music_volume=-4):
+    """Reference implementation of the previous pydub mixing path"""
+    tts_audio = AudioSegment.from_mp3(io.BytesIO(tts_bytes))
+    tts_duration = len(tts_audio)  # create_jingle measured TTS separately
+
+    tts_audio = AudioSegment.from_mp3(io.BytesIO(tts_bytes))
+    bg_audio = AudioSegment.from_mp3(io.BytesIO(music_bytes))
+    tts_audio = tts_audio + tts_volume
+    bg_audio = bg_audio + music_volume
+    bg_audio = bg_audio.fade_in(500).fade_out(500)
+    if len(bg_audio) < len(tts_audio):
+        repetitions = (len(tts_audio) // len(bg_audio)) + 1
+        bg_audio = (bg_audio * repetitions)[:len(tts_audio)]
+    mixed = bg_audio.overlay(tts_audio, position=0)
+
+    output = io.BytesIO()
+    mixed.export(output, format="mp3", bitrate="128k")
+    result = output.getvalue()
+
+    final_duration = len(AudioSegment.from_mp3(io.BytesIO(result)))  # re-decode for duration
+    return result, tts_duration, final_duration
+
+
+def numpy_pipeline(tts_bytes, music_bytes):
+    """New engine: decode once, mix, encode once"""
+    result = audio_mixer.render_jingle(tts_bytes, music_bytes)
+    return result['audio_bytes'], result['tts_duration_ms'], result['duration_ms']
+
+
+def time_it(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark jingle mixing engines')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--tts-seconds', type=float, default=8.0)
+    parser.add_argument('--music-seconds', type=float, default=12.0)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("AUDIO MIXER BENCHMARK")
+    print("=" * 60)
+    print(f"TTS: {args.tts_seconds}s, Music: {args.music_seconds}s, Iterations: {args.iterations}")
+
+    tts_bytes = audio_mixer.encode_mp3(synth_tts(args.tts_seconds))
+    music_bytes = audio_mixer.encode_mp3(synth_music(args.music_seconds))
+
+    # Warm up both paths (ffmpeg page cache, imports)
+    pydub_pipeline(tts_bytes, music_bytes)
+    numpy_pipeline(tts_bytes, music_bytes)
+
+    # Mix-stage only (no codec work) on identical PCM
+    tts_pcm = synth_tts(args.tts_seconds)
+    music_pcm = synth_music(args.music_seconds)
+    tts_seg = AudioSegment(
+        (tts_pcm * 32767).astype('<i2').tobytes(),
+        frame_rate=audio_mixer.SAMPLE_RATE, sample_width=2, channels=2
+    )
+    music_seg = AudioSegment(
+        (music_pcm * 32767).astype('<i2').tobytes(),
+        frame_rate=audio_mixer.SAMPLE_RATE, sample_width=2, channels=2
+    )
+
+    def pydub_mix_only():
+        bg = (music_seg - 4).fade_in(500).fade_out(500)
+        return bg.overlay(tts_seg + 3, position=0)
+
+    def numpy_mix_only():
+        return audio_mixer.mix_pcm(tts_pcm, music_pcm)
+
+    results = {
+        'pydub full pipeline': time_it(lambda: pydub_pipeline(tts_bytes, music_bytes), args.iterations),
+        'numpy full pipeline': time_it(lambda: numpy_pipeline(tts_bytes, music_bytes), args.iterations),
+        'pydub mix stage': time_it(pydub_mix_only, args.iterations),
+        'numpy mix stage': time_it(numpy_mix_only, args.iterations),
+    }
+
+    print("-" * 60)
+    for name, timings in results.items():
+        print(f"{name:22s} mean {np.mean(timings) * 1000:8.1f}ms   min {np.min(timings) * 1000:8.1f}ms")
+    print("-" * 60)
+
+    full_speedup = np.mean(results['pydub full pipeline']) / np.mean(results['numpy full pipeline'])
+    mix_speedup = np.mean(results['pydub mix stage']) / np.mean(results['numpy mix stage'])
+    print(f"Full pipeline speedup: {full_speedup:.2f}x")
+    print(f"Mix stage speedup:     {mix_speedup:.2f}x")
+
+    _, pydub_tts_ms, pydub_final_ms = pydub_pipeline(tts_bytes, music_bytes)
+    _, numpy_tts_ms, numpy_final_ms = numpy_pipeline(tts_bytes, music_bytes)
+    print(f"Durations (tts/final): pydub {pydub_tts_ms}/{pydub_final_ms}ms, numpy {numpy_tts_ms}/{numpy_final_ms}ms")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+Benchmark: card generation time and peak memory per stage
+
+Runs generate_cards() with a fixed seed for each card count, once with the
+ProcessPoolExecutor renderer and once sequentially. Every run happens in a
+fresh interpreter, so memory does not carry over from the previous one,
+and writes to a temporary directory, not data/cards.
+
+Peak memory is the highest RSS sampled (every 5 ms) while a stage ran,
+summed over the generator process and its render workers. Stages shorter
+than the sampling interval report the RSS at their end.
+
+Save results to compare them over time; the git revision is recorded:
+    python test/benchmark_card_generation.py --output card_bench.json
+
+Usage:
+    python test/benchmark_card_generation.py [--cards 50,200,1000] [--modes parallel,sequential]
+                                             [--pool-size 500] [--seed 1234] [--output FILE]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+class PeakSampler(threading.Thread):
+    """Peak RSS per stage: a stage's samples are closed when its time is recorded"""
+
+    def __init__(self, stage_times, interval=0.005):
+        super().__init__(daemon=True)
+        self.stage_times = stage_times
+        self.interval = interval
+        self.process = psutil.Process()
+        self.stop = threading.Event()
+        self.peaks = {}
+        self.overall = 0
+
+    def rss(self):
+        total = self.process.memory_info().rss
+        for child in self.process.children(recursive=True):
+            with contextlib.suppress(psutil.Error):
+                total += child.memory_info().rss
+        return total
+
+    def run(self):
+        current = last = 0
+        while True:
+            # Close the stages that ended since the last sample, then sample
+            finished = [stage for stage in list(self.stage_times) if stage not in self.peaks]
+            for stage in finished:
+                self.peaks[stage] = current or last
+            if finished:
+                current = 0
+            if self.stop.is_set():
+                return
+            last = self.rss()
+            current = max(current, last)
+            self.overall = max(self.overall, current)
+            self.stop.wait(self.interval)
+
+
+def run_once(cards, parallel, seed, pool_size):
+    """One generation in this process; returns its measurements"""
+    import generate_cards
+
+    stage_times = {}
+    sampler = PeakSampler(stage_times)
+    with tempfile.TemporaryDirectory() as workdir:
+        generate_cards.OUTPUT_DIR = generate_cards.Path(workdir)
+        sampler.start()
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = generate_cards.generate_cards(
+                venue_name='Benchmark Pub', num_players=cards, session_id='bench',
+                seed=seed, pool_size=pool_size, parallel=parallel, stage_times=stage_times
+            )
+        total = time.perf_counter() - start
+        sampler.stop.set()
+        sampler.join()
+        with open(result['session_file'], encoding='utf-8') as f:
+            songs = [song.get('id') for song in json.load(f)['songs']]
+
+    return {
+        'total_s': round(total, 3),
+        'peak_rss_mb': round(sampler.overall / 2 ** 20, 1),
+        'pdf_bytes': result['pdf_bytes'],
+        'selection_hash': hashlib.sha1(json.dumps(songs).encode()).hexdigest()[:12],
+        'stages': {
+            stage: {
+                'seconds': round(seconds, 3),
+                'peak_rss_mb': round(sampler.peaks.get(stage, 0) / 2 ** 20, 1),
+            }
+            for stage, seconds in stage_times.items()
+        },
+    }
+
+
+def git_revision():
+    try:
+        revision = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, text=True).strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD'], cwd=BACKEND_DIR) != 0
+        return revision + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', default='50,200,1000', help='Comma-separated card counts')
+    parser.add_argument('--modes', default='parallel,sequential', help='parallel and/or sequential')
+    parser.add_argument('--pool-size', type=int, default=None, help='Songs of the pool to use (default: all)')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', help='Write the results as JSON')
+    parser.add_argument('--run-one', nargs=2, metavar=('MODE', 'CARDS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        mode, cards = args.run_one
+        print(json.dumps(run_once(int(cards), mode == 'parallel', args.seed, args.pool_size)))
+        return 0
+
+    print("=" * 72)
+    print("CARD GENERATION BENCHMARK")
+    print("=" * 72)
+    print(f"Seed: {args.seed}  Pool size: {args.pool_size or 'all'}  CPUs: {os.cpu_count()}")
+
+    runs = []
+    for mode in args.modes.split(','):
+        for cards in [int(n) for n in args.cards.split(',')]:
+            command = [sys.executable, os.path.abspath(__file__), '--run-one', mode, str(cards), '--seed', str(args.seed)]
+            if args.pool_size:
+                command += ['--pool-size', str(args.pool_size)]
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            run = dict(mode=mode, cards=cards, **json.loads(output.strip().splitlines()[-1]))
+            runs.append(run)
+
+            print("-" * 72)
+            print(f"{mode} {cards} cards: {run['total_s']:.2f}s, peak {run['peak_rss_mb']} MB, "
+                  f"{run['pdf_bytes'] / 2 ** 20:.1f} MB PDF, selection {run['selection_hash']}")
+            for stage, stats in run['stages'].items():
+                print(f"  {stage:<16}{stats['seconds']:>9.3f}s{stats['peak_rss_mb']:>10.1f} MB")
+
+    print("=" * 72)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'revision': git_revision(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'seed': args.seed,
+                'pool_size': args.pool_size,
+                'cpus': os.cpu_count(),
+                'runs': runs,
+            }, f, indent=2)
+        print(f"Saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
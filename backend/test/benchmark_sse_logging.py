@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Benchmark: pub quiz player stream (quiz_stream) loop throughput vs logging
+
+Creates a throwaway test database with one in-progress quiz, then drives
+the quiz_stream SSE generator with its 1-second sleep removed and counts
+poll iterations per second. Log output goes to /dev/null, so the numbers
+are the cost of formatting and emitting lines, not of a terminal.
+
+Run it with default levels, then with every debug category enabled, to
+see what the debug lines cost per connected player:
+
+    python test/benchmark_sse_logging.py [--seconds 5]
+    python test/benchmark_sse_logging.py --levels debug=DEBUG
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from unittest import mock
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+
+django.setup()
+
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+
+from api.utils.config import AppConfig
+
+
+def create_quiz():
+    from api.pub_quiz_models import PubQuizSession, QuizGenre, QuizQuestion
+
+    session = PubQuizSession.objects.create(
+        session_code='BENCHSSE', venue_name='Bench Pub', status='in_progress',
+        current_round=1, current_question=1, questions_per_round=10, total_rounds=1,
+        question_started_at=timezone.now()
+    )
+    genre = QuizGenre.objects.create(name='Bench Genre')
+    for number in range(1, 11):
+        QuizQuestion.objects.create(
+            session=session, genre=genre, round_number=1, question_number=number,
+            question_text=f'Question {number}?', correct_answer='42'
+        )
+    return session
+
+
+def run_stream(session_code, seconds):
+    """Poll iterations per second of one player stream"""
+    from api import pub_quiz_views
+
+    request = RequestFactory().get(f'/api/pub-quiz/{session_code}/stream')
+    response = pub_quiz_views.quiz_stream(request, session_code)
+    chunks = response.streaming_content
+
+    iterations = 0
+    with mock.patch.object(pub_quiz_views.time, 'sleep', lambda seconds: None):
+        next(chunks)  # connected
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            chunk = next(chunks)
+            if chunk.startswith(b': heartbeat'):
+                iterations += 1
+    response.close()
+    return iterations / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--levels', default='', help="Log levels, e.g. 'debug=DEBUG'")
+    args = parser.parse_args()
+
+    from api.utils import log_control
+
+    # Only the levels given here apply (no override file)
+    with mock.patch.object(AppConfig, 'LOG_LEVELS', args.levels), \
+            mock.patch.object(AppConfig, 'LOG_LEVELS_FILE', AppConfig.DATA_DIR / '.benchmark-no-overrides.json'):
+        log_control.refresh_levels(force=True)
+
+        devnull = open(os.devnull, 'w')
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(devnull)
+
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            session = create_quiz()
+            rate = run_stream(session.session_code, args.seconds)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"levels: {args.levels or '(defaults)'}")
+    print(f"quiz_stream: {rate:,.0f} polls/s ({1000 / rate:.3f} ms per poll)")
+
+
+if __name__ == '__main__':
+    main()
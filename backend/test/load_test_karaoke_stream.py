@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Load test: karaoke live queue stream with hundreds of simulated phones
+
+Creates a karaoke session on a running server, opens N SSE connections to
+/api/karaoke/session/<id>/stream (one thread per simulated phone), then
+adds singers to the queue and measures how long each event takes to reach
+every phone. Cancels the test entries afterwards.
+
+Start a local server first, e.g.:
+    python manage.py runserver 8000
+
+Usage:
+    python test/load_test_karaoke_stream.py [--url http://127.0.0.1:8000] [--phones 300] [--events 20]
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+
+class Phone(threading.Thread):
+    """One simulated phone holding an SSE connection"""
+
+    def __init__(self, base_url, session_id, ready, stop):
+        super().__init__(daemon=True)
+        self.base_url = urlparse(base_url)
+        self.session_id = session_id
+        self.ready = ready
+        self.stop = stop
+        self.received = {}  # entry_id -> receive time for 'add' events
+        self.events = 0
+        self.error = None
+
+    def run(self):
+        try:
+            conn = http.client.HTTPConnection(self.base_url.hostname, self.base_url.port or 80, timeout=60)
+            conn.request('GET', f'/api/karaoke/session/{self.session_id}/stream',
+                         headers={'Accept': 'text/event-stream'})
+            response = conn.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f'HTTP {response.status}')
+
+            while not self.stop.is_set():
+                line = response.readline()
+                if not line:
+                    break
+                if not line.startswith(b'data: '):
+                    continue
+                event = json.loads(line[6:])
+                self.events += 1
+                if event.get('type') == 'snapshot':
+                    self.ready.release()
+                elif event.get('type') == 'add' and event.get('entry'):
+                    self.received.setdefault(event['entry']['id'], time.perf_counter())
+            conn.close()
+        except Exception as e:
+            self.error = str(e)
+            self.ready.release()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the karaoke queue stream')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--phones', type=int, default=300)
+    parser.add_argument('--events', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=0.25, help='Seconds between queue additions')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("KARAOKE QUEUE STREAM LOAD TEST")
+    print("=" * 60)
+    print(f"Server: {args.url}  Phones: {args.phones}  Events: {args.events}")
+
+    venue = f'Load Test {int(time.time())}'
+    response = requests.post(f'{args.url}/api/karaoke/session', json={'venue_name': venue}, timeout=10)
+    response.raise_for_status()
+    session_id = response.json()['id']
+
+    ready = threading.Semaphore(0)
+    stop = threading.Event()
+    phones = [Phone(args.url, session_id, ready, stop) for _ in range(args.phones)]
+
+    connect_start = time.perf_counter()
+    for phone in phones:
+        phone.start()
+    for _ in phones:
+        ready.acquire(timeout=60)
+    connect_time = time.perf_counter() - connect_start
+
+    failed = [p for p in phones if p.error]
+    print(f"Connected {len(phones) - len(failed)}/{len(phones)} phones in {connect_time:.2f}s")
+    if failed:
+        print(f"  first error: {failed[0].error}")
+
+    # Publish queue additions and note when each was sent
+    sent = {}
+    request_times = []
+    for i in range(args.events):
+        start = time.perf_counter()
+        response = requests.post(f'{args.url}/api/karaoke/queue', json={
+            'session_id': session_id,
+            'name': f'Singer {i}',
+            'song_id': f'load_{i}',
+            'song_title': 'Load Test Song',
+            'artist': 'Benchmark',
+            'duration': 180,
+        }, timeout=10)
+        response.raise_for_status()
+        sent[response.json()['id']] = start
+        request_times.append(time.perf_counter() - start)
+        time.sleep(args.interval)
+
+    time.sleep(2)  # Let the last events drain
+    stop.set()
+
+    latencies = []
+    missing = 0
+    for phone in phones:
+        if phone.error:
+            continue
+        for entry_id, sent_at in sent.items():
+            if entry_id in phone.received:
+                latencies.append(phone.received[entry_id] - sent_at)
+            else:
+                missing += 1
+
+    print("-" * 60)
+    print(f"POST /api/karaoke/queue: mean {statistics.mean(request_times) * 1000:.1f}ms  "
+          f"p95 {percentile(request_times, 95) * 1000:.1f}ms")
+    if latencies:
+        print(f"Fan-out latency (POST start -> phone receives event), {len(latencies)} deliveries:")
+        for pct in (50, 95, 99):
+            print(f"  p{pct}: {percentile(latencies, pct) * 1000:.1f}ms")
+        print(f"  max: {max(latencies) * 1000:.1f}ms")
+    print(f"Missed deliveries: {missing}")
+    print("=" * 60)
+
+    # Clean up the test queue
+    for entry_id in sent:
+        requests.delete(f'{args.url}/api/karaoke/queue/{entry_id}', timeout=10)
+
+    return 0 if not failed and not missing else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
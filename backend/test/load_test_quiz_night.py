@@ -0,0 +1,485 @@
+#!/usr/bin/env python
+"""
+Load test: a simulated pub quiz night against a local server
+
+Self-contained: migrates a throwaway SQLite database (or --database-url),
+seeds a quiz with questions, starts the app (gunicorn gthread like
+production when installed, runserver otherwise) and plays a whole quiz:
+
+- every team registers with genre votes and holds a player SSE stream
+- the host holds the host stream, starts the quiz and advances through
+  every question (next + start-countdown + host-data)
+- teams submit each answer while the question is open, and send the
+  end-of-quiz batch submit before the last question closes
+- a probe hits /api/health every half second: if it slows down or times
+  out, the workers are saturated (streams hold a thread each)
+
+Reports p50/p95/p99 per endpoint, SSE delivery, health probe latency,
+queries per second and DB time (from /metrics, request handlers only --
+the queries of running streams are not counted; with several workers they
+are one worker's, so compare runs with the same --workers) and server CPU.
+Workers and threads default to the production Dockerfile's.
+
+SQLite serializes writes, so bursts (registration, the batch submit) can
+fail with "database is locked"; point --database-url at a local
+PostgreSQL for numbers comparable with production. The server log is
+kept when requests fail.
+
+Save a run and compare it with a run of another commit:
+    python test/load_test_quiz_night.py --output before.json
+    git checkout my-branch
+    python test/load_test_quiz_night.py --output after.json
+    python test/load_test_quiz_night.py --compare before.json after.json
+
+Usage:
+    python test/load_test_quiz_night.py [--teams 40] [--rounds 2] [--questions 5] [--interval 2]
+                                        [--workers 2] [--threads 100] [--database-url URL]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+# /metrics needs a token; the server under test gets this one
+METRICS_TOKEN = secrets.token_hex(16)
+
+
+class Recorder:
+    """Latency samples and errors per endpoint, shared by every thread"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, name, method, url, **kwargs):
+        kwargs.setdefault('timeout', 30)
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.samples[name].append(elapsed)
+            if not ok:
+                self.errors[name] += 1
+        return response if ok else None
+
+
+class Stream(threading.Thread):
+    """One SSE connection (a team's phone or the host panel)"""
+
+    def __init__(self, base_url, path, ready, stop):
+        super().__init__(daemon=True)
+        self.base_url = urlparse(base_url)
+        self.path = path
+        self.ready = ready
+        self.stop = stop
+        self.received = {}  # (round, question) -> receive time of question_update
+        self.questions = []
+        self.events = 0
+        self.error = None
+
+    def run(self):
+        try:
+            conn = http.client.HTTPConnection(self.base_url.hostname, self.base_url.port or 80, timeout=60)
+            conn.request('GET', self.path, headers={'Accept': 'text/event-stream'})
+            response = conn.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f'HTTP {response.status}')
+            self.ready.release()
+
+            while not self.stop.is_set():
+                line = response.readline()
+                if not line:
+                    break
+                if not line.startswith(b'data: '):
+                    continue
+                event = json.loads(line[6:])
+                self.events += 1
+                if event.get('type') == 'quiz_started':
+                    self.questions = event['all_questions']
+                elif event.get('type') == 'question_update':
+                    self.received.setdefault((event['round'], event['question']), time.perf_counter())
+                elif event.get('type') in ('ended', 'timeout'):
+                    break
+            conn.close()
+        except Exception as e:
+            self.error = str(e)
+            self.ready.release()
+
+
+class HealthProbe(threading.Thread):
+    """Times /api/health while the quiz runs"""
+
+    def __init__(self, base_url, stop, interval=0.5, timeout=3):
+        super().__init__(daemon=True)
+        self.url = f'{base_url}/api/health'
+        self.stop = stop
+        self.interval = interval
+        self.timeout = timeout
+        self.samples = []
+        self.timeouts = 0
+
+    def run(self):
+        while not self.stop.is_set():
+            start = time.perf_counter()
+            try:
+                requests.get(self.url, timeout=self.timeout)
+                self.samples.append(time.perf_counter() - start)
+            except requests.RequestException:
+                self.timeouts += 1
+            self.stop.wait(self.interval)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(values):
+    """Milliseconds summary of a list of seconds"""
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 1),
+        'p95_ms': round(percentile(values, 95) * 1000, 1),
+        'p99_ms': round(percentile(values, 99) * 1000, 1),
+        'max_ms': round(max(values) * 1000, 1),
+    }
+
+
+def scrape_metrics(base_url, session):
+    """Sum of queries, DB seconds and requests over all views from /metrics"""
+    text = session.get(f'{base_url}/metrics', timeout=10,
+                       headers={'Authorization': f'Bearer {METRICS_TOKEN}'}).text
+    totals = {'queries': 0.0, 'db_seconds': 0.0, 'requests': 0.0}
+    for line in text.splitlines():
+        match = re.match(r'(music_bingo_request_\w+?)(_sum|_count)\{.*\} (\S+)$', line)
+        if not match:
+            continue
+        name, suffix, value = match.groups()
+        if name == 'music_bingo_request_queries' and suffix == '_sum':
+            totals['queries'] += float(value)
+        elif name == 'music_bingo_request_queries' and suffix == '_count':
+            totals['requests'] += float(value)
+        elif name == 'music_bingo_request_db_seconds' and suffix == '_sum':
+            totals['db_seconds'] += float(value)
+    return totals
+
+
+def git_revision():
+    try:
+        revision = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, text=True).strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD'], cwd=BACKEND_DIR) != 0
+        return revision + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed_quiz(args):
+    """Create the quiz in the database the server will use"""
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from api.pub_quiz_models import PubQuizSession, QuizGenre, QuizQuestion, QuizRound
+
+    call_command('migrate', verbosity=0)
+    session = PubQuizSession.objects.create(
+        session_code=f'LOAD{random.randint(1000, 9999)}', venue_name='Load Test Pub',
+        status='registration', total_rounds=args.rounds, questions_per_round=args.questions
+    )
+    genres = [QuizGenre.objects.get_or_create(name=f'Load Genre {n}')[0] for n in range(1, 9)]
+    for number in range(1, args.rounds + 1):
+        genre = genres[(number - 1) % len(genres)]
+        QuizRound.objects.create(session=session, round_number=number, genre=genre, round_name=genre.name)
+        for question in range(1, args.questions + 1):
+            QuizQuestion.objects.create(
+                session=session, genre=genre, round_number=number, question_number=question,
+                question_text=f'Round {number} question {question}?', correct_answer='42'
+            )
+    return session.session_code, [genre.id for genre in genres]
+
+
+def start_server(args, env, port):
+    if shutil.which('gunicorn'):
+        command = ['gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+                   '--worker-class', 'gthread', '--timeout', '120', '--keep-alive', '600',
+                   '--bind', f'127.0.0.1:{port}', 'wsgi:application']
+    else:
+        print("gunicorn not installed, using runserver (one thread per connection)")
+        command = [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}']
+    log = open(os.path.join(env['LOAD_TEST_DIR'], 'server.log'), 'w')
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited, see {log.name}")
+        try:
+            if requests.get(f'{base_url}/api/health', timeout=2).ok:
+                return server, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"Server did not start, see {log.name}")
+
+
+def play_quiz(args, base_url, session_code, genre_ids):
+    recorder = Recorder()
+    api = f'{base_url}/api/pub-quiz'
+    stop = threading.Event()
+    ready = threading.Semaphore(0)
+
+    # Registration and genre votes
+    def register(n):
+        response = recorder.call('register-team', 'POST', f'{api}/{session_code}/register-team', json={
+            'team_name': f'Load Team {n}', 'table_number': n, 'num_players': 4,
+            'genre_votes': random.sample(genre_ids, 3),
+        })
+        return response.json()['team_id'] if response else None
+
+    with ThreadPoolExecutor(max_workers=args.teams) as pool:
+        team_ids = [team_id for team_id in pool.map(register, range(args.teams)) if team_id]
+    print(f"Registered {len(team_ids)}/{args.teams} teams")
+
+    # Streams
+    players = [Stream(base_url, f'/api/pub-quiz/{session_code}/stream', ready, stop) for _ in team_ids]
+    host_stream = Stream(base_url, f'/api/pub-quiz/{session_code}/host-stream', ready, stop)
+    connect_start = time.perf_counter()
+    for stream in players + [host_stream]:
+        stream.start()
+    for _ in players + [host_stream]:
+        ready.acquire(timeout=60)
+    print(f"Opened {len(players) + 1} streams in {time.perf_counter() - connect_start:.2f}s")
+
+    probe = HealthProbe(base_url, stop)
+    probe.start()
+    # One kept-alive connection, so both scrapes reach the same worker
+    metrics_session = requests.Session()
+    before = scrape_metrics(base_url, metrics_session)
+    quiz_start = time.perf_counter()
+
+    response = recorder.call('start', 'POST', f'{api}/{session_code}/start')
+    questions = response.json()['all_questions'] if response else []
+    recorder.call('start-countdown', 'POST', f'{api}/{session_code}/start-countdown')
+
+    answers = defaultdict(list)
+    sent = {}
+    pending = []
+    pool = ThreadPoolExecutor(max_workers=max(len(team_ids), 1))
+
+    def answer(team_id, question, delay):
+        time.sleep(delay)
+        text = random.choice(['42', 'no idea', 'Paris'])
+        recorder.call('submit', 'POST', f'{api}/question/{question["id"]}/submit',
+                      json={'team_id': team_id, 'answer': text})
+        answers[team_id].append({'question_id': question['id'], 'answer': text})
+
+    def batch_submit(team_id, delay):
+        time.sleep(delay)
+        recorder.call('submit-answers', 'POST', f'{api}/{session_code}/submit-answers',
+                      json={'team_id': team_id, 'answers': answers[team_id]})
+
+    for index, question in enumerate(questions):
+        if index:
+            sent[(question['round'], question['number'])] = time.perf_counter()
+            recorder.call('next', 'POST', f'{api}/{session_code}/next')
+            recorder.call('start-countdown', 'POST', f'{api}/{session_code}/start-countdown')
+        recorder.call('host-data', 'GET', f'{api}/{session_code}/host-data')
+        for team_id in team_ids:
+            pending.append(pool.submit(answer, team_id, question, random.uniform(0, args.interval * 0.8)))
+        time.sleep(args.interval)
+
+    for future in pending:
+        future.result()
+    for team_id in team_ids:
+        pool.submit(batch_submit, team_id, random.uniform(0, args.interval))
+    pool.shutdown(wait=True)
+    recorder.call('next', 'POST', f'{api}/{session_code}/next')  # completes the quiz
+    duration = time.perf_counter() - quiz_start
+
+    after = scrape_metrics(base_url, metrics_session)
+    time.sleep(2)  # Let streams see the end
+    stop.set()
+    probe.join(timeout=5)
+
+    latencies, missing = [], 0
+    for player in players:
+        for key, sent_at in sent.items():
+            if key in player.received:
+                latencies.append(player.received[key] - sent_at)
+            else:
+                missing += 1
+
+    queries = after['queries'] - before['queries']
+    return {
+        'duration_s': round(duration, 1),
+        'teams': len(team_ids),
+        'questions': len(questions),
+        'endpoints': {
+            name: dict(summarize(samples), errors=recorder.errors[name])
+            for name, samples in sorted(recorder.samples.items())
+        },
+        'streams': {
+            'failed': sum(1 for s in players + [host_stream] if s.error),
+            'received_questions': sum(1 for p in players if len(p.questions) == len(questions)),
+            'question_update_deliveries': len(latencies),
+            'question_update_missed': missing,
+            'fan_out': summarize(latencies),
+        },
+        'health_probe': dict(summarize(probe.samples), timeouts=probe.timeouts),
+        'database': {
+            'queries': int(queries),
+            'queries_per_second': round(queries / duration, 1),
+            'queries_per_request': round(queries / max(after['requests'] - before['requests'], 1), 2),
+            'db_seconds': round(after['db_seconds'] - before['db_seconds'], 3),
+        },
+    }
+
+
+def print_report(result):
+    print("-" * 72)
+    print(f"{'endpoint':<18}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, stats in result['endpoints'].items():
+        print(f"{name:<18}{stats['count']:>7}{stats['errors']:>8}{stats.get('p50_ms', 0):>9}"
+              f"{stats.get('p95_ms', 0):>9}{stats.get('p99_ms', 0):>9}{stats.get('max_ms', 0):>9}")
+    streams = result['streams']
+    print("-" * 72)
+    print(f"Streams failed: {streams['failed']}  "
+          f"players with all questions: {streams['received_questions']}/{result['teams']}")
+    print(f"question_update delivered: {streams['question_update_deliveries']}  "
+          f"missed: {streams['question_update_missed']}")
+    if streams['fan_out']['count']:
+        fan_out = streams['fan_out']
+        print(f"  fan-out p50 {fan_out['p50_ms']}ms  p95 {fan_out['p95_ms']}ms  p99 {fan_out['p99_ms']}ms")
+    probe = result['health_probe']
+    print(f"Health probe: p50 {probe.get('p50_ms', '-')}ms  p95 {probe.get('p95_ms', '-')}ms  "
+          f"max {probe.get('max_ms', '-')}ms  timeouts {probe['timeouts']}")
+    database = result['database']
+    print(f"Database: {database['queries']} queries, {database['queries_per_second']}/s, "
+          f"{database['queries_per_request']}/request, {database['db_seconds']}s in DB")
+    if 'server_cpu_s' in result:
+        print(f"Server: {result['server_cpu_s']}s CPU, {result['server_rss_mb']} MB RSS")
+
+
+def compare(before_path, after_path):
+    """Print the change of every numeric result between two runs"""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    def flatten(data, prefix=''):
+        for key, value in data.items():
+            if isinstance(value, dict):
+                yield from flatten(value, f'{prefix}{key}.')
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield f'{prefix}{key}', value
+
+    old = dict(flatten(before['results']))
+    new = dict(flatten(after['results']))
+    print(f"{'metric':<44}{before['revision']:>12}{after['revision']:>12}{'change':>10}")
+    for key in sorted(old.keys() | new.keys()):
+        a, b = old.get(key), new.get(key)
+        if a is None or b is None:
+            change = 'n/a'
+        elif a == b:
+            continue
+        else:
+            change = f'{(b - a) / a * 100:+.0f}%' if a else 'new'
+        print(f"{key:<44}{str(a):>12}{str(b):>12}{change:>10}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate a pub quiz night against a local server')
+    parser.add_argument('--teams', type=int, default=40)
+    parser.add_argument('--rounds', type=int, default=2)
+    parser.add_argument('--questions', type=int, default=5, help='Questions per round')
+    parser.add_argument('--interval', type=float, default=2.0, help='Seconds each question stays open')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='gunicorn workers, as in production (/metrics reports one of them)')
+    parser.add_argument('--threads', type=int, default=100, help='gunicorn threads per worker, as in production')
+    parser.add_argument('--database-url', help='Use this database instead of a throwaway SQLite file')
+    parser.add_argument('--output', help='Save the results as JSON')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='Compare two saved runs')
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare)
+
+    workdir = tempfile.mkdtemp(prefix='quiz-load-')
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(workdir, 'load.sqlite3')}"
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+    env = dict(os.environ, DEBUG='False', LOAD_TEST_DIR=workdir, METRICS_TOKEN=METRICS_TOKEN)
+
+    print("=" * 72)
+    print("PUB QUIZ NIGHT LOAD TEST")
+    print("=" * 72)
+    print(f"Teams: {args.teams}  Questions: {args.rounds}x{args.questions}  Interval: {args.interval}s  "
+          f"Revision: {git_revision()}")
+
+    session_code, genre_ids = seed_quiz(args)
+    server, base_url = start_server(args, env, free_port())
+    try:
+        result = play_quiz(args, base_url, session_code, genre_ids)
+        try:
+            import psutil
+            process = psutil.Process(server.pid)
+            processes = [process] + process.children(recursive=True)
+            result['server_cpu_s'] = round(sum(sum(p.cpu_times()[:2]) for p in processes), 1)
+            result['server_rss_mb'] = round(sum(p.memory_info().rss for p in processes) / 2 ** 20, 1)
+        except ImportError:
+            pass
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    print_report(result)
+    print("=" * 72)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'revision': git_revision(), 'args': vars(args), 'results': result}, f, indent=2)
+        print(f"Saved to {args.output}")
+
+    errors = sum(stats['errors'] for stats in result['endpoints'].values())
+    if errors:
+        print(f"Server log: {os.path.join(workdir, 'server.log')}")
+    elif not args.database_url:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if not errors and not result['streams']['failed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
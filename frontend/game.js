@@ -75,6 +75,7 @@ function resetGameState() {
     gameState.announcementsAI = null;
     gameState.welcomeAnnounced = false;
     gameState.halfwayAnnounced = false;
+    playoutPlan = null;  // Re-plan for the new session
     // Note: Keep venueName and sessionId as they're set by the session loader
     console.log('✅ Game state reset complete');
 }
@@ -2584,6 +2585,7 @@ function resetGame() {
     gameState.isPlaying = false;
     gameState.welcomeAnnounced = false;
     gameState.halfwayAnnounced = false;
+    playoutPlan = null;
 
     // Clear saved game state
     clearGameState();
@@ -3328,22 +3330,28 @@ async function generateCards() {
         let attempts = 0;
         const maxAttempts = 120; // 4 minutes max (2 seconds per poll)
 
-        const checkStatus = async () => {
+        // Handles one status: pushed by the task stream, or polled when none is given
+        const checkStatus = async (pushed) => {
             attempts++;
 
             try {
-                const statusResponse = await fetch(`${CONFIG.API_URL}/api/tasks/${taskId}`);
+                let status = pushed;
+                if (!status) {
+                    const statusResponse = await fetch(`${CONFIG.API_URL}/api/tasks/${taskId}`);
 
-                if (!statusResponse.ok) {
-                    throw new Error('Failed to check status');
-                }
+                    if (!statusResponse.ok) {
+                        throw new Error('Failed to check status');
+                    }
 
-                const status = await statusResponse.json();
+                    status = await statusResponse.json();
+                }
                 console.log(`📊 Status check #${attempts}:`, status.status, `(${status.elapsed_time}s), Progress: ${status.progress || 0}%`);
 
                 // Update button with progress
                 if (status.status === 'processing' && status.progress) {
                     btn.textContent = `⏳ Generating... ${status.progress}%`;
+                } else if (status.status === 'pending' && status.queue_position) {
+                    btn.textContent = `⏳ Queued (#${status.queue_position})...`;
                 }
 
                 if (status.status === 'completed') {
@@ -3445,8 +3453,12 @@ async function generateCards() {
 
                 } else {
                     // Still processing, check again
-                    btn.textContent = `⏳ Generating... (${Math.round(status.elapsed_time)}s)`;
-                    setTimeout(checkStatus, 2000); // Poll every 2 seconds
+                    if (!status.progress && !status.queue_position) {
+                        btn.textContent = `⏳ Generating... (${Math.round(status.elapsed_time || 0)}s)`;
+                    }
+                    if (!pushed) {
+                        setTimeout(checkStatus, 2000); // Poll every 2 seconds
+                    }
                 }
 
             } catch (error) {
@@ -3457,15 +3469,44 @@ async function generateCards() {
                     btn.disabled = false;
                     if (pdfWindow) pdfWindow.close();
                     alert('Failed to check generation status. Please try again.');
-                } else {
+                } else if (!pushed) {
                     // Retry
                     setTimeout(checkStatus, 2000);
                 }
             }
         };
 
-        // Start polling
-        setTimeout(checkStatus, 2000); // First check after 2 seconds
+        // Follow the task's progress stream; fall back to polling without it
+        let polling = false;
+        const startPolling = () => {
+            if (!polling) {
+                polling = true;
+                setTimeout(checkStatus, 2000); // First check after 2 seconds
+            }
+        };
+
+        if (window.EventSource) {
+            const source = new EventSource(`${CONFIG.API_URL}/api/tasks/${taskId}/stream`);
+            source.onmessage = (event) => {
+                const status = JSON.parse(event.data);
+                if (status.type === 'timeout') {
+                    source.close();
+                    startPolling();
+                    return;
+                }
+                attempts = 0; // Pushed updates don't count towards the polling timeout
+                if (status.status === 'completed' || status.status === 'failed') {
+                    source.close();
+                }
+                checkStatus(status);
+            };
+            source.onerror = () => {
+                source.close();
+                startPolling();
+            };
+        } else {
+            startPolling();
+        }
 
     } catch (error) {
         console.error('❌ Error generating cards:', error);
@@ -3708,6 +3749,61 @@ async function fetchActiveJingles() {
     }
 }
 
+/**
+ * Planned running order from the backend (songs, jingles, announcements)
+ * null = not loaded yet, false = unavailable (fall back to active schedules)
+ */
+let playoutPlan = null;
+
+/**
+ * Load the playout plan for this bingo session and prefetch its jingles
+ */
+async function loadPlayoutPlan() {
+    const sessionId = new URLSearchParams(window.location.search).get('session') || localStorage.getItem('sessionId');
+    if (!sessionId) {
+        playoutPlan = false;
+        return;
+    }
+
+    try {
+        const fromRound = Math.max(gameState.called.length, 1);
+        const response = await fetch(`${CONFIG.API_URL}/api/bingo/session/${sessionId}/playout?from_round=${fromRound}`);
+        if (!response.ok) {
+            playoutPlan = false;
+            return;
+        }
+
+        playoutPlan = await response.json();
+        playoutPlan.replanAt = Date.parse(playoutPlan.replan_after);
+        console.log(`🗓️ Playout plan loaded: ${Object.keys(playoutPlan.jingles).length} jingles over ${playoutPlan.total_rounds} songs`);
+
+        // Prefetch jingles in play order so playback starts instantly
+        playoutPlan.assets.forEach(asset => {
+            const audio = new Audio(`${CONFIG.API_URL}${asset}`);
+            audio.preload = 'auto';
+        });
+    } catch (error) {
+        console.error('Error loading playout plan:', error);
+        playoutPlan = false;
+    }
+}
+
+/**
+ * Whether schedules were created, edited or deleted since the plan was made
+ * (cheap version check; errors keep the current plan)
+ */
+async function playoutPlanIsStale() {
+    try {
+        const response = await fetch(`${CONFIG.API_URL}/api/jingle-schedules/version`);
+        if (!response.ok) return false;
+        const data = await response.json();
+        return data.version !== playoutPlan.schedule_version;
+    } catch (error) {
+        console.error('Error checking schedule version:', error);
+        return false;
+    }
+}
+
 /**
  * Track jingle play for analytics (optional)
  */
@@ -3721,7 +3817,10 @@ async function trackJinglePlay(scheduleId, roundNumber) {
         await fetch(url, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ round_number: roundNumber })
+            body: JSON.stringify({
+                round_number: roundNumber,
+                venue_name: localStorage.getItem('venueName') || ''
+            })
         });
     } catch (error) {
         console.error('Error tracking jingle play:', error);
@@ -3732,6 +3831,32 @@ async function trackJinglePlay(scheduleId, roundNumber) {
  * Check if a jingle should play and play it
  */
 async function checkAndPlayJingle() {
+    // Use the planned running order when available (re-plan at the next schedule
+    // boundary, or as soon as a schedule is edited)
+    if (playoutPlan === null || (playoutPlan && Date.now() >= playoutPlan.replanAt)) {
+        await loadPlayoutPlan();
+    } else if (playoutPlan && await playoutPlanIsStale()) {
+        console.log('🗓️ Jingle schedules changed, re-planning');
+        await loadPlayoutPlan();
+    }
+    // Songs past the end of the plan (or a plan without songs) use the active schedules
+    if (playoutPlan && gameState.called.length <= playoutPlan.total_rounds) {
+        const songsPlayed = gameState.called.length;
+        const planned = playoutPlan.jingles[songsPlayed];
+        if (!planned) return;
+
+        console.log(`🎵 Playing planned jingle: ${planned.jingle_name}`);
+        updateStatus('🎵 Playing promotional jingle...', true);
+        try {
+            await playJingleAudio(planned.jingle_filename);
+            await trackJinglePlay(planned.schedule_id, songsPlayed);
+            await new Promise(resolve => setTimeout(resolve, 500));
+        } catch (error) {
+            console.error('Error playing jingle:', error);
+        }
+        return;
+    }
+
     // Fetch active schedules from backend
     const activeSchedules = await fetchActiveJingles();
 
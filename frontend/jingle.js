@@ -725,11 +725,64 @@ async function generateJingle() {
     }
 }
 
+function handleTaskStatus(task) {
+    console.log('Task status:', task.status, task.progress);
+
+    // Update progress bar
+    updateProgress(task.progress, task.current_step, task.queue_position);
+
+    if (task.status === 'completed') {
+        console.log('✅ Jingle generation completed!');
+        showCompletedJingle(task.result);
+        return true;
+    } else if (task.status === 'failed') {
+        throw new Error(task.error || 'Generation failed');
+    }
+    return false;
+}
+
+function showPollingError(error) {
+    console.error('Polling error:', error);
+    showError(error.message);
+    document.getElementById('generateButtons').style.display = 'flex';
+}
+
 async function pollTaskStatus(taskId) {
-    console.log('📊 Polling task status:', taskId);
+    console.log('📊 Following task status:', taskId);
 
     const apiUrl = window.BACKEND_URL || '';
-    const endpoint = apiUrl.includes('/api') ? `${apiUrl}/jingle-tasks/${taskId}` : `${apiUrl}/api/jingle-tasks/${taskId}`;
+    const base = apiUrl.includes('/api') ? apiUrl : `${apiUrl}/api`;
+
+    // Progress is pushed over the task stream; poll only if it is unavailable
+    if (window.EventSource) {
+        const source = new EventSource(`${base}/tasks/${taskId}/stream`);
+        source.onmessage = (event) => {
+            const task = JSON.parse(event.data);
+            if (task.type === 'timeout') {
+                source.close();
+                startPolling(`${base}/jingle-tasks/${taskId}`);
+                return;
+            }
+            try {
+                if (handleTaskStatus(task)) {
+                    source.close();
+                }
+            } catch (error) {
+                source.close();
+                showPollingError(error);
+            }
+        };
+        source.onerror = () => {
+            source.close();
+            startPolling(`${base}/jingle-tasks/${taskId}`);
+        };
+        return;
+    }
+    startPolling(`${base}/jingle-tasks/${taskId}`);
+}
+
+function startPolling(endpoint) {
+    if (pollingInterval) return;
 
     pollingInterval = setInterval(async () => {
         try {
@@ -739,31 +792,20 @@ async function pollTaskStatus(taskId) {
                 throw new Error('Failed to get task status');
             }
 
-            const task = await response.json();
-            console.log('Task status:', task.status, task.progress);
-
-            // Update progress bar
-            updateProgress(task.progress, task.current_step);
-
-            if (task.status === 'completed') {
-                clearInterval(pollingInterval);
-                console.log('✅ Jingle generation completed!');
-                showCompletedJingle(task.result);
-            } else if (task.status === 'failed') {
+            if (handleTaskStatus(await response.json())) {
                 clearInterval(pollingInterval);
-                throw new Error(task.error || 'Generation failed');
+                pollingInterval = null;
             }
 
         } catch (error) {
             clearInterval(pollingInterval);
-            console.error('Polling error:', error);
-            showError(error.message);
-            document.getElementById('generateButtons').style.display = 'flex';
+            pollingInterval = null;
+            showPollingError(error);
         }
     }, 2000); // Poll every 2 seconds
 }
 
-function updateProgress(percentage, step) {
+function updateProgress(percentage, step, queuePosition) {
     const progressBar = document.getElementById('progressBar');
     const progressText = document.getElementById('progressText');
 
@@ -779,6 +821,10 @@ function updateProgress(percentage, step) {
         'completed': 'Complete! 🎉'
     };
 
+    if (queuePosition) {
+        progressText.textContent = `Queued (#${queuePosition})...`;
+        return;
+    }
     progressText.textContent = stepMessages[step] || 'Processing...';
 }
 